@@ -15,12 +15,15 @@
 import collections
 import re
 
+import eventlet
+from eventlet import semaphore
 from neutron.agent.linux import external_process
 from neutron.agent.linux import ip_lib
 from neutron.common import utils
 from neutron_lib import constants as n_const
 from oslo_concurrency import lockutils
 from oslo_log import log
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 from ovsdbapp.backend.ovs_idl import event as row_event
 from ovsdbapp.backend.ovs_idl import vlog
@@ -44,6 +47,9 @@ METADATA_DEFAULT_CIDR = '%s/%d' % (METADATA_DEFAULT_IP,
                                    METADATA_DEFAULT_PREFIX)
 METADATA_PORT = 80
 MAC_PATTERN = re.compile(r'([0-9A-F]{2}[:-]){5}([0-9A-F]{2})', re.I)
+# Time in seconds the changes to the metadata networks of the chassis are
+# accumulated before being written to the SB database
+CHASSIS_METADATA_NETWORKS_FLUSH_DELAY = 0.5
 
 MetadataPortInfo = collections.namedtuple('MetadataPortInfo', ['mac',
                                                                'ip_addresses'])
@@ -67,6 +73,57 @@ def _wait_if_syncing(f):
     return wrapped
 
 
+class DatapathProvisioner(object):
+    """Run the provisioning of the datapaths concurrently.
+
+    Up to ``workers`` datapaths are provisioned (or torn down) at once.
+    Scheduling a datapath which is already waiting to be provisioned only
+    replaces the function to run, scheduling a datapath while it's being
+    provisioned runs it again once finished, so a burst of updates of a
+    datapath is coalesced into at most two runs.
+    """
+
+    def __init__(self, workers):
+        self._semaphore = semaphore.Semaphore(workers)
+        self._pool = eventlet.GreenPool()
+        # Datapaths waiting to be provisioned and their function
+        self._pending = {}
+        self._running = set()
+        # Datapath -> time in seconds its last provisioning took
+        self.latencies = {}
+
+    def schedule(self, datapath, func):
+        """Schedule the call of func(datapath)."""
+        coalesced = datapath in self._pending
+        self._pending[datapath] = func
+        if not coalesced and datapath not in self._running:
+            self._pool.spawn_n(self._run, datapath)
+
+    def _run(self, datapath):
+        with self._semaphore:
+            func = self._pending.pop(datapath)
+            self._running.add(datapath)
+            watch = timeutils.StopWatch().start()
+            try:
+                func(datapath)
+            except Exception:
+                LOG.exception("Failed to provision datapath %s", datapath)
+            finally:
+                # The datapath has been scheduled again while being
+                # provisioned, run it again before schedule() can.
+                if datapath in self._pending:
+                    self._pool.spawn_n(self._run, datapath)
+                self._running.discard(datapath)
+            self.latencies[datapath] = watch.elapsed()
+            LOG.debug("Datapath %(datapath)s provisioned in %(time).3f "
+                      "seconds", {'datapath': datapath,
+                                  'time': self.latencies[datapath]})
+
+    def wait(self):
+        """Wait for all the scheduled datapaths to be provisioned."""
+        self._pool.waitall()
+
+
 class PortBindingChassisEvent(row_event.RowEvent):
     def __init__(self, metadata_agent):
         self.agent = metadata_agent
@@ -144,6 +201,13 @@ class MetadataAgent(object):
         self._process_monitor = external_process.ProcessMonitor(
             config=self.conf,
             resource_type='metadata')
+        self._provisioner = DatapathProvisioner(
+            self.conf.metadata_provisioning_workers)
+        # Datapath -> True/False to add/remove it from the metadata
+        # networks of the chassis on the next flush
+        self._metadata_networks_changes = {}
+        self._metadata_networks_flush_timer = None
+        self._defer_metadata_networks_flush = False
 
     def start(self):
         # Launch the server that will act as a proxy between the VM's and Nova.
@@ -193,13 +257,21 @@ class MetadataAgent(object):
         chassis are serving metadata. Also, it will tear down those namespaces
         which were serving metadata but are no longer needed.
         """
-        metadata_namespaces = self.ensure_all_networks_provisioned()
-        system_namespaces = ip_lib.list_network_namespaces()
-        unused_namespaces = [ns for ns in system_namespaces if
-                             ns.startswith(NS_PREFIX) and
-                             ns not in metadata_namespaces]
-        for ns in unused_namespaces:
-            self.teardown_datapath(self._get_datapath_name(ns))
+        # Write the metadata networks of the chassis once, at the end
+        self._defer_metadata_networks_flush = True
+        try:
+            metadata_namespaces = self.ensure_all_networks_provisioned()
+            system_namespaces = ip_lib.list_network_namespaces()
+            unused_namespaces = [ns for ns in system_namespaces if
+                                 ns.startswith(NS_PREFIX) and
+                                 ns not in metadata_namespaces]
+            for ns in unused_namespaces:
+                self._provisioner.schedule(self._get_datapath_name(ns),
+                                           self.teardown_datapath)
+            self._provisioner.wait()
+        finally:
+            self._defer_metadata_networks_flush = False
+            self.flush_chassis_metadata_networks()
 
     @staticmethod
     def _get_veth_name(datapath):
@@ -251,7 +323,12 @@ class MetadataAgent(object):
           chassis).
         * Tear down the namespace if there are no more ports in our chassis
           for this datapath.
+
+        The update is run asynchronously by the DatapathProvisioner.
         """
+        self._provisioner.schedule(datapath, self._update_datapath)
+
+    def _update_datapath(self, datapath):
         ports = self.sb_idl.get_ports_on_chassis(self.chassis)
         datapath_ports = [p for p in ports if p.type == '' and
                           str(p.datapath.uuid) == datapath]
@@ -372,32 +449,83 @@ class MetadataAgent(object):
         ports = self.sb_idl.get_ports_on_chassis(self.chassis)
         datapaths = {str(p.datapath.uuid) for p in ports if p.type == ''}
         namespaces = []
-        # Make sure that all those datapaths are serving metadata
-        for datapath in datapaths:
-            netns = self.provision_datapath(datapath)
+
+        def provision(datapath):
+            try:
+                netns = self.provision_datapath(datapath)
+            except Exception:
+                # Don't let sync() tear down the namespace of a datapath
+                # that failed to be provisioned
+                namespaces.append(self._get_namespace_name(datapath))
+                raise
             if netns:
                 namespaces.append(netns)
 
+        # Make sure that all those datapaths are serving metadata
+        watch = timeutils.StopWatch().start()
+        for datapath in datapaths:
+            self._provisioner.schedule(datapath, provision)
+        self._provisioner.wait()
+        if datapaths:
+            slowest = max(datapaths, key=lambda dp:
+                          self._provisioner.latencies.get(dp, 0))
+            LOG.info("Provisioned %(count)d datapaths in %(time).2f seconds, "
+                     "the slowest one (%(datapath)s) took %(slowest).2f "
+                     "seconds", {'count': len(datapaths),
+                                 'time': watch.elapsed(),
+                                 'datapath': slowest,
+                                 'slowest': self._provisioner.latencies.get(
+                                     slowest, 0)})
+
         return namespaces
 
     def update_chassis_metadata_networks(self, datapath, remove=False):
         """Update metadata networks hosted in this chassis.
 
         Add or remove a datapath from the list of current datapaths that
-        we're currently serving metadata.
+        we're currently serving metadata. The changes are accumulated and
+        written to the chassis in a single transaction at the end of a
+        sync or after CHASSIS_METADATA_NETWORKS_FLUSH_DELAY seconds.
         """
-        current_dps = self.sb_idl.get_chassis_metadata_networks(self.chassis)
-        updated = False
-        if remove:
-            if datapath in current_dps:
-                current_dps.remove(datapath)
-                updated = True
-        else:
-            if datapath not in current_dps:
-                current_dps.append(datapath)
-                updated = True
-
-        if updated:
-            with self.sb_idl.create_transaction(check_error=True) as txn:
-                txn.add(self.sb_idl.set_chassis_metadata_networks(
-                    self.chassis, current_dps))
+        self._metadata_networks_changes[datapath] = not remove
+        if (self._defer_metadata_networks_flush or
+                self._metadata_networks_flush_timer is not None):
+            return
+        self._metadata_networks_flush_timer = eventlet.spawn_after(
+            CHASSIS_METADATA_NETWORKS_FLUSH_DELAY,
+            self._flush_chassis_metadata_networks_timer)
+
+    def _flush_chassis_metadata_networks_timer(self):
+        self._metadata_networks_flush_timer = None
+        try:
+            self.flush_chassis_metadata_networks()
+        except Exception:
+            LOG.exception("Failed to update the metadata networks of "
+                          "chassis %s, retrying", self.chassis)
+            self._metadata_networks_flush_timer = eventlet.spawn_after(
+                CHASSIS_METADATA_NETWORKS_FLUSH_DELAY,
+                self._flush_chassis_metadata_networks_timer)
+
+    @lockutils.synchronized('chassis_metadata_networks')
+    def flush_chassis_metadata_networks(self):
+        """Write the pending metadata networks changes to the chassis."""
+        changes = self._metadata_networks_changes
+        if not changes:
+            return
+        self._metadata_networks_changes = {}
+        try:
+            current_dps = self.sb_idl.get_chassis_metadata_networks(
+                self.chassis)
+            updated_dps = [dp for dp in current_dps if changes.get(dp, True)]
+            updated_dps += sorted(dp for dp, add in changes.items()
+                                  if add and dp not in current_dps)
+            if updated_dps != current_dps:
+                with self.sb_idl.create_transaction(check_error=True) as txn:
+                    txn.add(self.sb_idl.set_chassis_metadata_networks(
+                        self.chassis, updated_dps))
+        except Exception:
+            # Keep the changes for the next flush unless the datapaths
+            # have been changed again in the meantime
+            for dp, add in changes.items():
+                self._metadata_networks_changes.setdefault(dp, add)
+            raise
@@ -15,6 +15,7 @@
 import hashlib
 import hmac
 
+from eventlet import pools
 import httplib2
 from neutron.agent.linux import utils as agent_utils
 from neutron.conf.agent.metadata import config
@@ -24,6 +25,8 @@ from neutron_lib.callbacks import resources
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import encodeutils
+from oslo_utils import timeutils
+from ovsdbapp.backend.ovs_idl import event as row_event
 import six
 import six.moves.urllib.parse as urlparse
 import webob
@@ -41,11 +44,162 @@ MODE_MAP = {
     config.ALL_MODE: 0o666,
 }
 
+# Only the responses which can't change during the life of an instance are
+# cached: the versions of the metadata APIs and the IDs of the instance
+# given by the EC2 API, e.g. /latest/meta-data/instance-id. The rest of the
+# metadata can be modified, through the nova API (e.g. meta_data.json), by
+# a rebuild (e.g. the user data or keys) or by the instance (its password).
+_CACHEABLE_PATHS = frozenset(['', 'openstack'])
+_CACHEABLE_EC2_PATHS = frozenset(['meta-data/ami-launch-index',
+                                  'meta-data/instance-id',
+                                  'meta-data/reservation-id'])
+
+
+def _is_cacheable_path(path):
+    path = path.strip('/')
+    if path in _CACHEABLE_PATHS:
+        return True
+    version, _sep, ec2_path = path.partition('/')
+    return version != 'openstack' and ec2_path in _CACHEABLE_EC2_PATHS
+
+
+def _get_port_binding_keys(datapath, mac):
+    if not mac:
+        return []
+    # The first entry of the mac column has the format "<mac> <ip1> ..."
+    return [(datapath, addr) for addr in mac[0].split(' ')[1:]]
+
+
+class InstanceInfoCache(object):
+    """Cache of the instance and project IDs by network and IP address.
+
+    Every metadata request needs the Port_Binding of the (network, IP
+    address) it comes from. The result of the lookup is kept here and
+    invalidated by the Port_Binding events of the proxy's SB IDL (see
+    PortBindingCacheEvent), so the burst of requests of an instance at
+    boot time only looks up the Port_Binding table once.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, rows):
+        """Return the (instance ID, project ID) tuple of key, or None.
+
+        :param key: The (network, IP address) tuple to look for.
+        :param rows: The rows of the Port_Binding table. The python IDL
+                     drops its rows on reconnection without notifying the
+                     deletions, entries whose row is gone are discarded.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            row_uuid, ids = entry
+            if row_uuid in rows:
+                self.hits += 1
+                return ids
+            self._entries.pop(key, None)
+        self.misses += 1
+        return None
+
+    def set(self, key, row_uuid, ids):
+        self._entries[key] = (row_uuid, ids)
+
+    def invalidate(self, row, old=None):
+        datapath = str(row.datapath.uuid)
+        keys = _get_port_binding_keys(datapath, getattr(row, 'mac', []))
+        if old is not None:
+            keys += _get_port_binding_keys(datapath, getattr(old, 'mac', []))
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return {'entries': len(self), 'hits': self.hits,
+                'misses': self.misses}
+
+
+class PortBindingCacheEvent(row_event.RowEvent):
+    """Invalidate the InstanceInfoCache entries of a Port_Binding."""
+
+    # The Port_Binding columns the cached instance info depends on
+    COLUMNS = ('datapath', 'external_ids', 'mac')
+
+    def __init__(self, cache):
+        self.cache = cache
+        table = 'Port_Binding'
+        events = (self.ROW_CREATE, self.ROW_UPDATE, self.ROW_DELETE)
+        super(PortBindingCacheEvent, self).__init__(events, table, None)
+        self.event_name = 'PortBindingCacheEvent'
+
+    def matches(self, event, row, old=None):
+        if not super(PortBindingCacheEvent, self).matches(event, row, old):
+            return False
+        # Skip the updates of other columns (e.g. binding a port to a
+        # chassis), they are the bulk of the Port_Binding updates.
+        if event == self.ROW_UPDATE:
+            return any(hasattr(old, column) for column in self.COLUMNS)
+        return True
+
+    def run(self, event, row, old):
+        self.cache.invalidate(row, old)
+
+
+class ResponseCache(object):
+    """Short lived cache of the responses of the nova metadata server."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._next_prune = timeutils.now() + ttl
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _prune(self, now):
+        for key, (expires_at, _resp) in list(self._entries.items()):
+            if expires_at <= now:
+                del self._entries[key]
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, resp = entry
+        if expires_at <= timeutils.now():
+            self._entries.pop(key, None)
+            return None
+        return resp
+
+    def set(self, key, resp):
+        now = timeutils.now()
+        # Drop the expired entries once per TTL, the cache only holds the
+        # responses to the instances which requested metadata lately.
+        if now >= self._next_prune:
+            self._prune(now)
+            self._next_prune = now + self.ttl
+        self._entries[key] = (now + self.ttl, resp)
+
 
 class MetadataProxyHandler(object):
 
     def __init__(self, conf):
         self.conf = conf
+        self.instance_cache = InstanceInfoCache()
+        # httplib2.Http objects keep their connections open, but can't be
+        # shared by concurrent requests: keep a pool of them per worker.
+        self._http_pool = pools.Pool(max_size=conf.nova_metadata_pool_size,
+                                     create=self._create_http)
+        self._response_cache = None
+        if conf.nova_metadata_cache_ttl:
+            self._response_cache = ResponseCache(
+                conf.nova_metadata_cache_ttl)
         self.subscribe()
 
     def subscribe(self):
@@ -56,7 +210,8 @@ class MetadataProxyHandler(object):
     def post_fork_initialize(self, resource, event, trigger, payload=None):
         # We need to open a connection to OVN SouthBound database for
         # each worker so that we can process the metadata requests.
-        self.sb_idl = ovsdb.MetadataAgentOvnSbIdl().start()
+        self.sb_idl = ovsdb.MetadataAgentOvnSbIdl(
+            [PortBindingCacheEvent(self.instance_cache)]).start()
 
     @webob.dec.wsgify(RequestClass=webob.Request)
     def __call__(self, req):
@@ -80,15 +235,54 @@ class MetadataProxyHandler(object):
         remote_address = req.headers.get('X-Forwarded-For')
         network_id = req.headers.get('X-OVN-Network-ID')
 
+        key = (network_id, remote_address)
+        ids = self.instance_cache.get(
+            key, self.sb_idl.tables['Port_Binding'].rows)
+        if ids is not None:
+            return ids
+
         ports = self.sb_idl.get_network_port_bindings_by_ip(network_id,
                                                             remote_address)
         if len(ports) == 1:
             external_ids = ports[0].external_ids
-            return (external_ids[ovn_const.OVN_DEVID_EXT_ID_KEY],
-                    external_ids[ovn_const.OVN_PROJID_EXT_ID_KEY])
+            ids = (external_ids[ovn_const.OVN_DEVID_EXT_ID_KEY],
+                   external_ids[ovn_const.OVN_PROJID_EXT_ID_KEY])
+            self.instance_cache.set(key, ports[0].uuid, ids)
+            LOG.debug('Instance lookup cache: %s',
+                      self.instance_cache.stats())
+            return ids
         return None, None
 
+    def _get_nova_host_port(self):
+        return '%s:%s' % (self.conf.nova_metadata_host,
+                          self.conf.nova_metadata_port)
+
+    def _create_http(self):
+        h = httplib2.Http(
+            ca_certs=self.conf.auth_ca_cert,
+            disable_ssl_certificate_validation=self.conf.nova_metadata_insecure
+        )
+        if self.conf.nova_client_cert and self.conf.nova_client_priv_key:
+            h.add_certificate(self.conf.nova_client_priv_key,
+                              self.conf.nova_client_cert,
+                              self._get_nova_host_port())
+        return h
+
+    def _get_response_cache_key(self, instance_id, req):
+        if (self._response_cache is None or req.method != 'GET' or
+                not _is_cacheable_path(req.path_info)):
+            return None
+        return (instance_id, req.path_info, req.query_string)
+
     def _proxy_request(self, instance_id, tenant_id, req):
+        cache_key = self._get_response_cache_key(instance_id, req)
+        if cache_key is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                LOG.debug('Serving cached response to %s', req.path_info)
+                req.response.content_type, req.response.body = cached
+                return req.response
+
         headers = {
             'X-Forwarded-For': req.headers.get('X-Forwarded-For'),
             'X-Instance-ID': str(instance_id),
@@ -96,8 +290,7 @@ class MetadataProxyHandler(object):
             'X-Instance-ID-Signature': self._sign_instance_id(instance_id)
         }
 
-        nova_host_port = '%s:%s' % (self.conf.nova_metadata_host,
-                                    self.conf.nova_metadata_port)
+        nova_host_port = self._get_nova_host_port()
         LOG.debug('Request to Nova at %s', nova_host_port)
         LOG.debug(headers)
         url = urlparse.urlunsplit((
@@ -107,21 +300,17 @@ class MetadataProxyHandler(object):
             req.query_string,
             ''))
 
-        h = httplib2.Http(
-            ca_certs=self.conf.auth_ca_cert,
-            disable_ssl_certificate_validation=self.conf.nova_metadata_insecure
-        )
-        if self.conf.nova_client_cert and self.conf.nova_client_priv_key:
-            h.add_certificate(self.conf.nova_client_priv_key,
-                              self.conf.nova_client_cert,
-                              nova_host_port)
-        resp, content = h.request(url, method=req.method, headers=headers,
-                                  body=req.body)
+        with self._http_pool.item() as h:
+            resp, content = h.request(url, method=req.method,
+                                      headers=headers, body=req.body)
 
         if resp.status == 200:
             req.response.content_type = resp['content-type']
             req.response.body = content
             LOG.debug(str(resp))
+            if cache_key is not None:
+                self._response_cache.set(cache_key,
+                                         (resp['content-type'], content))
             return req.response
         elif resp.status == 403:
             LOG.warning(
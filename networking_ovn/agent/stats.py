@@ -16,6 +16,7 @@ import collections
 
 from oslo_utils import timeutils
 
+from networking_ovn.common import constants as ovn_const
 from networking_ovn.common import exceptions as ovn_exc
 
 Stats = collections.namedtuple("Stats", ['nb_cfg', 'updated_at'])
@@ -39,3 +40,88 @@ class _AgentStats(object):
 
 
 AgentStats = _AgentStats()
+
+
+def _format_agent_info(chassis, binary, agent_id, type_, description):
+    return {
+        'binary': binary,
+        'host': chassis.hostname,
+        'availability_zone': 'n/a',
+        'topic': 'n/a',
+        'description': description,
+        'configurations': {
+            'chassis_name': chassis.name,
+            'bridge-mappings':
+                chassis.external_ids.get('ovn-bridge-mappings', '')},
+        'start_flag': True,
+        'agent_type': type_,
+        'id': agent_id,
+        'admin_state_up': True}
+
+
+def _agents_from_chassis(chassis):
+    agent_dict = {}
+
+    # Check for ovn-controller / ovn-controller gateway
+    agent_type = ovn_const.OVN_CONTROLLER_AGENT
+    agent_id = str(chassis.uuid)
+    if ('enable-chassis-as-gw' in
+            chassis.external_ids.get('ovn-cms-options', [])):
+        agent_type = ovn_const.OVN_CONTROLLER_GW_AGENT
+
+    description = chassis.external_ids.get(ovn_const.OVN_AGENT_DESC_KEY, '')
+    agent_dict[agent_id] = _format_agent_info(
+        chassis, 'ovn-controller', agent_id, agent_type, description)
+
+    # Check for the metadata agent
+    metadata_agent_id = chassis.external_ids.get(
+        ovn_const.OVN_AGENT_METADATA_ID_KEY)
+    if metadata_agent_id:
+        description = chassis.external_ids.get(
+            ovn_const.OVN_AGENT_METADATA_DESC_KEY, '')
+        agent_dict[metadata_agent_id] = _format_agent_info(
+            chassis, 'networking-ovn-metadata-agent', metadata_agent_id,
+            ovn_const.OVN_METADATA_AGENT, description)
+
+    return agent_dict
+
+
+class _AgentCache(object):
+    """The agents running on the chassis.
+
+    The agents of a chassis are formatted when the chassis is created or
+    updated, not on every agent API call, and are indexed by ID: the ID of
+    a metadata agent is not the UUID of its chassis. The liveness of the
+    agents is not cached.
+    """
+
+    def __init__(self):
+        self._agents_by_chassis = {}
+        self._chassis_by_agent_id = {}
+
+    def update(self, chassis):
+        """Format and cache the agents of the chassis."""
+        self.delete(chassis.uuid)
+        agents = _agents_from_chassis(chassis)
+        self._agents_by_chassis[chassis.uuid] = agents
+        for agent_id in agents:
+            self._chassis_by_agent_id[agent_id] = chassis.uuid
+        return agents
+
+    def delete(self, chassis_uuid):
+        for agent_id in self._agents_by_chassis.pop(chassis_uuid, {}):
+            self._chassis_by_agent_id.pop(agent_id, None)
+
+    def get_agents(self, chassis):
+        """Return the {agent ID: agent} dictionary of the chassis."""
+        agents = self._agents_by_chassis.get(chassis.uuid)
+        if agents is None:
+            agents = self.update(chassis)
+        return agents
+
+    def get_chassis_uuid(self, agent_id):
+        """Return the UUID of the chassis running the agent, if known."""
+        return self._chassis_by_agent_id.get(agent_id)
+
+
+AgentCache = _AgentCache()
@@ -13,6 +13,7 @@
 #    under the License.
 
 from neutron_lib.agent import topics
+from neutron_lib import context as n_context
 from neutron_lib.plugins import directory
 from oslo_config import cfg
 from oslo_db import options as db_options
@@ -202,9 +203,22 @@ def main():
         core_plugin, ovn_api, ovn_sb_api, mode, ovn_driver)
 
     LOG.info('Sync for Northbound db started with mode : %s', mode)
+    # The concurrency and the transaction chunk size can be tuned with
+    # the --ovn-neutron_sync_concurrency and --ovn-ovsdb_txn_chunk_size
+    # command line options.
+    LOG.info('Northbound db sync stages concurrency: %(concurrency)d, '
+             'transaction chunk size: %(chunk_size)d',
+             {'concurrency': ovn_config.get_ovn_neutron_sync_concurrency(),
+              'chunk_size': ovn_config.get_ovn_txn_chunk_size()})
     synchronizer.do_sync()
     LOG.info('Sync completed for Northbound db')
 
+    if mode == ovn_db_sync.SYNC_MODE_LOG:
+        # Estimate the transactions of the migration from Address Sets to
+        # Port Groups run by the neutron server, if it is still pending.
+        synchronizer.migrate_to_port_groups(n_context.get_admin_context(),
+                                            dry_run=True)
+
     sb_synchronizer = ovn_db_sync.OvnSbSynchronizer(
         core_plugin, ovn_sb_api, ovn_driver)
 
@@ -12,6 +12,8 @@
 #    under the License.
 #
 
+import collections
+
 import netaddr
 
 from neutron_lib import constants as const
@@ -19,6 +21,7 @@ from neutron_lib import exceptions as n_exceptions
 from oslo_config import cfg
 
 from networking_ovn._i18n import _
+from networking_ovn.common import config
 from networking_ovn.common import constants as ovn_const
 from networking_ovn.common import utils
 
@@ -46,6 +49,13 @@ ICMP_PROTOCOLS = (const.PROTO_NAME_ICMP,
                   PROTOCOL_NAME_TO_NUM_MAP[const.PROTO_NAME_IPV6_ICMP],
                   PROTOCOL_NAME_TO_NUM_MAP[const.PROTO_NAME_IPV6_ICMP_LEGACY])
 
+# Maximum number of security group rules whose match is kept compiled
+SG_RULE_MATCH_CACHE_SIZE = 10000
+
+# The columns identifying an ACL of a Port Group
+ACL_PORT_GROUP_KEY_COLUMNS = ('port_group', 'direction', 'priority', 'match',
+                              'action', 'log', 'name', 'severity')
+
 
 class ProtocolNotSupported(n_exceptions.NeutronException):
     message = _('The protocol "%(protocol)s" is not supported. Valid '
@@ -325,47 +335,99 @@ def acl_remote_group_id(r, ip_version, ovn=None):
     return ' && %s.%s == $%s' % (ip_version, src_or_dst, addrset_name)
 
 
-def _add_sg_rule_acl_for_port(port, r):
-    # Update the match based on which direction this rule is for (ingress
-    # or egress).
-    match = acl_direction(r, port)
-
+def _compile_sg_rule_match(r, ovn=None):
     # Update the match for IPv4 vs IPv6.
-    ip_match, ip_version, icmp = acl_ethertype(r)
-    match += ip_match
+    match, ip_version, icmp = acl_ethertype(r)
 
     # Update the match if an IPv4 or IPv6 prefix was specified.
     match += acl_remote_ip_prefix(r, ip_version)
 
     # Update the match if remote group id was specified.
-    match += acl_remote_group_id(r, ip_version)
+    match += acl_remote_group_id(r, ip_version, ovn)
 
     # Update the match for the protocol (tcp, udp, icmp) and port/type
     # range if specified.
     match += acl_protocol_and_ports(r, icmp)
+    return match
 
-    # Finally, create the ACL entry for the direction specified.
-    return add_sg_rule_acl_for_port(port, r, match)
 
+class SGRuleMatchCache(object):
+    """The compiled matches of the security group rules.
+
+    The match of the ACL of a rule starts with the selector of the port or
+    Port Group it applies to, the rest only depends on the rule. It is
+    compiled once per revision of the rule and reused for all the ports
+    the rule applies to, the least recently used rules are evicted above
+    max_size. The rules without id or revision number are compiled every
+    time.
+    """
+
+    def __init__(self, max_size=SG_RULE_MATCH_CACHE_SIZE):
+        self.max_size = max_size
+        # {rule id: (revision number, {Port Group address sets: match})}
+        self._matches = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._matches)
+
+    def get(self, r, ovn=None):
+        """Return the match of the rule without its port selector."""
+        rule_id = r.get('id')
+        revision = r.get('revision_number')
+        if rule_id is None or revision is None:
+            self.misses += 1
+            return _compile_sg_rule_match(r, ovn)
+
+        # The name of the address sets of the remote group depends on the
+        # support of Port Groups, see acl_remote_group_id()
+        pg_addrsets = bool(r['remote_group_id'] and ovn and
+                           ovn.is_port_groups_supported())
+        cached_revision, matches = self._matches.pop(rule_id, (None, {}))
+        if cached_revision != revision:
+            matches = {}
+        match = matches.get(pg_addrsets)
+        if match is None:
+            self.misses += 1
+            match = matches[pg_addrsets] = _compile_sg_rule_match(r, ovn)
+            while len(self._matches) >= self.max_size > 0:
+                self._matches.popitem(last=False)
+        else:
+            self.hits += 1
+        if self.max_size > 0:
+            self._matches[rule_id] = (revision, matches)
+        return match
 
-def _add_sg_rule_acl_for_port_group(port_group, r, ovn):
-    # Update the match based on which direction this rule is for (ingress
-    # or egress).
-    match = acl_direction(r, port_group=port_group)
+    def invalidate(self, rule_id):
+        self._matches.pop(rule_id, None)
 
-    # Update the match for IPv4 vs IPv6.
-    ip_match, ip_version, icmp = acl_ethertype(r)
-    match += ip_match
+    def clear(self):
+        self._matches.clear()
 
-    # Update the match if an IPv4 or IPv6 prefix was specified.
-    match += acl_remote_ip_prefix(r, ip_version)
 
-    # Update the match if remote group id was specified.
-    match += acl_remote_group_id(r, ip_version, ovn)
+_sg_rule_matches = SGRuleMatchCache()
 
-    # Update the match for the protocol (tcp, udp, icmp) and port/type
-    # range if specified.
-    match += acl_protocol_and_ports(r, icmp)
+
+def invalidate_sg_rule_match(rule_id):
+    """Drop the compiled match of a deleted security group rule."""
+    _sg_rule_matches.invalidate(rule_id)
+
+
+def _add_sg_rule_acl_for_port(port, r):
+    # Update the match based on which direction this rule is for (ingress
+    # or egress), followed by the match of the rule itself.
+    match = acl_direction(r, port) + _sg_rule_matches.get(r)
+
+    # Finally, create the ACL entry for the direction specified.
+    return add_sg_rule_acl_for_port(port, r, match)
+
+
+def _add_sg_rule_acl_for_port_group(port_group, r, ovn):
+    # Update the match based on which direction this rule is for (ingress
+    # or egress), followed by the match of the rule itself.
+    match = (acl_direction(r, port_group=port_group) +
+             _sg_rule_matches.get(r, ovn))
 
     # Finally, create the ACL entry for the direction specified.
     return add_sg_rule_acl_for_port_group(port_group, r, match)
@@ -376,6 +438,76 @@ def _acl_columns_name_severity_supported(nb_idl):
     return ('name' in columns) and ('severity' in columns)
 
 
+def acl_key(acl, columns=ACL_PORT_GROUP_KEY_COLUMNS):
+    """Return a hashable key of an ACL dictionary made of its columns."""
+    key = []
+    for column in columns:
+        value = acl.get(column)
+        # A column missing from the NB schema is keyed like an unset
+        # optional column, e.g. the name and severity of the old schemas
+        if value is None:
+            value = ()
+        elif isinstance(value, list):
+            value = tuple(value)
+        elif isinstance(value, dict):
+            value = tuple(sorted(value.items()))
+        key.append(value)
+    return tuple(key)
+
+
+class ACLFingerprint(object):
+    """A hashable wrapper of an ACL dictionary.
+
+    Fingerprints are equal when their ACL dictionaries are equal, their hash
+    only covers the columns telling the ACLs of a port apart so it is cheap
+    to compute. The ACL must not be modified while its fingerprint is used.
+    """
+
+    __slots__ = ('acl', '_hash')
+
+    def __init__(self, acl):
+        self.acl = acl
+        self._hash = hash((acl.get('match'), acl.get('direction'),
+                           acl.get('priority')))
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, ACLFingerprint):
+            return NotImplemented
+        return self._hash == other._hash and self.acl == other.acl
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+
+def diff_acls(acls, ovn_acls, key=acl_key):
+    """Compare the ACLs expected by Neutron to the ones found in OVN.
+
+    ACLs are compared on their key, acl_key() by default, each ACL of acls
+    matches at most one ACL of ovn_acls.
+
+    :returns: a tuple with the list of ACLs of acls missing from ovn_acls
+              and the list of ACLs of ovn_acls missing from acls.
+    """
+    ovn_acls_by_key = collections.defaultdict(list)
+    for acl in ovn_acls:
+        ovn_acls_by_key[key(acl)].append(acl)
+
+    acls_to_add = []
+    for acl in acls:
+        matching_acls = ovn_acls_by_key.get(key(acl))
+        if matching_acls:
+            matching_acls.pop()
+        else:
+            acls_to_add.append(acl)
+    acls_to_remove = [acl for matching_acls in ovn_acls_by_key.values()
+                      for acl in matching_acls]
+    return acls_to_add, acls_to_remove
+
+
 def add_acls_for_sg_port_group(ovn, security_group, txn):
     for r in security_group['security_group_rules']:
         acl = _add_sg_rule_acl_for_port_group(
@@ -399,12 +531,14 @@ def update_acls_for_security_group(plugin,
     keep_name_severity = _acl_columns_name_severity_supported(ovn)
 
     # If we're using a Port Group for this SG, just update it.
-    # Otherwise, keep the old behavior.
+    # Otherwise, keep the old behavior. A SG being migrated from an
+    # Address Set has both (see OvnNbSynchronizer.migrate_to_port_groups).
+    pg_name = utils.ovn_port_group_name(security_group_id)
     if (ovn.is_port_groups_supported() and
-            not ovn.get_address_set(security_group_id)):
+            (ovn.get_port_group(pg_name) or
+             not ovn.get_address_set(security_group_id))):
         acl = _add_sg_rule_acl_for_port_group(
-            utils.ovn_port_group_name(security_group_id),
-            security_group_rule, ovn)
+            pg_name, security_group_rule, ovn)
         # Remove ACL log name and severity if not supported
         if is_add_acl:
             if not keep_name_severity:
@@ -415,7 +549,11 @@ def update_acls_for_security_group(plugin,
             ovn.pg_acl_del(acl['port_group'], acl['direction'],
                            acl['priority'], acl['match']).execute(
                 check_error=True)
-        return
+        # The ACLs of the ports of a SG being migrated are left on their
+        # Logical Switches until the end of the migration, except for the
+        # ones of a deleted rule.
+        if is_add_acl or not ovn.get_address_set(security_group_id):
+            return
 
     # Get the security group ports.
     sg_ports_cache = sg_ports_cache or {}
@@ -424,14 +562,21 @@ def update_acls_for_security_group(plugin,
                                         sg_ports_cache,
                                         security_group_id)
 
-    # ACLs associated with a security group may span logical switches
-    sg_port_ids = [binding['port_id'] for binding in sg_ports]
-    sg_port_ids = list(set(sg_port_ids))
-    port_list = plugin.get_ports(admin_context,
-                                 filters={'id': sg_port_ids})
-    if not port_list:
-        return
-
+    # ACLs associated with a security group may span logical switches.
+    # The ports are loaded from Neutron and their ACLs updated in chunks,
+    # a rule of a security group with many ports would otherwise end up
+    # in a single huge transaction.
+    sg_port_ids = sorted(set(binding['port_id'] for binding in sg_ports))
+    for port_ids in utils.chunks(sg_port_ids,
+                                 config.get_ovn_txn_chunk_size()):
+        port_list = plugin.get_ports(admin_context,
+                                     filters={'id': port_ids})
+        _update_sg_rule_acls_for_ports(ovn, port_list, security_group_rule,
+                                       keep_name_severity, is_add_acl)
+
+
+def _update_sg_rule_acls_for_ports(ovn, port_list, security_group_rule,
+                                   keep_name_severity, is_add_acl):
     acl_new_values_dict = {}
     update_port_list = []
 
@@ -154,6 +154,59 @@ ovn_opts = [
                        "field is empty. If both subnet's dns_nameservers and "
                        "this option is empty, then the DNS resolvers on the "
                        "host running the neutron server will be used.")),
+    cfg.IntOpt('ovsdb_txn_chunk_size',
+               min=1,
+               default=500,
+               help=_('Maximum number of resources to be created or updated '
+                      'in a single OVSDB transaction by the bulk operations. '
+                      'Larger values reduce the number of round trips to '
+                      'the OVN databases but make each transaction bigger.')),
+    cfg.IntOpt('neutron_sync_concurrency',
+               min=1,
+               default=1,
+               help=_('Maximum number of stages of the synchronization of '
+                      'the OVN_Northbound OVSDB with the Neutron DB that '
+                      'can run concurrently. Only stages that do not '
+                      'depend on each other (e.g. Address Sets and Port '
+                      'Groups) are run at the same time.')),
+    cfg.BoolOpt('neutron_sync_incremental',
+                default=False,
+                help=_('Whether the synchronization of the OVN_Northbound '
+                       'OVSDB with the Neutron DB should only compare the '
+                       'revision numbers of the networks, subnets, ports, '
+                       'routers, router ports and floating IPs on both '
+                       'sides, fetching the full objects only for the '
+                       'resources that are out of sync. The metadata '
+                       'ports, provider network ports, port DHCP options '
+                       'and DNS records are still fully checked. Otherwise '
+                       'all the resources are fully compared.')),
+    cfg.IntOpt('maintenance_page_size',
+               min=1,
+               default=1000,
+               help=_('Maximum number of inconsistent resources loaded from '
+                      'the database at once by the maintenance task. The '
+                      'resources of a page are fixed in bulk, grouped by '
+                      'resource type.')),
+    cfg.IntOpt('maintenance_time_budget',
+               min=1,
+               default=120,
+               help=_('Maximum time in seconds that a run of the '
+                      'maintenance task can spend fixing inconsistent '
+                      'resources. The resources left are fixed by the next '
+                      'runs of the task.')),
+    cfg.IntOpt('port_status_workers',
+               min=1,
+               default=10,
+               help=_('Maximum number of port status changes reported by '
+                      'OVN that are processed concurrently.')),
+    cfg.IntOpt('octavia_provider_workers',
+               min=1,
+               default=8,
+               help=_('Number of threads of the OVN Octavia provider driver '
+                      'processing the load balancer requests. The requests '
+                      'of a load balancer are always processed in order by '
+                      'the same thread, the requests of different load '
+                      'balancers are processed concurrently.')),
 ]
 
 cfg.CONF.register_opts(ovn_opts, group='ovn')
@@ -241,6 +294,34 @@ def get_dns_servers():
     return cfg.CONF.ovn.dns_servers
 
 
+def get_ovn_txn_chunk_size():
+    return cfg.CONF.ovn.ovsdb_txn_chunk_size
+
+
+def get_ovn_neutron_sync_concurrency():
+    return cfg.CONF.ovn.neutron_sync_concurrency
+
+
+def is_ovn_neutron_sync_incremental():
+    return cfg.CONF.ovn.neutron_sync_incremental
+
+
+def get_ovn_maintenance_page_size():
+    return cfg.CONF.ovn.maintenance_page_size
+
+
+def get_ovn_maintenance_time_budget():
+    return cfg.CONF.ovn.maintenance_time_budget
+
+
+def get_ovn_port_status_workers():
+    return cfg.CONF.ovn.port_status_workers
+
+
+def get_ovn_octavia_provider_workers():
+    return cfg.CONF.ovn.octavia_provider_workers
+
+
 def setup_logging():
     """Sets up the logging options for a log with supplied name."""
     product_name = "networking-ovn"
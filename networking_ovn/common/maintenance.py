@@ -13,17 +13,20 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import inspect
+import itertools
+import operator
 import threading
 
 from futurist import periodics
 from neutron.common import config as n_conf
 from neutron_lib import context as n_context
-from neutron_lib import exceptions as n_exc
 from neutron_lib import worker
 from oslo_log import log
 from oslo_utils import timeutils
 
+from networking_ovn.common import config
 from networking_ovn.common import constants as ovn_const
 from networking_ovn.db import maintenance as db_maint
 from networking_ovn.db import revision as db_rev
@@ -32,6 +35,21 @@ from networking_ovn import ovn_db_sync
 LOG = log.getLogger(__name__)
 
 DB_CONSISTENCY_CHECK_INTERVAL = 300  # 5 minutes
+CHASSIS_PING_INTERVAL = 30  # seconds
+
+# Fixing a resource whose OVN object is already up to date only requires
+# bumping its revision number.
+_FIX_BUMP = 'bump'
+
+
+def own_thread(periodic):
+    """Run a periodic task in a thread of its own.
+
+    The periodic tasks of a MaintenanceThread run one at a time, a task
+    decorated with this one isn't delayed by the others.
+    """
+    periodic._maintenance_own_thread = True
+    return periodic
 
 
 class MaintenanceWorker(worker.BaseWorker):
@@ -59,28 +77,45 @@ class MaintenanceThread(object):
 
     def __init__(self):
         self._callables = []
-        self._thread = None
-        self._worker = None
+        # The periodics running in a thread of their own
+        self._own_thread_callables = []
+        self._threads = []
+        self._workers = []
 
     def add_periodics(self, obj):
         for name, member in inspect.getmembers(obj):
             if periodics.is_periodic(member):
                 LOG.debug('Periodic task found: %(owner)s.%(member)s',
                           {'owner': obj.__class__.__name__, 'member': name})
-                self._callables.append((member, (), {}))
+                if getattr(member, '_maintenance_own_thread', False):
+                    self._own_thread_callables.append((member, (), {}))
+                else:
+                    self._callables.append((member, (), {}))
 
     def start(self):
-        if self._thread is None:
-            self._worker = periodics.PeriodicWorker(self._callables)
-            self._thread = threading.Thread(target=self._worker.start)
-            self._thread.daemon = True
-            self._thread.start()
+        if self._threads:
+            return
+        callables_list = [self._callables] + [
+            [callable_] for callable_ in self._own_thread_callables]
+        for callables in callables_list:
+            if not callables:
+                continue
+            periodic_worker = periodics.PeriodicWorker(callables)
+            thread = threading.Thread(target=periodic_worker.start)
+            thread.daemon = True
+            thread.start()
+            self._workers.append(periodic_worker)
+            self._threads.append(thread)
 
     def stop(self):
-        self._worker.stop()
-        self._worker.wait()
-        self._thread.join()
-        self._worker = self._thread = None
+        for periodic_worker in self._workers:
+            periodic_worker.stop()
+        for periodic_worker in self._workers:
+            periodic_worker.wait()
+        for thread in self._threads:
+            thread.join()
+        self._workers = []
+        self._threads = []
 
 
 class DBInconsistenciesPeriodics(object):
@@ -97,49 +132,53 @@ class DBInconsistenciesPeriodics(object):
 
         self._resources_func_map = {
             ovn_const.TYPE_NETWORKS: {
-                'neutron_get': self._ovn_client._plugin.get_network,
+                'neutron_get_many': self._ovn_client._plugin.get_networks,
                 'ovn_get': self._nb_idl.get_lswitch,
                 'ovn_create': self._ovn_client.create_network,
                 'ovn_update': self._ovn_client.update_network,
                 'ovn_delete': self._ovn_client.delete_network,
             },
             ovn_const.TYPE_PORTS: {
-                'neutron_get': self._ovn_client._plugin.get_port,
+                'neutron_get_many': self._ovn_client._plugin.get_ports,
                 'ovn_get': self._nb_idl.get_lswitch_port,
                 'ovn_create': self._ovn_client.create_port,
+                'ovn_create_bulk': self._ovn_client.create_ports,
                 'ovn_update': self._ovn_client.update_port,
+                'ovn_update_bulk': self._ovn_client.update_ports,
                 'ovn_delete': self._ovn_client.delete_port,
             },
             ovn_const.TYPE_FLOATINGIPS: {
-                'neutron_get': self._ovn_client._l3_plugin.get_floatingip,
+                'neutron_get_many':
+                    self._ovn_client._l3_plugin.get_floatingips,
                 'ovn_get': self._nb_idl.get_floatingip,
                 'ovn_create': self._ovn_client.create_floatingip,
                 'ovn_update': self._ovn_client.update_floatingip,
                 'ovn_delete': self._ovn_client.delete_floatingip,
             },
             ovn_const.TYPE_ROUTERS: {
-                'neutron_get': self._ovn_client._l3_plugin.get_router,
+                'neutron_get_many': self._ovn_client._l3_plugin.get_routers,
                 'ovn_get': self._nb_idl.get_lrouter,
                 'ovn_create': self._ovn_client.create_router,
                 'ovn_update': self._ovn_client.update_router,
                 'ovn_delete': self._ovn_client.delete_router,
             },
             ovn_const.TYPE_SECURITY_GROUPS: {
-                'neutron_get': self._ovn_client._plugin.get_security_group,
+                'neutron_get_many':
+                    self._ovn_client._plugin.get_security_groups,
                 'ovn_get': self._get_security_group,
                 'ovn_create': self._ovn_client.create_security_group,
                 'ovn_delete': self._ovn_client.delete_security_group,
             },
             ovn_const.TYPE_SECURITY_GROUP_RULES: {
-                'neutron_get':
-                    self._ovn_client._plugin.get_security_group_rule,
+                'neutron_get_many':
+                    self._ovn_client._plugin.get_security_group_rules,
                 'ovn_get': self._nb_idl.get_acl_by_id,
                 'ovn_create': self._ovn_client.create_security_group_rule,
                 'ovn_delete': self._ovn_client.delete_security_group_rule,
             },
             ovn_const.TYPE_ROUTER_PORTS: {
-                'neutron_get':
-                    self._ovn_client._plugin.get_port,
+                'neutron_get_many':
+                    self._ovn_client._plugin.get_ports,
                 'ovn_get': self._nb_idl.get_lrouter_port,
                 'ovn_create': self._create_lrouter_port,
                 'ovn_update': self._ovn_client.update_router_port,
@@ -155,46 +194,98 @@ class DBInconsistenciesPeriodics(object):
     def has_lock(self):
         return not self._idl.is_lock_contended
 
-    def _fix_create_update(self, row):
-        res_map = self._resources_func_map[row.resource_type]
-        admin_context = n_context.get_admin_context()
-        try:
-            # Get the latest version of the resource in Neutron DB
-            n_obj = res_map['neutron_get'](admin_context, row.resource_uuid)
-        except n_exc.NotFound:
-            LOG.warning('Skip fixing resource %(res_uuid)s (type: '
-                        '%(res_type)s). Resource does not exist in Neutron '
-                        'database anymore', {'res_uuid': row.resource_uuid,
-                                             'res_type': row.resource_type})
-            return
+    def _get_fix_action(self, row, n_obj):
+        """Return how to fix the create/update inconsistency of a resource.
 
+        :returns: 'ovn_create' or 'ovn_update' if the OVN object has to be
+                  created or updated, _FIX_BUMP if only the revision number
+                  has to be bumped or None if nothing can be done.
+        """
+        res_map = self._resources_func_map[row.resource_type]
         ovn_obj = res_map['ovn_get'](row.resource_uuid)
 
         if not ovn_obj:
-            res_map['ovn_create'](n_obj)
+            return 'ovn_create'
+
+        if row.resource_type == ovn_const.TYPE_SECURITY_GROUP_RULES:
+            LOG.error("SG rule %s found with a revision number while "
+                      "this resource doesn't support updates",
+                      row.resource_uuid)
+        elif row.resource_type == ovn_const.TYPE_SECURITY_GROUPS:
+            # In OVN, we don't care about updates to security groups,
+            # so just bump the revision number to whatever it's
+            # supposed to be.
+            return _FIX_BUMP
         else:
-            if row.resource_type == ovn_const.TYPE_SECURITY_GROUP_RULES:
-                LOG.error("SG rule %s found with a revision number while "
-                          "this resource doesn't support updates",
-                          row.resource_uuid)
-            elif row.resource_type == ovn_const.TYPE_SECURITY_GROUPS:
-                # In OVN, we don't care about updates to security groups,
-                # so just bump the revision number to whatever it's
-                # supposed to be.
-                db_rev.bump_revision(n_obj, row.resource_type)
-            else:
-                ext_ids = getattr(ovn_obj, 'external_ids', {})
-                ovn_revision = int(ext_ids.get(
-                    ovn_const.OVN_REV_NUM_EXT_ID_KEY, -1))
-                # If the resource exist in the OVN DB but the revision
-                # number is different from Neutron DB, updated it.
-                if ovn_revision != n_obj['revision_number']:
-                    res_map['ovn_update'](n_obj)
-                else:
-                    # If the resource exist and the revision number
-                    # is equal on both databases just bump the revision on
-                    # the cache table.
-                    db_rev.bump_revision(n_obj, row.resource_type)
+            ext_ids = getattr(ovn_obj, 'external_ids', {})
+            ovn_revision = int(ext_ids.get(
+                ovn_const.OVN_REV_NUM_EXT_ID_KEY, -1))
+            # If the resource exist in the OVN DB but the revision
+            # number is different from Neutron DB, updated it.
+            if ovn_revision != n_obj['revision_number']:
+                return 'ovn_update'
+            # If the resource exist and the revision number
+            # is equal on both databases just bump the revision on
+            # the cache table.
+            return _FIX_BUMP
+
+    def _run_fix_action(self, resource_type, action, n_objs):
+        if not n_objs:
+            return
+        res_map = self._resources_func_map[resource_type]
+        bulk_action = res_map.get('%s_bulk' % action)
+        if bulk_action:
+            try:
+                bulk_action(n_objs)
+                return
+            except Exception:
+                LOG.exception('Failed to fix %(count)d resources (type: '
+                              '%(res_type)s) at once, fixing them one by '
+                              'one', {'count': len(n_objs),
+                                      'res_type': resource_type})
+
+        for n_obj in n_objs:
+            try:
+                res_map[action](n_obj)
+            except Exception:
+                LOG.exception('Failed to fix resource %(res_uuid)s '
+                              '(type: %(res_type)s)',
+                              {'res_uuid': n_obj['id'],
+                               'res_type': resource_type})
+
+    def _fix_create_update_rows(self, resource_type, rows):
+        """Fix the create/update inconsistencies of many resources.
+
+        The resources are of the same type. Their latest version is fetched
+        from the Neutron DB with a single query, the revision numbers of the
+        resources already up to date in OVN are bumped with a single query
+        and the resources with a bulk action (e.g. ports) are created or
+        updated in shared OVSDB transactions.
+        """
+        res_map = self._resources_func_map[resource_type]
+        admin_context = n_context.get_admin_context()
+        n_objs = {n_obj['id']: n_obj for n_obj in res_map['neutron_get_many'](
+            admin_context,
+            filters={'id': [row.resource_uuid for row in rows]})}
+
+        fixes = collections.defaultdict(list)
+        for row in rows:
+            n_obj = n_objs.get(row.resource_uuid)
+            if n_obj is None:
+                LOG.warning('Skip fixing resource %(res_uuid)s (type: '
+                            '%(res_type)s). Resource does not exist in '
+                            'Neutron database anymore',
+                            {'res_uuid': row.resource_uuid,
+                             'res_type': resource_type})
+                continue
+            action = self._get_fix_action(row, n_obj)
+            if action:
+                fixes[action].append(n_obj)
+
+        if fixes[_FIX_BUMP]:
+            db_rev.bump_revisions(fixes[_FIX_BUMP], resource_type)
+        self._run_fix_action(resource_type, 'ovn_create', fixes['ovn_create'])
+        self._run_fix_action(resource_type, 'ovn_update', fixes['ovn_update'])
 
     def _fix_delete(self, row):
         res_map = self._resources_func_map[row.resource_type]
@@ -219,7 +310,8 @@ class DBInconsistenciesPeriodics(object):
 
     # The migration will run just once per neutron-server instance. If the lock
     # is held by some other neutron-server instance in the cloud, we'll attempt
-    # to perform the migration every 10 seconds until completed.
+    # to perform the migration every 10 seconds until completed. A migration
+    # interrupted by an error or a restart resumes where it stopped.
     @periodics.periodic(spacing=10, run_immediately=True)
     def migrate_to_port_groups(self):
         """Perform the migration from Address Sets to Port Groups. """
@@ -244,6 +336,69 @@ class DBInconsistenciesPeriodics(object):
         nb_sync.migrate_to_port_groups(admin_context)
         raise periodics.NeverAgain()
 
+    @staticmethod
+    def _get_pages(get_resources, first_page, page_size):
+        rows = first_page
+        while rows:
+            yield rows
+            if len(rows) < page_size:
+                return
+            rows = get_resources(limit=page_size, marker=rows[-1])
+
+    def _can_continue(self, time_budget):
+        if not self.has_lock:
+            LOG.info('Maintenance task: Lost the OVSDB lock, stopping the '
+                     'synchronization')
+            return False
+        if self._sync_timer.elapsed() >= time_budget:
+            LOG.info('Maintenance task: Time budget of %d seconds '
+                     'exhausted, the inconsistencies left will be fixed by '
+                     'the next run', time_budget)
+            return False
+        return True
+
+    def _fix_create_update_page(self, rows):
+        for res_type, type_rows in itertools.groupby(
+                rows, key=operator.attrgetter('resource_type')):
+            # NOTE(lucasagomes): The way to fix subnets is bit
+            # different than other resources. A subnet in OVN language
+            # is just a DHCP rule but, this rule only exist if the
+            # subnet in Neutron has the "enable_dhcp" attribute set
+            # to True. So, it's possible to have a consistent subnet
+            # resource even when it does not exist in the OVN database.
+            if res_type != ovn_const.TYPE_SUBNETS:
+                type_rows = list(type_rows)
+                try:
+                    self._fix_create_update_rows(res_type, type_rows)
+                except Exception:
+                    LOG.exception('Failed to fix %(count)d resources '
+                                  '(type: %(res_type)s)',
+                                  {'count': len(type_rows),
+                                   'res_type': res_type})
+                continue
+
+            for row in type_rows:
+                try:
+                    self._fix_create_update_subnet(row)
+                except Exception:
+                    LOG.exception('Failed to fix resource %(res_uuid)s '
+                                  '(type: %(res_type)s)',
+                                  {'res_uuid': row.resource_uuid,
+                                   'res_type': row.resource_type})
+
+    def _fix_delete_page(self, rows):
+        for row in rows:
+            try:
+                if row.resource_type == ovn_const.TYPE_SUBNETS:
+                    self._ovn_client.delete_subnet(row.resource_uuid)
+                else:
+                    self._fix_delete(row)
+            except Exception:
+                LOG.exception('Failed to fix deleted resource %(res_uuid)s '
+                              '(type: %(res_type)s)',
+                              {'res_uuid': row.resource_uuid,
+                               'res_type': row.resource_type})
+
     @periodics.periodic(spacing=DB_CONSISTENCY_CHECK_INTERVAL,
                         run_immediately=True)
     def check_for_inconsistencies(self):
@@ -252,45 +407,39 @@ class DBInconsistenciesPeriodics(object):
         if not self.has_lock:
             return
 
-        create_update_inconsistencies = db_maint.get_inconsistent_resources()
-        delete_inconsistencies = db_maint.get_deleted_resources()
+        page_size = config.get_ovn_maintenance_page_size()
+        time_budget = config.get_ovn_maintenance_time_budget()
+        create_update_inconsistencies = db_maint.get_inconsistent_resources(
+            limit=page_size)
+        delete_inconsistencies = db_maint.get_deleted_resources(
+            limit=page_size)
         if not any([create_update_inconsistencies, delete_inconsistencies]):
             return
         LOG.debug('Maintenance task: Synchronizing Neutron '
                   'and OVN databases')
         self._sync_timer.restart()
 
+        # The inconsistencies are fixed one page at a time, stopping once
+        # the time budget of this run is exhausted so a large backlog
+        # (e.g. after an OVN DB outage) is drained over multiple runs
+        # instead of blocking this thread for an unbounded time.
+        can_continue = True
+
         # Fix the create/update resources inconsistencies
-        for row in create_update_inconsistencies:
-            try:
-                # NOTE(lucasagomes): The way to fix subnets is bit
-                # different than other resources. A subnet in OVN language
-                # is just a DHCP rule but, this rule only exist if the
-                # subnet in Neutron has the "enable_dhcp" attribute set
-                # to True. So, it's possible to have a consistent subnet
-                # resource even when it does not exist in the OVN database.
-                if row.resource_type == ovn_const.TYPE_SUBNETS:
-                    self._fix_create_update_subnet(row)
-                else:
-                    self._fix_create_update(row)
-            except Exception:
-                LOG.exception('Failed to fix resource %(res_uuid)s '
-                              '(type: %(res_type)s)',
-                              {'res_uuid': row.resource_uuid,
-                               'res_type': row.resource_type})
+        for rows in self._get_pages(db_maint.get_inconsistent_resources,
+                                    create_update_inconsistencies, page_size):
+            self._fix_create_update_page(rows)
+            can_continue = self._can_continue(time_budget)
+            if not can_continue:
+                break
 
         # Fix the deleted resources inconsistencies
-        for row in delete_inconsistencies:
-            try:
-                if row.resource_type == ovn_const.TYPE_SUBNETS:
-                    self._ovn_client.delete_subnet(row.resource_uuid)
-                else:
-                    self._fix_delete(row)
-            except Exception:
-                LOG.exception('Failed to fix deleted resource %(res_uuid)s '
-                              '(type: %(res_type)s)',
-                              {'res_uuid': row.resource_uuid,
-                               'res_type': row.resource_type})
+        if can_continue:
+            for rows in self._get_pages(db_maint.get_deleted_resources,
+                                        delete_inconsistencies, page_size):
+                self._fix_delete_page(rows)
+                if not self._can_continue(time_budget):
+                    break
 
         self._sync_timer.stop()
         LOG.info('Maintenance task synchronization finished '
@@ -301,3 +450,18 @@ class DBInconsistenciesPeriodics(object):
         router_id = port['device_id']
         self._ovn_client._l3_plugin.add_router_interface(
             admin_context, router_id, {'port_id': port['id']}, may_exist=True)
+
+    # The agents API only reports the liveness computed from the answers of
+    # the chassis to these pings, it does not ping the chassis itself. The
+    # other periodics can run for longer than agent_down_time, the pings
+    # run in their own thread so the agents aren't reported as dead
+    # meanwhile.
+    @own_thread
+    @periodics.periodic(spacing=CHASSIS_PING_INTERVAL, run_immediately=True)
+    def ping_chassis(self):
+        """Update NB_Global.nb_cfg so that Chassis.nb_cfg will increment"""
+        # Only the worker holding a valid lock within OVSDB will run
+        # this periodic
+        if not self.has_lock:
+            return
+        self._nb_idl.check_liveness().execute(check_error=True)
@@ -190,10 +190,11 @@ class OVNClient(object):
             external_ids=subnet_dhcp_options['external_ids'])
         return {'cmd': add_dhcp_opts_cmd}
 
-    def _get_port_options(self, port, qos_options=None):
+    def _get_port_options(self, port, qos_options=None, qos_cache=None):
         binding_prof = utils.validate_and_get_data_from_binding_profile(port)
         if qos_options is None:
-            qos_options = self._qos_driver.get_qos_options(port)
+            qos_options = self._qos_driver.get_qos_options(port,
+                                                           cache=qos_cache)
         vtep_physical_switch = binding_prof.get('vtep-physical-switch')
 
         cidrs = ''
@@ -235,26 +236,111 @@ class OVNClient(object):
                            parent_name, tag, dhcpv4_options, dhcpv6_options,
                            cidrs.strip(), device_owner, sg_ids)
 
+    def _gen_port_external_ids(self, port, port_info):
+        return {ovn_const.OVN_PORT_NAME_EXT_ID_KEY: port['name'],
+                ovn_const.OVN_DEVID_EXT_ID_KEY: port['device_id'],
+                ovn_const.OVN_PROJID_EXT_ID_KEY: port['project_id'],
+                ovn_const.OVN_CIDRS_EXT_ID_KEY: port_info.cidrs,
+                ovn_const.OVN_DEVICE_OWNER_EXT_ID_KEY:
+                    port_info.device_owner,
+                ovn_const.OVN_NETWORK_NAME_EXT_ID_KEY:
+                    utils.ovn_name(port['network_id']),
+                ovn_const.OVN_SG_IDS_EXT_ID_KEY:
+                    port_info.security_group_ids,
+                ovn_const.OVN_REV_NUM_EXT_ID_KEY: str(
+                    utils.get_revision_number(
+                        port, ovn_const.TYPE_PORTS))}
+
+    def _get_port_dhcp_options_for_txn(self, port_info, txn):
+        """Return the dhcpv4_options and dhcpv6_options column values.
+
+        Adds the commands creating port specific DHCP_Options rows, if
+        any, to the transaction.
+        """
+        result = []
+        for dhcp_options in (port_info.dhcpv4_options,
+                             port_info.dhcpv6_options):
+            if not dhcp_options:
+                result.append([])
+            elif 'cmd' in dhcp_options:
+                result.append(txn.add(dhcp_options['cmd']))
+            else:
+                result.append([dhcp_options['uuid']])
+        return result
+
+    def _create_lswitch_port(self, port, port_info, txn, sg_cache,
+                             subnet_cache):
+        external_ids = self._gen_port_external_ids(port, port_info)
+        lswitch_name = utils.ovn_name(port['network_id'])
+        admin_context = n_context.get_admin_context()
+        dhcpv4_options, dhcpv6_options = self._get_port_dhcp_options_for_txn(
+            port_info, txn)
+        # The lport_name *must* be neutron port['id'].  It must match the
+        # iface-id set in the Interfaces table of the Open_vSwitch
+        # database which nova sets to be the port ID.
+        port_cmd = txn.add(self._nb_idl.create_lswitch_port(
+            lport_name=port['id'],
+            lswitch_name=lswitch_name,
+            addresses=port_info.addresses,
+            external_ids=external_ids,
+            parent_name=port_info.parent_name,
+            tag=port_info.tag,
+            enabled=port.get('admin_state_up'),
+            options=port_info.options,
+            type=port_info.type,
+            port_security=port_info.port_security,
+            dhcpv4_options=dhcpv4_options,
+            dhcpv6_options=dhcpv6_options))
+
+        # Handle ACL's for this port. If we're not using Port Groups
+        # because either the schema doesn't support it or we didn't
+        # migrate old SGs from Address Sets to Port Groups, then we
+        # keep the old behavior. For those SGs this port belongs to
+        # that are modelled as a Port Group, we'll use it.
+        sg_ids = utils.get_lsp_security_groups(port)
+        if self._nb_idl.is_port_groups_supported():
+            # If this is not a trusted port or port security is enabled,
+            # add it to the default drop Port Group so that all traffic
+            # is dropped by default.
+            if not utils.is_lsp_trusted(port) or port_info.port_security:
+                self._add_port_to_drop_port_group(port_cmd, txn)
+            # For SGs modelled as OVN Port Groups, just add the port to
+            # its Port Group.
+            for sg in sg_ids:
+                txn.add(self._nb_idl.pg_add_ports(
+                    utils.ovn_port_group_name(sg), port_cmd))
+        else:
+            # SGs modelled as Address Sets:
+            acls_new = ovn_acl.add_acls(self._plugin, admin_context,
+                                        port, sg_cache, subnet_cache,
+                                        self._nb_idl)
+            for acl in acls_new:
+                txn.add(self._nb_idl.add_acl(**acl))
+
+            if port.get('fixed_ips') and sg_ids:
+                addresses = ovn_acl.acl_port_ips(port)
+                # NOTE(rtheis): Fail port creation if the address set
+                # doesn't exist. This prevents ports from being created on
+                # any security groups out-of-sync between neutron and OVN.
+                for sg_id in sg_ids:
+                    for ip_version in addresses:
+                        if addresses[ip_version]:
+                            txn.add(self._nb_idl.update_address_set(
+                                name=utils.ovn_addrset_name(sg_id,
+                                                            ip_version),
+                                addrs_add=addresses[ip_version],
+                                addrs_remove=None,
+                                if_exists=False))
+
+        if self.is_dns_required_for_port(port):
+            self.add_txns_to_sync_port_dns_records(txn, port)
+
     def create_port(self, port):
         if utils.is_lsp_ignored(port):
             return
 
         port_info = self._get_port_options(port)
-        external_ids = {ovn_const.OVN_PORT_NAME_EXT_ID_KEY: port['name'],
-                        ovn_const.OVN_DEVID_EXT_ID_KEY: port['device_id'],
-                        ovn_const.OVN_PROJID_EXT_ID_KEY: port['project_id'],
-                        ovn_const.OVN_CIDRS_EXT_ID_KEY: port_info.cidrs,
-                        ovn_const.OVN_DEVICE_OWNER_EXT_ID_KEY:
-                            port_info.device_owner,
-                        ovn_const.OVN_NETWORK_NAME_EXT_ID_KEY:
-                            utils.ovn_name(port['network_id']),
-                        ovn_const.OVN_SG_IDS_EXT_ID_KEY:
-                            port_info.security_group_ids,
-                        ovn_const.OVN_REV_NUM_EXT_ID_KEY: str(
-                            utils.get_revision_number(
-                                port, ovn_const.TYPE_PORTS))}
         lswitch_name = utils.ovn_name(port['network_id'])
-        admin_context = n_context.get_admin_context()
         sg_cache = {}
         subnet_cache = {}
 
@@ -268,80 +354,41 @@ class OVNClient(object):
             'Logical_Switch', 'name', lswitch_name)
 
         with self._nb_idl.transaction(check_error=True) as txn:
-            if not port_info.dhcpv4_options:
-                dhcpv4_options = []
-            elif 'cmd' in port_info.dhcpv4_options:
-                dhcpv4_options = txn.add(port_info.dhcpv4_options['cmd'])
-            else:
-                dhcpv4_options = [port_info.dhcpv4_options['uuid']]
-            if not port_info.dhcpv6_options:
-                dhcpv6_options = []
-            elif 'cmd' in port_info.dhcpv6_options:
-                dhcpv6_options = txn.add(port_info.dhcpv6_options['cmd'])
-            else:
-                dhcpv6_options = [port_info.dhcpv6_options['uuid']]
-            # The lport_name *must* be neutron port['id'].  It must match the
-            # iface-id set in the Interfaces table of the Open_vSwitch
-            # database which nova sets to be the port ID.
-            port_cmd = txn.add(self._nb_idl.create_lswitch_port(
-                lport_name=port['id'],
-                lswitch_name=lswitch_name,
-                addresses=port_info.addresses,
-                external_ids=external_ids,
-                parent_name=port_info.parent_name,
-                tag=port_info.tag,
-                enabled=port.get('admin_state_up'),
-                options=port_info.options,
-                type=port_info.type,
-                port_security=port_info.port_security,
-                dhcpv4_options=dhcpv4_options,
-                dhcpv6_options=dhcpv6_options))
-
-            # Handle ACL's for this port. If we're not using Port Groups
-            # because either the schema doesn't support it or we didn't
-            # migrate old SGs from Address Sets to Port Groups, then we
-            # keep the old behavior. For those SGs this port belongs to
-            # that are modelled as a Port Group, we'll use it.
-            sg_ids = utils.get_lsp_security_groups(port)
-            if self._nb_idl.is_port_groups_supported():
-                # If this is not a trusted port or port security is enabled,
-                # add it to the default drop Port Group so that all traffic
-                # is dropped by default.
-                if not utils.is_lsp_trusted(port) or port_info.port_security:
-                    self._add_port_to_drop_port_group(port_cmd, txn)
-                # For SGs modelled as OVN Port Groups, just add the port to
-                # its Port Group.
-                for sg in sg_ids:
-                    txn.add(self._nb_idl.pg_add_ports(
-                        utils.ovn_port_group_name(sg), port_cmd))
-            else:
-                # SGs modelled as Address Sets:
-                acls_new = ovn_acl.add_acls(self._plugin, admin_context,
-                                            port, sg_cache, subnet_cache,
-                                            self._nb_idl)
-                for acl in acls_new:
-                    txn.add(self._nb_idl.add_acl(**acl))
-
-                if port.get('fixed_ips') and sg_ids:
-                    addresses = ovn_acl.acl_port_ips(port)
-                    # NOTE(rtheis): Fail port creation if the address set
-                    # doesn't exist. This prevents ports from being created on
-                    # any security groups out-of-sync between neutron and OVN.
-                    for sg_id in sg_ids:
-                        for ip_version in addresses:
-                            if addresses[ip_version]:
-                                txn.add(self._nb_idl.update_address_set(
-                                    name=utils.ovn_addrset_name(sg_id,
-                                                                ip_version),
-                                    addrs_add=addresses[ip_version],
-                                    addrs_remove=None,
-                                    if_exists=False))
-
-            if self.is_dns_required_for_port(port):
-                self.add_txns_to_sync_port_dns_records(txn, port)
+            self._create_lswitch_port(port, port_info, txn, sg_cache,
+                                      subnet_cache)
 
         db_rev.bump_revision(port, ovn_const.TYPE_PORTS)
 
+    def create_ports(self, ports):
+        """Create the OVN objects of many Neutron ports.
+
+        This is the bulk version of create_port(). The commands of up to
+        ``ovsdb_txn_chunk_size`` ports are committed in a single OVSDB
+        transaction and their revision numbers are bumped with a single
+        database query per transaction.
+        """
+        ports = [port for port in ports if not utils.is_lsp_ignored(port)]
+        if not ports:
+            return
+
+        sg_cache = {}
+        subnet_cache = {}
+        qos_cache = {}
+        # See create_port() for why this check is needed
+        for lswitch_name in {utils.ovn_name(port['network_id'])
+                             for port in ports}:
+            self._nb_idl.check_for_row_by_value_and_retry(
+                'Logical_Switch', 'name', lswitch_name)
+
+        for chunk in utils.chunks(ports, config.get_ovn_txn_chunk_size()):
+            ports_info = [self._get_port_options(port, qos_cache=qos_cache)
+                          for port in chunk]
+            with self._nb_idl.transaction(check_error=True) as txn:
+                for port, port_info in zip(chunk, ports_info):
+                    self._create_lswitch_port(port, port_info, txn, sg_cache,
+                                              subnet_cache)
+            db_rev.bump_revisions(chunk, ovn_const.TYPE_PORTS)
+
     # TODO(lucasagomes): Remove this helper method in the Rocky release
     def _get_lsp_backward_compat_sgs(self, ovn_port, port_object=None,
                                      skip_trusted_port=True):
@@ -353,6 +400,158 @@ class OVNClient(object):
                 port_object, skip_trusted_port=skip_trusted_port)
         return []
 
+    def _update_lswitch_port(self, port, port_info, txn, sg_cache,
+                             subnet_cache, port_object=None):
+        """Add the commands updating a port to the transaction.
+
+        :returns: The command checking the revision number of the port,
+                  its result is ovn_const.TXN_COMMITTED once the
+                  transaction is committed.
+        """
+        external_ids = self._gen_port_external_ids(port, port_info)
+        admin_context = n_context.get_admin_context()
+        check_rev_cmd = self._nb_idl.check_revision_number(
+            port['id'], port, ovn_const.TYPE_PORTS)
+        txn.add(check_rev_cmd)
+        columns_dict = {}
+        if utils.is_lsp_router_port(port):
+            port_info.options.update(
+                self._nb_idl.get_router_port_options(port['id']))
+        else:
+            columns_dict['type'] = port_info.type
+            columns_dict['addresses'] = port_info.addresses
+        dhcpv4_options, dhcpv6_options = self._get_port_dhcp_options_for_txn(
+            port_info, txn)
+        # NOTE(lizk): Fail port updating if port doesn't exist. This
+        # prevents any new inserted resources to be orphan, such as port
+        # dhcp options or ACL rules for port, e.g. a port was created
+        # without extra dhcp options and security group, while updating
+        # includes the new attributes setting to port.
+        txn.add(self._nb_idl.set_lswitch_port(
+                lport_name=port['id'],
+                external_ids=external_ids,
+                parent_name=port_info.parent_name,
+                tag=port_info.tag,
+                options=port_info.options,
+                enabled=port['admin_state_up'],
+                port_security=port_info.port_security,
+                dhcpv4_options=dhcpv4_options,
+                dhcpv6_options=dhcpv6_options,
+                if_exists=False,
+                **columns_dict))
+
+        ovn_port = self._nb_idl.lookup('Logical_Switch_Port', port['id'])
+        # Determine if security groups or fixed IPs are updated.
+        old_sg_ids = set(self._get_lsp_backward_compat_sgs(
+            ovn_port, port_object=port_object))
+        new_sg_ids = set(utils.get_lsp_security_groups(port))
+        detached_sg_ids = old_sg_ids - new_sg_ids
+        attached_sg_ids = new_sg_ids - old_sg_ids
+        old_fixed_ips = utils.remove_macs_from_lsp_addresses(
+            ovn_port.addresses)
+        new_fixed_ips = [x['ip_address'] for x in
+                         port.get('fixed_ips', [])]
+        old_allowed_address_pairs = (
+            utils.get_allowed_address_pairs_ip_addresses_from_ovn_port(
+                ovn_port))
+        new_allowed_address_pairs = (
+            utils.get_allowed_address_pairs_ip_addresses(port))
+        is_fixed_ips_updated = (
+            sorted(old_fixed_ips) != sorted(new_fixed_ips))
+        is_allowed_ips_updated = (sorted(old_allowed_address_pairs) !=
+                                  sorted(new_allowed_address_pairs))
+
+        port_security_changed = utils.is_port_security_enabled(port) != (
+            bool(ovn_port.port_security))
+
+        if self._nb_idl.is_port_groups_supported():
+            for sg in detached_sg_ids:
+                txn.add(self._nb_idl.pg_del_ports(
+                    utils.ovn_port_group_name(sg), port['id']))
+            for sg in attached_sg_ids:
+                txn.add(self._nb_idl.pg_add_ports(
+                    utils.ovn_port_group_name(sg), port['id']))
+            if (not utils.is_lsp_trusted(port) and
+                    utils.is_port_security_enabled(port)):
+                self._add_port_to_drop_port_group(port['id'], txn)
+            # If the port doesn't belong to any security group and
+            # port_security is disabled, allow all traffic
+            elif (not new_sg_ids and
+                  not utils.is_port_security_enabled(port)):
+                self._del_port_from_drop_port_group(port['id'], txn)
+        else:
+            # Refresh ACLs for changed security groups or fixed IPs.
+            if (detached_sg_ids or attached_sg_ids or
+                    is_fixed_ips_updated or port_security_changed):
+                # Note that update_acls will compare the port's ACLs to
+                # ensure only the necessary ACLs are added and deleted
+                # on the transaction.
+                acls_new = ovn_acl.add_acls(self._plugin,
+                                            admin_context,
+                                            port,
+                                            sg_cache,
+                                            subnet_cache,
+                                            self._nb_idl)
+                txn.add(self._nb_idl.update_acls([port['network_id']],
+                                                 [port],
+                                                 {port['id']: acls_new},
+                                                 need_compare=True))
+
+            # Refresh address sets for changed security groups or fixed
+            # IPs.
+            if len(old_fixed_ips) != 0 or len(new_fixed_ips) != 0:
+                addresses = ovn_acl.acl_port_ips(port)
+                addresses_old = utils.sort_ips_by_version(
+                    utils.get_ovn_port_addresses(ovn_port))
+                # Add current addresses to attached security groups.
+                for sg_id in attached_sg_ids:
+                    for ip_version in addresses:
+                        if addresses[ip_version]:
+                            txn.add(self._nb_idl.update_address_set(
+                                name=utils.ovn_addrset_name(sg_id,
+                                    ip_version),
+                                addrs_add=addresses[ip_version],
+                                addrs_remove=None))
+                # Remove old addresses from detached security groups.
+                for sg_id in detached_sg_ids:
+                    for ip_version in addresses_old:
+                        if addresses_old[ip_version]:
+                            txn.add(self._nb_idl.update_address_set(
+                                name=utils.ovn_addrset_name(sg_id,
+                                    ip_version),
+                                addrs_add=None,
+                                addrs_remove=addresses_old[ip_version]))
+
+                if is_fixed_ips_updated or is_allowed_ips_updated:
+                    # We have refreshed address sets for attached and
+                    # detached security groups, so now we only need to take
+                    # care of unchanged security groups.
+                    unchanged_sg_ids = new_sg_ids & old_sg_ids
+                    for sg_id in unchanged_sg_ids:
+                        for ip_version in addresses:
+                            addr_add = ((set(addresses[ip_version]) -
+                                         set(addresses_old[ip_version])) or
+                                        None)
+                            addr_remove = (
+                                (set(addresses_old[ip_version]) -
+                                 set(addresses[ip_version])) or None)
+
+                            if addr_add or addr_remove:
+                                txn.add(self._nb_idl.update_address_set(
+                                        name=utils.ovn_addrset_name(
+                                            sg_id, ip_version),
+                                        addrs_add=addr_add,
+                                        addrs_remove=addr_remove))
+
+        if self.is_dns_required_for_port(port):
+            self.add_txns_to_sync_port_dns_records(
+                txn, port, original_port=port_object)
+        elif port_object and self.is_dns_required_for_port(port_object):
+            # We need to remove the old entries
+            self.add_txns_to_remove_port_dns_records(txn, port_object)
+
+        return check_rev_cmd
+
     # TODO(lucasagomes): The ``port_object`` parameter was added to
     # keep things backward compatible. Remove it in the Rocky release.
     def update_port(self, port, qos_options=None, port_object=None):
@@ -360,177 +559,97 @@ class OVNClient(object):
             return
 
         port_info = self._get_port_options(port, qos_options)
-        external_ids = {ovn_const.OVN_PORT_NAME_EXT_ID_KEY: port['name'],
-                        ovn_const.OVN_DEVID_EXT_ID_KEY: port['device_id'],
-                        ovn_const.OVN_PROJID_EXT_ID_KEY: port['project_id'],
-                        ovn_const.OVN_CIDRS_EXT_ID_KEY: port_info.cidrs,
-                        ovn_const.OVN_DEVICE_OWNER_EXT_ID_KEY:
-                            port_info.device_owner,
-                        ovn_const.OVN_NETWORK_NAME_EXT_ID_KEY:
-                            utils.ovn_name(port['network_id']),
-                        ovn_const.OVN_SG_IDS_EXT_ID_KEY:
-                            port_info.security_group_ids,
-                        ovn_const.OVN_REV_NUM_EXT_ID_KEY: str(
-                            utils.get_revision_number(
-                                port, ovn_const.TYPE_PORTS))}
-        admin_context = n_context.get_admin_context()
         sg_cache = {}
         subnet_cache = {}
 
-        check_rev_cmd = self._nb_idl.check_revision_number(
-            port['id'], port, ovn_const.TYPE_PORTS)
         with self._nb_idl.transaction(check_error=True) as txn:
-            txn.add(check_rev_cmd)
-            columns_dict = {}
-            if utils.is_lsp_router_port(port):
-                port_info.options.update(
-                    self._nb_idl.get_router_port_options(port['id']))
-            else:
-                columns_dict['type'] = port_info.type
-                columns_dict['addresses'] = port_info.addresses
-            if not port_info.dhcpv4_options:
-                dhcpv4_options = []
-            elif 'cmd' in port_info.dhcpv4_options:
-                dhcpv4_options = txn.add(port_info.dhcpv4_options['cmd'])
-            else:
-                dhcpv4_options = [port_info.dhcpv4_options['uuid']]
-            if not port_info.dhcpv6_options:
-                dhcpv6_options = []
-            elif 'cmd' in port_info.dhcpv6_options:
-                dhcpv6_options = txn.add(port_info.dhcpv6_options['cmd'])
-            else:
-                dhcpv6_options = [port_info.dhcpv6_options['uuid']]
-            # NOTE(lizk): Fail port updating if port doesn't exist. This
-            # prevents any new inserted resources to be orphan, such as port
-            # dhcp options or ACL rules for port, e.g. a port was created
-            # without extra dhcp options and security group, while updating
-            # includes the new attributes setting to port.
-            txn.add(self._nb_idl.set_lswitch_port(
-                    lport_name=port['id'],
-                    external_ids=external_ids,
-                    parent_name=port_info.parent_name,
-                    tag=port_info.tag,
-                    options=port_info.options,
-                    enabled=port['admin_state_up'],
-                    port_security=port_info.port_security,
-                    dhcpv4_options=dhcpv4_options,
-                    dhcpv6_options=dhcpv6_options,
-                    if_exists=False,
-                    **columns_dict))
-
-            ovn_port = self._nb_idl.lookup('Logical_Switch_Port', port['id'])
-            # Determine if security groups or fixed IPs are updated.
-            old_sg_ids = set(self._get_lsp_backward_compat_sgs(
-                ovn_port, port_object=port_object))
-            new_sg_ids = set(utils.get_lsp_security_groups(port))
-            detached_sg_ids = old_sg_ids - new_sg_ids
-            attached_sg_ids = new_sg_ids - old_sg_ids
-            old_fixed_ips = utils.remove_macs_from_lsp_addresses(
-                ovn_port.addresses)
-            new_fixed_ips = [x['ip_address'] for x in
-                             port.get('fixed_ips', [])]
-            old_allowed_address_pairs = (
-                utils.get_allowed_address_pairs_ip_addresses_from_ovn_port(
-                    ovn_port))
-            new_allowed_address_pairs = (
-                utils.get_allowed_address_pairs_ip_addresses(port))
-            is_fixed_ips_updated = (
-                sorted(old_fixed_ips) != sorted(new_fixed_ips))
-            is_allowed_ips_updated = (sorted(old_allowed_address_pairs) !=
-                                      sorted(new_allowed_address_pairs))
-
-            port_security_changed = utils.is_port_security_enabled(port) != (
-                bool(ovn_port.port_security))
-
-            if self._nb_idl.is_port_groups_supported():
-                for sg in detached_sg_ids:
-                    txn.add(self._nb_idl.pg_del_ports(
-                        utils.ovn_port_group_name(sg), port['id']))
-                for sg in attached_sg_ids:
-                    txn.add(self._nb_idl.pg_add_ports(
-                        utils.ovn_port_group_name(sg), port['id']))
-                if (not utils.is_lsp_trusted(port) and
-                        utils.is_port_security_enabled(port)):
-                    self._add_port_to_drop_port_group(port['id'], txn)
-                # If the port doesn't belong to any security group and
-                # port_security is disabled, allow all traffic
-                elif (not new_sg_ids and
-                      not utils.is_port_security_enabled(port)):
-                    self._del_port_from_drop_port_group(port['id'], txn)
-            else:
-                # Refresh ACLs for changed security groups or fixed IPs.
-                if (detached_sg_ids or attached_sg_ids or
-                        is_fixed_ips_updated or port_security_changed):
-                    # Note that update_acls will compare the port's ACLs to
-                    # ensure only the necessary ACLs are added and deleted
-                    # on the transaction.
-                    acls_new = ovn_acl.add_acls(self._plugin,
-                                                admin_context,
-                                                port,
-                                                sg_cache,
-                                                subnet_cache,
-                                                self._nb_idl)
-                    txn.add(self._nb_idl.update_acls([port['network_id']],
-                                                     [port],
-                                                     {port['id']: acls_new},
-                                                     need_compare=True))
-
-                # Refresh address sets for changed security groups or fixed
-                # IPs.
-                if len(old_fixed_ips) != 0 or len(new_fixed_ips) != 0:
-                    addresses = ovn_acl.acl_port_ips(port)
-                    addresses_old = utils.sort_ips_by_version(
-                        utils.get_ovn_port_addresses(ovn_port))
-                    # Add current addresses to attached security groups.
-                    for sg_id in attached_sg_ids:
-                        for ip_version in addresses:
-                            if addresses[ip_version]:
-                                txn.add(self._nb_idl.update_address_set(
-                                    name=utils.ovn_addrset_name(sg_id,
-                                        ip_version),
-                                    addrs_add=addresses[ip_version],
-                                    addrs_remove=None))
-                    # Remove old addresses from detached security groups.
-                    for sg_id in detached_sg_ids:
-                        for ip_version in addresses_old:
-                            if addresses_old[ip_version]:
-                                txn.add(self._nb_idl.update_address_set(
-                                    name=utils.ovn_addrset_name(sg_id,
-                                        ip_version),
-                                    addrs_add=None,
-                                    addrs_remove=addresses_old[ip_version]))
-
-                    if is_fixed_ips_updated or is_allowed_ips_updated:
-                        # We have refreshed address sets for attached and
-                        # detached security groups, so now we only need to take
-                        # care of unchanged security groups.
-                        unchanged_sg_ids = new_sg_ids & old_sg_ids
-                        for sg_id in unchanged_sg_ids:
-                            for ip_version in addresses:
-                                addr_add = ((set(addresses[ip_version]) -
-                                             set(addresses_old[ip_version])) or
-                                            None)
-                                addr_remove = (
-                                    (set(addresses_old[ip_version]) -
-                                     set(addresses[ip_version])) or None)
-
-                                if addr_add or addr_remove:
-                                    txn.add(self._nb_idl.update_address_set(
-                                            name=utils.ovn_addrset_name(
-                                                sg_id, ip_version),
-                                            addrs_add=addr_add,
-                                            addrs_remove=addr_remove))
-
-            if self.is_dns_required_for_port(port):
-                self.add_txns_to_sync_port_dns_records(
-                    txn, port, original_port=port_object)
-            elif port_object and self.is_dns_required_for_port(port_object):
-                # We need to remove the old entries
-                self.add_txns_to_remove_port_dns_records(txn, port_object)
+            check_rev_cmd = self._update_lswitch_port(
+                port, port_info, txn, sg_cache, subnet_cache,
+                port_object=port_object)
 
         if check_rev_cmd.result == ovn_const.TXN_COMMITTED:
             db_rev.bump_revision(port, ovn_const.TYPE_PORTS)
 
+    def update_ports(self, ports, qos_options=None, port_objects=None):
+        """Update the OVN objects of many Neutron ports.
+
+        This is the bulk version of update_port(). The commands of up to
+        ``ovsdb_txn_chunk_size`` ports are committed in a single OVSDB
+        transaction and their revision numbers are bumped with a single
+        database query per transaction.
+
+        :param ports: The list of Neutron ports to update.
+        :param qos_options: Optional dictionary of QoS options indexed by
+                            port ID.
+        :param port_objects: Optional dictionary of the original Neutron
+                             ports indexed by port ID.
+        """
+        ports = [port for port in ports if not utils.is_lsp_ignored(port)]
+        qos_options = qos_options or {}
+        port_objects = port_objects or {}
+        sg_cache = {}
+        subnet_cache = {}
+        qos_cache = {}
+
+        for chunk in utils.chunks(ports, config.get_ovn_txn_chunk_size()):
+            ports_info = [self._get_port_options(
+                port, qos_options.get(port['id']), qos_cache=qos_cache)
+                for port in chunk]
+            check_rev_cmds = []
+            with self._nb_idl.transaction(check_error=True) as txn:
+                for port, port_info in zip(chunk, ports_info):
+                    check_rev_cmds.append(self._update_lswitch_port(
+                        port, port_info, txn, sg_cache, subnet_cache,
+                        port_object=port_objects.get(port['id'])))
+
+            if all(cmd.result == ovn_const.TXN_COMMITTED
+                   for cmd in check_rev_cmds):
+                db_rev.bump_revisions(chunk, ovn_const.TYPE_PORTS)
+                continue
+
+            # A revision conflict on any of the ports aborts the whole
+            # transaction, fall back to updating the ports one by one so
+            # only the conflicting ones are skipped.
+            LOG.debug('Bulk update of %d ports aborted, updating them one '
+                      'by one', len(chunk))
+            for port in chunk:
+                self.update_port(port, qos_options.get(port['id']),
+                                 port_object=port_objects.get(port['id']))
+
+    def update_ports_qos_options(self, ports, qos_options):
+        """Update the QoS options of the OVN ports of many Neutron ports.
+
+        Only the QoS options of the Logical_Switch_Ports are written, up to
+        ``ovsdb_txn_chunk_size`` ports per OVSDB transaction, and the ports
+        whose QoS options are already up to date are skipped. The revision
+        numbers are not bumped since the Neutron ports don't change.
+
+        :param ports: The list of Neutron ports to update.
+        :param qos_options: The QoS options of all the ports.
+        """
+        port_ids = []
+        for port in ports:
+            if utils.is_lsp_ignored(port):
+                continue
+            lsp = self._nb_idl.get_lswitch_port(port['id'])
+            # A port not created yet in OVN will be created with its QoS
+            # options and the vtep ports don't have any
+            if not lsp or lsp.type == 'vtep':
+                continue
+            current_options = dict(
+                (key, value) for key, value in lsp.options.items()
+                if key in ovn_const.OVN_QOS_OPTION_KEYS)
+            if current_options != qos_options:
+                port_ids.append(port['id'])
+
+        for chunk in utils.chunks(port_ids, config.get_ovn_txn_chunk_size()):
+            with self._nb_idl.transaction(check_error=True) as txn:
+                for port_id in chunk:
+                    txn.add(self._nb_idl.set_lswitch_port_qos_options(
+                        port_id, qos_options))
+        LOG.debug('QoS options of %(updated)d out of %(total)d ports '
+                  'updated', {'updated': len(port_ids), 'total': len(ports)})
+
     def _delete_port(self, port_id, port_object=None):
         ovn_port = self._nb_idl.lookup('Logical_Switch_Port', port_id)
         network_id = ovn_port.external_ids.get(
@@ -1700,6 +1819,7 @@ class OVNClient(object):
 
     def delete_security_group_rule(self, rule):
         self._process_security_group_rule(rule, is_add_acl=False)
+        ovn_acl.invalidate_sg_rule_match(rule['id'])
         db_rev.delete_revision(rule['id'], ovn_const.TYPE_SECURITY_GROUP_RULES)
 
     def _find_metadata_port(self, context, network_id):
@@ -371,14 +371,16 @@ def get_port_subnet_ids(port):
     return [f['subnet_id'] for f in fixed_ips]
 
 
-def get_ovsdb_connection(connection_string, schema, timeout, tables=None):
+def get_ovsdb_connection(connection_string, schema, timeout, tables=None,
+                         idl_class=idl.Idl):
     helper = idlutils.get_schema_helper(connection_string, schema)
     if tables:
         for table in tables:
             helper.register_table(table)
     else:
         helper.register_all()
-    return connection.Connection(idl.Idl(connection_string, helper), timeout)
+    return connection.Connection(idl_class(connection_string, helper),
+                                 timeout)
 
 
 def get_method_class(method):
@@ -390,3 +392,15 @@ def get_method_class(method):
 def ovn_metadata_name(id_):
     """Return the OVN metadata name based on an id."""
     return 'metadata-%s' % id_
+
+
+def chunks(iterable, size):
+    """Split iterable into lists of at most size items."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
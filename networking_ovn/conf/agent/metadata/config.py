@@ -43,7 +43,13 @@ SHARED_OPTS = [
                       "group).")),
     cfg.StrOpt('ovs_integration_bridge',
                default='br-int',
-               help=_('Name of Open vSwitch bridge to use'))
+               help=_('Name of Open vSwitch bridge to use')),
+    cfg.IntOpt('metadata_provisioning_workers',
+               min=1,
+               default=8,
+               help=_('Maximum number of networks whose metadata service '
+                      'is provisioned or torn down concurrently, for '
+                      'example when the metadata agent starts.'))
 ]
 
 
@@ -80,7 +86,25 @@ METADATA_PROXY_HANDLER_OPTS = [
                help=_("Client certificate for nova metadata api server.")),
     cfg.StrOpt('nova_client_priv_key',
                default='',
-               help=_("Private key of client certificate."))
+               help=_("Private key of client certificate.")),
+    cfg.IntOpt('nova_metadata_pool_size',
+               min=1,
+               default=10,
+               help=_("Maximum number of persistent connections to the nova "
+                      "metadata server kept by each metadata worker. The "
+                      "connections are reused across requests, saving the "
+                      "TCP and TLS handshakes.")),
+    cfg.IntOpt('nova_metadata_cache_ttl',
+               min=0,
+               default=0,
+               help=_("Time in seconds the responses of the nova metadata "
+                      "server to GET requests are cached by each metadata "
+                      "worker. Only the metadata which can't change during "
+                      "the life of an instance is cached: the versions of "
+                      "the metadata APIs (/ and /openstack) and the "
+                      "meta-data/instance-id, meta-data/ami-launch-index "
+                      "and meta-data/reservation-id paths of the EC2 API. "
+                      "0 disables the cache."))
 ]
 
 
@@ -21,28 +21,49 @@ from networking_ovn.common import constants as ovn_const
 from networking_ovn.db import models
 
 
-def get_inconsistent_resources():
+def _paginate(query, sort_order, order_map, limit, marker):
+    if marker is not None:
+        marker_order = order_map[marker.resource_type]
+        query = query.filter(sa.or_(
+            sort_order > marker_order,
+            sa.and_(sort_order == marker_order,
+                    models.OVNRevisionNumbers.resource_uuid >
+                    marker.resource_uuid)))
+    query = query.order_by(sort_order,
+                           models.OVNRevisionNumbers.resource_uuid)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def get_inconsistent_resources(limit=None, marker=None):
     """Get a list of inconsistent resources.
 
+    :param limit: The maximum number of objects to return, all of them
+                  are returned if None.
+    :param marker: The last object of the previous page, only the objects
+                   sorted after it are returned.
     :returns: A list of objects which the revision number from the
               ovn_revision_number and standardattributes tables differs.
     """
-    sort_order = sa.case(value=models.OVNRevisionNumbers.resource_type,
-                         whens=ovn_const.MAINTENANCE_CREATE_UPDATE_TYPE_ORDER)
+    sort_order = sa.case(ovn_const.MAINTENANCE_CREATE_UPDATE_TYPE_ORDER,
+                         value=models.OVNRevisionNumbers.resource_type)
     session = db_api.get_reader_session()
     with session.begin():
-        return (session.query(models.OVNRevisionNumbers).
-                join(
-                    standard_attr.StandardAttribute,
-                    models.OVNRevisionNumbers.standard_attr_id ==
-                    standard_attr.StandardAttribute.id).
-                filter(
-                    models.OVNRevisionNumbers.revision_number !=
-                    standard_attr.StandardAttribute.revision_number).
-                order_by(sort_order).all())
-
-
-def get_deleted_resources():
+        query = (session.query(models.OVNRevisionNumbers).
+                 join(
+                     standard_attr.StandardAttribute,
+                     models.OVNRevisionNumbers.standard_attr_id ==
+                     standard_attr.StandardAttribute.id).
+                 filter(
+                     models.OVNRevisionNumbers.revision_number !=
+                     standard_attr.StandardAttribute.revision_number))
+        return _paginate(query, sort_order,
+                         ovn_const.MAINTENANCE_CREATE_UPDATE_TYPE_ORDER,
+                         limit, marker)
+
+
+def get_deleted_resources(limit=None, marker=None):
     """Get a list of resources that failed to be deleted in OVN.
 
     Get a list of resources that have been deleted from neutron but not
@@ -53,10 +74,16 @@ def get_deleted_resources():
     ovn_revision_number should also be deleted but if something fails
     the entry will be kept and returned in this list so the maintenance
     thread can later fix it.
+
+    The ``limit`` and ``marker`` parameters are the same as the ones of
+    get_inconsistent_resources().
     """
-    sort_order = sa.case(value=models.OVNRevisionNumbers.resource_type,
-                         whens=ovn_const.MAINTENANCE_DELETE_TYPE_ORDER)
+    sort_order = sa.case(ovn_const.MAINTENANCE_DELETE_TYPE_ORDER,
+                         value=models.OVNRevisionNumbers.resource_type)
     session = db_api.get_reader_session()
     with session.begin():
-        return session.query(models.OVNRevisionNumbers).filter_by(
-            standard_attr_id=None).order_by(sort_order).all()
+        query = session.query(models.OVNRevisionNumbers).filter_by(
+            standard_attr_id=None)
+        return _paginate(query, sort_order,
+                         ovn_const.MAINTENANCE_DELETE_TYPE_ORDER,
+                         limit, marker)
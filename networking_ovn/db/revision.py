@@ -14,9 +14,14 @@
 #    under the License.
 
 from neutron.db import standard_attr
+from neutron_lib import constants as n_const
 from neutron_lib.db import api as db_api
 from oslo_db import api as oslo_db_api
+from oslo_db import exception as os_db_exc
 from oslo_log import log
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import exc
 
 from networking_ovn.common import constants as ovn_const
@@ -34,12 +39,30 @@ if STD_ATTR_MAP:
     STD_ATTR_MAP[ovn_const.TYPE_ROUTER_PORTS] = \
         STD_ATTR_MAP[ovn_const.TYPE_PORTS]
 
+# The device owners of the ports with a Logical_Router_Port in OVN
+ROUTER_PORT_OWNERS = (
+    n_const.DEVICE_OWNER_ROUTER_INTF,
+    n_const.DEVICE_OWNER_ROUTER_GW,
+    n_const.DEVICE_OWNER_DVR_INTERFACE,
+    n_const.DEVICE_OWNER_ROUTER_HA_INTF,
+    n_const.DEVICE_OWNER_HA_REPLICATED_INT)
+
 _wrap_db_retry = oslo_db_api.wrap_db_retry(
     max_retries=ovn_const.DB_MAX_RETRIES,
     retry_interval=ovn_const.DB_INITIAL_RETRY_INTERVAL,
     max_retry_interval=ovn_const.DB_MAX_RETRY_INTERVAL,
     inc_retry_interval=True, retry_on_deadlock=True)
 
+# The revision rows missing when bumping the revision numbers may be created
+# concurrently, the INSERT then fails on the backends without upsert and the
+# bump is retried, updating the rows now existing.
+_wrap_db_retry_on_duplicate = oslo_db_api.wrap_db_retry(
+    max_retries=ovn_const.DB_MAX_RETRIES,
+    retry_interval=ovn_const.DB_INITIAL_RETRY_INTERVAL,
+    max_retry_interval=ovn_const.DB_MAX_RETRY_INTERVAL,
+    inc_retry_interval=True, retry_on_deadlock=True,
+    exception_checker=lambda e: isinstance(e, os_db_exc.DBDuplicateEntry))
+
 
 def _get_standard_attr_id(session, resource_uuid, resource_type):
     try:
@@ -51,6 +74,43 @@ def _get_standard_attr_id(session, resource_uuid, resource_type):
             resource_uuid=resource_uuid)
 
 
+def _get_standard_attr_ids(session, resource_uuids, resource_type):
+    model = STD_ATTR_MAP[resource_type]
+    std_attr_ids = dict(session.query(model.id, model.standard_attr_id).filter(
+        model.id.in_(resource_uuids)))
+    for resource_uuid in resource_uuids:
+        if resource_uuid not in std_attr_ids:
+            raise ovn_exc.StandardAttributeIDNotFound(
+                resource_uuid=resource_uuid)
+    return std_attr_ids
+
+
+def _insert_revision_rows(session, values):
+    """Insert many revision rows with a single INSERT statement.
+
+    On the backends supporting it the INSERT is an upsert, if a row has
+    been created concurrently it's kept with the highest revision number.
+    On the other backends it's a plain INSERT, raising DBDuplicateEntry in
+    that case.
+    """
+    table = models.OVNRevisionNumbers.__table__
+    dialect = session.get_bind().dialect.name
+    if dialect == 'mysql':
+        stmt = mysql.insert(table).values(values)
+        stmt = stmt.on_duplicate_key_update(
+            revision_number=sa.func.greatest(
+                table.c.revision_number, stmt.inserted.revision_number))
+    elif dialect == 'postgresql':
+        stmt = postgresql.insert(table).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.resource_uuid, table.c.resource_type],
+            set_={'revision_number': sa.func.greatest(
+                table.c.revision_number, stmt.excluded.revision_number)})
+    else:
+        stmt = table.insert().values(values)
+    session.execute(stmt)
+
+
 @_wrap_db_retry
 def create_initial_revision(resource_uuid, resource_type, session,
                             revision_number=ovn_const.INITIAL_REV_NUM):
@@ -114,6 +174,23 @@ def get_revision_row(resource_uuid):
         pass
 
 
+@_wrap_db_retry
+def get_revision_rows(resource_uuids):
+    """Return the revision rows of many resources.
+
+    This is the bulk version of get_revision_row(), resources without a
+    revision row are not part of the returned list.
+    """
+    resource_uuids = list(resource_uuids)
+    if not resource_uuids:
+        return []
+    session = db_api.get_reader_session()
+    with session.begin():
+        return session.query(models.OVNRevisionNumbers).filter(
+            models.OVNRevisionNumbers.resource_uuid.in_(
+                resource_uuids)).all()
+
+
 @_wrap_db_retry
 def bump_revision(resource, resource_type):
     session = db_api.get_writer_session()
@@ -139,3 +216,98 @@ def bump_revision(resource, resource_type):
              '%(res_uuid)s (type: %(res_type)s) to %(rev_num)d',
              {'res_uuid': resource['id'], 'res_type': resource_type,
               'rev_num': revision_number})
+
+
+@_wrap_db_retry_on_duplicate
+def bump_revisions(resources, resource_type):
+    """Bump the revision number of many resources of the same type.
+
+    This is the bulk version of bump_revision(). The revision numbers of
+    all the resources are set with a single UPDATE statement, a revision
+    number is only bumped if it's higher than the one already registered
+    in the database. The missing revision rows are created with a single
+    INSERT statement, the bump is retried if one of them has been created
+    concurrently meanwhile.
+    """
+    revisions = {resource['id']: utils.get_revision_number(
+                 resource, resource_type) for resource in resources}
+    if not revisions:
+        return
+
+    session = db_api.get_writer_session()
+    with session.begin():
+        query = session.query(models.OVNRevisionNumbers).filter(
+            models.OVNRevisionNumbers.resource_type == resource_type,
+            models.OVNRevisionNumbers.resource_uuid.in_(revisions))
+        current_rev = models.OVNRevisionNumbers.revision_number
+        new_rev = sa.case(revisions,
+                          value=models.OVNRevisionNumbers.resource_uuid)
+        updated = query.update(
+            {current_rev: sa.case([(new_rev > current_rev, new_rev)],
+                                  else_=current_rev)},
+            synchronize_session=False)
+
+        if updated < len(revisions):
+            existing = {row.resource_uuid for row in query.with_entities(
+                models.OVNRevisionNumbers.resource_uuid)}
+            missing = sorted(set(revisions) - existing)
+            for res_uuid in missing:
+                LOG.warning(
+                    'No revision row found for %(res_uuid)s (type: '
+                    '%(res_type)s) when bumping the revision number. '
+                    'Creating one.', {'res_uuid': res_uuid,
+                                      'res_type': resource_type})
+            std_attr_ids = _get_standard_attr_ids(
+                session, missing, resource_type)
+            _insert_revision_rows(session, [
+                {'resource_uuid': res_uuid, 'resource_type': resource_type,
+                 'standard_attr_id': std_attr_ids[res_uuid],
+                 'revision_number': revisions[res_uuid]}
+                for res_uuid in missing])
+    LOG.info('Successfully bumped revision numbers for %(count)d resources '
+             '(type: %(res_type)s)', {'count': len(revisions),
+                                      'res_type': resource_type})
+
+
+def _filter_resources_with_ovn_objects(query, model, resource_type):
+    if resource_type == ovn_const.TYPE_PORTS:
+        # Floating IP ports are not created in OVN, see is_lsp_ignored()
+        return query.filter(
+            model.device_owner != n_const.DEVICE_OWNER_FLOATINGIP)
+    if resource_type == ovn_const.TYPE_ROUTER_PORTS:
+        return query.filter(model.device_owner.in_(ROUTER_PORT_OWNERS))
+    if resource_type == ovn_const.TYPE_FLOATINGIPS:
+        # Only floating IPs associated to a port have a NAT entry
+        return query.filter(model.fixed_port_id.isnot(None))
+    if resource_type == ovn_const.TYPE_SUBNETS:
+        # Only subnets with DHCP enabled have a DHCP_Options entry, see
+        # is_dhcp_options_ignored()
+        return query.filter(
+            model.enable_dhcp.is_(True),
+            sa.or_(model.ip_version != n_const.IP_VERSION_6,
+                   model.ipv6_address_mode.is_(None),
+                   model.ipv6_address_mode != n_const.IPV6_SLAAC))
+    return query
+
+
+@_wrap_db_retry
+def get_neutron_revision_numbers(resource_type):
+    """Return the revision numbers of the Neutron resources of a type.
+
+    Only the resources expected to have an object in the OVN NB database
+    are returned (e.g. floating IPs not associated to any port are not).
+
+    :param resource_type: The resource type, e.g. ovn_const.TYPE_PORTS.
+    :returns: A dictionary of resource UUID -> revision number. Only those
+              two columns are loaded from the database.
+    """
+    model = STD_ATTR_MAP[resource_type]
+    session = db_api.get_reader_session()
+    with session.begin():
+        query = session.query(
+            model.id, standard_attr.StandardAttribute.revision_number).join(
+                standard_attr.StandardAttribute,
+                model.standard_attr_id == standard_attr.StandardAttribute.id)
+        query = _filter_resources_with_ovn_objects(
+            query, model, resource_type)
+        return dict(query)
@@ -34,6 +34,7 @@ from neutron.db import l3_gwmode_db
 from neutron.db.models import l3 as l3_models
 from neutron.quota import resource_registry
 
+from networking_ovn.common import config as ovn_config
 from networking_ovn.common import constants as ovn_const
 from networking_ovn.common import extensions
 from networking_ovn.common import ovn_client
@@ -319,17 +320,25 @@ class OVNL3RouterPlugin(service_base.ServicePluginBase,
         cms = self._sb_ovn.get_gateway_chassis_from_cms_options()
         unhosted_gateways = self._ovn.get_unhosted_gateways(
             port_physnet_dict, chassis_physnets, cms)
+        if not unhosted_gateways:
+            return
+        gateways = {}
         for g_name in unhosted_gateways:
             physnet = port_physnet_dict.get(g_name[len('lrp-'):])
-            candidates = self._ovn_client.get_candidates_for_scheduling(
+            gateways[g_name] = self._ovn_client.get_candidates_for_scheduling(
                 physnet, cms=cms, chassis_physnets=chassis_physnets)
-            chassis = self.scheduler.select(
-                self._ovn, self._sb_ovn, g_name, candidates=candidates)
-            # NOTE(dalvarez): Let's commit the changes in separate transactions
-            # as we will rely on those for scheduling subsequent gateways.
+        # NOTE(dalvarez): The scheduling of a gateway relies on the load of
+        # the chassis, all the gateways are planned at once against the
+        # same load so the bindings can be committed in batches.
+        planned = self.scheduler.plan(
+            self._ovn, self._sb_ovn, gateways,
+            chassis_load=self._ovn.get_chassis_gateway_load())
+        for g_names in utils.chunks(unhosted_gateways,
+                                    ovn_config.get_ovn_txn_chunk_size()):
             with self._ovn.transaction(check_error=True) as txn:
-                txn.add(self._ovn.update_lrouter_port(
-                    g_name, gateway_chassis=chassis))
+                for g_name in g_names:
+                    txn.add(self._ovn.update_lrouter_port(
+                        g_name, gateway_chassis=planned[g_name]))
 
     @staticmethod
     @registry.receives(resources.SUBNET, [events.AFTER_UPDATE])
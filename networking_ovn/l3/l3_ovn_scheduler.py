@@ -38,15 +38,69 @@ class OVNGatewayScheduler(object):
         pass
 
     @abc.abstractmethod
-    def select(self, nb_idl, sb_idl, gateway_name, candidates=None):
+    def select(self, nb_idl, sb_idl, gateway_name, candidates=None,
+               chassis_load=None):
         """Schedule the gateway port of a router to an OVN chassis.
 
         Schedule the gateway router port only if it is not already
         scheduled.
+
+        When scheduling several gateways in a row, the caller can pass the
+        load of the chassis (see get_chassis_gateway_load()) it got before
+        scheduling the first one; it is updated with each placement so the
+        gateways can be bound in a single transaction.
         """
         pass
 
-    def _schedule_gateway(self, nb_idl, sb_idl, gateway_name, candidates):
+    def plan(self, nb_idl, sb_idl, gateways, chassis_load=None):
+        """Schedule a set of gateway ports of routers at once.
+
+        Used to reschedule all the gateways affected by the loss of a
+        chassis in a single pass.
+
+        @param   gateways: {gateway name: candidates} of the gateways to
+                           schedule, if no candidates are given for a
+                           gateway all the chassis are candidates.
+        @type    gateways: {}
+        @param   chassis_load: the load of the chassis, updated with the
+                               planned bindings.
+        @type    chassis_load: {}
+        @return: A {gateway name: chassis list} dictionary.
+        """
+        if chassis_load is None:
+            chassis_load = nb_idl.get_chassis_gateway_load()
+        return dict((gateway_name,
+                     self.select(nb_idl, sb_idl, gateway_name,
+                                 candidates=candidates,
+                                 chassis_load=chassis_load))
+                    for gateway_name, candidates in gateways.items())
+
+    @staticmethod
+    def _update_chassis_load(chassis_load, old_chassis, new_chassis):
+        """Move a gateway from the old_chassis to the new_chassis.
+
+        The priorities are the ones assigned when binding a gateway, the
+        first chassis of the list gets the highest one.
+        """
+        for chassis_list, delta in ((old_chassis, -1), (new_chassis, 1)):
+            prio = len(chassis_list)
+            for chassis in chassis_list:
+                load = chassis_load.setdefault(chassis, {})
+                count = load.get(prio, 0) + delta
+                if count > 0:
+                    load[prio] = count
+                else:
+                    load.pop(prio, None)
+                prio -= 1
+
+    @staticmethod
+    def _add_chassis_load(chassis_load, chassis_list, prio):
+        for chassis in chassis_list:
+            load = chassis_load.setdefault(chassis, {})
+            load[prio] = load.get(prio, 0) + 1
+
+    def _schedule_gateway(self, nb_idl, sb_idl, gateway_name, candidates,
+                          chassis_load=None):
         existing_chassis = nb_idl.get_gateway_chassis_binding(gateway_name)
         candidates = candidates or self._get_chassis_candidates(sb_idl)
         # if no candidates or all chassis in existing_chassis also present
@@ -62,14 +116,17 @@ class OVNGatewayScheduler(object):
         # column or gateway_chassis column in the OVN_Northbound is done
         # by the caller
         chassis = self._select_gateway_chassis(
-            nb_idl, candidates)[:MAX_GW_CHASSIS]
+            nb_idl, candidates, chassis_load)[:MAX_GW_CHASSIS]
+        if chassis_load is not None:
+            self._update_chassis_load(chassis_load, existing_chassis or [],
+                                      chassis)
 
         LOG.debug("Gateway %s scheduled on chassis %s",
                   gateway_name, chassis)
         return chassis
 
     @abc.abstractmethod
-    def _select_gateway_chassis(self, nb_idl, candidates):
+    def _select_gateway_chassis(self, nb_idl, candidates, chassis_load=None):
         """Choose a chassis from candidates based on a specific policy."""
         pass
 
@@ -84,10 +141,12 @@ class OVNGatewayScheduler(object):
 class OVNGatewayChanceScheduler(OVNGatewayScheduler):
     """Randomly select an chassis for a gateway port of a router"""
 
-    def select(self, nb_idl, sb_idl, gateway_name, candidates=None):
-        return self._schedule_gateway(nb_idl, sb_idl, gateway_name, candidates)
+    def select(self, nb_idl, sb_idl, gateway_name, candidates=None,
+               chassis_load=None):
+        return self._schedule_gateway(nb_idl, sb_idl, gateway_name, candidates,
+                                      chassis_load)
 
-    def _select_gateway_chassis(self, nb_idl, candidates):
+    def _select_gateway_chassis(self, nb_idl, candidates, chassis_load=None):
         candidates = copy.deepcopy(candidates)
         random.shuffle(candidates)
         return candidates
@@ -96,32 +155,88 @@ class OVNGatewayChanceScheduler(OVNGatewayScheduler):
 class OVNGatewayLeastLoadedScheduler(OVNGatewayScheduler):
     """Select the least loaded chassis for a gateway port of a router"""
 
-    def select(self, nb_idl, sb_idl, gateway_name, candidates=None):
-        return self._schedule_gateway(nb_idl, sb_idl, gateway_name, candidates)
-
-    @staticmethod
-    def _get_chassis_load_by_prios(chassis_info):
-        """Retrieve the amount of ports by priorities hosted in the chassis.
-
-        @param   chassis_info: list of (port, prio) hosted by this chassis
-        @type    chassis_info: []
-        @return: A list of (prio, number_of_ports) tuples.
+    def plan(self, nb_idl, sb_idl, gateways, chassis_load=None):
+        """Schedule a set of gateway ports of routers at once.
+
+        Unlike scheduling the gateways one after the other, the planned
+        bindings balance the number of gateways hosted by the chassis at
+        each priority: the gateways with the fewest candidates (physnet
+        and ovn-cms-options constraints) are placed first and each
+        priority of a gateway goes to the candidate hosting the fewest
+        gateways at that priority. The highest priority chassis of a
+        gateway is kept if it is still a candidate, not to move the
+        traffic of routers whose active gateway is still alive.
         """
-        chassis_load = {}
-        for lrp, prio in chassis_info:
-            chassis_load[prio] = chassis_load.get(prio, 0) + 1
-        return chassis_load.items()
+        if chassis_load is None:
+            chassis_load = nb_idl.get_chassis_gateway_load()
+        planned = {}
+        to_place = []
+        all_chassis = None
+        for gateway_name, candidates in gateways.items():
+            existing_chassis = nb_idl.get_gateway_chassis_binding(
+                gateway_name)
+            if not candidates:
+                if all_chassis is None:
+                    all_chassis = self._get_chassis_candidates(sb_idl)
+                candidates = all_chassis
+            # Same rules as _schedule_gateway()
+            if existing_chassis and (not candidates or
+               not (set(existing_chassis) - set(candidates))):
+                planned[gateway_name] = existing_chassis
+                continue
+            if not candidates:
+                planned[gateway_name] = [ovn_const.OVN_GATEWAY_INVALID_CHASSIS]
+                continue
+            self._update_chassis_load(chassis_load, existing_chassis or [],
+                                      [])
+            chassis = []
+            if existing_chassis and existing_chassis[0] in candidates:
+                chassis.append(existing_chassis[0])
+            to_place.append((gateway_name, candidates, chassis))
+            # Account for the kept chassis right away so the other gateways
+            # are planned against the actual load
+            self._add_chassis_load(chassis_load, chassis,
+                                   min(len(candidates), MAX_GW_CHASSIS))
+
+        # Most constrained gateways first
+        to_place.sort(key=lambda gateway: (len(gateway[1]), gateway[0]))
+        for gateway_name, candidates, chassis in to_place:
+            remaining = [c for c in candidates if c not in chassis]
+            prio = min(len(candidates), MAX_GW_CHASSIS) - len(chassis)
+            while prio > 0:
+                best = min(remaining, key=lambda c: (
+                    chassis_load.get(c, {}).get(prio, 0),
+                    sum(chassis_load.get(c, {}).values())))
+                remaining.remove(best)
+                chassis.append(best)
+                self._add_chassis_load(chassis_load, [best], prio)
+                prio -= 1
+            planned[gateway_name] = chassis
+            LOG.debug("Gateway %s planned on chassis %s",
+                      gateway_name, chassis)
+        return planned
+
+    def select(self, nb_idl, sb_idl, gateway_name, candidates=None,
+               chassis_load=None):
+        return self._schedule_gateway(nb_idl, sb_idl, gateway_name, candidates,
+                                      chassis_load)
 
     @staticmethod
     def _get_chassis_load(chassis):
-        chassis_ports_prios = chassis[1]
-        return sorted(
-            OVNGatewayLeastLoadedScheduler._get_chassis_load_by_prios(
-                chassis_ports_prios), reverse=True)
-
-    def _select_gateway_chassis(self, nb_idl, candidates):
-        chassis_bindings = nb_idl.get_all_chassis_gateway_bindings(candidates)
-        return [chassis for chassis, load in sorted(chassis_bindings.items(),
+        """Return the sort key of a (chassis, {prio: number_of_ports}) tuple.
+
+        The chassis hosting the fewest ports of the highest priority come
+        first.
+        """
+        return sorted(((prio, count) for prio, count in chassis[1].items()
+                       if count), reverse=True)
+
+    def _select_gateway_chassis(self, nb_idl, candidates, chassis_load=None):
+        if chassis_load is None:
+            chassis_load = nb_idl.get_chassis_gateway_load(candidates)
+        candidates_load = [(chassis, chassis_load.get(chassis, {}))
+                           for chassis in candidates]
+        return [chassis for chassis, load in sorted(candidates_load,
                 key=OVNGatewayLeastLoadedScheduler._get_chassis_load)]
 
 
@@ -12,11 +12,13 @@
 #    under the License.
 #
 
+import collections
 import functools
 import operator
 import threading
 import types
 import uuid
+import weakref
 
 from neutron_lib.api.definitions import portbindings
 from neutron_lib.callbacks import events
@@ -33,7 +35,6 @@ from oslo_db import exception as os_db_exc
 from oslo_log import log
 from oslo_utils import timeutils
 
-from neutron.common import utils as n_utils
 from neutron.db import provisioning_blocks
 from neutron.services.segments import db as segment_service_db
 
@@ -47,6 +48,7 @@ from networking_ovn.common import maintenance
 from networking_ovn.common import ovn_client
 from networking_ovn.common import utils
 from networking_ovn.db import revision as db_rev
+from networking_ovn.ml2 import port_status
 from networking_ovn.ml2 import qos_driver
 from networking_ovn.ml2 import trunk_driver
 from networking_ovn import ovn_db_sync
@@ -58,8 +60,62 @@ LOG = log.getLogger(__name__)
 METADATA_READY_WAIT_TIMEOUT = 15
 
 
-class MetadataServiceReadyWaitTimeoutException(Exception):
-    pass
+class _MetadataReadyWaiter(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.count = 0
+
+
+class MetadataReadyWaiters(object):
+    """Wait for the metadata service of networks to be ready on chassis.
+
+    The waiters are indexed by chassis and network and are woken up by
+    notify() when the metadata agent of the chassis reports the networks
+    as provisioned, all the waiters of a network at once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Chassis name -> {network: _MetadataReadyWaiter}
+        self._waiters = collections.defaultdict(dict)
+
+    def wait(self, chassis, network, is_ready, timeout):
+        """Wait for the metadata service of network to be ready on chassis.
+
+        :param is_ready: function returning whether the service is ready,
+                         called once the waiter is registered so that a
+                         notification can't be missed
+        :returns: False if the service isn't ready after timeout seconds
+        """
+        with self._lock:
+            waiter = self._waiters[chassis].setdefault(
+                network, _MetadataReadyWaiter())
+            waiter.count += 1
+        try:
+            return is_ready() or waiter.event.wait(timeout)
+        finally:
+            with self._lock:
+                waiter.count -= 1
+                waiters = self._waiters.get(chassis, {})
+                if not waiter.count and waiters.get(network) is waiter:
+                    del waiters[network]
+                    if not waiters:
+                        self._waiters.pop(chassis, None)
+
+    def notify(self, chassis, networks):
+        """Wake up the waiters of the networks ready on chassis."""
+        with self._lock:
+            waiters = self._waiters.get(chassis)
+            if not waiters:
+                return
+            for network in set(networks) & set(waiters):
+                waiters.pop(network).event.set()
+            if not waiters:
+                del self._waiters[chassis]
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(waiters) for waiters in self._waiters.values())
 
 
 class OVNPortUpdateError(n_exc.BadRequest):
@@ -104,6 +160,13 @@ class OVNMechanismDriver(api.MechanismDriver):
         self._maintenance_thread = None
         self.sg_enabled = ovn_acl.is_sg_enabled()
         self._post_fork_event = threading.Event()
+        # Ports created by each API request (indexed by plugin context)
+        # and not yet created in OVN. See create_port_postcommit().
+        self._bulk_port_contexts = weakref.WeakKeyDictionary()
+        self._port_status_pipeline = port_status.PortStatusPipeline(
+            self._prepare_port_status, self._commit_ports_status,
+            workers=config.get_ovn_port_status_workers())
+        self._metadata_ready_waiters = MetadataReadyWaiters()
         if cfg.CONF.SECURITYGROUP.firewall_driver:
             LOG.warning('Firewall driver configuration is ignored')
         self._setup_vif_port_bindings()
@@ -407,6 +470,13 @@ class OVNMechanismDriver(api.MechanismDriver):
                                            ovn_const.TYPE_ROUTER_PORTS,
                                            context._plugin_context.session)
 
+        # ML2 creates all the ports of a bulk request in the database
+        # before calling create_port_postcommit() for each one of them,
+        # keep track of them so they can be created in OVN all at once.
+        bulk_contexts = self._bulk_port_contexts.setdefault(
+            context._plugin_context, collections.OrderedDict())
+        bulk_contexts[port['id']] = context
+
     def _is_port_provisioning_required(self, port, host, original_host=None):
         vnic_type = port.get(portbindings.VNIC_TYPE, portbindings.VNIC_NORMAL)
         if vnic_type not in self.supported_vnic_types:
@@ -485,9 +555,47 @@ class OVNMechanismDriver(api.MechanismDriver):
         """
         port = context.current
         port['network'] = context.network.current
-        self._ovn_client.create_port(port)
+        bulk_contexts = self._bulk_port_contexts.get(
+            context._plugin_context, {})
+        if port['id'] in bulk_contexts and bulk_contexts[port['id']] is None:
+            # Already created in OVN along with the other ports of the
+            # same bulk request.
+            del bulk_contexts[port['id']]
+        elif len(bulk_contexts) > 1:
+            self._create_bulk_ports(context, bulk_contexts)
+        else:
+            bulk_contexts.pop(port['id'], None)
+            self._ovn_client.create_port(port)
         self._notify_dhcp_updated(port['id'])
 
+    def _create_bulk_ports(self, context, bulk_contexts):
+        """Create in OVN all the pending ports of a bulk request.
+
+        The pending ports are marked as created, the following calls to
+        create_port_postcommit() for them won't do anything but notifying
+        that the DHCP has been updated.
+        """
+        pending = [port_id for port_id, port_context in bulk_contexts.items()
+                   if port_context is not None]
+        # Precommit may have been executed for ports whose database
+        # transaction was later retried, only take the existing ones.
+        existing = {p['id'] for p in self._plugin.get_ports(
+            n_context.get_admin_context(), filters={'id': pending},
+            fields=['id'])}
+        existing.add(context.current['id'])
+        ports = []
+        for port_id in pending:
+            port_context = bulk_contexts.pop(port_id)
+            if port_id not in existing:
+                continue
+            port = port_context.current
+            port['network'] = port_context.network.current
+            ports.append(port)
+        self._ovn_client.create_ports(ports)
+        for port in ports:
+            if port['id'] != context.current['id']:
+                bulk_contexts[port['id']] = None
+
     def update_port_precommit(self, context):
         """Update resources of a port.
 
@@ -744,11 +852,32 @@ class OVNMechanismDriver(api.MechanismDriver):
             self._nb_ovn.db_clear(
                 'NAT', nat['_uuid'], 'external_mac').execute(check_error=True)
 
+    def queue_port_status(self, port_id, up):
+        """Queue a status change of a port reported by OVN.
+
+        The status changes are processed in the background by
+        port_status.PortStatusPipeline, see set_port_status_up() and
+        set_port_status_down() for what is done.
+        """
+        LOG.info("OVN reports status %(status)s for port: %(port)s",
+                 {'status': 'up' if up else 'down', 'port': port_id})
+        self._port_status_pipeline.queue(port_id, up)
+
     def set_port_status_up(self, port_id):
-        # Port provisioning is complete now that OVN has reported that the
-        # port is up. Any provisioning block (possibly added during port
-        # creation or when OVN reports that the port is down) must be removed.
         LOG.info("OVN reports status up for port: %s", port_id)
+        self._prepare_port_status(port_id, True)
+        self._commit_ports_status([(port_id, True)])
+
+    def set_port_status_down(self, port_id):
+        LOG.info("OVN reports status down for port: %s", port_id)
+        self._prepare_port_status(port_id, False)
+        self._commit_ports_status([(port_id, False)])
+
+    def _prepare_port_status(self, port_id, up):
+        """Update OVN and wait for the port before updating its status."""
+        if not up:
+            self._update_dnat_entry_if_needed(port_id, False)
+            return
 
         self._update_dnat_entry_if_needed(port_id)
         self._wait_for_metadata_provisioned_if_needed(port_id)
@@ -758,13 +887,42 @@ class OVNMechanismDriver(api.MechanismDriver):
         # it will not transition from DOWN to ACTIVE.
         self._update_subport_host_if_needed(port_id)
 
+    def _commit_ports_status(self, statuses):
+        """Update the status of the ports in the Neutron DB.
+
+        The ports are fetched at once but their status is written one port
+        at a time, provisioning_complete() and update_port_status() have no
+        bulk variant and notify each port on their own.
+
+        :param statuses: list of (port ID, True if the port is up) tuples
+        """
+        admin_context = n_context.get_admin_context()
+        ports = dict(
+            (port['id'], port) for port in self._plugin.get_ports(
+                admin_context,
+                filters={'id': [port_id for port_id, up in statuses]}))
+        for port_id, up in statuses:
+            if up:
+                self._commit_port_status_up(
+                    admin_context, port_id, ports.get(port_id))
+            else:
+                self._commit_port_status_down(
+                    admin_context, port_id, ports.get(port_id))
+
+    def _commit_port_status_up(self, admin_context, port_id, port):
+        # Port provisioning is complete now that OVN has reported that the
+        # port is up. Any provisioning block (possibly added during port
+        # creation or when OVN reports that the port is down) must be removed.
         provisioning_blocks.provisioning_complete(
-            n_context.get_admin_context(),
+            admin_context,
             port_id,
             resources.PORT,
             provisioning_blocks.L2_AGENT_ENTITY)
 
-        admin_context = n_context.get_admin_context()
+        if not port:
+            LOG.debug('Port not found during OVN status up report: %s',
+                      port_id)
+            return
         try:
             # NOTE(lucasagomes): Router ports in OVN is never bound
             # to a host given their decentralized nature. By calling
@@ -772,7 +930,6 @@ class OVNMechanismDriver(api.MechanismDriver):
             # becasue the router ports are unbind so, for OVN we are
             # forcing the status here. Maybe it's something that we can
             # change in core Neutron in the future.
-            port = self._plugin.get_port(admin_context, port_id)
             if port.get('device_owner') in (const.DEVICE_OWNER_ROUTER_INTF,
                                             const.DEVICE_OWNER_DVR_INTERFACE,
                                             const.DEVICE_OWNER_ROUTER_HA_INTF):
@@ -782,17 +939,17 @@ class OVNMechanismDriver(api.MechanismDriver):
             LOG.debug('Port not found during OVN status up report: %s',
                       port_id)
 
-    def set_port_status_down(self, port_id):
+    def _commit_port_status_down(self, admin_context, port_id, port):
         # Port provisioning is required now that OVN has reported that the
         # port is down. Insert a provisioning block and mark the port down
         # in neutron. The block is inserted before the port status update
         # to prevent another entity from bypassing the block with its own
         # port status update.
-        LOG.info("OVN reports status down for port: %s", port_id)
-        self._update_dnat_entry_if_needed(port_id, False)
-        admin_context = n_context.get_admin_context()
+        if not port:
+            LOG.debug("Port not found during OVN status down report: %s",
+                      port_id)
+            return
         try:
-            port = self._plugin.get_port(admin_context, port_id)
             self._insert_port_provisioning_block(admin_context, port)
             self._plugin.update_port_status(admin_context,
                                             port['id'],
@@ -848,13 +1005,11 @@ class OVNMechanismDriver(api.MechanismDriver):
                 LOG.warning("Logical port %s is not bound to a "
                             "chassis", port_id)
                 return
-            try:
-                n_utils.wait_until_true(
+            if not self._metadata_ready_waiters.wait(
+                    chassis, datapath,
                     lambda: datapath in
                     self._sb_ovn.get_chassis_metadata_networks(chassis),
-                    timeout=METADATA_READY_WAIT_TIMEOUT,
-                    exception=MetadataServiceReadyWaitTimeoutException)
-            except MetadataServiceReadyWaitTimeoutException:
+                    METADATA_READY_WAIT_TIMEOUT):
                 # If we reach this point it means that metadata agent didn't
                 # provision the datapath for this port on its chassis. Either
                 # the agent is not running or it crashed. We'll complete the
@@ -863,6 +1018,10 @@ class OVNMechanismDriver(api.MechanismDriver):
                             " networking-ovn-metadata-agent status/logs.",
                             port_id)
 
+    def notify_metadata_networks(self, chassis, networks):
+        """The metadata service of networks is ready on chassis."""
+        self._metadata_ready_waiters.notify(chassis, networks)
+
     def agent_alive(self, chassis, type_):
         nb_cfg = chassis.nb_cfg
         id_ = chassis.uuid
@@ -884,54 +1043,14 @@ class OVNMechanismDriver(api.MechanismDriver):
             return True
         return False
 
-    def _format_agent_info(self, chassis, binary, agent_id, type_,
-                           description, alive):
-        return {
-            'binary': binary,
-            'host': chassis.hostname,
-            'heartbeat_timestamp': timeutils.utcnow(),
-            'availability_zone': 'n/a',
-            'topic': 'n/a',
-            'description': description,
-            'configurations': {
-                'chassis_name': chassis.name,
-                'bridge-mappings':
-                    chassis.external_ids.get('ovn-bridge-mappings', '')},
-            'start_flag': True,
-            'agent_type': type_,
-            'id': agent_id,
-            'alive': alive,
-            'admin_state_up': True}
-
     def agents_from_chassis(self, chassis):
         agent_dict = {}
-
-        # Check for ovn-controller / ovn-controller gateway
-        agent_type = ovn_const.OVN_CONTROLLER_AGENT
-        agent_id = str(chassis.uuid)
-        if ('enable-chassis-as-gw' in
-                chassis.external_ids.get('ovn-cms-options', [])):
-            agent_type = ovn_const.OVN_CONTROLLER_GW_AGENT
-
-        alive = self.agent_alive(chassis, agent_type)
-        description = chassis.external_ids.get(
-            ovn_const.OVN_AGENT_DESC_KEY, '')
-        agent_dict[agent_id] = self._format_agent_info(
-            chassis, 'ovn-controller', agent_id, agent_type, description,
-            alive)
-
-        # Check for the metadata agent
-        metadata_agent_id = chassis.external_ids.get(
-            ovn_const.OVN_AGENT_METADATA_ID_KEY)
-        if metadata_agent_id:
-            agent_type = ovn_const.OVN_METADATA_AGENT
-            alive = self.agent_alive(chassis, agent_type)
-            description = chassis.external_ids.get(
-                ovn_const.OVN_AGENT_METADATA_DESC_KEY, '')
-            agent_dict[metadata_agent_id] = self._format_agent_info(
-                chassis, 'networking-ovn-metadata-agent',
-                metadata_agent_id, agent_type, description, alive)
-
+        for agent_id, agent in stats.AgentCache.get_agents(chassis).items():
+            agent = dict(agent)
+            agent['configurations'] = dict(agent['configurations'])
+            agent['heartbeat_timestamp'] = timeutils.utcnow()
+            agent['alive'] = self.agent_alive(chassis, agent['agent_type'])
+            agent_dict[agent_id] = agent
         return agent_dict
 
     def patch_plugin_merge(self, method_name, new_fn, op=operator.add):
@@ -958,13 +1077,10 @@ class OVNMechanismDriver(api.MechanismDriver):
 
         setattr(self._plugin, method_name, types.MethodType(fn, self._plugin))
 
-    def ping_chassis(self):
-        """Update NB_Global.nb_cfg so that Chassis.nb_cfg will increment"""
-        self._nb_ovn.check_liveness().execute(check_error=True)
-
 
 def get_agents(self, context, filters=None, fields=None, _driver=None):
-    _driver.ping_chassis()
+    # NOTE: The chassis are pinged by the maintenance task, not to have the
+    # agents write to the Southbound database on every API call.
     filters = filters or {}
     agent_list = []
     for ch in _driver._sb_ovn.tables['Chassis'].rows.values():
@@ -976,15 +1092,21 @@ def get_agents(self, context, filters=None, fields=None, _driver=None):
 
 def get_agent(self, context, id, fields=None, _driver=None):
     chassis = None
+    chassis_uuid = stats.AgentCache.get_chassis_uuid(id)
     try:
-        chassis = _driver._sb_ovn.tables['Chassis'].rows[uuid.UUID(id)]
+        if chassis_uuid is None:
+            # The ID of an ovn-controller agent is the UUID of its chassis
+            chassis_uuid = uuid.UUID(id)
+        chassis = _driver._sb_ovn.tables['Chassis'].rows[chassis_uuid]
     except KeyError:
-        # If the UUID is not found, check for the metadata agent ID
+        # If the UUID is not found, check for the metadata agent ID of the
+        # chassis whose events have not been processed yet
         for ch in _driver._sb_ovn.tables['Chassis'].rows.values():
             metadata_agent_id = ch.external_ids.get(
                 ovn_const.OVN_AGENT_METADATA_ID_KEY)
             if id == metadata_agent_id:
                 chassis = ch
+                stats.AgentCache.update(chassis)
                 break
         else:
             raise
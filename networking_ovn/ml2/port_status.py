@@ -0,0 +1,154 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+import eventlet
+from eventlet import semaphore
+from oslo_log import log
+from oslo_utils import timeutils
+
+LOG = log.getLogger(__name__)
+
+# Maximum number of port status changes handed to the committer at once
+PORT_STATUS_BATCH_SIZE = 100
+
+STAGE_QUEUE = 'queue'
+STAGE_PREPARE = 'prepare'
+STAGE_COMMIT = 'commit'
+STAGES = (STAGE_QUEUE, STAGE_PREPARE, STAGE_COMMIT)
+
+
+class PortStatusPipeline(object):
+    """Process the port status changes reported by OVN.
+
+    The status changes go through two stages. They are first prepared
+    (NAT entries, wait for the metadata service...) by up to ``workers``
+    ports at once, the prepared changes are then handed to a single
+    committer in batches of up to PORT_STATUS_BATCH_SIZE ports, so a port
+    waiting for its metadata service doesn't hold the status changes of
+    the other ports.
+
+    A port is processed by one stage at a time. Only the last status
+    queued for a port waiting to be processed is kept, and a status queued
+    for a port being processed is processed again once finished, so a
+    flapping port is processed at most twice.
+
+    :param prepare: function called as prepare(port_id, up)
+    :param commit: function called as commit([(port_id, up), ...])
+    :param workers: number of ports prepared concurrently
+    """
+
+    def __init__(self, prepare, commit, workers):
+        self._prepare = prepare
+        self._commit = commit
+        self._semaphore = semaphore.Semaphore(workers)
+        self._pool = eventlet.GreenPool()
+        # Port ID -> (up, stopwatch started when the status was queued)
+        self._pending = collections.OrderedDict()
+        # Ports being prepared or committed
+        self._busy = set()
+        # Prepared (port ID, up) waiting to be committed
+        self._ready = []
+        self._committing = False
+        self.counters = collections.Counter()
+        # Stage -> [number of ports, total seconds, max seconds]
+        self.latencies = dict((stage, [0, 0.0, 0.0]) for stage in STAGES)
+
+    def queue(self, port_id, up):
+        """Queue a status change of a port."""
+        if port_id in self._pending:
+            # Only the last status of the port matters, keep its place in
+            # the queue though
+            self._pending[port_id] = (up, self._pending[port_id][1])
+            self.counters['coalesced'] += 1
+            return
+        self._pending[port_id] = (up, timeutils.StopWatch().start())
+        self.counters['queued'] += 1
+        if port_id not in self._busy:
+            self._pool.spawn_n(self._run, port_id)
+
+    def _add_latency(self, stage, elapsed, ports=1):
+        latency = self.latencies[stage]
+        latency[0] += ports
+        latency[1] += elapsed * ports
+        latency[2] = max(latency[2], elapsed)
+
+    def _run(self, port_id):
+        with self._semaphore:
+            up, watch = self._pending.pop(port_id)
+            self._busy.add(port_id)
+            self._add_latency(STAGE_QUEUE, watch.elapsed())
+            watch = timeutils.StopWatch().start()
+            try:
+                self._prepare(port_id, up)
+            except Exception:
+                LOG.exception("Failed to process the status %(status)s of "
+                              "port %(port)s",
+                              {'status': 'up' if up else 'down',
+                               'port': port_id})
+                self.counters['failed'] += 1
+                self._release([port_id])
+                return
+            finally:
+                self._add_latency(STAGE_PREPARE, watch.elapsed())
+
+        self._ready.append((port_id, up))
+        if not self._committing:
+            self._committing = True
+            self._pool.spawn_n(self._commit_ready)
+
+    def _commit_ready(self):
+        try:
+            while self._ready:
+                batch = self._ready[:PORT_STATUS_BATCH_SIZE]
+                del self._ready[:PORT_STATUS_BATCH_SIZE]
+                watch = timeutils.StopWatch().start()
+                try:
+                    self._commit(batch)
+                    self.counters['processed'] += len(batch)
+                except Exception:
+                    LOG.exception("Failed to commit the status of ports %s",
+                                  [port_id for port_id, up in batch])
+                    self.counters['failed'] += len(batch)
+                self._add_latency(STAGE_COMMIT, watch.elapsed(),
+                                  ports=len(batch))
+                self._release([port_id for port_id, up in batch])
+                LOG.debug("Port status pipeline: %s", self.get_stats())
+        finally:
+            self._committing = False
+
+    def _release(self, port_ids):
+        for port_id in port_ids:
+            self._busy.discard(port_id)
+            # The status of the port has been queued again while it was
+            # being processed
+            if port_id in self._pending:
+                self._pool.spawn_n(self._run, port_id)
+
+    def get_stats(self):
+        """Return the depth of the queue and the latency of the stages.
+
+        The latencies are the average and maximum time in seconds the ports
+        spent in each stage.
+        """
+        stats = {'queue_depth': len(self._pending),
+                 'in_progress': len(self._busy)}
+        stats.update(self.counters)
+        for stage, (ports, total, max_) in self.latencies.items():
+            stats['%s_latency' % stage] = {
+                'avg': total / ports if ports else 0.0, 'max': max_}
+        return stats
+
+    def wait(self):
+        """Wait for all the queued status changes to be processed."""
+        self._pool.waitall()
@@ -108,41 +108,54 @@ class OVNQosDriver(object):
                     options['qos_burst'] = str(rule.max_burst_kbps * 1000)
         return options
 
-    def get_qos_options(self, port):
+    def get_qos_options(self, port, cache=None):
+        """Return the QoS options of a port.
+
+        :param cache: Optional dictionary caching the network policies and
+                      the options of the policies, to be shared by the
+                      calls made for the ports of a single operation.
+        """
         # Is qos service enabled
         if 'qos_policy_id' not in port:
             return {}
         # Don't apply qos rules to network devices
         if utils.is_network_device_port(port):
             return {}
+        if cache is None:
+            cache = {}
 
         # Determine if port or network policy should be used
         context = n_context.get_admin_context()
         port_policy_id = port.get('qos_policy_id')
         network_policy_id = None
         if not port_policy_id:
-            network_policy = qos_policy.QosPolicy.get_network_policy(
-                context, port['network_id'])
-            network_policy_id = network_policy.id if network_policy else None
+            network_key = ('network', port['network_id'])
+            if network_key not in cache:
+                network_policy = qos_policy.QosPolicy.get_network_policy(
+                    context, port['network_id'])
+                cache[network_key] = (
+                    network_policy.id if network_policy else None)
+            network_policy_id = cache[network_key]
 
         # Generate qos options for the selected policy
         policy_id = port_policy_id or network_policy_id
-        return self._generate_port_options(context, policy_id)
+        policy_key = ('policy', policy_id)
+        if policy_key not in cache:
+            cache[policy_key] = self._generate_port_options(context,
+                                                            policy_id)
+        # The options are updated by the caller
+        return dict(cache[policy_key])
 
     def _update_network_ports(self, context, network_id, options):
         # Retrieve all ports for this network
         ports = self._plugin.get_ports(context,
                                        filters={'network_id': [network_id]})
-        for port in ports:
-            # Don't apply qos rules if port has a policy
-            port_policy_id = port.get('qos_policy_id')
-            if port_policy_id:
-                continue
-            # Don't apply qos rules to network devices
-            if utils.is_network_device_port(port):
-                continue
-            # Call into OVN client to update port
-            self._driver.update_port(port, qos_options=options)
+        # Don't apply qos rules if port has a policy nor to network devices
+        ports = [port for port in ports
+                 if not port.get('qos_policy_id') and
+                 not utils.is_network_device_port(port)]
+        # Call into OVN client to update the QoS options of the ports
+        self._driver.update_ports_qos_options(ports, options)
 
     def update_network(self, network):
         # Is qos service enabled
@@ -165,6 +178,7 @@ class OVNQosDriver(object):
 
         # Update each port bound to this policy
         port_bindings = policy.get_bound_ports()
-        for port_id in port_bindings:
-            port = self._plugin.get_port(context, port_id)
-            self._driver.update_port(port, qos_options=options)
+        if port_bindings:
+            ports = self._plugin.get_ports(
+                context, filters={'id': list(port_bindings)})
+            self._driver.update_ports_qos_options(ports, options)
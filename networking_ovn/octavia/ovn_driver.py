@@ -13,15 +13,19 @@
 #    under the License.
 
 import atexit
+import collections
 import copy
 import threading
 
+import netaddr
 from six.moves import queue as Queue
 
 from oslo_log import log as logging
 from oslo_serialization import jsonutils
+from oslo_utils import timeutils
 
 from ovs.stream import Stream
+from ovsdbapp.backend.ovs_idl import connection
 from ovsdbapp.schema.ovn_northbound import impl_idl as idl_ovn
 
 from octavia.api.drivers import data_models as o_datamodels
@@ -34,6 +38,7 @@ from octavia.common import utils
 from networking_ovn._i18n import _
 from networking_ovn.common import config as ovn_cfg
 from networking_ovn.common import utils as ovn_utils
+from networking_ovn.ovsdb import indexes
 
 
 LOG = logging.getLogger(__name__)
@@ -180,8 +185,18 @@ REQ_TYPE_POOL_UPDATE = 'pool_update'
 REQ_TYPE_MEMBER_CREATE = 'member_create'
 REQ_TYPE_MEMBER_DELETE = 'member_delete'
 REQ_TYPE_MEMBER_UPDATE = 'member_update'
+REQ_TYPE_MEMBER_BATCH_UPDATE = 'member_batch_update'
 REQ_TYPE_EXIT = 'exit'
 
+LB_REQUEST_TYPES = (REQ_TYPE_LB_CREATE, REQ_TYPE_LB_DELETE,
+                    REQ_TYPE_LB_FAILOVER, REQ_TYPE_LB_UPDATE)
+MEMBER_REQUEST_TYPES = (REQ_TYPE_MEMBER_CREATE, REQ_TYPE_MEMBER_DELETE,
+                        REQ_TYPE_MEMBER_UPDATE, REQ_TYPE_MEMBER_BATCH_UPDATE)
+
+# Name of the latency of the requests waiting in the queues, the other
+# latencies are named after the request types
+QUEUE_LATENCY = 'queue'
+
 DISABLED_RESOURCE_SUFFIX = 'D'
 
 LB_EXT_IDS_LS_REFS_KEY = 'ls_refs'
@@ -193,14 +208,43 @@ LB_EXT_IDS_VIP_KEY = 'neutron:vip'
 LB_EXT_IDS_VIP_PORT_ID_KEY = 'neutron:vip_port_id'
 
 
+class OvnProviderIdl(connection.OvsdbIdl):
+    """The OVN_Northbound IDL of the provider, with its secondary indexes."""
+
+    def __init__(self, remote, schema):
+        super(OvnProviderIdl, self).__init__(remote, schema)
+        self.indexes = indexes.IdlIndexes(
+            self, indexes=indexes.OCTAVIA_PROVIDER_INDEXES,
+            gateway_load=False)
+
+    def notify(self, event, row, updates=None):
+        self.indexes.notify(event, row)
+
+
 class OvnProviderHelper(object):
 
     ovn_nbdb_api = None
 
     def __init__(self):
-        self.requests = Queue.Queue()
-        self.helper_thread = threading.Thread(target=self.request_handler)
-        self.helper_thread.daemon = True
+        # The requests of a load balancer are always queued to the same
+        # worker, so they are processed in order, while the requests of
+        # different load balancers are processed concurrently.
+        self._workers = ovn_cfg.get_ovn_octavia_provider_workers()
+        self.requests = [Queue.Queue() for _ in range(self._workers)]
+        self.helper_threads = []
+        for requests in self.requests:
+            thread = threading.Thread(target=self.request_handler,
+                                      args=(requests,))
+            thread.daemon = True
+            self.helper_threads.append(thread)
+        # Pool ID -> ID of the load balancer of the pool, the member
+        # requests only have the ID of their pool
+        self._pool_lbs = {}
+        self._pool_lbs_lock = threading.Lock()
+        # QUEUE_LATENCY or request type -> [number of requests,
+        # total seconds, max seconds]
+        self.latencies = collections.defaultdict(lambda: [0, 0.0, 0.0])
+        self._latencies_lock = threading.Lock()
         atexit.register(self.shutdown)
         self._octavia_driver_lib = o_driver_lib.DriverLibrary()
         self._init_ovnnb_db_api()
@@ -222,6 +266,7 @@ class OvnProviderHelper(object):
             REQ_TYPE_MEMBER_CREATE: self.member_create,
             REQ_TYPE_MEMBER_DELETE: self.member_delete,
             REQ_TYPE_MEMBER_UPDATE: self.member_update,
+            REQ_TYPE_MEMBER_BATCH_UPDATE: self.member_batch_update,
         }
 
     def _init_ovnnb_db_api(self):
@@ -232,7 +277,8 @@ class OvnProviderHelper(object):
                   'Logical_Switch_Port', 'Logical_Router_Port')
         conn = ovn_utils.get_ovsdb_connection(
             ovn_cfg.get_ovn_nb_connection(), 'OVN_Northbound',
-            ovn_cfg.get_ovn_ovsdb_timeout(), tables=tables)
+            ovn_cfg.get_ovn_ovsdb_timeout(), tables=tables,
+            idl_class=OvnProviderIdl)
 
         # idl_ovn.OvnNbApiIdlImpl.ovsdb_connection is a class variable.
         # So set it to None so that we don't use any old connection object.
@@ -253,32 +299,108 @@ class OvnProviderHelper(object):
             Stream.ssl_set_ca_cert_file(ca_cert_file)
 
     def start(self):
-        self.helper_thread.start()
+        for thread in self.helper_threads:
+            thread.start()
 
-    def request_handler(self):
+    def request_handler(self, requests):
         while True:
             try:
-                request = self.requests.get()
+                request, watch = requests.get()
                 request_type = request['type']
                 if request_type == REQ_TYPE_EXIT:
                     break
 
+                queued = watch.elapsed()
+                self._add_latency(QUEUE_LATENCY, queued)
                 request_handler = self._lb_request_func_maps.get(request_type)
                 if request_handler:
-                    status = request_handler(request['info'])
+                    watch = timeutils.StopWatch().start()
+                    try:
+                        status = request_handler(request['info'])
+                    finally:
+                        self._add_latency(request_type, watch.elapsed())
+                        LOG.debug('Processed the %(type)s request %(id)s in '
+                                  '%(time).3fs, queued for %(queued).3fs',
+                                  {'type': request_type,
+                                   'id': request['info'].get(
+                                       'id', request['info'].get('pool_id')),
+                                   'time': watch.elapsed(),
+                                   'queued': queued})
                     if status:
                         self._update_status_to_octavia(status)
-                self.requests.task_done()
             except Exception:
                 # If any unexpected exception happens we don't want the
                 # notify_loop to exit.
                 LOG.exception('Unexpected exception in request_handler')
+            finally:
+                requests.task_done()
+
+    def _add_latency(self, name, elapsed):
+        with self._latencies_lock:
+            latency = self.latencies[name]
+            latency[0] += 1
+            latency[1] += elapsed
+            latency[2] = max(latency[2], elapsed)
+
+    def get_stats(self):
+        """Return the depth of the queues and the latency of the requests.
+
+        The latencies are the average and maximum time in seconds the
+        requests waited in the queues and took to be processed, per request
+        type.
+        """
+        stats = {'workers': self._workers,
+                 'queue_depth': sum(requests.qsize()
+                                    for requests in self.requests)}
+        with self._latencies_lock:
+            for name, (count, total, max_) in self.latencies.items():
+                stats['%s_latency' % name] = {
+                    'count': count, 'avg': total / count if count else 0.0,
+                    'max': max_}
+        return stats
+
+    def _get_pool_lb_id(self, pool_id):
+        lb_id = self._pool_lbs.get(pool_id)
+        if lb_id:
+            return lb_id
+        # The pool was created before the driver was started
+        pool_key, ovn_lb = self._find_ovn_lb_by_pool_id(pool_id)
+        if ovn_lb:
+            with self._pool_lbs_lock:
+                self._pool_lbs[pool_id] = ovn_lb.name
+            return ovn_lb.name
+
+    def _get_request_lb_id(self, req):
+        request_type = req['type']
+        info = req['info']
+        if request_type in LB_REQUEST_TYPES:
+            if request_type == REQ_TYPE_LB_DELETE:
+                with self._pool_lbs_lock:
+                    self._pool_lbs = dict(
+                        (pool_id, lb_id) for pool_id, lb_id in
+                        self._pool_lbs.items() if lb_id != info['id'])
+            return info['id']
+        if request_type in MEMBER_REQUEST_TYPES:
+            # The requests of the members of an unknown pool are at least
+            # processed in order
+            return self._get_pool_lb_id(info['pool_id']) or info['pool_id']
+        if request_type == REQ_TYPE_POOL_DELETE:
+            # The members are deleted before their pool
+            with self._pool_lbs_lock:
+                self._pool_lbs.pop(info['id'], None)
+        elif request_type in (REQ_TYPE_POOL_CREATE, REQ_TYPE_POOL_UPDATE):
+            with self._pool_lbs_lock:
+                self._pool_lbs[info['id']] = info['loadbalancer_id']
+        return info['loadbalancer_id']
 
     def add_request(self, req):
-        self.requests.put(req)
+        lb_id = self._get_request_lb_id(req)
+        requests = self.requests[hash(lb_id) % self._workers]
+        requests.put((req, timeutils.StopWatch().start()))
 
     def shutdown(self):
-        self.requests.put({'type': REQ_TYPE_EXIT})
+        for requests in self.requests:
+            requests.put(({'type': REQ_TYPE_EXIT}, None))
 
     def _update_status_to_octavia(self, status):
         try:
@@ -287,22 +409,41 @@ class OvnProviderHelper(object):
             # TODO(numans): Handle the exception properly
             LOG.error('Error while updating the load balancer status: %s', e)
 
+    def _lookup_by_index(self, table, index, key):
+        return indexes.lookup_by_index(self.ovn_nbdb_api.idl, table, index,
+                                       key)
+
     def _find_ovn_lb(self, loadbalancer_id):
-        find_condition = ('name', '=', loadbalancer_id)
-        ovn_lb = self.ovn_nbdb_api.db_find(
-            'Load_Balancer', find_condition, row=True).execute(
-                check_error=True)
+        ovn_lb = self._lookup_by_index('Load_Balancer', 'name',
+                                       loadbalancer_id)
+        if ovn_lb is None:
+            find_condition = ('name', '=', loadbalancer_id)
+            ovn_lb = self.ovn_nbdb_api.db_find(
+                'Load_Balancer', find_condition, row=True).execute(
+                    check_error=True)
         if len(ovn_lb) > 1:
             LOG.warning("Two or more load balancer named '%s'"
                         "have been found in the database" % loadbalancer_id)
         return ovn_lb[0] if len(ovn_lb) == 1 else None
 
     def _find_ovn_lb_with_pool_key(self, pool_key):
+        lbs = self._lookup_by_index('Load_Balancer', 'pool_key', pool_key)
+        if lbs is not None:
+            return lbs[0] if lbs else None
         lbs = self.ovn_nbdb_api.db_list_rows('Load_Balancer').execute()
         for lb in lbs:
             if pool_key in lb.external_ids:
                 return lb
 
+    def _find_ovn_lb_by_pool_id(self, pool_id):
+        """Return the key of a pool and its load balancer, or (None, None)."""
+        for is_enabled in (True, False):
+            pool_key = self._get_pool_key(pool_id, is_enabled=is_enabled)
+            ovn_lb = self._find_ovn_lb_with_pool_key(pool_key)
+            if ovn_lb:
+                return pool_key, ovn_lb
+        return None, None
+
     def _execute_commands(self, commands):
         with self.ovn_nbdb_api.transaction(check_error=True) as txn:
             for command in commands:
@@ -310,56 +451,74 @@ class OvnProviderHelper(object):
 
     def _update_lb_to_ls_association(self, ovn_lb, network_id=None,
                                      subnet_id=None, associate=True):
-        commands = []
         if not network_id and not subnet_id:
-            return commands
+            return []
 
         if network_id:
             ls_name = ovn_utils.ovn_name(network_id)
         else:
-            network_driver = utils.get_network_driver()
-            subnet = network_driver.get_subnet(subnet_id)
-            ls_name = ovn_utils.ovn_name(subnet.network_id)
+            ls_name = self._get_subnet_ls_name(subnet_id)
+
+        return self._update_lb_to_ls_refs(
+            ovn_lb, {ls_name: 1 if associate else -1})
 
-        ovn_ls = self.ovn_nbdb_api.ls_get(ls_name).execute(
-            check_error=True)
-        if not ovn_ls:
-            return commands
+    def _get_subnet_ls_name(self, subnet_id):
+        network_driver = utils.get_network_driver()
+        subnet = network_driver.get_subnet(subnet_id)
+        return ovn_utils.ovn_name(subnet.network_id)
 
+    def _get_lb_ls_refs(self, ovn_lb):
         ls_refs = ovn_lb.external_ids.get(LB_EXT_IDS_LS_REFS_KEY)
         if ls_refs:
             try:
-                ls_refs = jsonutils.loads(ls_refs)
+                return jsonutils.loads(ls_refs)
             except ValueError:
-                ls_refs = {}
-        else:
-            ls_refs = {}
+                pass
+        return {}
+
+    def _update_lb_to_ls_refs(self, ovn_lb, ls_refs_changes):
+        """Update the references of a load balancer to Logical Switches.
+
+        :param ls_refs_changes: Logical Switch name -> number of members of
+                                the load balancer added (positive) or
+                                removed (negative) on the switch
+        :returns: the commands associating the load balancer to the
+                  switches it is added on and disassociating it from the
+                  switches it is no longer on
+        """
+        commands = []
+        ls_refs = self._get_lb_ls_refs(ovn_lb)
+        updated = False
+        for ls_name, change in ls_refs_changes.items():
+            if not change:
+                continue
+            ovn_ls = self.ovn_nbdb_api.ls_get(ls_name).execute(
+                check_error=True)
+            if not ovn_ls:
+                continue
 
-        if associate:
-            if ls_name in ls_refs:
-                ref_ct = ls_refs[ls_name]
-                ls_refs[ls_name] = ref_ct + 1
-            else:
-                ls_refs[ls_name] = 1
-                commands.append(self.ovn_nbdb_api.ls_lb_add(
-                    ovn_ls.uuid, ovn_lb.uuid, may_exist=True))
-        else:
-            if ls_name not in ls_refs:
+            ref_ct = ls_refs.get(ls_name, 0)
+            if change > 0:
+                if not ref_ct:
+                    commands.append(self.ovn_nbdb_api.ls_lb_add(
+                        ovn_ls.uuid, ovn_lb.uuid, may_exist=True))
+                ls_refs[ls_name] = ref_ct + change
+            elif ls_name not in ls_refs:
                 # Nothing to be done.
-                return commands
-
-            ref_ct = ls_refs[ls_name]
-            if ref_ct == 1:
+                continue
+            elif ref_ct + change <= 0:
                 del ls_refs[ls_name]
                 commands.append(self.ovn_nbdb_api.ls_lb_del(
                     ovn_ls.uuid, ovn_lb.uuid, if_exists=True))
             else:
-                ls_refs[ls_name] = ref_ct - 1
+                ls_refs[ls_name] = ref_ct + change
+            updated = True
 
-        ls_refs = {LB_EXT_IDS_LS_REFS_KEY: jsonutils.dumps(ls_refs)}
-        commands.append(self.ovn_nbdb_api.db_set(
-            'Load_Balancer', ovn_lb.uuid,
-            ('external_ids', ls_refs)))
+        if updated:
+            ls_refs = {LB_EXT_IDS_LS_REFS_KEY: jsonutils.dumps(ls_refs)}
+            commands.append(self.ovn_nbdb_api.db_set(
+                'Load_Balancer', ovn_lb.uuid,
+                ('external_ids', ls_refs)))
 
         return commands
 
@@ -389,6 +548,13 @@ class OvnProviderHelper(object):
         if not lrp_name:
             return
 
+        lrps = self._lookup_by_index('Logical_Router_Port', 'name', lrp_name)
+        if lrps:
+            lrs = self._lookup_by_index('Logical_Router', 'port_uuid',
+                                        lrps[0].uuid)
+            if lrs:
+                return lrs[0]
+        # Fall back to scanning the routers if the port isn't indexed
         for lr in self.ovn_nbdb_api.tables['Logical_Router'].rows.values():
             for lrp in lr.ports:
                 if lrp.name == lrp_name:
@@ -410,14 +576,21 @@ class OvnProviderHelper(object):
         mem_info = ''
         if member:
             for mem in member.split(','):
+                if self._is_member_disabled(mem):
+                    continue
                 mem_info += str(mem.split('_')[2]) + ','
         return mem_info[:-1]  # Remove the last ','
 
-    def _get_member_key(self, member):
+    def _get_member_key(self, member, is_enabled=True):
         member_info = LB_EXT_IDS_MEMBER_PREFIX + member['id'] + "_"
         member_info += member['address'] + ":" + str(member['protocol_port'])
+        if not is_enabled:
+            member_info += ':' + DISABLED_RESOURCE_SUFFIX
         return member_info
 
+    def _is_member_disabled(self, member_key):
+        return member_key.endswith(':' + DISABLED_RESOURCE_SUFFIX)
+
     def _make_listener_key_value(self, listener_port, pool_id):
         return str(listener_port) + ':' + pool_id
 
@@ -466,6 +639,9 @@ class OvnProviderHelper(object):
                 continue
 
             ips = self._extract_member_info(lb_external_ids[pool_id])
+            if not ips:
+                # Only disabled members in the pool
+                continue
             vip_ips[lb_vip + ':' + vip_port] = ips
 
         return vip_ips
@@ -1019,16 +1195,21 @@ class OvnProviderHelper(object):
 
     def _add_member(self, member, ovn_lb, pool_key):
         external_ids = copy.deepcopy(ovn_lb.external_ids)
-        existing_members = external_ids[pool_key]
+        existing_members = [m for m in external_ids[pool_key].split(',')
+                            if m]
         member_info = self._get_member_key(member)
-        if member_info in existing_members.split(','):
+        if member_info in existing_members:
             # member already present. No need to do anything.
             return
 
-        if existing_members:
-            pool_data = {pool_key: existing_members + "," + member_info}
+        disabled_member_info = self._get_member_key(member, is_enabled=False)
+        if disabled_member_info in existing_members:
+            # The member was disabled, enable it back
+            existing_members[existing_members.index(
+                disabled_member_info)] = member_info
         else:
-            pool_data = {pool_key: member_info}
+            existing_members.append(member_info)
+        pool_data = {pool_key: ",".join(existing_members)}
 
         commands = []
         commands.append(
@@ -1081,13 +1262,27 @@ class OvnProviderHelper(object):
 
         return status
 
-    def _remove_member(self, member, ovn_lb, pool_key):
+    def _remove_member(self, member, ovn_lb, pool_key, disable=False):
+        # A disabled member is kept in the pool, marked as disabled, for
+        # member_batch_update() to report it as deleted when it goes away.
         external_ids = copy.deepcopy(ovn_lb.external_ids)
         existing_members = external_ids[pool_key].split(",")
         member_info = self._get_member_key(member)
-        if member_info in existing_members:
+        disabled_member_info = self._get_member_key(member, is_enabled=False)
+        if disabled_member_info in existing_members and not disable:
+            # Not in the vips nor referencing its Logical Switch anymore
+            existing_members.remove(disabled_member_info)
+            pool_data = {pool_key: ",".join(existing_members)}
+            self._execute_commands([
+                self.ovn_nbdb_api.db_set('Load_Balancer', ovn_lb.uuid,
+                                         ('external_ids', pool_data))])
+        elif member_info in existing_members:
             commands = []
-            existing_members.remove(member_info)
+            index = existing_members.index(member_info)
+            if disable:
+                existing_members[index] = disabled_member_info
+            else:
+                del existing_members[index]
             pool_data = {pool_key: ",".join(existing_members)}
             commands.append(
                 self.ovn_nbdb_api.db_set('Load_Balancer', ovn_lb.uuid,
@@ -1161,7 +1356,8 @@ class OvnProviderHelper(object):
                     status['members'][0]['operating_status'] = \
                         constants.ONLINE
                 else:
-                    self._remove_member(member, ovn_lb, pool_key)
+                    self._remove_member(member, ovn_lb, pool_key,
+                                        disable=True)
                     status['members'][0]['operating_status'] = \
                         constants.OFFLINE
 
@@ -1182,6 +1378,129 @@ class OvnProviderHelper(object):
                                    'provisioning_status': constants.ACTIVE}]}
         return status
 
+    def _get_member_ls_name(self, ovn_lb, address, networks_cidrs):
+        # The subnet of the members is not stored in the NB DB, find it
+        # among the subnets of the Logical Switches of the load balancer.
+        ip = netaddr.IPAddress(address)
+        network_driver = utils.get_network_driver()
+        for ls_name in self._get_lb_ls_refs(ovn_lb):
+            if ls_name not in networks_cidrs:
+                network = network_driver.get_network(
+                    ls_name[len(ovn_utils.ovn_name('')):])
+                networks_cidrs[ls_name] = [
+                    netaddr.IPNetwork(network_driver.get_subnet(
+                        subnet_id).cidr)
+                    for subnet_id in network.subnets or []]
+            if any(ip in cidr for cidr in networks_cidrs[ls_name]):
+                return ls_name
+
+    def member_batch_update(self, request):
+        """Set the members of a pool.
+
+        The members of the request are the complete list of the members of
+        the pool, the members missing from it are deleted, including the
+        ones disabled earlier, and the disabled members are removed from the
+        vips. The members added and removed are applied in a single
+        transaction and reported at once.
+        """
+        pool_id = request['pool_id']
+        ovn_lb = None
+        try:
+            pool_key, ovn_lb = self._find_ovn_lb_by_pool_id(pool_id)
+            external_ids = copy.deepcopy(ovn_lb.external_ids)
+            existing_members = [m for m in external_ids[pool_key].split(',')
+                                if m]
+            # Member key, once enabled -> member of the request
+            member_keys = dict((self._get_member_key(member), member)
+                               for member in request['members'])
+            enabled_keys = [self._get_member_key(member)
+                            for member in request['members']
+                            if member['admin_state_up']]
+            existing_enabled_keys = [key for key in existing_members
+                                     if not self._is_member_disabled(key)]
+            added = [key for key in enabled_keys
+                     if key not in existing_enabled_keys]
+            removed = [key for key in existing_enabled_keys
+                       if key not in enabled_keys]
+            member_statuses = []
+            for member in request['members']:
+                member_statuses.append({
+                    'id': member['id'],
+                    'provisioning_status': constants.ACTIVE,
+                    'operating_status': (constants.ONLINE
+                                         if member['admin_state_up'] else
+                                         constants.OFFLINE)})
+
+            # Members deleted, disabled or not, their key is
+            # member_<ID>_<address>:<port>[:D]
+            deleted_addresses = {}
+            for key in existing_members:
+                if self._is_member_disabled(key):
+                    key = key.rsplit(':', 1)[0]
+                if key in member_keys:
+                    continue
+                member_id, address = key[len(
+                    LB_EXT_IDS_MEMBER_PREFIX):].split('_', 1)
+                deleted_addresses[key] = address.rsplit(':', 1)[0]
+                member_statuses.append(
+                    {'id': member_id,
+                     'provisioning_status': constants.DELETED})
+
+            ls_refs_changes = collections.Counter()
+            subnets_ls_names = {}
+            networks_cidrs = {}
+            for key in added + removed:
+                member = member_keys.get(key)
+                if member:
+                    subnet_id = member['subnet_id']
+                    if subnet_id not in subnets_ls_names:
+                        subnets_ls_names[subnet_id] = (
+                            self._get_subnet_ls_name(subnet_id))
+                    ls_name = subnets_ls_names[subnet_id]
+                else:
+                    ls_name = self._get_member_ls_name(
+                        ovn_lb, deleted_addresses[key], networks_cidrs)
+                if ls_name:
+                    ls_refs_changes[ls_name] += 1 if key in added else -1
+
+            members = [self._get_member_key(
+                member, is_enabled=member['admin_state_up'])
+                for member in request['members']]
+            if set(members) != set(existing_members):
+                external_ids[pool_key] = ",".join(members)
+                commands = [self.ovn_nbdb_api.db_set(
+                    'Load_Balancer', ovn_lb.uuid,
+                    ('external_ids', {pool_key: external_ids[pool_key]}))]
+                commands.extend(
+                    self._refresh_lb_vips(ovn_lb.uuid, external_ids))
+                commands.extend(
+                    self._update_lb_to_ls_refs(ovn_lb, ls_refs_changes))
+                self._execute_commands(commands)
+
+            status = {
+                'pools': [{'id': pool_id,
+                           'provisioning_status': constants.ACTIVE}],
+                'members': member_statuses,
+                'loadbalancers': [{'id': ovn_lb.name,
+                                   'provisioning_status': constants.ACTIVE}],
+                'listeners': [{'id': l,
+                               'provisioning_status': constants.ACTIVE}
+                              for l in self._get_pool_listeners(
+                                  ovn_lb, pool_key)]}
+        except Exception:
+            LOG.exception('Exception during member batch update')
+            status = {
+                'pools': [{'id': pool_id,
+                           'provisioning_status': constants.ACTIVE}],
+                'members': [{'id': member['id'],
+                             'provisioning_status': constants.ERROR}
+                            for member in request['members']]}
+            if ovn_lb:
+                status['loadbalancers'] = [
+                    {'id': ovn_lb.name,
+                     'provisioning_status': constants.ACTIVE}]
+        return status
+
 
 class OvnProviderDriver(driver_base.ProviderDriver):
     def __init__(self):
@@ -1364,5 +1683,31 @@ class OvnProviderDriver(driver_base.ProviderDriver):
         self._ovn_helper.add_request(request)
 
     def member_batch_update(self, members):
+        # The members are the complete list of the members of their pool
+        if not members:
+            LOG.warning('Member batch update without any member, the pool '
+                        'is unknown')
+            return
+
+        request_members = []
         for member in members:
-            self.member_update(member, member)
+            if isinstance(member.subnet_id, o_datamodels.UnsetType):
+                msg = _('Subnet is required for Member creation'
+                        ' with OVN Provider Driver')
+                raise driver_exceptions.UnsupportedOptionError(
+                    user_fault_string=msg,
+                    operator_fault_string=msg)
+
+            admin_state_up = member.admin_state_up
+            if isinstance(admin_state_up, o_datamodels.UnsetType):
+                admin_state_up = True
+            request_members.append({'id': member.member_id,
+                                    'address': member.address,
+                                    'protocol_port': member.protocol_port,
+                                    'subnet_id': member.subnet_id,
+                                    'admin_state_up': admin_state_up})
+        request_info = {'pool_id': members[0].pool_id,
+                        'members': request_members}
+        request = {'type': REQ_TYPE_MEMBER_BATCH_UPDATE,
+                   'info': request_info}
+        self._ovn_helper.add_request(request)
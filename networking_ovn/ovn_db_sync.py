@@ -11,9 +11,11 @@
 #    under the License.
 
 import abc
+import collections
 from datetime import datetime
 import itertools
 
+import eventlet
 from eventlet import greenthread
 from neutron.services.segments import db as segments_db
 from neutron_lib.api.definitions import l3
@@ -25,6 +27,7 @@ from neutron_lib.plugins import constants as plugin_constants
 from neutron_lib.plugins import directory
 from neutron_lib.utils import helpers
 from oslo_log import log
+from oslo_utils import timeutils
 import six
 
 from networking_ovn.common import acl as acl_utils
@@ -32,6 +35,7 @@ from networking_ovn.common import config
 from networking_ovn.common import constants as const
 from networking_ovn.common import ovn_client
 from networking_ovn.common import utils
+from networking_ovn.db import revision as db_rev
 
 LOG = log.getLogger(__name__)
 
@@ -39,6 +43,25 @@ SYNC_MODE_OFF = 'off'
 SYNC_MODE_LOG = 'log'
 SYNC_MODE_REPAIR = 'repair'
 
+# The resource types compared by the incremental sync
+INCREMENTAL_SYNC_TYPES = (
+    const.TYPE_NETWORKS,
+    const.TYPE_SUBNETS,
+    const.TYPE_PORTS,
+    const.TYPE_ROUTERS,
+    const.TYPE_ROUTER_PORTS,
+    const.TYPE_FLOATINGIPS)
+
+_L3_TYPES = (
+    const.TYPE_ROUTERS,
+    const.TYPE_ROUTER_PORTS,
+    const.TYPE_FLOATINGIPS)
+
+# The outcome of a step of the migration from Address Sets to Port Groups.
+# The size of a transaction is the number of rows and references it writes.
+PgMigrationStep = collections.namedtuple(
+    'PgMigrationStep', ['name', 'rows', 'transactions', 'largest', 'time'])
+
 
 @six.add_metaclass(abc.ABCMeta)
 class OvnDbSynchronizer(object):
@@ -85,14 +108,66 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
             return
         LOG.debug("Starting OVN-Northbound DB sync process")
 
+        pool = eventlet.GreenPool(config.get_ovn_neutron_sync_concurrency())
+        pending = self._get_sync_stages()
+        finished = set()
+        while pending:
+            ready = [stage for stage in pending
+                     if finished.issuperset(stage[2])]
+            pending = [stage for stage in pending if stage not in ready]
+            threads = [pool.spawn(self._run_sync_stage, name, func)
+                       for name, func, _deps in ready]
+            for thread in threads:
+                thread.wait()
+            finished.update(name for name, _func, _deps in ready)
+
+    def _get_sync_stages(self):
+        """Return the stages of the NB sync.
+
+        Each stage is a (name, method, dependencies) tuple. A stage only
+        starts once all the stages it depends on have finished, the ones
+        without pending dependencies run concurrently (up to the value of
+        the neutron_sync_concurrency configuration option).
+        """
+        if config.is_ovn_neutron_sync_incremental():
+            revisions = 'revision_numbers'
+            return [
+                ('address_sets', self.sync_address_sets, ()),
+                ('port_groups', self.sync_port_groups, ()),
+                (revisions, self.sync_revision_numbers,
+                 ('address_sets', 'port_groups')),
+                ('metadata_provnet_and_dhcp_opts',
+                 self.sync_metadata_provnet_and_dhcp_opts, (revisions,)),
+                ('port_dns_records', self.sync_port_dns_records,
+                 (revisions,)),
+                ('acls', self.sync_acls, ('port_groups', revisions)),
+            ]
+
+        networks = 'networks_ports_and_dhcp_opts'
+        return [
+            ('address_sets', self.sync_address_sets, ()),
+            ('port_groups', self.sync_port_groups, ()),
+            # Ports are added to the Address Sets and Port Groups
+            (networks, self.sync_networks_ports_and_dhcp_opts,
+             ('address_sets', 'port_groups')),
+            ('port_dns_records', self.sync_port_dns_records, (networks,)),
+            ('acls', self.sync_acls, ('port_groups', networks)),
+            ('routers_and_rports', self.sync_routers_and_rports,
+             (networks,)),
+        ]
+
+    def _run_sync_stage(self, name, func):
+        # The stages may run concurrently, each one of them needs its own
+        # context (and database session)
         ctx = context.get_admin_context()
-
-        self.sync_address_sets(ctx)
-        self.sync_port_groups(ctx)
-        self.sync_networks_ports_and_dhcp_opts(ctx)
-        self.sync_port_dns_records(ctx)
-        self.sync_acls(ctx)
-        self.sync_routers_and_rports(ctx)
+        watch = timeutils.StopWatch()
+        with watch:
+            num_items = func(ctx) or 0
+        LOG.info('OVN-NB sync stage %(stage)s finished in %(time).2f '
+                 'seconds, %(items)d item(s) processed',
+                 {'stage': name, 'time': watch.elapsed(),
+                  'items': num_items})
+        return num_items
 
     def _create_port_in_ovn(self, ctx, port):
         # Remove any old ACLs for the port to avoid creating duplicate ACLs.
@@ -104,6 +179,199 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
         # updates as needed.
         self._ovn_client.create_port(port)
 
+    def _create_ports_in_ovn(self, ctx, ports):
+        """Bulk version of _create_port_in_ovn()."""
+        with self.ovn_api.transaction(check_error=True) as txn:
+            for port in ports:
+                txn.add(self.ovn_api.delete_acl(
+                    utils.ovn_name(port['network_id']), port['id']))
+
+        # Create the ports in OVN. This will include ACL and Address Set
+        # updates as needed.
+        self._ovn_client.create_ports(ports)
+
+    def _get_incremental_sync_map(self):
+        return {
+            const.TYPE_NETWORKS: {
+                'neutron_get': self.core_plugin.get_networks,
+                'ovn_create': self._ovn_client.create_network,
+                'ovn_update': self._ovn_client.update_network,
+                'ovn_delete': self._ovn_client.delete_network,
+            },
+            const.TYPE_SUBNETS: {
+                'neutron_get': self.core_plugin.get_subnets,
+                'ovn_create': self._create_subnet,
+                'ovn_update': self._update_subnet,
+                'ovn_delete': self._ovn_client.delete_subnet,
+            },
+            const.TYPE_PORTS: {
+                'neutron_get': self.core_plugin.get_ports,
+                'ovn_create': self._ovn_client.create_port,
+                'ovn_create_bulk': self._create_ports_in_ovn,
+                'ovn_update': self._ovn_client.update_port,
+                'ovn_update_bulk': self._update_ports_in_ovn,
+                'ovn_delete': self._ovn_client.delete_port,
+            },
+            const.TYPE_ROUTERS: {
+                'neutron_get': self.l3_plugin.get_routers,
+                'ovn_create': self._ovn_client.create_router,
+                'ovn_update': self._ovn_client.update_router,
+                'ovn_delete': self._ovn_client.delete_router,
+            },
+            const.TYPE_ROUTER_PORTS: {
+                'neutron_get': self.core_plugin.get_ports,
+                'ovn_create': self._create_router_port,
+                'ovn_update': self._ovn_client.update_router_port,
+                'ovn_delete': self._ovn_client._delete_lrouter_port,
+            },
+            const.TYPE_FLOATINGIPS: {
+                'neutron_get': self.l3_plugin.get_floatingips,
+                'ovn_create': self._ovn_client.create_floatingip,
+                'ovn_update': self._ovn_client.update_floatingip,
+                'ovn_delete': self._ovn_client.delete_floatingip,
+            },
+        }
+
+    def _update_ports_in_ovn(self, ctx, ports):
+        self._ovn_client.update_ports(ports)
+
+    def _create_subnet(self, subnet):
+        network = self.core_plugin.get_network(
+            context.get_admin_context(), subnet['network_id'])
+        self._ovn_client.create_subnet(subnet, network)
+
+    def _update_subnet(self, subnet):
+        network = self.core_plugin.get_network(
+            context.get_admin_context(), subnet['network_id'])
+        self._ovn_client.update_subnet(subnet, network)
+
+    def _create_router_port(self, port):
+        if port['device_owner'] == constants.DEVICE_OWNER_ROUTER_GW:
+            self._create_router_gw_port(port)
+            return
+        # As when the interface is added to the router, which also creates
+        # the SNAT rule of its subnet if the router has a gateway
+        self._ovn_client.create_router_port(
+            port['device_id'], {'port_id': port['id']})
+
+    def _create_router_gw_port(self, port):
+        # As when the gateway is set on the router, which also adds the
+        # default route and the SNAT rules of the router subnets. Those
+        # left behind by the lost gateway port are removed first.
+        ctx = context.get_admin_context()
+        router = self.l3_plugin.get_router(ctx, port['device_id'])
+        networks = self._ovn_client._get_v4_network_of_all_router_ports(
+            ctx, router['id'])
+        with self.ovn_api.transaction(check_error=True) as txn:
+            txn.add(self.ovn_api.delete_lrouter_ext_gw(
+                utils.ovn_name(router['id'])))
+            self._ovn_client._add_router_ext_gw(ctx, router, networks, txn)
+        db_rev.bump_revision(port, const.TYPE_ROUTER_PORTS)
+
+    def _fix_resources(self, ctx, resource_type, action, res_uuids):
+        """Create or update in OVN the Neutron resources res_uuids.
+
+        The Neutron resources are fetched from the database in chunks,
+        the ones with a bulk action (e.g. ports) are fixed one chunk at a
+        time, falling back to fixing them one by one if that fails.
+        """
+        res_map = self._get_incremental_sync_map()[resource_type]
+        bulk_action = res_map.get('%s_bulk' % action)
+        for chunk in utils.chunks(res_uuids, config.get_ovn_txn_chunk_size()):
+            n_objs = res_map['neutron_get'](ctx, filters={'id': chunk})
+            if bulk_action and n_objs:
+                try:
+                    bulk_action(ctx, n_objs)
+                    continue
+                except Exception:
+                    LOG.exception('Failed to fix %(count)d resources (type: '
+                                  '%(res_type)s) at once, fixing them one '
+                                  'by one', {'count': len(n_objs),
+                                             'res_type': resource_type})
+            for n_obj in n_objs:
+                try:
+                    res_map[action](n_obj)
+                except Exception:
+                    LOG.exception('Failed to fix resource %(res_uuid)s '
+                                  '(type: %(res_type)s)',
+                                  {'res_uuid': n_obj['id'],
+                                   'res_type': resource_type})
+
+    def sync_revision_numbers(self, ctx):
+        """Incrementally sync resources between neutron and NB.
+
+        Only the (UUID, revision number) pairs of the resources are
+        compared. The Neutron DB is queried for those two columns only and
+        the OVN side is read from the external_ids of the local copy of the
+        NB database. The full Neutron objects are only fetched for the
+        resources that are out of sync, so the cost of syncing a cloud
+        depends on how many resources drifted rather than on its size.
+
+        @param ctx: neutron_lib.context
+        @type  ctx: object of type neutron_lib.context.Context
+        @return: The number of resources out of sync
+        """
+        LOG.debug('OVN-NB Sync revision numbers started @ %s' %
+                  str(datetime.now()))
+        res_types = [res_type for res_type in INCREMENTAL_SYNC_TYPES
+                     if res_type not in _L3_TYPES or
+                     utils.is_ovn_l3(self.l3_plugin)]
+        res_map = self._get_incremental_sync_map()
+        num_items = 0
+        to_delete = {}
+        # The OVN revision numbers of a resource type are read right before
+        # fixing it, once the types it depends on have been fixed (e.g.
+        # creating a router also creates its gateway router port).
+        for res_type in sorted(
+                res_types,
+                key=const.MAINTENANCE_CREATE_UPDATE_TYPE_ORDER.get):
+            neutron_revs = db_rev.get_neutron_revision_numbers(res_type)
+            ovn_revs = self.ovn_api.get_revision_numbers(res_type)
+            to_create = [res_uuid for res_uuid in neutron_revs
+                         if res_uuid not in ovn_revs]
+            to_update = [res_uuid for res_uuid, rev in neutron_revs.items()
+                         if res_uuid in ovn_revs and ovn_revs[res_uuid] != rev]
+            to_delete[res_type] = [res_uuid for res_uuid in ovn_revs
+                                   if res_uuid not in neutron_revs]
+            num_items += (len(to_create) + len(to_update) +
+                          len(to_delete[res_type]))
+
+            for res_uuid in to_create:
+                LOG.warning('Resource %(res_uuid)s (type: %(res_type)s) '
+                            'found in Neutron but not in OVN DB',
+                            {'res_uuid': res_uuid, 'res_type': res_type})
+            for res_uuid in to_update:
+                LOG.warning('Resource %(res_uuid)s (type: %(res_type)s) '
+                            'revision number %(ovn_rev)d in OVN DB differs '
+                            'from the one in Neutron (%(neutron_rev)d)',
+                            {'res_uuid': res_uuid, 'res_type': res_type,
+                             'ovn_rev': ovn_revs[res_uuid],
+                             'neutron_rev': neutron_revs[res_uuid]})
+            for res_uuid in to_delete[res_type]:
+                LOG.warning('Resource %(res_uuid)s (type: %(res_type)s) '
+                            'found in OVN DB but not in Neutron',
+                            {'res_uuid': res_uuid, 'res_type': res_type})
+
+            if self.mode == SYNC_MODE_REPAIR:
+                self._fix_resources(ctx, res_type, 'ovn_create', to_create)
+                self._fix_resources(ctx, res_type, 'ovn_update', to_update)
+
+        if self.mode == SYNC_MODE_REPAIR:
+            for res_type in sorted(
+                    to_delete, key=const.MAINTENANCE_DELETE_TYPE_ORDER.get):
+                for res_uuid in to_delete[res_type]:
+                    try:
+                        res_map[res_type]['ovn_delete'](res_uuid)
+                    except Exception:
+                        LOG.exception('Failed to delete resource '
+                                      '%(res_uuid)s (type: %(res_type)s) '
+                                      'from OVN DB', {'res_uuid': res_uuid,
+                                                      'res_type': res_type})
+
+        LOG.debug('OVN-NB Sync revision numbers finished @ %s' %
+                  str(datetime.now()))
+        return num_items
+
     def remove_common_acls(self, neutron_acls, nb_acls):
         """Take out common acls of the two acl dictionaries.
 
@@ -113,11 +381,10 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
         @type    nb_acls: {}
         @return: Nothing, original dictionary modified
         """
-        for port in neutron_acls.keys():
-            for acl in list(neutron_acls[port]):
-                if port in nb_acls and acl in nb_acls[port]:
-                    neutron_acls[port].remove(acl)
-                    nb_acls[port].remove(acl)
+        for port, acls in neutron_acls.items():
+            if port in nb_acls:
+                acls[:], nb_acls[port][:] = acl_utils.diff_acls(
+                    acls, nb_acls[port], key=acl_utils.ACLFingerprint)
 
     def compute_address_set_difference(self, neutron_sgs, nb_sgs):
         neutron_sgs_name_set = set(neutron_sgs.keys())
@@ -195,6 +462,7 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
 
         LOG.debug('Port Groups added %d, removed %d',
                   len(add_pgs), len(remove_pgs))
+        num_items = len(add_pgs) + len(remove_pgs)
 
         if self.mode == SYNC_MODE_REPAIR:
             LOG.debug('Port-Group-SYNC: transaction started @ %s',
@@ -234,6 +502,7 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
                     txn.add(self.ovn_api.pg_del(pg))
             LOG.debug('Port-Group-SYNC: transaction finished @ %s',
                       str(datetime.now()))
+        return num_items
 
     def sync_address_sets(self, ctx):
         """Sync Address Sets between neutron and NB.
@@ -295,6 +564,8 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
                     txn.add(self.ovn_api.delete_address_set(name=sgname))
             LOG.debug('Address-Set-SYNC: transaction finished @ %s' %
                       str(datetime.now()))
+        return (len(sgnames_to_add) + len(sgnames_to_delete) +
+                len(sgs_to_update))
 
     def _get_acls_from_port_groups(self):
         ovn_acls = []
@@ -334,12 +605,7 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
         num_acls_to_remove_from_ls = get_num_acls(ovn_acls_from_ls)
 
         # Remove the common ones
-        for na in list(neutron_acls):
-            for ovn_a in ovn_acls:
-                if all(item in na.items() for item in ovn_a.items()):
-                    neutron_acls.remove(na)
-                    ovn_acls.remove(ovn_a)
-                    break
+        neutron_acls, ovn_acls = acl_utils.diff_acls(neutron_acls, ovn_acls)
 
         num_acls_to_add = len(neutron_acls)
         num_acls_to_remove = len(ovn_acls) + num_acls_to_remove_from_ls
@@ -350,21 +616,27 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
                          'remove': num_acls_to_remove})
 
         if self.mode == SYNC_MODE_REPAIR:
-            with self.ovn_api.transaction(check_error=True) as txn:
-                for acla in neutron_acls:
-                    LOG.warning('ACL found in Neutron but not in '
-                                'OVN DB for port group %s', acla['port_group'])
-                    txn.add(self.ovn_api.pg_acl_add(**acla))
+            chunk_size = config.get_ovn_txn_chunk_size()
+            for chunk in utils.chunks(neutron_acls, chunk_size):
+                with self.ovn_api.transaction(check_error=True) as txn:
+                    for acla in chunk:
+                        LOG.warning('ACL found in Neutron but not in '
+                                    'OVN DB for port group %s',
+                                    acla['port_group'])
+                        txn.add(self.ovn_api.pg_acl_add(**acla))
+
+            for chunk in utils.chunks(ovn_acls, chunk_size):
+                with self.ovn_api.transaction(check_error=True) as txn:
+                    for aclr in chunk:
+                        LOG.warning('ACLs found in OVN DB but not in '
+                                    'Neutron for port group %s',
+                                    aclr['port_group'])
+                        txn.add(self.ovn_api.pg_acl_del(aclr['port_group'],
+                                                        aclr['direction'],
+                                                        aclr['priority'],
+                                                        aclr['match']))
 
             with self.ovn_api.transaction(check_error=True) as txn:
-                for aclr in ovn_acls:
-                    LOG.warning('ACLs found in OVN DB but not in '
-                                'Neutron for port group %s',
-                                aclr['port_group'])
-                    txn.add(self.ovn_api.pg_acl_del(aclr['port_group'],
-                                                    aclr['direction'],
-                                                    aclr['priority'],
-                                                    aclr['match']))
                 for aclr in ovn_acls_from_ls:
                     # Remove all the ACLs from any Logical Switch if they have
                     # any. Elements are (lswitch_name, list_of_acls).
@@ -372,6 +644,7 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
                         LOG.warning('Removing ACLs from OVN from Logical '
                                     'Switch %s', aclr[0])
                         txn.add(self.ovn_api.acl_del(aclr[0]))
+        return num_acls_to_add + num_acls_to_remove
 
     def _sync_acls(self, ctx):
         """Sync ACLs between neutron and NB when not using Port Groups.
@@ -419,27 +692,34 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
                          'remove': num_acls_to_remove})
 
         if self.mode == SYNC_MODE_REPAIR:
-            with self.ovn_api.transaction(check_error=True) as txn:
-                for acla in list(itertools.chain(*neutron_acls.values())):
-                    LOG.warning('ACL found in Neutron but not in '
-                                'OVN DB for port %s', acla['lport'])
-                    txn.add(self.ovn_api.add_acl(**acla))
-
-            with self.ovn_api.transaction(check_error=True) as txn:
-                for aclr in list(itertools.chain(*nb_acls.values())):
-                    # Both lswitch and lport aren't needed within the ACL.
-                    lswitchr = aclr.pop('lswitch').replace('neutron-', '')
-                    lportr = aclr.pop('lport')
-                    aclr_dict = {lportr: aclr}
-                    LOG.warning('ACLs found in OVN DB but not in '
-                                'Neutron for port %s', lportr)
-                    txn.add(self.ovn_api.update_acls(
-                        [lswitchr],
-                        [lportr],
-                        aclr_dict,
-                        need_compare=False,
-                        is_add_acl=False
-                    ))
+            chunk_size = config.get_ovn_txn_chunk_size()
+            for chunk in utils.chunks(
+                    itertools.chain(*neutron_acls.values()), chunk_size):
+                with self.ovn_api.transaction(check_error=True) as txn:
+                    for acla in chunk:
+                        LOG.warning('ACL found in Neutron but not in '
+                                    'OVN DB for port %s', acla['lport'])
+                        txn.add(self.ovn_api.add_acl(**acla))
+
+            for chunk in utils.chunks(
+                    itertools.chain(*nb_acls.values()), chunk_size):
+                with self.ovn_api.transaction(check_error=True) as txn:
+                    for aclr in chunk:
+                        # Both lswitch and lport aren't needed within the
+                        # ACL.
+                        lswitchr = aclr.pop('lswitch').replace('neutron-', '')
+                        lportr = aclr.pop('lport')
+                        aclr_dict = {lportr: aclr}
+                        LOG.warning('ACLs found in OVN DB but not in '
+                                    'Neutron for port %s', lportr)
+                        txn.add(self.ovn_api.update_acls(
+                            [lswitchr],
+                            [{'id': lportr, 'network_id': lswitchr}],
+                            aclr_dict,
+                            need_compare=False,
+                            is_add_acl=False
+                        ))
+        return num_acls_to_add + num_acls_to_remove
 
     def sync_acls(self, ctx):
         """Sync ACLs between neutron and NB.
@@ -452,12 +732,13 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
                   str(datetime.now()))
 
         if self.ovn_api.is_port_groups_supported():
-            self._sync_acls_port_groups(ctx)
+            num_items = self._sync_acls_port_groups(ctx)
         else:
-            self._sync_acls(ctx)
+            num_items = self._sync_acls(ctx)
 
         LOG.debug('ACL-SYNC: finished @ %s' %
                   str(datetime.now()))
+        return num_items
 
     def _calculate_fips_differences(self, ovn_fips, db_fips):
         to_add = []
@@ -596,6 +877,12 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
             else:
                 del_lrouters_list.append(lrouter)
 
+        num_items = (len(db_routers) + len(db_router_ports) +
+                     len(del_lrouters_list) + len(del_lrouter_ports_list))
+        for update in (update_sroutes_list + update_fips_list +
+                       update_snats_list):
+            num_items += len(update['add']) + len(update['del'])
+
         for r_id, router in db_routers.items():
             LOG.warning("Router found in Neutron but not in "
                         "OVN DB, router id=%s", router['id'])
@@ -751,6 +1038,7 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
                                 type='snat'))
         LOG.debug('OVN-NB Sync routers and router ports finished %s' %
                   str(datetime.now()))
+        return num_items
 
     def _sync_subnet_dhcp_options(self, ctx, db_networks,
                                   ovn_subnet_dhcp_options):
@@ -998,27 +1286,40 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
         self._sync_subnet_dhcp_options(
             ctx, db_network_cache, ovn_all_dhcp_options['subnets'])
 
+        num_items = (len(db_networks) + len(db_ports) +
+                     len(del_lswitchs_list) + len(add_provnet_ports_list) +
+                     len(del_lports_list))
         for port_id, port in db_ports.items():
             LOG.warning("Port found in Neutron but not in OVN "
                         "DB, port_id=%s", port['id'])
-            if self.mode == SYNC_MODE_REPAIR:
+
+        if self.mode == SYNC_MODE_REPAIR:
+            for chunk in utils.chunks(list(db_ports.values()),
+                                      config.get_ovn_txn_chunk_size()):
+                LOG.debug('Creating %d ports in OVN NB DB', len(chunk))
                 try:
-                    LOG.debug('Creating the port %s in OVN NB DB',
-                              port['id'])
-                    self._create_port_in_ovn(ctx, port)
-                    if port_id in ovn_all_dhcp_options['ports_v4']:
-                        _, lsp_opts = utils.get_lsp_dhcp_opts(
-                            port, constants.IP_VERSION_4)
-                        if lsp_opts:
-                            ovn_all_dhcp_options['ports_v4'].pop(port_id)
-                    if port_id in ovn_all_dhcp_options['ports_v6']:
-                        _, lsp_opts = utils.get_lsp_dhcp_opts(
-                            port, constants.IP_VERSION_6)
-                        if lsp_opts:
-                            ovn_all_dhcp_options['ports_v6'].pop(port_id)
+                    self._create_ports_in_ovn(ctx, chunk)
+                    created_ports = chunk
                 except RuntimeError:
-                    LOG.warning("Create port in OVN NB failed for"
-                                " port %s", port['id'])
+                    # Retry the ports one by one to create all but the
+                    # failing ones
+                    created_ports = []
+                    for port in chunk:
+                        try:
+                            self._create_port_in_ovn(ctx, port)
+                            created_ports.append(port)
+                        except RuntimeError:
+                            LOG.warning("Create port in OVN NB failed for"
+                                        " port %s", port['id'])
+                for port in created_ports:
+                    for ip_version, key in (
+                            (constants.IP_VERSION_4, 'ports_v4'),
+                            (constants.IP_VERSION_6, 'ports_v6')):
+                        if port['id'] in ovn_all_dhcp_options[key]:
+                            _, lsp_opts = utils.get_lsp_dhcp_opts(
+                                port, ip_version)
+                            if lsp_opts:
+                                ovn_all_dhcp_options[key].pop(port['id'])
 
         with self.ovn_api.transaction(check_error=True) as txn:
             for lswitch in del_lswitchs_list:
@@ -1029,17 +1330,7 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
                               lswitch['name'])
                     txn.add(self.ovn_api.ls_del(lswitch['name']))
 
-            for provnet_port_info in add_provnet_ports_list:
-                network = provnet_port_info['network']
-                LOG.warning("Provider network found in Neutron but "
-                            "provider network port not found in OVN DB, "
-                            "network_id=%s", provnet_port_info['lswitch'])
-                if self.mode == SYNC_MODE_REPAIR:
-                    LOG.debug('Creating the provnet port %s in OVN NB DB',
-                              utils.ovn_provnet_port_name(network['id']))
-                    self._ovn_client._create_provnet_port(
-                        txn, network, network.get(pnet.PHYSICAL_NETWORK),
-                        network.get(pnet.SEGMENTATION_ID))
+            self._create_provnet_ports(txn, add_provnet_ports_list)
 
             for lport_info in del_lports_list:
                 LOG.warning("Port found in OVN but not in "
@@ -1067,6 +1358,67 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
                                      ovn_all_dhcp_options['ports_v4'],
                                      ovn_all_dhcp_options['ports_v6'])
         LOG.debug('OVN-NB Sync networks, ports and DHCP options finished')
+        return num_items
+
+    def _create_provnet_ports(self, txn, add_provnet_ports_list):
+        for provnet_port_info in add_provnet_ports_list:
+            network = provnet_port_info['network']
+            LOG.warning("Provider network found in Neutron but "
+                        "provider network port not found in OVN DB, "
+                        "network_id=%s", provnet_port_info['lswitch'])
+            if self.mode == SYNC_MODE_REPAIR:
+                LOG.debug('Creating the provnet port %s in OVN NB DB',
+                          utils.ovn_provnet_port_name(network['id']))
+                self._ovn_client._create_provnet_port(
+                    txn, network, network.get(pnet.PHYSICAL_NETWORK),
+                    network.get(pnet.SEGMENTATION_ID))
+
+    def sync_metadata_provnet_and_dhcp_opts(self, ctx):
+        """Sync the network resources without a revision number.
+
+        The incremental counterpart of sync_networks_ports_and_dhcp_opts():
+        the networks and ports themselves are fixed by
+        sync_revision_numbers(), this method only checks the metadata
+        ports, the provider network ports and the DHCP options of the
+        ports.
+        """
+        LOG.debug('OVN-NB Sync metadata ports, provnet ports and port DHCP '
+                  'options started')
+        db_networks = {utils.ovn_name(net['id']): net
+                       for net in self.core_plugin.get_networks(ctx)}
+        db_ports = {port['id']: port for port in
+                    self.core_plugin.get_ports(ctx) if not
+                    utils.is_lsp_ignored(port)}
+        ovn_all_dhcp_options = self.ovn_api.get_all_dhcp_options()
+
+        ports_need_sync_dhcp_opts = []
+        add_provnet_ports_list = []
+        for lswitch in self.ovn_api.get_all_logical_switches_with_ports():
+            db_network = db_networks.get(lswitch['name'])
+            if not db_network:
+                continue
+            for lport in lswitch['ports']:
+                port = db_ports.get(lport)
+                if port and not utils.is_network_device_port(port):
+                    ports_need_sync_dhcp_opts.append(port)
+            if (db_network.get(pnet.PHYSICAL_NETWORK) and
+                    not lswitch['provnet_port']):
+                add_provnet_ports_list.append(
+                    {'network': db_network, 'lswitch': lswitch['name']})
+
+        # The ports missing in OVN were created by sync_revision_numbers()
+        self._sync_metadata_ports(ctx, {})
+
+        if add_provnet_ports_list:
+            with self.ovn_api.transaction(check_error=True) as txn:
+                self._create_provnet_ports(txn, add_provnet_ports_list)
+
+        self._sync_port_dhcp_options(ctx, ports_need_sync_dhcp_opts,
+                                     ovn_all_dhcp_options['ports_v4'],
+                                     ovn_all_dhcp_options['ports_v6'])
+        LOG.debug('OVN-NB Sync metadata ports, provnet ports and port DHCP '
+                  'options finished')
+        return len(add_provnet_ports_list)
 
     def sync_port_dns_records(self, ctx):
         if self.mode != SYNC_MODE_REPAIR:
@@ -1088,6 +1440,7 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
 
         for network_id, port_dns_records in dns_records.items():
             self._set_dns_records(network_id, port_dns_records)
+        return len(dns_records)
 
     def _set_dns_records(self, network_id, dns_records):
         lswitch_name = utils.ovn_name(network_id)
@@ -1102,82 +1455,225 @@ class OvnNbSynchronizer(OvnDbSynchronizer):
                 txn.add(self.ovn_api.dns_set_records(ls_dns_record.uuid,
                                                      **dns_records))
 
-    def _delete_address_sets(self, ctx):
-        with self.ovn_api.transaction(check_error=True) as txn:
-            for sg in self.core_plugin.get_security_groups(ctx):
-                for ip_version in ['ip4', 'ip6']:
-                    txn.add(self.ovn_api.delete_address_set(
-                        utils.ovn_addrset_name(sg['id'], ip_version)))
-
-    def _delete_acls_from_lswitches(self, ctx):
-        with self.ovn_api.transaction(check_error=True) as txn:
-            for net in self.core_plugin.get_networks(ctx):
-                # Calling acl_del from ovsdbapp with no ACL will delete
-                # all the ACLs belonging to that Logical Switch.
-                txn.add(self.ovn_api.acl_del(utils.ovn_name(net['id'])))
-
-    def _create_default_drop_port_group(self, db_ports):
-        with self.ovn_api.transaction(check_error=True) as txn:
-            pg_name = const.OVN_DROP_PORT_GROUP_NAME
-            if not self.ovn_api.get_port_group(pg_name):
-                # If drop Port Group doesn't exist yet, create it.
-                txn.add(self.ovn_api.pg_add(pg_name, acls=[]))
-                # Add ACLs to this Port Group so that all traffic is dropped.
-                acls = acl_utils.add_acls_for_drop_port_group(pg_name)
-                for acl in acls:
-                    txn.add(self.ovn_api.pg_acl_add(**acl))
-            ports_ids = [port['id'] for port in db_ports]
-            # Add the ports to the default Port Group
-            txn.add(self.ovn_api.pg_add_ports(pg_name, ports_ids))
-
-    def _create_sg_port_groups_and_acls(self, ctx, db_ports):
-        # Create a Port Group per Neutron Security Group
-        with self.ovn_api.transaction(check_error=True) as txn:
-            for sg in self.core_plugin.get_security_groups(ctx):
-                pg_name = utils.ovn_port_group_name(sg['id'])
-                if self.ovn_api.get_port_group(pg_name):
-                    continue
-                ext_ids = {const.OVN_SG_EXT_ID_KEY: sg['id']}
-                txn.add(self.ovn_api.pg_add(
-                    name=pg_name, acls=[], external_ids=ext_ids))
-                acl_utils.add_acls_for_sg_port_group(self.ovn_api, sg, txn)
-            for port in db_ports:
-                for sg in port['security_groups']:
-                    txn.add(self.ovn_api.pg_add_ports(
-                        utils.ovn_port_group_name(sg), port['id']))
-
-    def migrate_to_port_groups(self, ctx):
-        # This routine is responsible for migrating the current Security
-        # Groups and SG Rules to the new Port Groups implementation.
-        # 1. Create the default drop Port Group and add all ports with port
-        #    security enabled to it.
-        # 2. Create a Port Group for every existing Neutron Security Group and
-        #    add all its Security Group Rules as ACLs to that Port Group.
-        # 3. Delete all existing Address Sets in NorthBound database which
-        #    correspond to a Neutron Security Group.
-        # 4. Delete all the ACLs in every Logical Switch (Neutron network).
+    @staticmethod
+    def _is_port_in_port_groups(port):
+        return (not utils.is_lsp_ignored(port) and
+                not utils.is_lsp_trusted(port) and
+                utils.is_port_security_enabled(port))
+
+    def _get_ports_pages(self, ctx, page_size):
+        marker = None
+        while True:
+            ports = self.core_plugin.get_ports(
+                ctx, sorts=[('id', True)], limit=page_size, marker=marker)
+            if ports:
+                yield ports
+            if len(ports) < page_size:
+                return
+            marker = ports[-1]['id']
+
+    def _get_sg_ports_chunks(self, ctx, sg_id, chunk_size):
+        bindings = self.core_plugin._get_port_security_group_bindings(
+            ctx, {'security_group_id': [sg_id]})
+        port_ids = sorted(set(binding['port_id'] for binding in bindings))
+        for chunk in utils.chunks(port_ids, chunk_size):
+            yield self.core_plugin.get_ports(ctx, filters={'id': chunk})
+
+    def _drop_port_group_txns(self, ctx, chunk_size):
+        pg_name = const.OVN_DROP_PORT_GROUP_NAME
+        if not self.ovn_api.get_port_group(pg_name):
+            # If drop Port Group doesn't exist yet, create it with the
+            # ACLs dropping all the traffic.
+            acls = acl_utils.add_acls_for_drop_port_group(pg_name)
+            yield 1 + len(acls), (
+                [self.ovn_api.pg_add(pg_name, acls=[])] +
+                [self.ovn_api.pg_acl_add(**acl) for acl in acls])
+        # Add the ports to the default Port Group
+        for ports in self._get_ports_pages(ctx, chunk_size):
+            port_ids = [port['id'] for port in ports
+                        if self._is_port_in_port_groups(port)]
+            if port_ids:
+                yield len(port_ids), [
+                    self.ovn_api.pg_add_ports(pg_name, port_ids)]
+
+    def _get_security_group_ids(self, ctx):
+        return [sg['id'] for sg in
+                self.core_plugin.get_security_groups(ctx, fields=['id'])]
+
+    def _sg_port_groups_txns(self, ctx, chunk_size):
+        # Create a Port Group per Neutron Security Group with the ACLs of
+        # its rules, the Port Groups of several Security Groups are
+        # created in the same transaction up to chunk_size rows. Until its
+        # Port Group exists the rule changes of a Security Group only go
+        # to the Logical Switch ACLs, deleted by a later step, so each
+        # Security Group is read from Neutron when its Port Group is added
+        # to a transaction rather than when the migration starts.
+        size = 0
+        commands = []
+        for sg_id in self._get_security_group_ids(ctx):
+            pg_name = utils.ovn_port_group_name(sg_id)
+            if self.ovn_api.get_port_group(pg_name):
+                continue
+            sgs = self.core_plugin.get_security_groups(
+                ctx, filters={'id': [sg_id]})
+            if not sgs:
+                # Deleted since the migration started
+                continue
+            sg = sgs[0]
+            if commands and size + 1 + len(
+                    sg['security_group_rules']) > chunk_size:
+                yield size, commands
+                size = 0
+                commands = []
+            ext_ids = {const.OVN_SG_EXT_ID_KEY: sg['id']}
+            commands.append(self.ovn_api.pg_add(
+                name=pg_name, acls=[], external_ids=ext_ids))
+            for r in sg['security_group_rules']:
+                acl = acl_utils._add_sg_rule_acl_for_port_group(
+                    pg_name, r, self.ovn_api)
+                commands.append(self.ovn_api.pg_acl_add(**acl))
+            size += 1 + len(sg['security_group_rules'])
+        if commands:
+            yield size, commands
+
+    def _sg_port_group_ports_txns(self, ctx, chunk_size):
+        # The Security Groups whose ports have all been added to their
+        # Port Group are flagged in the external_ids of their Address
+        # Sets, they are skipped when the migration is resumed. The Port
+        # Group of a Security Group deleted since the previous step is
+        # gone, the Security Groups are checked again before adding ports.
+        address_sets = self.ovn_api.get_address_sets()
+        for sg_id in self._get_security_group_ids(ctx):
+            as_names = [utils.ovn_addrset_name(sg_id, ip_version)
+                        for ip_version in ('ip4', 'ip6')]
+            as_ext_ids = [address_sets[name].get('external_ids', {})
+                          for name in as_names if name in address_sets]
+            if not as_ext_ids or all(const.OVN_PG_MIGRATED_EXT_ID_KEY in
+                                     ext_ids for ext_ids in as_ext_ids):
+                continue
+            if not self.core_plugin.get_security_groups(
+                    ctx, filters={'id': [sg_id]}, fields=['id']):
+                continue
+            pg_name = utils.ovn_port_group_name(sg_id)
+            for ports in self._get_sg_ports_chunks(ctx, sg_id, chunk_size):
+                port_ids = [port['id'] for port in ports
+                            if self._is_port_in_port_groups(port)]
+                if port_ids:
+                    yield len(port_ids), [
+                        self.ovn_api.pg_add_ports(pg_name, port_ids)]
+            yield len(as_names), [
+                self.ovn_api.update_address_set_ext_ids(
+                    name, {const.OVN_PG_MIGRATED_EXT_ID_KEY: 'true'})
+                for name in as_names]
+
+    def _lswitch_acls_txns(self, ctx, chunk_size):
+        # The ACLs are removed from the Logical Switches by UUID, the ones
+        # of the Port Groups cover all the ports by now.
+        for net in self.core_plugin.get_networks(ctx, fields=['id']):
+            lswitch = self.ovn_api.get_lswitch(utils.ovn_name(net['id']))
+            if lswitch is None:
+                continue
+            acl_uuids = [acl.uuid for acl in getattr(lswitch, 'acls', [])]
+            for chunk in utils.chunks(acl_uuids, chunk_size):
+                yield len(chunk), [self.ovn_api.db_remove(
+                    'Logical_Switch', lswitch.name, 'acls', *chunk,
+                    if_exists=True)]
+
+    def _address_sets_txns(self, chunk_size):
+        for names in utils.chunks(sorted(self.ovn_api.get_address_sets()),
+                                  chunk_size):
+            yield len(names), [self.ovn_api.delete_address_set(name)
+                               for name in names]
+
+    def _run_pg_migration_step(self, name, transactions, dry_run):
+        """Run the transactions of a step of the Port Groups migration
+
+        @param name: The name of the step
+        @param transactions: Iterable of (size, commands) tuples, one per
+                             transaction. They are generated as the step
+                             goes, only one transaction is held in memory
+                             at a time.
+        @param dry_run: Only count the transactions, don't commit them
+        @return: The outcome of the step
+        @rtype: PgMigrationStep
+        """
+        num_rows = num_txns = largest = 0
+        watch = timeutils.StopWatch()
+        with watch:
+            for size, commands in transactions:
+                if not dry_run:
+                    with self.ovn_api.transaction(check_error=True) as txn:
+                        for command in commands:
+                            txn.add(command)
+                num_rows += size
+                num_txns += 1
+                largest = max(largest, size)
+        step = PgMigrationStep(name, num_rows, num_txns, largest,
+                               watch.elapsed())
+        if dry_run:
+            LOG.info('Port Groups migration step %(step)s would write '
+                     '%(rows)d row(s) in %(txns)d transaction(s), the '
+                     'largest one writing %(largest)d row(s)',
+                     {'step': name, 'rows': num_rows, 'txns': num_txns,
+                      'largest': largest})
+        else:
+            LOG.info('Port Groups migration step %(step)s finished in '
+                     '%(time).2f seconds, %(rows)d row(s) written in '
+                     '%(txns)d transaction(s) (%(rate).1f rows/s)',
+                     {'step': name, 'time': step.time, 'rows': num_rows,
+                      'txns': num_txns,
+                      'rate': num_rows / step.time if step.time else 0})
+        return step
+
+    def migrate_to_port_groups(self, ctx, dry_run=False):
+        """Migrate the Security Groups from Address Sets to Port Groups.
+
+        1. Create the default drop Port Group and add all ports with port
+           security enabled to it.
+        2. Create a Port Group for every existing Neutron Security Group
+           and add all its Security Group Rules as ACLs to that Port Group.
+        3. Add the ports of every Security Group to its Port Group.
+        4. Delete all the ACLs in every Logical Switch (Neutron network).
+        5. Delete all existing Address Sets in NorthBound database which
+           correspond to a Neutron Security Group.
+
+        The steps commit transactions of about ovsdb_txn_chunk_size rows,
+        a Port Group being created along with all the ACLs of its Security
+        Group, and the ports are loaded from Neutron in pages of the same
+        size. The rules of a Security Group are read from Neutron when its
+        Port Group is created, the rule changes are applied to the Port
+        Group from then on. The migration can be interrupted at any point
+        and resumed by running it again, the Security Groups whose ports
+        have all been added to their Port Group are skipped.
 
+        @param ctx: neutron_lib.context
+        @type  ctx: object of type neutron_lib.context.Context
+        @param dry_run: Only estimate the transactions of the migration,
+                        nothing is written to the NorthBound database.
+        @return: The outcome of the steps of the migration
+        @rtype: [PgMigrationStep]
+        """
         # If Port Groups are not supported or we've already migrated, return
         if (not self.ovn_api.is_port_groups_supported() or
                 not self.ovn_api.get_address_sets()):
-            return
-
-        LOG.debug('Port Groups Migration task started')
-
-        # Ignore the floating ip ports with device_owner set to
-        # constants.DEVICE_OWNER_FLOATINGIP
-        db_ports = [port for port in
-                    self.core_plugin.get_ports(ctx) if not
-                    utils.is_lsp_ignored(port) and not
-                    utils.is_lsp_trusted(port) and
-                    utils.is_port_security_enabled(port)]
-
-        self._create_default_drop_port_group(db_ports)
-        self._create_sg_port_groups_and_acls(ctx, db_ports)
-        self._delete_address_sets(ctx)
-        self._delete_acls_from_lswitches(ctx)
-
-        LOG.debug('Port Groups Migration task finished')
+            return []
+
+        LOG.debug('Port Groups Migration task started%s',
+                  ' (dry run)' if dry_run else '')
+        chunk_size = config.get_ovn_txn_chunk_size()
+        steps = [
+            ('drop_port_group', self._drop_port_group_txns(ctx, chunk_size)),
+            ('port_groups', self._sg_port_groups_txns(ctx, chunk_size)),
+            ('port_group_ports', self._sg_port_group_ports_txns(
+                ctx, chunk_size)),
+            ('lswitch_acls', self._lswitch_acls_txns(ctx, chunk_size)),
+            ('address_sets', self._address_sets_txns(chunk_size)),
+        ]
+        result = [self._run_pg_migration_step(name, txns, dry_run)
+                  for name, txns in steps]
+        LOG.debug('Port Groups Migration task finished%s',
+                  ' (dry run)' if dry_run else '')
+        return result
 
 
 class OvnSbSynchronizer(OvnDbSynchronizer):
@@ -10,11 +10,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+
 from oslo_utils import timeutils
 from ovsdbapp.backend.ovs_idl import command
 from ovsdbapp.backend.ovs_idl import idlutils
 
 from networking_ovn._i18n import _
+from networking_ovn.common import acl as acl_utils
 from networking_ovn.common import constants as ovn_const
 from networking_ovn.common import exceptions as ovn_exc
 from networking_ovn.common import utils
@@ -69,11 +72,17 @@ def _add_gateway_chassis(api, txn, lrp_name, val):
         uuid_list = []
         for chassis in val:
             gwc_name = '%s_%s' % (lrp_name, chassis)
-            try:
-                gwc = idlutils.row_by_value(api.idl,
-                                            'Gateway_Chassis',
-                                            'name', gwc_name)
-            except idlutils.RowNotFound:
+            gwcs = api.lookup_by_index('Gateway_Chassis', 'name', gwc_name)
+            if gwcs is None:
+                try:
+                    gwcs = [idlutils.row_by_value(api.idl,
+                                                  'Gateway_Chassis',
+                                                  'name', gwc_name)]
+                except idlutils.RowNotFound:
+                    gwcs = []
+            if gwcs:
+                gwc = gwcs[0]
+            else:
                 gwc = txn.insert(gateway_chassis)
                 gwc.name = gwc_name
             gwc.chassis_name = chassis
@@ -220,6 +229,37 @@ class SetLSwitchPortCommand(command.BaseCommand):
             setattr(port, col, val)
 
 
+class SetLSwitchPortQosOptionsCommand(command.BaseCommand):
+    def __init__(self, api, lport, qos_options, if_exists):
+        super(SetLSwitchPortQosOptionsCommand, self).__init__(api)
+        self.lport = lport
+        self.qos_options = qos_options
+        self.if_exists = if_exists
+
+    def run_idl(self, txn):
+        ports = self.api.lookup_by_index('Logical_Switch_Port', 'name',
+                                         self.lport)
+        if ports is None:
+            try:
+                ports = [idlutils.row_by_value(
+                    self.api.idl, 'Logical_Switch_Port', 'name', self.lport)]
+            except idlutils.RowNotFound:
+                ports = []
+        if not ports:
+            if self.if_exists:
+                return
+            msg = _("Logical Switch Port %s does not exist") % self.lport
+            raise RuntimeError(msg)
+
+        # Only the QoS options are modified, not the whole options column
+        port = ports[0]
+        for key in ovn_const.OVN_QOS_OPTION_KEYS:
+            if key in self.qos_options:
+                port.setkey('options', key, self.qos_options[key])
+            elif key in port.options:
+                port.delkey('options', key)
+
+
 class DelLSwitchPortCommand(command.BaseCommand):
     def __init__(self, api, lport, lswitch, if_exists):
         super(DelLSwitchPortCommand, self).__init__(api)
@@ -512,19 +552,19 @@ class UpdateACLsCommand(command.BaseCommand):
         self.need_compare = need_compare
         self.is_add_acl = is_add_acl
 
-    def _acl_list_sub(self, acl_list1, acl_list2):
-        """Compute the elements in acl_list1 but not in acl_list2.
+    def _acl_index(self, acl_list):
+        """Index a list of acls by fingerprint, keeping their order."""
+        return collections.OrderedDict(
+            (acl_utils.ACLFingerprint(acl), acl) for acl in acl_list)
+
+    def _acl_list_sub(self, acl_index1, acl_index2):
+        """Compute the elements in acl_index1 but not in acl_index2.
 
-        If acl_list1 and acl_list2 were sets, the result of this routine
-        could be thought of as acl_list1 - acl_list2. Note that acl_list1
-        and acl_list2 cannot actually be sets as they contain dictionary
-        items i.e. set([{'a':1}) doesn't work.
+        The acls are compared by fingerprint, the result of this routine
+        is the list of fingerprints in acl_index1 - acl_index2.
         """
-        acl_diff = []
-        for acl in acl_list1:
-            if acl not in acl_list2:
-                acl_diff.append(acl)
-        return acl_diff
+        return [fingerprint for fingerprint in acl_index1
+                if fingerprint not in acl_index2]
 
     def _compute_acl_differences(self, port_list, acl_old_values_dict,
                                  acl_new_values_dict, acl_obj_dict):
@@ -536,8 +576,8 @@ class UpdateACLsCommand(command.BaseCommand):
                                     by port id
         @param acl_new_values_dict: Dictionary of new acl values indexed
                                     by port id
-        @param acl_obj_dict: Dictionary of acl objects indexed by the acl
-                             value in string format.
+        @param acl_obj_dict: Dictionary of acl objects indexed by the
+                             fingerprint of the acl value.
         @var acl_del_objs_dict: Dictionary of acl objects to be deleted
                                 indexed by the lswitch.
         @var acl_add_values_dict: Dictionary of acl values to be added
@@ -550,21 +590,56 @@ class UpdateACLsCommand(command.BaseCommand):
         acl_add_values_dict = {}
         for port in port_list:
             lswitch_name = port['network_id']
-            acls_old = acl_old_values_dict.get(port['id'], [])
-            acls_new = acl_new_values_dict.get(port['id'], [])
-            acls_del = self._acl_list_sub(acls_old, acls_new)
-            acls_add = self._acl_list_sub(acls_new, acls_old)
+            acls_old = self._acl_index(
+                acl_old_values_dict.get(port['id'], []))
+            acls_new = self._acl_index(
+                acl_new_values_dict.get(port['id'], []))
             acl_del_objs = acl_del_objs_dict.setdefault(lswitch_name, [])
-            for acl in acls_del:
-                acl_del_objs.append(acl_obj_dict[str(acl)])
+            for fingerprint in self._acl_list_sub(acls_old, acls_new):
+                acl_del_objs.append(acl_obj_dict[fingerprint])
             acl_add_values = acl_add_values_dict.setdefault(lswitch_name, [])
-            for acl in acls_add:
+            for fingerprint in self._acl_list_sub(acls_new, acls_old):
+                acl = acls_new[fingerprint]
                 # Remove lport and lswitch columns
                 del acl['lswitch']
                 del acl['lport']
                 acl_add_values.append(acl)
         return acl_del_objs_dict, acl_add_values_dict
 
+    def _lookup_acls_to_delete(self, lswitch_ovsdb_dict):
+        """Look the acls to delete up by security group rule and port
+
+        @param lswitch_ovsdb_dict: Dictionary of lswitch objects indexed
+                                   by the lswitch name.
+        @return: Dictionary of acl objects to be deleted indexed by the
+                 lswitch, None if they can't be looked up in the ACL
+                 index.
+        @rtype: {}
+        """
+        acl_del_objs_dict = {}
+        for port in self.port_list:
+            acl_dict = self.acl_new_values_dict.get(port['id'])
+            if acl_dict is None:
+                continue
+            ext_ids = acl_dict['external_ids']
+            key = (ext_ids.get(ovn_const.OVN_SG_RULE_EXT_ID_KEY),
+                   ext_ids.get('neutron:lport'))
+            # Only the ACLs of the security group rules are indexed
+            if not all(key):
+                return None
+            acls = self.api.lookup_by_index('ACL', 'sg_rule_lport', key)
+            if acls is None:
+                return None
+            switch_name = utils.ovn_name(port['network_id'])
+            if switch_name not in lswitch_ovsdb_dict:
+                continue
+            acl_del_objs = acl_del_objs_dict.setdefault(switch_name, [])
+            for acl in acls:
+                if (acl.match == acl_dict['match'] and
+                        acl.external_ids == ext_ids):
+                    acl_del_objs.append(acl)
+        return acl_del_objs_dict
+
     def _get_update_data_without_compare(self):
         lswitch_ovsdb_dict = {}
         for switch_name in self.lswitch_names:
@@ -584,18 +659,25 @@ class UpdateACLsCommand(command.BaseCommand):
             acl_del_objs_dict = {}
         else:
             acl_add_values_dict = {}
+            acl_del_objs_dict = self._lookup_acls_to_delete(
+                lswitch_ovsdb_dict)
+            if acl_del_objs_dict is not None:
+                return (lswitch_ovsdb_dict, acl_del_objs_dict,
+                        acl_add_values_dict)
             acl_del_objs_dict = {}
-            del_acl_extids = []
+            del_acl_extids = set()
             for acl_dict in self.acl_new_values_dict.values():
-                del_acl_extids.append({acl_dict['match']:
-                                       acl_dict['external_ids']})
+                del_acl_extids.add(
+                    (acl_dict['match'],
+                     frozenset(acl_dict['external_ids'].items())))
             for switch_name, lswitch in lswitch_ovsdb_dict.items():
                 if switch_name not in acl_del_objs_dict:
                     acl_del_objs_dict[switch_name] = []
                 acls = getattr(lswitch, 'acls', [])
                 for acl in acls:
                     match = getattr(acl, 'match')
-                    acl_extids = {match: getattr(acl, 'external_ids')}
+                    acl_extids = (
+                        match, frozenset(getattr(acl, 'external_ids').items()))
                     if acl_extids in del_acl_extids:
                         acl_del_objs_dict[switch_name].append(acl)
         return lswitch_ovsdb_dict, acl_del_objs_dict, acl_add_values_dict
@@ -28,11 +28,13 @@ from ovsdbapp.schema.ovn_northbound import impl_idl as nb_impl_idl
 from ovsdbapp.schema.ovn_southbound import impl_idl as sb_impl_idl
 
 from networking_ovn._i18n import _
+from networking_ovn.common import acl as acl_utils
 from networking_ovn.common import config as cfg
 from networking_ovn.common import constants as ovn_const
 from networking_ovn.common import exceptions as ovn_exc
 from networking_ovn.common import utils
 from networking_ovn.ovsdb import commands as cmd
+from networking_ovn.ovsdb import indexes
 from networking_ovn.ovsdb import ovsdb_monitor
 
 
@@ -84,6 +86,18 @@ class Backend(ovs_idl.Backend):
             self, self.ovsdb_connection, self.ovsdb_connection.timeout,
             check_error, log_errors)
 
+    def lookup_by_index(self, table, index, key):
+        """Look up rows using a secondary index of the IDL.
+
+        @param table: The name of the indexed table
+        @param index: The name of the index (see ovsdb/indexes.py)
+        @param key: The key to look for
+        @return: The list of matching rows or None if the IDL does not
+                 maintain such index, in which case the caller should fall
+                 back to scanning the table.
+        """
+        return indexes.lookup_by_index(self.idl, table, index, key)
+
     # Check for a column match in the table. If not found do a retry with
     # a stop delay of 10 secs. This function would be useful if the caller
     # wants to verify for the presence of a particular row in the table
@@ -186,6 +200,11 @@ class OvsdbNbOvnIdl(nb_impl_idl.OvnNbApiIdlImpl, Backend):
         return cmd.SetLSwitchPortCommand(self, lport_name,
                                          if_exists, **columns)
 
+    def set_lswitch_port_qos_options(self, lport_name, qos_options,
+                                     if_exists=True):
+        return cmd.SetLSwitchPortQosOptionsCommand(self, lport_name,
+                                                   qos_options, if_exists)
+
     def delete_lswitch_port(self, lport_name=None, lswitch_name=None,
                             ext_id=None, if_exists=True):
         if lport_name is not None:
@@ -273,8 +292,9 @@ class OvsdbNbOvnIdl(nb_impl_idl.OvnNbApiIdlImpl, Backend):
         @var acl_values_dict: A dictionary indexed by port_id containing the
                               list of acl values in string format that belong
                               to that port
-        @var acl_obj_dict: A dictionary indexed by acl value containing the
-                           corresponding acl idl object.
+        @var acl_obj_dict: A dictionary indexed by the fingerprint of the acl
+                           value containing the corresponding acl idl
+                           object, see acl_utils.ACLFingerprint.
         @var lswitch_ovsdb_dict: A dictionary mapping from logical switch
                                  name to lswitch idl object
         @return: (acl_values_dict, acl_obj_dict, lswitch_ovsdb_dict)
@@ -310,7 +330,7 @@ class OvsdbNbOvnIdl(nb_impl_idl.OvnNbApiIdlImpl, Backend):
                         acl_string[acl_key] = getattr(acl, acl_key)
                     except AttributeError:
                         pass
-                acl_obj_dict[str(acl_string)] = acl
+                acl_obj_dict[acl_utils.ACLFingerprint(acl_string)] = acl
                 acl_list.append(acl_string)
         return acl_values_dict, acl_obj_dict, lswitch_ovsdb_dict
 
@@ -416,14 +436,36 @@ class OvsdbNbOvnIdl(nb_impl_idl.OvnNbApiIdlImpl, Backend):
                     routers_hosted.append((lrp.name, prio))
         return chassis_bindings
 
+    def get_chassis_gateway_load(self, chassis_candidate_list=None):
+        idl_indexes = getattr(self.idl, 'indexes', None)
+        if isinstance(idl_indexes, indexes.IdlIndexes):
+            load = idl_indexes.get_gateway_load(chassis_candidate_list)
+            if load is not None:
+                return load
+
+        chassis_load = {}
+        bindings = self.get_all_chassis_gateway_bindings(
+            chassis_candidate_list)
+        for chassis_name, routers_hosted in bindings.items():
+            load = chassis_load.setdefault(chassis_name, {})
+            for lrp_name, prio in routers_hosted:
+                load[prio] = load.get(prio, 0) + 1
+        return chassis_load
+
     def get_gateway_chassis_binding(self, gateway_name):
-        try:
-            lrp = idlutils.row_by_value(
-                self.idl, 'Logical_Router_Port', 'name', gateway_name)
-            chassis_list = self._get_logical_router_port_gateway_chassis(lrp)
-            return [chassis for chassis, prio in chassis_list]
-        except idlutils.RowNotFound:
+        lrps = self.lookup_by_index('Logical_Router_Port', 'name',
+                                    gateway_name)
+        if lrps is None:
+            try:
+                lrps = [idlutils.row_by_value(
+                    self.idl, 'Logical_Router_Port', 'name', gateway_name)]
+            except idlutils.RowNotFound:
+                lrps = []
+        if not lrps:
             return []
+        chassis_list = self._get_logical_router_port_gateway_chassis(lrps[0])
+        chassis_list = sorted(chassis_list, key=lambda c: c[1], reverse=True)
+        return [chassis for chassis, prio in chassis_list]
 
     def get_unhosted_gateways(self, port_physnet_dict, chassis_physnets,
                               gw_chassis):
@@ -444,6 +486,7 @@ class OvsdbNbOvnIdl(nb_impl_idl.OvnNbApiIdlImpl, Backend):
                          physnet not in chassis_physnets.get(chassis_name)) or
                         (gw_chassis and chassis_name not in gw_chassis)):
                     unhosted_gateways.append(lrp.name)
+                    break
         return unhosted_gateways
 
     def add_dhcp_options(self, subnet_id, port_id=None, may_exist=True,
@@ -504,6 +547,61 @@ class OvsdbNbOvnIdl(nb_impl_idl.OvnNbApiIdlImpl, Backend):
 
         return dhcp_options
 
+    def _get_revision_numbers_rows(self, resource_type):
+        """Return the (Neutron UUID, row) pairs for a resource type."""
+        if resource_type == ovn_const.TYPE_NETWORKS:
+            for row in self._tables['Logical_Switch'].rows.values():
+                if ovn_const.OVN_NETWORK_NAME_EXT_ID_KEY in row.external_ids:
+                    yield row.name.replace('neutron-', '', 1), row
+        elif resource_type == ovn_const.TYPE_PORTS:
+            for row in self._tables['Logical_Switch_Port'].rows.values():
+                if ovn_const.OVN_PORT_NAME_EXT_ID_KEY in row.external_ids:
+                    yield row.name, row
+        elif resource_type == ovn_const.TYPE_ROUTERS:
+            for row in self._tables['Logical_Router'].rows.values():
+                if ovn_const.OVN_ROUTER_NAME_EXT_ID_KEY in row.external_ids:
+                    yield row.name.replace('neutron-', '', 1), row
+        elif resource_type == ovn_const.TYPE_ROUTER_PORTS:
+            for row in self._tables['Logical_Router_Port'].rows.values():
+                if row.name.startswith('lrp-'):
+                    yield row.name.replace('lrp-', '', 1), row
+        elif resource_type == ovn_const.TYPE_FLOATINGIPS:
+            # TODO(dalvarez): remove this check once the minimum OVS
+            # required version contains the column (when OVS 2.8.2 is
+            # released).
+            if not self.is_col_present('NAT', 'external_ids'):
+                return
+            for row in self._tables['NAT'].rows.values():
+                fip_id = row.external_ids.get(ovn_const.OVN_FIP_EXT_ID_KEY)
+                if fip_id:
+                    yield fip_id, row
+        elif resource_type == ovn_const.TYPE_SUBNETS:
+            for row in self._tables['DHCP_Options'].rows.values():
+                external_ids = getattr(row, 'external_ids', {})
+                if (external_ids.get('subnet_id') and
+                        not external_ids.get('port_id')):
+                    yield external_ids['subnet_id'], row
+        else:
+            raise ovn_exc.UnknownResourceType(resource_type=resource_type)
+
+    def get_revision_numbers(self, resource_type):
+        """Return the revision numbers of the OVN objects of a resource type.
+
+        The objects are read from the local copy of the database, no
+        request is sent to the OVSDB server.
+
+        :param resource_type: The Neutron resource type, e.g.
+                              ovn_const.TYPE_PORTS.
+        :returns: A dictionary of Neutron resource UUID -> revision number
+                  of its OVN object (-1 if the object has no revision
+                  number).
+        """
+        return {
+            res_uuid: int(row.external_ids.get(
+                ovn_const.OVN_REV_NUM_EXT_ID_KEY, -1))
+            for res_uuid, row in self._get_revision_numbers_rows(
+                resource_type)}
+
     def get_address_sets(self):
         address_sets = {}
         for row in self._tables['Address_Set'].rows.values():
@@ -574,6 +672,9 @@ class OvsdbNbOvnIdl(nb_impl_idl.OvnNbApiIdlImpl, Backend):
         return cmd.DeleteNatIpFromLRPortPeerOptionsCommand(self, lport, nat_ip)
 
     def get_lswitch_port(self, lsp_name):
+        ports = self.lookup_by_index('Logical_Switch_Port', 'name', lsp_name)
+        if ports is not None:
+            return ports[0] if ports else None
         try:
             return self.lookup('Logical_Switch_Port', lsp_name)
         except idlutils.RowNotFound:
@@ -634,6 +735,9 @@ class OvsdbNbOvnIdl(nb_impl_idl.OvnNbApiIdlImpl, Backend):
 
     def get_address_set(self, addrset_id, ip_version='ip4'):
         addr_name = utils.ovn_addrset_name(addrset_id, ip_version)
+        rows = self.lookup_by_index('Address_Set', 'name', addr_name)
+        if rows is not None:
+            return rows[0] if rows else None
         try:
             return idlutils.row_by_value(self.idl, 'Address_Set',
                                          'name', addr_name)
@@ -673,6 +777,10 @@ class OvsdbNbOvnIdl(nb_impl_idl.OvnNbApiIdlImpl, Backend):
         if uuidutils.is_uuid_like(pg_name):
             pg_name = utils.ovn_port_group_name(pg_name)
 
+        rows = self.lookup_by_index('Port_Group', 'name', pg_name)
+        if rows is not None:
+            return rows[0] if rows else None
+
         for pg in self._tables['Port_Group'].rows.values():
             if pg.name == pg_name:
                 return pg
@@ -762,14 +870,14 @@ class OvsdbSbOvnIdl(sb_impl_idl.OvnSbApiIdlImpl, Backend):
         """Return a list with the metadata networks the chassis is hosting."""
         chassis = self.lookup('Chassis', chassis_name)
         proxy_networks = chassis.external_ids.get(
-            'neutron-metadata-proxy-networks', None)
+            ovn_const.OVN_AGENT_METADATA_NETWORKS_KEY, None)
         return proxy_networks.split(',') if proxy_networks else []
 
     def set_chassis_metadata_networks(self, chassis, networks):
         nets = ','.join(networks) if networks else ''
         # TODO(twilson) This could just use DbSetCommand
         return cmd.UpdateChassisExtIdsCommand(
-            self, chassis, {'neutron-metadata-proxy-networks': nets},
+            self, chassis, {ovn_const.OVN_AGENT_METADATA_NETWORKS_KEY: nets},
             if_exists=True)
 
     def set_chassis_neutron_description(self, chassis, description,
@@ -781,6 +889,10 @@ class OvsdbSbOvnIdl(sb_impl_idl.OvnSbApiIdlImpl, Backend):
             self, chassis, {desc_key: description}, if_exists=False)
 
     def get_network_port_bindings_by_ip(self, network, ip_address):
+        rows = self.lookup_by_index('Port_Binding', 'datapath_ip',
+                                    (network, ip_address))
+        if rows is not None:
+            return rows
         rows = self.db_list_rows('Port_Binding').execute(check_error=True)
         # TODO(twilson) It would be useful to have a db_find that takes a
         # comparison function
@@ -802,11 +914,17 @@ class OvsdbSbOvnIdl(sb_impl_idl.OvnSbApiIdlImpl, Backend):
     def get_ports_on_chassis(self, chassis):
         # TODO(twilson) Some day it would be nice to stop passing names around
         # and just start using chassis objects so db_find_rows could be used
+        rows = self.lookup_by_index('Port_Binding', 'chassis', chassis)
+        if rows is not None:
+            return rows
         rows = self.db_list_rows('Port_Binding').execute(check_error=True)
         return [r for r in rows if r.chassis and r.chassis[0].name == chassis]
 
     def get_logical_port_chassis_and_datapath(self, name):
-        for port in self._tables['Port_Binding'].rows.values():
+        ports = self.lookup_by_index('Port_Binding', 'logical_port', name)
+        if ports is None:
+            ports = self._tables['Port_Binding'].rows.values()
+        for port in ports:
             if port.logical_port == name:
                 datapath = str(port.datapath.uuid)
                 chassis = port.chassis[0].name if port.chassis else None
@@ -0,0 +1,331 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import threading
+
+from ovs.db import idl as ovs_idl
+
+from networking_ovn.common import constants as ovn_const
+
+
+def _name_key(row):
+    return [row.name]
+
+
+def _acl_sg_rule_lport_key(row):
+    # Without Port Groups, the ACLs of a security group rule are created
+    # for each port of its security group.
+    rule_id = row.external_ids.get(ovn_const.OVN_SG_RULE_EXT_ID_KEY)
+    lport = row.external_ids.get('neutron:lport')
+    if not (rule_id and lport):
+        return []
+    return [(rule_id, lport)]
+
+
+def _gateway_chassis_load_key(row):
+    # Gateway_Chassis rows are named "<router port name>_<chassis name>"
+    # by networking-ovn, only the gateways of the neutron routers count.
+    if not row.name.startswith('lrp-'):
+        return []
+    return [(row.chassis_name, row.priority)]
+
+
+def _lrp_gateway_chassis_load_key(row):
+    # Old schemas without Gateway_Chassis bind the gateway router ports
+    # through the options column of the Logical_Router_Port, with no
+    # priority.
+    if not row.name.startswith('lrp-'):
+        return []
+    chassis = row.options.get(ovn_const.OVN_GATEWAY_CHASSIS_KEY)
+    return [(chassis, 0)] if chassis else []
+
+
+def _load_balancer_pool_key(row):
+    # The pools of the Octavia OVN provider are stored as "pool_<ID>" keys,
+    # suffixed with ":D" when disabled, of the external_ids of their load
+    # balancer.
+    return [key for key in row.external_ids if key.startswith('pool_')]
+
+
+def _logical_router_port_uuid_key(row):
+    # A router port is inserted along with the update of the ports of its
+    # router, but the IDL may notify the router before the row of the new
+    # port exists, leaving the port out of row.ports. The UUIDs of the
+    # ports are taken from the raw data of the row instead.
+    return row._data['ports'].to_python(lambda value, base: value)
+
+
+def _port_binding_chassis_key(row):
+    return [row.chassis[0].name] if row.chassis else []
+
+
+def _port_binding_datapath_ip_key(row):
+    if not row.mac:
+        return []
+    datapath = str(row.datapath.uuid)
+    # The first entry of the mac column has the format "<mac> <ip1> ...",
+    # index every token to keep the same semantics as a full table scan.
+    return [(datapath, addr) for addr in row.mac[0].split(' ')]
+
+
+def _port_binding_logical_port_key(row):
+    return [row.logical_port]
+
+
+# List of (table, index name, key function) tuples. An index is only
+# created if its table is registered in the IDL the indexes are attached
+# to, so the same list can be used for both the NB and SB databases.
+DEFAULT_INDEXES = (
+    # OVN_Northbound
+    ('ACL', 'sg_rule_lport', _acl_sg_rule_lport_key),
+    ('Port_Group', 'name', _name_key),
+    ('Address_Set', 'name', _name_key),
+    ('Gateway_Chassis', 'name', _name_key),
+    ('Logical_Router_Port', 'name', _name_key),
+    ('Logical_Switch_Port', 'name', _name_key),
+    # OVN_Southbound
+    ('Port_Binding', 'chassis', _port_binding_chassis_key),
+    ('Port_Binding', 'datapath_ip', _port_binding_datapath_ip_key),
+    ('Port_Binding', 'logical_port', _port_binding_logical_port_key),
+)
+
+# Indexes of the OVN_Northbound IDL of the Octavia OVN provider driver
+OCTAVIA_PROVIDER_INDEXES = (
+    ('Load_Balancer', 'name', _name_key),
+    ('Load_Balancer', 'pool_key', _load_balancer_pool_key),
+    ('Logical_Router', 'port_uuid', _logical_router_port_uuid_key),
+    ('Logical_Router_Port', 'name', _name_key),
+)
+
+
+class RowIndex(object):
+    """An in-memory secondary index over the rows of an IDL table.
+
+    The index maps the keys returned by ``key_func(row)`` to the UUIDs of
+    the rows holding them. A key function may return more than one key for
+    a row (e.g. one per IP address of a Port_Binding).
+    """
+
+    def __init__(self, table, key_func):
+        self.table = table
+        self.key_func = key_func
+        self._uuids_by_key = collections.defaultdict(set)
+        self._keys_by_uuid = {}
+
+    def __len__(self):
+        return len(self._keys_by_uuid)
+
+    def _get_keys(self, row):
+        try:
+            return frozenset(self.key_func(row))
+        except (AttributeError, IndexError, KeyError, TypeError):
+            # The row may not have all its columns populated yet, there
+            # is nothing to index until the next update arrives.
+            return frozenset()
+
+    def add(self, row):
+        self.remove(row.uuid)
+        keys = self._get_keys(row)
+        if not keys:
+            return
+        self._keys_by_uuid[row.uuid] = keys
+        for key in keys:
+            self._uuids_by_key[key].add(row.uuid)
+
+    def remove(self, row_uuid):
+        for key in self._keys_by_uuid.pop(row_uuid, ()):
+            uuids = self._uuids_by_key.get(key)
+            if uuids is None:
+                continue
+            uuids.discard(row_uuid)
+            if not uuids:
+                del self._uuids_by_key[key]
+
+    def clear(self):
+        self._uuids_by_key.clear()
+        self._keys_by_uuid.clear()
+
+    def lookup(self, rows, key):
+        """Return the rows matching key.
+
+        :param rows: The ``rows`` dictionary of the indexed IDL table.
+        :param key: The key to look for.
+
+        Each candidate is validated against the current contents of the
+        table, the python IDL drops its rows on reconnection without
+        notifying deletions so the index may hold stale entries which
+        are fixed up here.
+        """
+        result = []
+        for row_uuid in list(self._uuids_by_key.get(key, ())):
+            row = rows.get(row_uuid)
+            if row is None:
+                self.remove(row_uuid)
+                continue
+            if key not in self._get_keys(row):
+                self.add(row)
+                continue
+            result.append(row)
+        return result
+
+
+class GatewayLoadIndex(RowIndex):
+    """The number of gateway router ports hosted by each chassis.
+
+    The rows binding a gateway router port to a chassis are indexed by
+    (chassis name, priority), and the priorities used on each chassis are
+    tracked so the load of a chassis can be computed without walking the
+    Logical_Router_Port table.
+    """
+
+    def __init__(self, table, key_func):
+        super(GatewayLoadIndex, self).__init__(table, key_func)
+        self._prios_by_chassis = collections.defaultdict(set)
+
+    def add(self, row):
+        super(GatewayLoadIndex, self).add(row)
+        for chassis, prio in self._keys_by_uuid.get(row.uuid, ()):
+            self._prios_by_chassis[chassis].add(prio)
+
+    def remove(self, row_uuid):
+        keys = self._keys_by_uuid.get(row_uuid, ())
+        super(GatewayLoadIndex, self).remove(row_uuid)
+        for chassis, prio in keys:
+            if (chassis, prio) in self._uuids_by_key:
+                continue
+            prios = self._prios_by_chassis.get(chassis)
+            if prios is None:
+                continue
+            prios.discard(prio)
+            if not prios:
+                del self._prios_by_chassis[chassis]
+
+    def clear(self):
+        super(GatewayLoadIndex, self).clear()
+        self._prios_by_chassis.clear()
+
+    def get_load(self, rows, chassis_list=None):
+        """Return the load of the chassis.
+
+        :param rows: The ``rows`` dictionary of the indexed IDL table.
+        :param chassis_list: The chassis to return the load of, all the
+                             chassis hosting gateways if not set.
+        :returns: A {chassis name: {priority: number of gateway ports}}
+                  dictionary. The chassis of chassis_list hosting no
+                  gateway are returned with an empty load.
+        """
+        load = {}
+        if chassis_list:
+            for chassis in chassis_list:
+                load[chassis] = {}
+        else:
+            chassis_list = list(self._prios_by_chassis)
+        for chassis in chassis_list:
+            for prio in list(self._prios_by_chassis.get(chassis, ())):
+                # Drop the stale rows, see RowIndex.lookup()
+                count = 0
+                for row_uuid in list(self._uuids_by_key.get((chassis, prio),
+                                                            ())):
+                    if row_uuid in rows:
+                        count += 1
+                    else:
+                        self.remove(row_uuid)
+                if count:
+                    load.setdefault(chassis, {})[prio] = count
+        return load
+
+
+def lookup_by_index(idl, table, index, key):
+    """Look up rows using a secondary index of an IDL.
+
+    Return the list of matching rows or None if the IDL does not maintain
+    such index, in which case the caller should fall back to scanning the
+    table.
+    """
+    idl_indexes = getattr(idl, 'indexes', None)
+    if (not isinstance(idl_indexes, IdlIndexes) or
+            not idl_indexes.has_index(table, index)):
+        return None
+    return idl_indexes.lookup(table, index, key)
+
+
+class IdlIndexes(object):
+    """Secondary indexes kept current by the notifications of an IDL.
+
+    The lookups fix up the stale entries of the indexes, they may be run
+    from several threads along with the notifications of the IDL thread,
+    the indexes are guarded by a lock.
+    """
+
+    def __init__(self, idl, indexes=DEFAULT_INDEXES, gateway_load=True):
+        self.idl = idl
+        self._lock = threading.Lock()
+        self._indexes = {}
+        self._by_table = collections.defaultdict(list)
+        for table, name, key_func in indexes:
+            self.register(table, name, key_func)
+        if not gateway_load:
+            return
+        if 'Gateway_Chassis' in self.idl.tables:
+            self.register('Gateway_Chassis', 'gateway_load',
+                          _gateway_chassis_load_key, GatewayLoadIndex)
+        else:
+            self.register('Logical_Router_Port', 'gateway_load',
+                          _lrp_gateway_chassis_load_key, GatewayLoadIndex)
+
+    def register(self, table, name, key_func, index_cls=RowIndex):
+        """Register an index named name over table.
+
+        The index is not created if the table is not monitored by the IDL.
+        Existing rows are indexed right away.
+        """
+        if table not in self.idl.tables:
+            return
+        index = index_cls(table, key_func)
+        with self._lock:
+            for row in list(self.idl.tables[table].rows.values()):
+                index.add(row)
+            self._indexes[(table, name)] = index
+            self._by_table[table].append(index)
+
+    def has_index(self, table, name):
+        return (table, name) in self._indexes
+
+    def get_index(self, table, name):
+        return self._indexes.get((table, name))
+
+    def notify(self, event, row):
+        with self._lock:
+            for index in self._by_table.get(row._table.name, ()):
+                if event == ovs_idl.ROW_DELETE:
+                    index.remove(row.uuid)
+                else:
+                    index.add(row)
+
+    def lookup(self, table, name, key):
+        """Return the list of rows of table whose index name matches key."""
+        index = self._indexes[(table, name)]
+        with self._lock:
+            return index.lookup(self.idl.tables[table].rows, key)
+
+    def get_gateway_load(self, chassis_list=None):
+        """Return the load of the chassis, see GatewayLoadIndex.get_load().
+
+        Return None if the gateway load is not indexed.
+        """
+        for table in ('Gateway_Chassis', 'Logical_Router_Port'):
+            index = self._indexes.get((table, 'gateway_load'))
+            if index is not None:
+                with self._lock:
+                    return index.get_load(self.idl.tables[table].rows,
+                                          chassis_list)
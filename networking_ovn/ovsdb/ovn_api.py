@@ -67,6 +67,23 @@ class API(api.API):
         :returns:             :class:`Command` with no result
         """
 
+    @abc.abstractmethod
+    def set_lswitch_port_qos_options(self, lport_name, qos_options,
+                                     if_exists=True):
+        """Create a command to set the QoS options of a logical switch port
+
+        The other options of the port are left untouched.
+
+        :param lport_name:    The name of the lport
+        :type lport_name:     string
+        :param qos_options:   The QoS options of the port, the QoS options
+                              not in this dictionary are removed
+        :type qos_options:    dictionary
+        :param if_exists:     Do not fail if lport does not exist
+        :type if_exists:      bool
+        :returns:             :class:`Command` with no result
+        """
+
     @abc.abstractmethod
     def delete_lswitch_port(self, lport_name=None, lswitch_name=None,
                             ext_id=None, if_exists=True):
@@ -332,6 +349,16 @@ class API(api.API):
         :returns:                       {} of chassis to routers mapping
         """
 
+    @abc.abstractmethod
+    def get_chassis_gateway_load(self, chassis_candidate_list=None):
+        """Return the number of gateways hosted by each chassis
+
+        :param chassis_candidate_list:  List of possible chassis candidates
+        :type chassis_candidate_list:   []
+        :returns:                       {} of chassis to {priority: number
+                                        of gateways} mapping
+        """
+
     @abc.abstractmethod
     def get_gateway_chassis_binding(self, gateway_id):
         """Return the list of chassis to which the gateway is bound to
@@ -12,6 +12,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import threading
+
 from neutron.common import config
 from neutron_lib.plugins import constants
 from neutron_lib.plugins import directory
@@ -28,11 +31,16 @@ from networking_ovn.agent import stats
 from networking_ovn.common import config as ovn_config
 from networking_ovn.common import constants as ovn_const
 from networking_ovn.common import utils
+from networking_ovn.ovsdb import indexes
 
 LOG = log.getLogger(__name__)
 
 
 class ChassisAgentEvent(row_event.RowEvent):
+
+    # The Chassis columns the description of the agents is built from
+    AGENT_COLUMNS = ('name', 'hostname', 'external_ids')
+
     def __init__(self):
         table = 'Chassis'
         events = (self.ROW_CREATE, self.ROW_UPDATE, self.ROW_DELETE)
@@ -42,6 +50,9 @@ class ChassisAgentEvent(row_event.RowEvent):
     def run(self, event, row, old):
         if event != self.ROW_DELETE:
             stats.AgentStats.add_stat(row.uuid, row.nb_cfg)
+            if event == self.ROW_CREATE or any(
+                    hasattr(old, column) for column in self.AGENT_COLUMNS):
+                stats.AgentCache.update(row)
 
             # Update the metadata agent stats
             metadata_nb_cfg = row.external_ids.get(
@@ -60,10 +71,27 @@ class ChassisAgentEvent(row_event.RowEvent):
         else:
             stats.AgentStats.del_agent(row.uuid)
             stats.AgentStats.del_agent(utils.ovn_metadata_name(row.uuid))
+            stats.AgentCache.delete(row.uuid)
 
 
 class ChassisEvent(row_event.RowEvent):
-    """Chassis create update delete event."""
+    """Chassis create update delete event.
+
+    Only the updates of the hostname and of the EXTERNAL_IDS_KEYS keys are
+    handled, the other ones (e.g. the nb_cfg bumps done to ping the agents)
+    are filtered out. The events are debounced: the segment host mappings
+    and the gateways of all the events received within DEBOUNCE_DELAY
+    seconds are updated by a single pass.
+
+    The ``counters`` attribute holds the number of events filtered out,
+    the number of events that started a pass and the number of events
+    coalesced into a pending pass.
+    """
+
+    # The Chassis external_ids keys the segment host mappings and the
+    # scheduling of the gateways depend on
+    EXTERNAL_IDS_KEYS = ('ovn-bridge-mappings', 'ovn-cms-options')
+    DEBOUNCE_DELAY = 1  # seconds
 
     def __init__(self, driver):
         self.driver = driver
@@ -72,6 +100,29 @@ class ChassisEvent(row_event.RowEvent):
         events = (self.ROW_CREATE, self.ROW_UPDATE, self.ROW_DELETE)
         super(ChassisEvent, self).__init__(events, table, None)
         self.event_name = 'ChassisEvent'
+        self.counters = collections.Counter()
+        self._lock = threading.Lock()
+        # Host -> physical networks whose segment host mapping is pending
+        self._pending_hosts = {}
+        self._timer = None
+
+    def _is_relevant_update(self, row, old):
+        if hasattr(old, 'hostname'):
+            return True
+        old_external_ids = getattr(old, 'external_ids', None)
+        if old_external_ids is None:
+            return False
+        return any(row.external_ids.get(key) != old_external_ids.get(key)
+                   for key in self.EXTERNAL_IDS_KEYS)
+
+    def matches(self, event, row, old=None):
+        if not super(ChassisEvent, self).matches(event, row, old):
+            return False
+        if event == self.ROW_UPDATE and not self._is_relevant_update(row,
+                                                                     old):
+            self.counters['filtered'] += 1
+            return False
+        return True
 
     def run(self, event, row, old):
         host = row.hostname
@@ -82,9 +133,80 @@ class ChassisEvent(row_event.RowEvent):
                                                   unique_values=False)
             phy_nets = list(mapping_dict)
 
-        self.driver.update_segment_host_mapping(host, phy_nets)
-        if utils.is_ovn_l3(self.l3_plugin):
-            self.l3_plugin.schedule_unhosted_gateways()
+        with self._lock:
+            self._pending_hosts[host] = phy_nets
+            if self._timer is not None:
+                self.counters['coalesced'] += 1
+                return
+            self.counters['processed'] += 1
+            self._timer = threading.Timer(self.DEBOUNCE_DELAY, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Handle the pending events."""
+        with self._lock:
+            self._timer = None
+            pending_hosts, self._pending_hosts = self._pending_hosts, {}
+        if not pending_hosts:
+            return
+
+        try:
+            for host, phy_nets in pending_hosts.items():
+                self.driver.update_segment_host_mapping(host, phy_nets)
+            if utils.is_ovn_l3(self.l3_plugin):
+                self.l3_plugin.schedule_unhosted_gateways()
+        except Exception:
+            LOG.exception("Failed to handle the Chassis events of hosts %s",
+                          list(pending_hosts))
+        LOG.debug("Chassis events: %(processed)d processed, %(coalesced)d "
+                  "coalesced, %(filtered)d filtered",
+                  {'processed': self.counters['processed'],
+                   'coalesced': self.counters['coalesced'],
+                   'filtered': self.counters['filtered']})
+
+
+class ChassisMetadataNetworksEvent(row_event.RowEvent):
+    """Chassis event - metadata networks of the chassis changed.
+
+    The metadata agent of a chassis lists in its external_ids the
+    networks it provides the metadata service for. The ports going up wait
+    for the metadata service of their network, see
+    OVNMechanismDriver._wait_for_metadata_provisioned_if_needed().
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        table = 'Chassis'
+        events = (self.ROW_CREATE, self.ROW_UPDATE)
+        super(ChassisMetadataNetworksEvent, self).__init__(
+            events, table, None)
+        self.event_name = 'ChassisMetadataNetworksEvent'
+
+    @staticmethod
+    def _get_networks(external_ids):
+        networks = external_ids.get(
+            ovn_const.OVN_AGENT_METADATA_NETWORKS_KEY)
+        return set(networks.split(',')) if networks else set()
+
+    def matches(self, event, row, old=None):
+        if not super(ChassisMetadataNetworksEvent, self).matches(
+                event, row, old):
+            return False
+        if event == self.ROW_UPDATE:
+            old_external_ids = getattr(old, 'external_ids', None)
+            return old_external_ids is not None and (
+                row.external_ids.get(ovn_const.OVN_AGENT_METADATA_NETWORKS_KEY)
+                != old_external_ids.get(
+                    ovn_const.OVN_AGENT_METADATA_NETWORKS_KEY))
+        return True
+
+    def run(self, event, row, old):
+        networks = self._get_networks(row.external_ids)
+        if event == self.ROW_UPDATE:
+            networks -= self._get_networks(old.external_ids)
+        if networks:
+            self.driver.notify_metadata_networks(row.name, networks)
 
 
 class PortBindingChassisEvent(row_event.RowEvent):
@@ -137,7 +259,7 @@ class LogicalSwitchPortCreateUpEvent(row_event.RowEvent):
         self.event_name = 'LogicalSwitchPortCreateUpEvent'
 
     def run(self, event, row, old):
-        self.driver.set_port_status_up(row.name)
+        self.driver.queue_port_status(row.name, True)
 
 
 class LogicalSwitchPortCreateDownEvent(row_event.RowEvent):
@@ -156,7 +278,7 @@ class LogicalSwitchPortCreateDownEvent(row_event.RowEvent):
         self.event_name = 'LogicalSwitchPortCreateDownEvent'
 
     def run(self, event, row, old):
-        self.driver.set_port_status_down(row.name)
+        self.driver.queue_port_status(row.name, False)
 
 
 class LogicalSwitchPortUpdateUpEvent(row_event.RowEvent):
@@ -176,7 +298,7 @@ class LogicalSwitchPortUpdateUpEvent(row_event.RowEvent):
         self.event_name = 'LogicalSwitchPortUpdateUpEvent'
 
     def run(self, event, row, old):
-        self.driver.set_port_status_up(row.name)
+        self.driver.queue_port_status(row.name, True)
 
 
 class LogicalSwitchPortUpdateDownEvent(row_event.RowEvent):
@@ -196,7 +318,7 @@ class LogicalSwitchPortUpdateDownEvent(row_event.RowEvent):
         self.event_name = 'LogicalSwitchPortUpdateDownEvent'
 
     def run(self, event, row, old):
-        self.driver.set_port_status_down(row.name)
+        self.driver.queue_port_status(row.name, False)
 
 
 class OvnDbNotifyHandler(event.RowEventHandler):
@@ -206,6 +328,10 @@ class OvnDbNotifyHandler(event.RowEventHandler):
 
 
 class BaseOvnIdl(connection.OvsdbIdl):
+    def __init__(self, remote, schema):
+        super(BaseOvnIdl, self).__init__(remote, schema)
+        self.indexes = indexes.IdlIndexes(self)
+
     @classmethod
     def from_server(cls, connection_string, schema_name):
         _check_and_set_ssl_files(schema_name)
@@ -213,10 +339,14 @@ class BaseOvnIdl(connection.OvsdbIdl):
         helper.register_all()
         return cls(connection_string, helper)
 
+    def notify(self, event, row, updates=None):
+        self.indexes.notify(event, row)
+
 
 class BaseOvnSbIdl(connection.OvsdbIdl):
     def __init__(self, remote, schema):
         super(BaseOvnSbIdl, self).__init__(remote, schema)
+        self.indexes = indexes.IdlIndexes(self)
         self.notify_handler = event.RowEventHandler()
         self.notify_handler.watch_event(ChassisAgentEvent())
 
@@ -231,6 +361,7 @@ class BaseOvnSbIdl(connection.OvsdbIdl):
         return cls(connection_string, helper)
 
     def notify(self, event, row, updates=None):
+        self.indexes.notify(event, row)
         self.notify_handler.notify(event, row, updates)
 
 
@@ -260,6 +391,9 @@ class OvnIdl(BaseOvnIdl):
         self.event_lock_name = "neutron_ovn_event_lock"
 
     def notify(self, event, row, updates=None):
+        # The indexes must be kept current regardless of the event lock,
+        # they are used by the API calls of every neutron server.
+        self.indexes.notify(event, row)
         # Do not handle the notification if the event lock is requested,
         # but not granted by the ovsdb-server.
         if self.is_lock_contended:
@@ -315,6 +449,19 @@ class OvnNbIdl(OvnIdl):
 
 class OvnSbIdl(OvnIdl):
 
+    def __init__(self, driver, remote, schema):
+        super(OvnSbIdl, self).__init__(driver, remote, schema)
+        self._metadata_networks_event = ChassisMetadataNetworksEvent(driver)
+
+    def notify(self, event, row, updates=None):
+        # The ports going up are handled by the neutron server holding the
+        # NB event lock, which may not hold the SB one: the waits for the
+        # metadata service must be woken up regardless of the lock. This is
+        # cheap enough to be done in the IDL thread.
+        if self._metadata_networks_event.matches(event, row, updates):
+            self._metadata_networks_event.run(event, row, updates)
+        super(OvnSbIdl, self).notify(event, row, updates)
+
     @classmethod
     def from_server(cls, connection_string, schema_name, driver):
         _check_and_set_ssl_files(schema_name)
@@ -43,16 +43,26 @@ class TestOctaviaOvnProviderDriver(base.TestOVNFunctionalBase):
         o_utils.get_network_driver = mock.MagicMock()
         o_utils.get_network_driver.return_value = self.fake_network_driver
         self.fake_network_driver.get_subnet = self._mock_get_subnet
+        self.fake_network_driver.get_network = self._mock_get_network
         self.fake_network_driver.neutron_client.list_ports = (
             self._mock_list_ports)
         self._local_net_cache = {}
+        self._local_cidr_cache = {}
         self._local_port_cache = {'ports': []}
 
     def _mock_get_subnet(self, subnet_id):
         m_subnet = mock.MagicMock()
         m_subnet.network_id = self._local_net_cache[subnet_id]
+        m_subnet.cidr = self._local_cidr_cache[subnet_id]
         return m_subnet
 
+    def _mock_get_network(self, network_id):
+        m_network = mock.MagicMock()
+        m_network.subnets = [
+            subnet_id for subnet_id, net_id in self._local_net_cache.items()
+            if net_id == network_id]
+        return m_network
+
     def _mock_list_ports(self, **kwargs):
         return self._local_port_cache
 
@@ -168,6 +178,7 @@ class TestOctaviaOvnProviderDriver(base.TestOVNFunctionalBase):
                                   cidr)
         subnet = self.deserialize(self.fmt, res)['subnet']
         self._local_net_cache[subnet['id']] = n1['network']['id']
+        self._local_cidr_cache[subnet['id']] = cidr
 
         port = self._make_port(self.fmt, n1['network']['id'])
         if router_id:
@@ -323,10 +334,10 @@ class TestOctaviaOvnProviderDriver(base.TestOVNFunctionalBase):
         for p in lb_data.get('pools', []):
             p_members = ""
             for m in p.members:
-                if not m.admin_state_up:
-                    continue
                 m_info = 'member_' + m.member_id + '_' + m.address
                 m_info += ":" + str(m.protocol_port)
+                if not m.admin_state_up:
+                    m_info += ':D'
                 if p_members:
                     p_members += "," + m_info
                 else:
@@ -354,8 +365,9 @@ class TestOctaviaOvnProviderDriver(base.TestOVNFunctionalBase):
                 vip_k = lb_data['model'].vip_address + ":" + str(
                     l.protocol_port)
                 if not isinstance(l.default_pool_id,
-                                  octavia_data_model.UnsetType) and pool_info[
-                                      l.default_pool_id]:
+                                  octavia_data_model.UnsetType) and (
+                                      self._extract_member_info(pool_info[
+                                          l.default_pool_id])):
                     expected_vips[vip_k] = self._extract_member_info(
                         pool_info[l.default_pool_id])
             else:
@@ -378,6 +390,8 @@ class TestOctaviaOvnProviderDriver(base.TestOVNFunctionalBase):
         mem_info = ''
         if member:
             for item in member.split(','):
+                if item.endswith(':D'):
+                    continue
                 mem_info += item.split('_')[2] + ","
         return mem_info[:-1]
 
@@ -458,8 +472,10 @@ class TestOctaviaOvnProviderDriver(base.TestOVNFunctionalBase):
                  'loadbalancers': [{"id": p.loadbalancer_id,
                                     "provisioning_status": "ACTIVE"}],
                  'listeners': []})
-            self._update_ls_refs(
-                lb_data, self._local_net_cache[m.subnet_id], add_ref=False)
+            if m.admin_state_up:
+                self._update_ls_refs(
+                    lb_data, self._local_net_cache[m.subnet_id],
+                    add_ref=False)
 
         pool_dict = {
             'pools': [{'id': p.pool_id,
@@ -527,10 +543,17 @@ class TestOctaviaOvnProviderDriver(base.TestOVNFunctionalBase):
             if m.address == member_address:
                 return m
 
-    def _update_member_and_validate(self, lb_data, pool_id, member_address):
+    def _update_member_and_validate(self, lb_data, pool_id, member_address,
+                                    admin_state_up=None):
         pool = self._get_pool_from_lb_data(lb_data, pool_id=pool_id)
 
         member = self._get_pool_member(pool, member_address)
+        if (admin_state_up is not None and
+                admin_state_up != member.admin_state_up):
+            member.admin_state_up = admin_state_up
+            self._update_ls_refs(
+                lb_data, self._local_net_cache[member.subnet_id],
+                add_ref=admin_state_up)
         self._o_driver_lib.update_loadbalancer_status.reset_mock()
         self.ovn_driver.member_update(member, member)
         expected_status = {
@@ -538,7 +561,9 @@ class TestOctaviaOvnProviderDriver(base.TestOVNFunctionalBase):
                        'provisioning_status': 'ACTIVE'}],
             'members': [{"id": member.member_id,
                          'provisioning_status': 'ACTIVE',
-                         'operating_status': 'ONLINE'}],
+                         'operating_status': ('ONLINE'
+                                              if member.admin_state_up
+                                              else 'OFFLINE')}],
             'loadbalancers': [{'id': pool.loadbalancer_id,
                                'provisioning_status': 'ACTIVE'}],
             'listeners': []
@@ -546,26 +571,46 @@ class TestOctaviaOvnProviderDriver(base.TestOVNFunctionalBase):
         self._wait_for_status_and_validate(lb_data, [expected_status])
 
     def _update_members_in_batch_and_validate(self, lb_data, pool_id,
-                                              member_addresses):
+                                              members):
         pool = self._get_pool_from_lb_data(lb_data, pool_id=pool_id)
+        # Only the enabled members reference their Logical Switch
+        enabled_ids = [m.member_id for m in pool.members if m.admin_state_up]
+        member_ids = [m.member_id for m in members]
+        expected_members = []
+        for member in members:
+            if member.admin_state_up != (member.member_id in enabled_ids):
+                self._update_ls_refs(
+                    lb_data, self._local_net_cache[member.subnet_id],
+                    add_ref=member.admin_state_up)
+            expected_members.append(
+                {'id': member.member_id,
+                 'provisioning_status': 'ACTIVE',
+                 'operating_status': ('ONLINE' if member.admin_state_up
+                                      else 'OFFLINE')})
+        for member in pool.members:
+            if member.member_id not in member_ids:
+                if member.admin_state_up:
+                    self._update_ls_refs(
+                        lb_data, self._local_net_cache[member.subnet_id],
+                        add_ref=False)
+                expected_members.append(
+                    {'id': member.member_id,
+                     'provisioning_status': 'DELETED'})
+        pool.members = members
 
-        members = []
-        expected_status = []
-        for addr in member_addresses:
-            member = self._get_pool_member(pool, addr)
-            members.append(member)
-            expected_status.append(
-                {'pools': [{'id': pool.pool_id,
-                           'provisioning_status': 'ACTIVE'}],
-                 'members': [{'id': member.member_id,
-                              'provisioning_status': 'ACTIVE',
-                              'operating_status': 'ONLINE'}],
-                 'loadbalancers': [{'id': pool.loadbalancer_id,
-                                   'provisioning_status': 'ACTIVE'}],
-                 'listeners': []})
+        pool_listeners = self._get_pool_listeners(lb_data, pool_id)
+        expected_status = {
+            'pools': [{'id': pool.pool_id,
+                       'provisioning_status': 'ACTIVE'}],
+            'members': expected_members,
+            'loadbalancers': [{'id': pool.loadbalancer_id,
+                               'provisioning_status': 'ACTIVE'}],
+            'listeners': [{'id': l.listener_id,
+                           'provisioning_status': 'ACTIVE'}
+                          for l in pool_listeners]}
         self._o_driver_lib.update_loadbalancer_status.reset_mock()
         self.ovn_driver.member_batch_update(members)
-        self._wait_for_status_and_validate(lb_data, expected_status)
+        self._wait_for_status_and_validate(lb_data, [expected_status])
 
     def _delete_member_and_validate(self, lb_data, pool_id, network_id,
                                     member_address):
@@ -583,7 +628,9 @@ class TestOctaviaOvnProviderDriver(base.TestOVNFunctionalBase):
                                "provisioning_status": "ACTIVE"}],
             'listeners': []}
 
-        self._update_ls_refs(lb_data, network_id, add_ref=False)
+        # A disabled member does not reference its Logical Switch
+        if member.admin_state_up:
+            self._update_ls_refs(lb_data, network_id, add_ref=False)
         self._wait_for_status_and_validate(lb_data, [expected_status])
 
     def _create_listener_and_validate(self, lb_data, pool_id=None,
@@ -709,8 +756,9 @@ class TestOctaviaOvnProviderDriver(base.TestOVNFunctionalBase):
         self._update_load_balancer_and_validate(lb_data,
                                                 admin_state_up=True)
         # Test member_batch_update
+        pool = self._get_pool_from_lb_data(lb_data, pool_id=pool_id)
         self._update_members_in_batch_and_validate(lb_data, pool_id,
-                                                   ['10.0.0.10', '10.0.0.11'])
+                                                   list(pool.members))
 
         self._delete_member_and_validate(lb_data, pool_id,
                                          lb_data['vip_net_info'][0],
@@ -747,6 +795,94 @@ class TestOctaviaOvnProviderDriver(base.TestOVNFunctionalBase):
         self._delete_pool_and_validate(lb_data, "p1")
         self._delete_load_balancer_and_validate(lb_data)
 
+    def test_member_batch_update(self):
+        lb_data = self._create_load_balancer_and_validate(
+            {'vip_network': 'vip_network',
+             'cidr': '10.0.0.0/24'})
+        self._create_pool_and_validate(lb_data, "p1")
+        pool_id = lb_data['pools'][0].pool_id
+        for address in ('10.0.0.10', '10.0.0.11', '10.0.0.12'):
+            self._create_member_and_validate(
+                lb_data, pool_id, lb_data['vip_net_info'][1],
+                lb_data['vip_net_info'][0], address)
+        net20_info = self._create_net('net20', '20.0.0.0/24')
+        pool = self._get_pool_from_lb_data(lb_data, pool_id=pool_id)
+        # 10.0.0.11 and 10.0.0.12 are deleted, 20.0.0.4 and 20.0.0.6 are
+        # added
+        members = [self._get_pool_member(pool, '10.0.0.10'),
+                   self._create_member_model(pool_id, net20_info[1],
+                                             '20.0.0.4'),
+                   self._create_member_model(pool_id, net20_info[1],
+                                             '20.0.0.6')]
+        self._update_members_in_batch_and_validate(lb_data, pool_id,
+                                                   members)
+        self.assertTrue(self._is_lb_associated_to_ls(
+            lb_data['model'].loadbalancer_id, 'neutron-' + net20_info[0]))
+
+        # The members on net20 are deleted
+        self._update_members_in_batch_and_validate(lb_data, pool_id,
+                                                   members[:1])
+        self.assertFalse(self._is_lb_associated_to_ls(
+            lb_data['model'].loadbalancer_id, 'neutron-' + net20_info[0]))
+        self._delete_pool_and_validate(lb_data, "p1")
+        self._delete_load_balancer_and_validate(lb_data)
+
+    def test_member_batch_update_disabled_member(self):
+        lb_data = self._create_load_balancer_and_validate(
+            {'vip_network': 'vip_network',
+             'cidr': '10.0.0.0/24'})
+        self._create_pool_and_validate(lb_data, "p1")
+        pool_id = lb_data['pools'][0].pool_id
+        for address in ('10.0.0.10', '10.0.0.11'):
+            self._create_member_and_validate(
+                lb_data, pool_id, lb_data['vip_net_info'][1],
+                lb_data['vip_net_info'][0], address)
+        # The disabled member is kept in the pool, out of the vips
+        self._update_member_and_validate(lb_data, pool_id, '10.0.0.11',
+                                         admin_state_up=False)
+        pool = self._get_pool_from_lb_data(lb_data, pool_id=pool_id)
+        # The disabled member is deleted by the batch and reported so
+        self._update_members_in_batch_and_validate(
+            lb_data, pool_id, [self._get_pool_member(pool, '10.0.0.10')])
+        self._delete_pool_and_validate(lb_data, "p1")
+        self._delete_load_balancer_and_validate(lb_data)
+
+    def test_member_requests_sharded_by_lb(self):
+        lb_data = self._create_load_balancer_and_validate(
+            {'vip_network': 'vip_network',
+             'cidr': '10.0.0.0/24'})
+        lb_id = lb_data['model'].loadbalancer_id
+        self._create_pool_and_validate(lb_data, "p1")
+        pool_id = lb_data['pools'][0].pool_id
+        helper = self.ovn_driver._ovn_helper
+        request = {'type': ovn_driver.REQ_TYPE_MEMBER_CREATE,
+                   'info': {'id': uuidutils.generate_uuid(),
+                            'pool_id': pool_id}}
+        self.assertEqual(lb_id, helper._get_request_lb_id(request))
+        # The load balancer of the pool is found in the NB DB after a
+        # restart of the driver
+        helper._pool_lbs.clear()
+        self.assertEqual(lb_id, helper._get_request_lb_id(request))
+        self.assertEqual({pool_id: lb_id}, helper._pool_lbs)
+        # The load balancer is found through the indexes of the NB IDL
+        self.assertEqual(
+            [lb_id], [lb.name for lb in helper._lookup_by_index(
+                'Load_Balancer', 'pool_key', 'pool_' + pool_id)])
+
+        self._create_member_and_validate(
+            lb_data, pool_id, lb_data['vip_net_info'][1],
+            lb_data['vip_net_info'][0], '10.0.0.10')
+        stats = helper.get_stats()
+        self.assertEqual(0, stats['queue_depth'])
+        self.assertEqual(
+            1, stats['%s_latency' % ovn_driver.REQ_TYPE_MEMBER_CREATE][
+                'count'])
+        self.assertEqual(3, stats['%s_latency' % ovn_driver.QUEUE_LATENCY][
+            'count'])
+        self._delete_pool_and_validate(lb_data, "p1")
+        self.assertNotIn(pool_id, helper._pool_lbs)
+        self._delete_load_balancer_and_validate(lb_data)
+
     def test_listener(self):
         lb_data = self._create_load_balancer_and_validate(
             {'vip_network': 'vip_network',
@@ -14,6 +14,7 @@
 
 import collections
 
+import eventlet
 import mock
 from neutron.agent.linux import ip_lib
 from neutron.agent.linux.ip_lib import IpAddrCommand as ip_addr
@@ -139,6 +140,7 @@ class TestMetadataAgent(base.BaseTestCase):
                 mock.patch.object(self.agent.sb_idl, 'get_ports_on_chassis',
                                   return_value=ports):
             self.agent.update_datapath('1')
+            self.agent._provisioner.wait()
             pdp.assert_called_once_with('1')
             tdp.assert_not_called()
 
@@ -153,9 +155,170 @@ class TestMetadataAgent(base.BaseTestCase):
                 mock.patch.object(self.agent.sb_idl, 'get_ports_on_chassis',
                                   return_value=ports):
             self.agent.update_datapath('5')
+            self.agent._provisioner.wait()
             tdp.assert_called_once_with('5')
             pdp.assert_not_called()
 
+    def test_update_datapath_coalesced(self):
+        ports = [makePort(datapath=DatapathInfo(uuid='1'))]
+        with mock.patch.object(self.agent, 'provision_datapath',
+                               return_value=None) as pdp,\
+                mock.patch.object(self.agent, 'teardown_datapath') as tdp,\
+                mock.patch.object(self.agent.sb_idl, 'get_ports_on_chassis',
+                                  return_value=ports):
+            for _ in range(5):
+                self.agent.update_datapath('1')
+            self.agent.update_datapath('2')
+            self.agent._provisioner.wait()
+            self.assertEqual([mock.call('1')], pdp.call_args_list)
+            tdp.assert_called_once_with('2')
+            self.assertEqual(['1', '2'],
+                             sorted(self.agent._provisioner.latencies))
+
+    def test_update_datapath_while_provisioning(self):
+        calls = []
+
+        def provision(datapath):
+            calls.append(datapath)
+            if len(calls) == 1:
+                # The datapath is updated again while being provisioned
+                self.agent.update_datapath(datapath)
+                self.agent.update_datapath(datapath)
+                eventlet.sleep(0)
+
+        ports = [makePort(datapath=DatapathInfo(uuid='1'))]
+        with mock.patch.object(self.agent, 'provision_datapath',
+                               side_effect=provision),\
+                mock.patch.object(self.agent.sb_idl, 'get_ports_on_chassis',
+                                  return_value=ports):
+            self.agent.update_datapath('1')
+            self.agent._provisioner.wait()
+        self.assertEqual(['1', '1'], calls)
+
+    def test_update_datapath_once_provisioned(self):
+        provisioner = self.agent._provisioner
+        debug = agent.LOG.debug
+
+        def log_debug(msg, *args):
+            debug(msg, *args)
+            if msg.startswith('Datapath ') and len(pdp.call_args_list) == 1:
+                # The datapath is updated again right after being
+                # provisioned
+                self.agent.update_datapath('1')
+
+        ports = [makePort(datapath=DatapathInfo(uuid='1'))]
+        with mock.patch.object(self.agent, 'provision_datapath') as pdp, \
+                mock.patch.object(self.agent.sb_idl, 'get_ports_on_chassis',
+                                  return_value=ports), \
+                mock.patch.object(agent.LOG, 'debug', side_effect=log_debug), \
+                mock.patch.object(provisioner, '_run',
+                                  wraps=provisioner._run) as run:
+            self.agent.update_datapath('1')
+            provisioner.wait()
+        self.assertEqual([mock.call('1'), mock.call('1')],
+                         pdp.call_args_list)
+        self.assertEqual(2, run.call_count)
+
+    def test_ensure_all_networks_provisioned_concurrently(self):
+        self.fake_conf_fixture.config(metadata_provisioning_workers=2)
+        self.agent = agent.MetadataAgent(self.fake_conf)
+        self.agent.sb_idl = mock.Mock()
+        self.agent.chassis = 'chassis'
+        running = []
+        max_running = []
+
+        def provision(datapath):
+            running.append(datapath)
+            max_running.append(len(running))
+            eventlet.sleep(0)
+            running.remove(datapath)
+            if datapath == '3':
+                raise RuntimeError()
+            return 'ovnmeta-' + datapath
+
+        ports = [makePort(datapath=DatapathInfo(uuid=str(i)))
+                 for i in range(4)]
+        with mock.patch.object(self.agent, 'provision_datapath',
+                               side_effect=provision),\
+                mock.patch.object(self.agent.sb_idl, 'get_ports_on_chassis',
+                                  return_value=ports):
+            namespaces = self.agent.ensure_all_networks_provisioned()
+
+        # The namespace of the datapath that failed is kept
+        self.assertEqual(['ovnmeta-%d' % i for i in range(4)],
+                         sorted(namespaces))
+        self.assertEqual(2, max(max_running))
+
+    def test_update_chassis_metadata_networks(self):
+        self.agent.sb_idl.get_chassis_metadata_networks.return_value = [
+            '3', '4']
+        with mock.patch.object(agent.eventlet, 'spawn_after') as spawn:
+            self.agent.update_chassis_metadata_networks('1')
+            self.agent.update_chassis_metadata_networks('2')
+            self.agent.update_chassis_metadata_networks('3', remove=True)
+            self.agent.update_chassis_metadata_networks('4')
+            # A single flush is scheduled for all the changes
+            spawn.assert_called_once_with(
+                agent.CHASSIS_METADATA_NETWORKS_FLUSH_DELAY,
+                self.agent._flush_chassis_metadata_networks_timer)
+            self.agent.sb_idl.set_chassis_metadata_networks.assert_not_called()
+
+            self.agent._flush_chassis_metadata_networks_timer()
+        get_networks = self.agent.sb_idl.get_chassis_metadata_networks
+        get_networks.assert_called_once_with('chassis')
+        set_networks = self.agent.sb_idl.set_chassis_metadata_networks
+        set_networks.assert_called_once_with(
+            'chassis', ['4', '1', '2'])
+
+    def test_update_chassis_metadata_networks_no_change(self):
+        self.agent.sb_idl.get_chassis_metadata_networks.return_value = ['1']
+        with mock.patch.object(agent.eventlet, 'spawn_after'):
+            self.agent.update_chassis_metadata_networks('1')
+            self.agent.update_chassis_metadata_networks('2', remove=True)
+            self.agent.flush_chassis_metadata_networks()
+        self.agent.sb_idl.set_chassis_metadata_networks.assert_not_called()
+
+    def test_update_chassis_metadata_networks_flush_failure(self):
+        self.agent.sb_idl.get_chassis_metadata_networks.side_effect = [
+            RuntimeError, []]
+        with mock.patch.object(agent.eventlet, 'spawn_after') as spawn:
+            self.agent.update_chassis_metadata_networks('1')
+            self.agent._flush_chassis_metadata_networks_timer()
+            # The flush is retried with the same changes
+            self.assertEqual(2, spawn.call_count)
+            self.agent._flush_chassis_metadata_networks_timer()
+        set_networks = self.agent.sb_idl.set_chassis_metadata_networks
+        set_networks.assert_called_once_with(
+            'chassis', ['1'])
+
+    def test_sync_updates_chassis_metadata_networks_once(self):
+        self.agent.sb_idl.get_chassis_metadata_networks.return_value = ['3']
+
+        def provision(datapath):
+            self.agent.update_chassis_metadata_networks(datapath)
+            return 'ovnmeta-' + datapath
+
+        def teardown(datapath):
+            self.agent.update_chassis_metadata_networks(datapath, remove=True)
+
+        ports = [makePort(datapath=DatapathInfo(uuid=str(i)))
+                 for i in range(3)]
+        with mock.patch.object(self.agent, 'provision_datapath',
+                               side_effect=provision),\
+                mock.patch.object(self.agent, 'teardown_datapath',
+                                  side_effect=teardown),\
+                mock.patch.object(ip_lib, 'list_network_namespaces',
+                                  return_value=['ovnmeta-3']),\
+                mock.patch.object(agent.eventlet, 'spawn_after') as spawn,\
+                mock.patch.object(self.agent.sb_idl,
+                                  'get_ports_on_chassis', return_value=ports):
+            self.agent.sync()
+
+        spawn.assert_not_called()
+        set_networks = self.agent.sb_idl.set_chassis_metadata_networks
+        set_networks.assert_called_once_with(
+            'chassis', ['0', '1', '2'])
+
     def test_teardown_datapath(self):
         """Test teardown datapath.
 
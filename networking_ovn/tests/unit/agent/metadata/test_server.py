@@ -26,7 +26,7 @@ import webob
 from networking_ovn.agent.metadata import server as agent
 from networking_ovn.conf.agent.metadata import config as meta_conf
 
-OvnPortInfo = collections.namedtuple('OvnPortInfo', 'external_ids')
+OvnPortInfo = collections.namedtuple('OvnPortInfo', 'uuid external_ids')
 
 
 class ConfFixture(config_fixture.Config):
@@ -54,7 +54,9 @@ class TestMetadataProxyHandler(base.BaseTestCase):
         self.log_p = mock.patch.object(agent, 'LOG')
         self.log = self.log_p.start()
         self.handler = agent.MetadataProxyHandler(self.fake_conf)
-        self.handler.sb_idl = mock.Mock()
+        self.pb_rows = {}
+        self.handler.sb_idl = mock.Mock(
+            tables={'Port_Binding': mock.Mock(rows=self.pb_rows)})
 
     def test_call(self):
         req = mock.Mock()
@@ -111,6 +113,7 @@ class TestMetadataProxyHandler(base.BaseTestCase):
         }
 
         ovn_port = OvnPortInfo(
+            uuid='port_uuid',
             external_ids={'neutron:device_id': 'device_id',
                           'neutron:project_id': 'project_id'})
         ports = [[ovn_port]]
@@ -134,6 +137,32 @@ class TestMetadataProxyHandler(base.BaseTestCase):
                                                             network='the_id')
         self.assertEqual(expected, observed)
 
+    def test_get_instance_id_cached(self):
+        req = mock.Mock(headers={'X-Forwarded-For': '192.168.1.1',
+                                 'X-OVN-Network-ID': 'the_id'})
+        ovn_port = OvnPortInfo(
+            uuid='port_uuid',
+            external_ids={'neutron:device_id': 'device_id',
+                          'neutron:project_id': 'project_id'})
+        self.pb_rows['port_uuid'] = ovn_port
+        get_ports = self.handler.sb_idl.get_network_port_bindings_by_ip
+        get_ports.return_value = [ovn_port]
+
+        for _ in range(3):
+            self.assertEqual(('device_id', 'project_id'),
+                             self.handler._get_instance_and_project_id(req))
+        get_ports.assert_called_once_with('the_id', '192.168.1.1')
+        self.assertEqual({'entries': 1, 'hits': 2, 'misses': 1},
+                         self.handler.instance_cache.stats())
+
+        # The row has been dropped from the IDL without notification
+        del self.pb_rows['port_uuid']
+        get_ports.return_value = []
+        self.assertEqual((None, None),
+                         self.handler._get_instance_and_project_id(req))
+        self.assertEqual(2, get_ports.call_count)
+        self.assertEqual(0, len(self.handler.instance_cache))
+
     def _proxy_request_test_helper(self, response_code=200, method='GET'):
         hdrs = {'X-Forwarded-For': '8.8.8.8'}
         body = 'body'
@@ -208,6 +237,71 @@ class TestMetadataProxyHandler(base.BaseTestCase):
         with testtools.ExpectedException(Exception):
             self._proxy_request_test_helper(302)
 
+    def _mock_http(self):
+        resp = mock.MagicMock(status=200)
+        resp.__getitem__.return_value = 'text/plain'
+        mock_http = mock.patch('httplib2.Http').start()
+        self.addCleanup(mock.patch.stopall)
+        mock_http.return_value.request.return_value = (resp, 'content')
+        return mock_http
+
+    def _proxy_requests(self, paths, method='GET'):
+        for path in paths:
+            req = mock.Mock(path_info=path, query_string='',
+                            headers={'X-Forwarded-For': '8.8.8.8'},
+                            method=method, body='')
+            response = self.handler._proxy_request('the_id', 'tenant_id',
+                                                   req)
+            self.assertEqual('content', response.body)
+
+    def test_proxy_request_connection_reused(self):
+        mock_http = self._mock_http()
+        self._proxy_requests(['/the_path'] * 3)
+        # The connection and its certificate are only set up once
+        mock_http.assert_called_once_with(
+            ca_certs=None, disable_ssl_certificate_validation=True)
+        mock_http.return_value.add_certificate.assert_called_once_with(
+            'nova_priv_key', 'nova_cert', '9.9.9.9:8775')
+        self.assertEqual(3, mock_http.return_value.request.call_count)
+
+    def test_proxy_request_cached(self):
+        self.fake_conf_fixture.config(nova_metadata_cache_ttl=10)
+        mock_http = self._mock_http()
+        with mock.patch.object(agent.timeutils, 'now') as mock_now:
+            mock_now.return_value = 100
+            self.handler = agent.MetadataProxyHandler(self.fake_conf)
+            self._proxy_requests(['/latest/meta-data/instance-id'] * 2 +
+                                 ['/openstack/', '/openstack'])
+            self.assertEqual(2, mock_http.return_value.request.call_count)
+
+            # The cached response expires after the TTL
+            mock_now.return_value = 111
+            self._proxy_requests(['/latest/meta-data/instance-id'])
+            self.assertEqual(3, mock_http.return_value.request.call_count)
+
+    def test_proxy_request_not_cached(self):
+        self.fake_conf_fixture.config(nova_metadata_cache_ttl=10)
+        mock_http = self._mock_http()
+        self.handler = agent.MetadataProxyHandler(self.fake_conf)
+        # The metadata which may change is never cached
+        self._proxy_requests(['/openstack/latest/meta_data.json',
+                              '/openstack/latest/meta_data.json',
+                              '/openstack/latest/password',
+                              '/openstack/latest/password',
+                              '/openstack/latest/meta-data/instance-id',
+                              '/openstack/latest/meta-data/instance-id',
+                              '/latest/meta-data/public-keys',
+                              '/latest/meta-data/public-keys'])
+        self.assertEqual(8, mock_http.return_value.request.call_count)
+
+    def test_proxy_request_cached_post(self):
+        self.fake_conf_fixture.config(nova_metadata_cache_ttl=10)
+        mock_http = self._mock_http()
+        self.handler = agent.MetadataProxyHandler(self.fake_conf)
+        self._proxy_requests(['/latest/meta-data/instance-id'] * 2,
+                             method='POST')
+        self.assertEqual(2, mock_http.return_value.request.call_count)
+
     def test_sign_instance_id(self):
         self.assertEqual(
             self.handler._sign_instance_id('foo'),
@@ -215,6 +309,45 @@ class TestMetadataProxyHandler(base.BaseTestCase):
         )
 
 
+class TestPortBindingCacheEvent(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestPortBindingCacheEvent, self).setUp()
+        self.cache = agent.InstanceInfoCache()
+        self.event = agent.PortBindingCacheEvent(self.cache)
+        self.row = mock.Mock(datapath=mock.Mock(uuid='dp1'),
+                             mac=['fa:16:3e:00:00:01 10.0.0.1 fd00::1'])
+        self.row._table = mock.Mock()
+        self.row._table.name = 'Port_Binding'
+        for ip in ('10.0.0.1', 'fd00::1'):
+            self.cache.set(('dp1', ip), 'port_uuid', ('device', 'project'))
+        self.cache.set(('dp2', '10.0.0.1'), 'other', ('device', 'project'))
+
+    def test_matches(self):
+        self.assertTrue(self.event.matches(self.event.ROW_CREATE, self.row))
+        self.assertTrue(self.event.matches(self.event.ROW_DELETE, self.row))
+        self.assertTrue(self.event.matches(
+            self.event.ROW_UPDATE, self.row, mock.Mock(spec=['mac'])))
+        # Binding the port to a chassis doesn't change the cached info
+        self.assertFalse(self.event.matches(
+            self.event.ROW_UPDATE, self.row, mock.Mock(spec=['chassis'])))
+
+    def test_run(self):
+        self.event.run(self.event.ROW_DELETE, self.row, None)
+        self.assertEqual(1, len(self.cache))
+        self.assertIsNotNone(
+            self.cache.get(('dp2', '10.0.0.1'), {'other': None}))
+
+    def test_run_ip_changed(self):
+        old = mock.Mock(spec=['mac'], mac=self.row.mac)
+        self.row.mac = ['fa:16:3e:00:00:01 10.0.0.2']
+        self.event.run(self.event.ROW_UPDATE, self.row, old)
+        self.assertIsNone(
+            self.cache.get(('dp1', '10.0.0.1'), {'port_uuid': None}))
+        self.assertIsNone(
+            self.cache.get(('dp1', 'fd00::1'), {'port_uuid': None}))
+
+
 class TestUnixDomainMetadataProxy(base.BaseTestCase):
     def setUp(self):
         super(TestUnixDomainMetadataProxy, self).setUp()
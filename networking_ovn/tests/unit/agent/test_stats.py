@@ -15,7 +15,9 @@
 import uuid
 
 from networking_ovn.agent import stats
+from networking_ovn.common import constants as ovn_const
 from networking_ovn.tests import base
+from networking_ovn.tests.unit import fakes
 
 
 class AgentStatsTest(base.TestCase):
@@ -28,3 +30,47 @@ class AgentStatsTest(base.TestCase):
         self.assertTrue(got.updated_at)
         stats.AgentStats.del_agent(uid)
         self.assertNotIn(uid, stats.AgentStats._agents)
+
+
+class AgentCacheTest(base.TestCase):
+    def setUp(self):
+        super(AgentCacheTest, self).setUp()
+        self.cache = stats._AgentCache()
+        self.chassis = fakes.FakeOvsdbRow.create_one_ovsdb_row(
+            attrs={'uuid': uuid.uuid4(), 'hostname': 'host1',
+                   'external_ids': {
+                       'ovn-cms-options': 'enable-chassis-as-gw',
+                       ovn_const.OVN_AGENT_METADATA_ID_KEY: 'metadata-id'}})
+
+    def test_get_agents(self):
+        agents = self.cache.get_agents(self.chassis)
+        chassis_id = str(self.chassis.uuid)
+        self.assertItemsEqual([chassis_id, 'metadata-id'], agents)
+        self.assertEqual(ovn_const.OVN_CONTROLLER_GW_AGENT,
+                         agents[chassis_id]['agent_type'])
+        self.assertEqual(ovn_const.OVN_METADATA_AGENT,
+                         agents['metadata-id']['agent_type'])
+        self.assertEqual('host1', agents['metadata-id']['host'])
+        # The agents are only formatted once
+        self.assertIs(agents, self.cache.get_agents(self.chassis))
+
+    def test_get_chassis_uuid(self):
+        self.assertIsNone(self.cache.get_chassis_uuid('metadata-id'))
+        self.cache.update(self.chassis)
+        self.assertEqual(self.chassis.uuid,
+                         self.cache.get_chassis_uuid('metadata-id'))
+        self.assertEqual(self.chassis.uuid,
+                         self.cache.get_chassis_uuid(str(self.chassis.uuid)))
+
+    def test_update(self):
+        self.cache.update(self.chassis)
+        del self.chassis.external_ids[ovn_const.OVN_AGENT_METADATA_ID_KEY]
+        agents = self.cache.update(self.chassis)
+        self.assertEqual([str(self.chassis.uuid)], list(agents))
+        self.assertIsNone(self.cache.get_chassis_uuid('metadata-id'))
+
+    def test_delete(self):
+        self.cache.update(self.chassis)
+        self.cache.delete(self.chassis.uuid)
+        self.assertIsNone(self.cache.get_chassis_uuid('metadata-id'))
+        self.assertNotIn(self.chassis.uuid, self.cache._agents_by_chassis)
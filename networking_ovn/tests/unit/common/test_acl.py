@@ -12,10 +12,12 @@
 #    under the License.
 #
 
+import collections
 import copy
 
 import mock
 from neutron_lib import constants as const
+from oslo_config import cfg
 
 from networking_ovn.common import acl as ovn_acl
 from networking_ovn.common import constants as ovn_const
@@ -212,12 +214,12 @@ class TestACLs(base.TestCase):
         port2_acls_old = [aclport2_old1, aclport2_old2, aclport2_old3]
         acls_old_dict = {'%s' % (port1['id']): port1_acls_old,
                          '%s' % (port2['id']): port2_acls_old}
-        acl_obj_dict = {str(aclport1_old1): 'row1',
-                        str(aclport1_old2): 'row2',
-                        str(aclport1_old3): 'row3',
-                        str(aclport2_old1): 'row4',
-                        str(aclport2_old2): 'row5',
-                        str(aclport2_old3): 'row6'}
+        acl_obj_dict = {ovn_acl.ACLFingerprint(aclport1_old1): 'row1',
+                        ovn_acl.ACLFingerprint(aclport1_old2): 'row2',
+                        ovn_acl.ACLFingerprint(aclport1_old3): 'row3',
+                        ovn_acl.ACLFingerprint(aclport2_old1): 'row4',
+                        ovn_acl.ACLFingerprint(aclport2_old2): 'row5',
+                        ovn_acl.ACLFingerprint(aclport2_old3): 'row6'}
         # NEW ACLs, allow IPv6 communication
         aclport1_new1 = {'priority': 1002, 'direction': 'from-lport',
                          'lport': port1['id'], 'lswitch': lswitch_name,
@@ -604,6 +606,83 @@ class TestACLs(base.TestCase):
     def test_update_acls_for_security_group_no_cache(self):
         self._test_update_acls_for_security_group(use_cache=False)
 
+    def test_update_acls_for_security_group_chunks(self):
+        sg = fakes.FakeSecurityGroup.create_one_security_group().info()
+        sg_rule = fakes.FakeSecurityGroupRule.create_one_security_group_rule({
+            'security_group_id': sg['id']
+        }).info()
+        ports = sorted([fakes.FakePort.create_one_port({
+            'security_groups': [sg['id']]}).info() for i in range(5)],
+            key=lambda p: p['id'])
+        sg_ports_cache = {sg['id']: [{'port_id': p['id']} for p in ports]}
+        self.plugin.get_ports.side_effect = [ports[:2], ports[2:4],
+                                             ports[4:]]
+        cfg.CONF.set_override('ovsdb_txn_chunk_size', 2, group='ovn')
+        self.addCleanup(cfg.CONF.clear_override, 'ovsdb_txn_chunk_size',
+                        group='ovn')
+
+        ovn_acl.update_acls_for_security_group(self.plugin,
+                                               self.admin_context,
+                                               self.driver._nb_ovn,
+                                               sg['id'],
+                                               sg_rule,
+                                               sg_ports_cache=sg_ports_cache,
+                                               is_add_acl=False)
+        self.plugin.get_ports.assert_has_calls([
+            mock.call(self.admin_context,
+                      filters={'id': [p['id'] for p in ports[:2]]}),
+            mock.call(self.admin_context,
+                      filters={'id': [p['id'] for p in ports[2:4]]}),
+            mock.call(self.admin_context,
+                      filters={'id': [ports[4]['id']]})])
+        self.assertEqual(3, self.driver._nb_ovn.update_acls.call_count)
+        for i, chunk in enumerate((ports[:2], ports[2:4], ports[4:])):
+            args, kwargs = self.driver._nb_ovn.update_acls.call_args_list[i]
+            self.assertEqual(sorted(p['id'] for p in chunk),
+                             sorted(args[2]))
+            self.assertFalse(kwargs['is_add_acl'])
+
+    def _test_update_acls_for_security_group_migrating(self, is_add_acl):
+        sg = fakes.FakeSecurityGroup.create_one_security_group().info()
+        sg_rule = fakes.FakeSecurityGroupRule.create_one_security_group_rule({
+            'security_group_id': sg['id']
+        }).info()
+        port = fakes.FakePort.create_one_port({
+            'security_groups': [sg['id']]
+        }).info()
+        self.plugin.get_ports.return_value = [port]
+        nb_ovn = self.driver._nb_ovn
+        # Both the Port Group and the Address Set of a security group
+        # being migrated exist
+        nb_ovn.is_port_groups_supported.return_value = True
+        nb_ovn.get_port_group.return_value = mock.sentinel.pg
+        nb_ovn.get_address_set.return_value = mock.sentinel.address_set
+
+        ovn_acl.update_acls_for_security_group(
+            self.plugin, self.admin_context, nb_ovn, sg['id'], sg_rule,
+            sg_ports_cache={sg['id']: [{'port_id': port['id']}]},
+            is_add_acl=is_add_acl)
+        nb_ovn.get_port_group.assert_called_once_with(
+            ovn_utils.ovn_port_group_name(sg['id']))
+        if is_add_acl:
+            self.assertEqual(1, nb_ovn.pg_acl_add.call_count)
+            nb_ovn.update_acls.assert_not_called()
+            return
+
+        # The ACLs of a deleted rule are removed from the ports too
+        nb_ovn.pg_acl_del.assert_called_once_with(
+            ovn_utils.ovn_port_group_name(sg['id']), mock.ANY, mock.ANY,
+            mock.ANY)
+        nb_ovn.update_acls.assert_called_once_with(
+            [port['network_id']], mock.ANY, {port['id']: mock.ANY},
+            need_compare=False, is_add_acl=False)
+
+    def test_update_acls_for_security_group_migrating_add(self):
+        self._test_update_acls_for_security_group_migrating(is_add_acl=True)
+
+    def test_update_acls_for_security_group_migrating_delete(self):
+        self._test_update_acls_for_security_group_migrating(is_add_acl=False)
+
     def test_acl_port_ips(self):
         port4 = fakes.FakePort.create_one_port({
             'fixed_ips': [{'subnet_id': 'subnet-ipv4',
@@ -657,3 +736,116 @@ class TestACLs(base.TestCase):
 
             addresses = ovn_acl.acl_port_ips(port)
             self.assertEqual({'ip4': [], 'ip6': []}, addresses)
+
+    def test_acl_key(self):
+        acl = ovn_acl.add_sg_rule_acl_for_port_group(
+            'pg1', {'direction': 'ingress', 'id': 'rule1'}, 'outport == @pg1')
+        self.assertEqual(
+            ('pg1', 'to-lport', ovn_const.ACL_PRIORITY_ALLOW,
+             'outport == @pg1', ovn_const.ACL_ACTION_ALLOW_RELATED, False,
+             (), ()),
+            ovn_acl.acl_key(acl))
+        # The ACLs read from an NB schema without name and severity have
+        # the same key
+        ovn_acl_row = copy.deepcopy(acl)
+        del ovn_acl_row['name']
+        del ovn_acl_row['severity']
+        del ovn_acl_row[ovn_const.OVN_SG_RULE_EXT_ID_KEY]
+        self.assertEqual(ovn_acl.acl_key(acl), ovn_acl.acl_key(ovn_acl_row))
+        self.assertNotEqual(ovn_acl.acl_key(acl),
+                            ovn_acl.acl_key(dict(acl, priority=1000)))
+
+    def test_acl_fingerprint(self):
+        acl = ovn_acl.add_sg_rule_acl_for_port(
+            self.fake_port, {'direction': 'ingress', 'id': 'rule1'},
+            'outport == "fake_port_id1"')
+        same_acl = collections.OrderedDict(reversed(sorted(acl.items())))
+        same_acl['external_ids'] = dict(
+            reversed(sorted(acl['external_ids'].items())))
+        self.assertEqual(ovn_acl.ACLFingerprint(acl),
+                         ovn_acl.ACLFingerprint(same_acl))
+        self.assertEqual(1, len({ovn_acl.ACLFingerprint(acl),
+                                 ovn_acl.ACLFingerprint(same_acl)}))
+        self.assertNotEqual(ovn_acl.ACLFingerprint(acl),
+                            ovn_acl.ACLFingerprint(dict(acl, log=True)))
+        del same_acl['log']
+        self.assertNotEqual(ovn_acl.ACLFingerprint(acl),
+                            ovn_acl.ACLFingerprint(same_acl))
+
+    def test_diff_acls(self):
+        acls = [ovn_acl.add_sg_rule_acl_for_port_group(
+            'pg1', {'direction': 'ingress', 'id': 'rule%d' % i},
+            'outport == @pg1 && tcp.dst == %d' % i) for i in range(3)]
+        ovn_acls = [{k: v for k, v in acl.items()
+                     if k != ovn_const.OVN_SG_RULE_EXT_ID_KEY}
+                    for acl in acls[1:]]
+        # An ACL duplicated in OVN is removed
+        ovn_acls.append(copy.deepcopy(ovn_acls[0]))
+        stale_acl = dict(ovn_acls[0], match='outport == @pg1 && udp')
+        ovn_acls.append(stale_acl)
+
+        acls_to_add, acls_to_remove = ovn_acl.diff_acls(acls, ovn_acls)
+        self.assertEqual([acls[0]], acls_to_add)
+        self.assertEqual(2, len(acls_to_remove))
+        self.assertIn(ovn_acls[0], acls_to_remove)
+        self.assertIn(stale_acl, acls_to_remove)
+
+    def test_sg_rule_match_cache(self):
+        cache = ovn_acl.SGRuleMatchCache()
+        sg_rule = {'id': 'sgr_id', 'revision_number': 1,
+                   'direction': 'ingress', 'ethertype': 'IPv4',
+                   'remote_group_id': None, 'remote_ip_prefix': None,
+                   'protocol': 'tcp', 'port_range_min': 22,
+                   'port_range_max': 22}
+        match = ' && ip4 && tcp && tcp.dst == 22'
+        self.assertEqual(match, cache.get(sg_rule))
+        self.assertEqual(match, cache.get(sg_rule))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+        # A new revision of the rule is compiled again
+        sg_rule.update(revision_number=2, port_range_min=23,
+                       port_range_max=23)
+        self.assertEqual(' && ip4 && tcp && tcp.dst == 23',
+                         cache.get(sg_rule))
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+        cache.invalidate('sgr_id')
+        self.assertEqual(0, len(cache))
+        # The rules without revision number aren't cached
+        del sg_rule['revision_number']
+        cache.get(sg_rule)
+        self.assertEqual(0, len(cache))
+
+    def test_sg_rule_match_cache_remote_group(self):
+        cache = ovn_acl.SGRuleMatchCache()
+        sg_rule = {'id': 'sgr_id', 'revision_number': 1,
+                   'direction': 'ingress', 'ethertype': 'IPv4',
+                   'remote_group_id': 'sg1', 'remote_ip_prefix': None,
+                   'protocol': None}
+        ovn = mock.Mock()
+        ovn.is_port_groups_supported.return_value = True
+        self.assertEqual(
+            ' && ip4 && ip4.src == $%s' % ovn_utils.ovn_pg_addrset_name(
+                'sg1', 'ip4'), cache.get(sg_rule, ovn))
+        self.assertEqual(
+            ' && ip4 && ip4.src == $%s' % ovn_utils.ovn_addrset_name(
+                'sg1', 'ip4'), cache.get(sg_rule))
+        self.assertEqual(1, len(cache))
+        self.assertEqual(2, cache.misses)
+
+    def test_sg_rule_match_cache_eviction(self):
+        cache = ovn_acl.SGRuleMatchCache(max_size=2)
+        sg_rules = [{'id': 'sgr_id%d' % i, 'revision_number': 1,
+                     'direction': 'egress', 'ethertype': 'IPv6',
+                     'remote_group_id': None, 'remote_ip_prefix': None,
+                     'protocol': None} for i in range(3)]
+        cache.get(sg_rules[0])
+        cache.get(sg_rules[1])
+        cache.get(sg_rules[0])
+        cache.get(sg_rules[2])
+        # The least recently used rule was evicted
+        self.assertEqual(2, len(cache))
+        cache.get(sg_rules[0])
+        self.assertEqual(2, cache.hits)
+        cache.get(sg_rules[1])
+        self.assertEqual(2, cache.hits)
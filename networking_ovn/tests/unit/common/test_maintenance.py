@@ -19,12 +19,14 @@ from futurist import periodics
 from neutron.tests.unit.plugins.ml2 import test_security_group as test_sg
 from neutron_lib.db import api as db_api
 
+from networking_ovn.common import config as ovn_config
 from networking_ovn.common import constants
 from networking_ovn.common import maintenance
 from networking_ovn.common import utils
 from networking_ovn.db import maintenance as db_maint
 from networking_ovn.db import revision as db_rev
 from networking_ovn import ovn_db_sync
+from networking_ovn.tests import base
 from networking_ovn.tests.unit.db import base as db_base
 
 
@@ -45,13 +47,111 @@ class TestDBInconsistenciesPeriodics(db_base.DBTestCase,
         self.session = db_api.get_writer_session()
 
     @mock.patch.object(maintenance.DBInconsistenciesPeriodics,
-                       '_fix_create_update')
+                       '_fix_create_update_rows')
     @mock.patch.object(db_maint, 'get_inconsistent_resources')
     def test_check_for_inconsistencies(self, mock_get_incon_res, mock_fix_net):
         fake_row = mock.Mock(resource_type=constants.TYPE_NETWORKS)
         mock_get_incon_res.return_value = [fake_row, ]
         self.periodic.check_for_inconsistencies()
-        mock_fix_net.assert_called_once_with(fake_row)
+        mock_fix_net.assert_called_once_with(constants.TYPE_NETWORKS,
+                                             [fake_row])
+
+    @mock.patch.object(maintenance.DBInconsistenciesPeriodics,
+                       '_fix_delete')
+    @mock.patch.object(maintenance.DBInconsistenciesPeriodics,
+                       '_fix_create_update_rows')
+    @mock.patch.object(db_maint, 'get_deleted_resources')
+    @mock.patch.object(db_maint, 'get_inconsistent_resources')
+    def test_check_for_inconsistencies_pages(self, mock_get_incon_res,
+                                             mock_get_del_res, mock_fix_rows,
+                                             mock_fix_del):
+        ovn_config.cfg.CONF.set_override('maintenance_page_size', 2,
+                                         group='ovn')
+        net_rows = [mock.Mock(resource_type=constants.TYPE_NETWORKS)
+                    for _ in range(2)]
+        port_row = mock.Mock(resource_type=constants.TYPE_PORTS)
+        del_row = mock.Mock(resource_type=constants.TYPE_PORTS)
+        mock_get_incon_res.side_effect = [net_rows, [port_row]]
+        mock_get_del_res.return_value = [del_row]
+        self.periodic.check_for_inconsistencies()
+
+        mock_get_incon_res.assert_has_calls([
+            mock.call(limit=2), mock.call(limit=2, marker=net_rows[1])])
+        mock_fix_rows.assert_has_calls([
+            mock.call(constants.TYPE_NETWORKS, net_rows),
+            mock.call(constants.TYPE_PORTS, [port_row])])
+        # The page of deleted resources is not full, it's the last one
+        mock_get_del_res.assert_called_once_with(limit=2)
+        mock_fix_del.assert_called_once_with(del_row)
+
+    @mock.patch.object(maintenance.DBInconsistenciesPeriodics,
+                       '_fix_delete')
+    @mock.patch.object(maintenance.DBInconsistenciesPeriodics,
+                       '_fix_create_update_rows')
+    @mock.patch.object(db_maint, 'get_deleted_resources')
+    @mock.patch.object(db_maint, 'get_inconsistent_resources')
+    def test_check_for_inconsistencies_time_budget(self, mock_get_incon_res,
+                                                   mock_get_del_res,
+                                                   mock_fix_rows,
+                                                   mock_fix_del):
+        ovn_config.cfg.CONF.set_override('maintenance_page_size', 1,
+                                         group='ovn')
+        ovn_config.cfg.CONF.set_override('maintenance_time_budget', 10,
+                                         group='ovn')
+        net_row = mock.Mock(resource_type=constants.TYPE_NETWORKS)
+        mock_get_incon_res.return_value = [net_row]
+        mock_get_del_res.return_value = [mock.Mock()]
+        with mock.patch.object(self.periodic._sync_timer, 'elapsed',
+                               return_value=11):
+            self.periodic.check_for_inconsistencies()
+
+        # The time budget is exhausted after fixing the first page, the
+        # next pages and the deleted resources are left to the next run
+        mock_get_incon_res.assert_called_once_with(limit=1)
+        mock_fix_rows.assert_called_once_with(constants.TYPE_NETWORKS,
+                                              [net_row])
+        mock_fix_del.assert_not_called()
+
+    @mock.patch.object(db_rev, 'bump_revisions')
+    def test__fix_create_update_rows_ports(self, mock_bump):
+        ports = [{'id': 'p%d' % i, 'revision_number': 3} for i in range(4)]
+        rows = [mock.Mock(resource_uuid=port['id'],
+                          resource_type=constants.TYPE_PORTS)
+                for port in ports]
+        ovn_ports = {
+            # p0 is missing in OVN, p1 is outdated and p2 is up to date
+            'p0': None,
+            'p1': mock.Mock(external_ids={
+                constants.OVN_REV_NUM_EXT_ID_KEY: '2'}),
+            'p2': mock.Mock(external_ids={
+                constants.OVN_REV_NUM_EXT_ID_KEY: '3'})}
+        self.fake_ovn_client._nb_idl.get_lswitch_port.side_effect = (
+            ovn_ports.get)
+        # p3 has been deleted from the Neutron DB in the meantime
+        self.fake_ovn_client._plugin.get_ports.return_value = ports[:3]
+        self.periodic._fix_create_update_rows(constants.TYPE_PORTS, rows)
+
+        self.fake_ovn_client._plugin.get_ports.assert_called_once_with(
+            mock.ANY, filters={'id': ['p0', 'p1', 'p2', 'p3']})
+        self.fake_ovn_client.create_ports.assert_called_once_with([ports[0]])
+        self.fake_ovn_client.update_ports.assert_called_once_with([ports[1]])
+        mock_bump.assert_called_once_with([ports[2]], constants.TYPE_PORTS)
+        self.fake_ovn_client.create_port.assert_not_called()
+        self.fake_ovn_client.update_port.assert_not_called()
+
+    def test__fix_create_update_rows_bulk_failure(self):
+        ports = [{'id': 'p%d' % i, 'revision_number': 3} for i in range(2)]
+        rows = [mock.Mock(resource_uuid=port['id'],
+                          resource_type=constants.TYPE_PORTS)
+                for port in ports]
+        self.fake_ovn_client._nb_idl.get_lswitch_port.return_value = None
+        self.fake_ovn_client._plugin.get_ports.return_value = ports
+        self.fake_ovn_client.create_ports.side_effect = RuntimeError
+        self.periodic._fix_create_update_rows(constants.TYPE_PORTS, rows)
+
+        # The ports are created one by one if the bulk creation fails
+        self.fake_ovn_client.create_port.assert_has_calls(
+            [mock.call(ports[0]), mock.call(ports[1])])
 
     def _test_migrate_to_port_groups_helper(self, pg_supported, a_sets,
                                             migration_expected, never_again):
@@ -121,8 +221,8 @@ class TestDBInconsistenciesPeriodics(db_base.DBTestCase,
                 constants.OVN_REV_NUM_EXT_ID_KEY: ovn_rev})
             self.fake_ovn_client._nb_idl.get_lswitch.return_value = fake_ls
 
-        self.fake_ovn_client._plugin.get_network.return_value = self.net
-        self.periodic._fix_create_update(row)
+        self.fake_ovn_client._plugin.get_networks.return_value = [self.net]
+        self.periodic._fix_create_update_rows(constants.TYPE_NETWORKS, [row])
 
         # Since the revision number was < 0, make sure create_network()
         # is invoked with the latest version of the object in the neutron
@@ -162,21 +262,21 @@ class TestDBInconsistenciesPeriodics(db_base.DBTestCase,
             self.fake_ovn_client._nb_idl.get_lswitch_port.return_value = (
                 fake_lsp)
 
-        self.fake_ovn_client._plugin.get_port.return_value = self.port
-        self.periodic._fix_create_update(row)
+        self.fake_ovn_client._plugin.get_ports.return_value = [self.port]
+        self.periodic._fix_create_update_rows(constants.TYPE_PORTS, [row])
 
-        # Since the revision number was < 0, make sure create_port()
+        # Since the revision number was < 0, make sure create_ports()
         # is invoked with the latest version of the object in the neutron
         # database
         if ovn_rev < 0:
-            self.fake_ovn_client.create_port.assert_called_once_with(
-                self.port)
+            self.fake_ovn_client.create_ports.assert_called_once_with(
+                [self.port])
         # If the revision number is > 0 it means that the object already
         # exist and we just need to update to match the latest in the
-        # neutron database so, update_port() should be called.
+        # neutron database so, update_ports() should be called.
         else:
-            self.fake_ovn_client.update_port.assert_called_once_with(
-                self.port)
+            self.fake_ovn_client.update_ports.assert_called_once_with(
+                [self.port])
 
     def test_fix_port_create(self):
         self._test_fix_create_update_port(ovn_rev=-1, neutron_rev=2)
@@ -184,7 +284,7 @@ class TestDBInconsistenciesPeriodics(db_base.DBTestCase,
     def test_fix_port_update(self):
         self._test_fix_create_update_port(ovn_rev=5, neutron_rev=7)
 
-    @mock.patch.object(db_rev, 'bump_revision')
+    @mock.patch.object(db_rev, 'bump_revisions')
     def _test_fix_security_group_create(self, mock_bump, revision_number):
         sg_name = utils.ovn_addrset_name('fake_id', 'ip4')
         sg = self._make_security_group(self.fmt, sg_name, '')['security_group']
@@ -202,8 +302,9 @@ class TestDBInconsistenciesPeriodics(db_base.DBTestCase,
             self.fake_ovn_client._nb_idl.get_address_set.return_value = (
                 mock.sentinel.AddressSet)
 
-        self.fake_ovn_client._plugin.get_security_group.return_value = sg
-        self.periodic._fix_create_update(row)
+        self.fake_ovn_client._plugin.get_security_groups.return_value = [sg]
+        self.periodic._fix_create_update_rows(
+            constants.TYPE_SECURITY_GROUPS, [row])
 
         if revision_number < 0:
             self.fake_ovn_client.create_security_group.assert_called_once_with(
@@ -213,7 +314,7 @@ class TestDBInconsistenciesPeriodics(db_base.DBTestCase,
             # the revision number in the ovn_revision_numbers table
             self.assertFalse(self.fake_ovn_client.create_security_group.called)
             mock_bump.assert_called_once_with(
-                sg, constants.TYPE_SECURITY_GROUPS)
+                [sg], constants.TYPE_SECURITY_GROUPS)
 
     def test_fix_security_group_create_doesnt_exist(self):
         self._test_fix_security_group_create(revision_number=-1)
@@ -229,3 +330,49 @@ class TestDBInconsistenciesPeriodics(db_base.DBTestCase,
         l3_mock.add_router_interface.assert_called_once_with(
             mock.ANY, port['device_id'], {'port_id': port['id']},
             may_exist=True)
+
+    def test_ping_chassis(self):
+        self.periodic.ping_chassis()
+        check_liveness = self.fake_ovn_client._nb_idl.check_liveness
+        check_liveness.assert_called_once_with()
+        check_liveness.return_value.execute.assert_called_once_with(
+            check_error=True)
+
+    def test_ping_chassis_no_lock(self):
+        with mock.patch.object(maintenance.DBInconsistenciesPeriodics,
+                               'has_lock', mock.PropertyMock(
+                                   return_value=False)):
+            self.periodic.ping_chassis()
+        self.assertFalse(
+            self.fake_ovn_client._nb_idl.check_liveness.called)
+
+
+class TestMaintenanceThread(base.TestCase):
+
+    class FakePeriodics(object):
+        @periodics.periodic(spacing=10)
+        def slow(self):
+            pass
+
+        @maintenance.own_thread
+        @periodics.periodic(spacing=10)
+        def ping(self):
+            pass
+
+    @mock.patch.object(maintenance.threading, 'Thread')
+    @mock.patch.object(periodics, 'PeriodicWorker')
+    def test_start_stop_own_thread(self, mock_worker, mock_thread):
+        fake_periodics = self.FakePeriodics()
+        maint_thread = maintenance.MaintenanceThread()
+        maint_thread.add_periodics(fake_periodics)
+        maint_thread.start()
+
+        mock_worker.assert_has_calls([
+            mock.call([(fake_periodics.slow, (), {})]),
+            mock.call([(fake_periodics.ping, (), {})])], any_order=True)
+        self.assertEqual(2, mock_thread.call_count)
+        self.assertEqual(2, mock_thread.return_value.start.call_count)
+
+        maint_thread.stop()
+        self.assertEqual(2, mock_worker.return_value.stop.call_count)
+        self.assertEqual(2, mock_thread.return_value.join.call_count)
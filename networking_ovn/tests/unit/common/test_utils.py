@@ -41,3 +41,9 @@ class TestUtils(base.TestCase):
         observed_dns_resolvers = utils.get_system_dns_resolvers(
             resolver_file=resolver_file_name)
         self.assertEqual(expected_dns_resolvers, observed_dns_resolvers)
+
+    def test_chunks(self):
+        self.assertEqual([[1, 2], [3, 4], [5]],
+                         list(utils.chunks(iter(range(1, 6)), 2)))
+        self.assertEqual([[1, 2]], list(utils.chunks([1, 2], 2)))
+        self.assertEqual([], list(utils.chunks([], 2)))
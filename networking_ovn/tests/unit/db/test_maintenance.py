@@ -80,6 +80,20 @@ class TestMaintenance(test_securitygroup.SecurityGroupsTestCase,
         # Assert nothing is inconsistent
         self.assertEqual([], res)
 
+    def test_get_inconsistent_resources_pages(self):
+        nets = [self.net] + [self._make_network(
+            self.fmt, 'net%d' % i, True)['network'] for i in range(2, 4)]
+        for net in nets:
+            db_rev.create_initial_revision(
+                net['id'], constants.TYPE_NETWORKS, self.session,
+                revision_number=-1)
+        page1 = db_maint.get_inconsistent_resources(limit=2)
+        page2 = db_maint.get_inconsistent_resources(limit=2, marker=page1[-1])
+        self.assertEqual(2, len(page1))
+        self.assertEqual(1, len(page2))
+        self.assertEqual(sorted(net['id'] for net in nets),
+                         [row.resource_uuid for row in page1 + page2])
+
     def test_get_deleted_resources(self):
         db_rev.create_initial_revision(
             self.net['id'], constants.TYPE_NETWORKS, self.session,
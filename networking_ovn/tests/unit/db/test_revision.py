@@ -17,6 +17,7 @@ import mock
 
 from neutron.tests.unit.plugins.ml2 import test_plugin
 from neutron_lib.db import api as db_api
+from oslo_db import exception as os_db_exc
 
 from networking_ovn.common import constants
 from networking_ovn.db import revision as db_rev
@@ -64,3 +65,71 @@ class TestRevisionNumber(db_base.DBTestCase, test_plugin.Ml2PluginV2TestCase):
         db_rev.delete_revision(self.net['id'], constants.TYPE_NETWORKS)
         row = db_rev.get_revision_row(self.net['id'])
         self.assertIsNone(row)
+
+    def _create_networks(self, count):
+        networks = []
+        for i in range(count):
+            res = self._create_network(fmt=self.fmt, name='net%d' % i,
+                                       admin_state_up=True)
+            networks.append(self.deserialize(self.fmt, res)['network'])
+        return networks
+
+    def test_get_revision_rows(self):
+        net2, net3 = self._create_networks(2)
+        for net in (self.net, net2):
+            db_rev.create_initial_revision(
+                net['id'], constants.TYPE_NETWORKS, self.session)
+        rows = db_rev.get_revision_rows([self.net['id'], net2['id'],
+                                         net3['id']])
+        self.assertItemsEqual([self.net['id'], net2['id']],
+                              [row.resource_uuid for row in rows])
+        self.assertEqual([], db_rev.get_revision_rows([]))
+
+    @mock.patch.object(db_rev.LOG, 'warning')
+    def test_bump_revisions(self, mock_log):
+        net2, net3 = self._create_networks(2)
+        db_rev.create_initial_revision(self.net['id'], constants.TYPE_NETWORKS,
+                                       self.session)
+        db_rev.create_initial_revision(net2['id'], constants.TYPE_NETWORKS,
+                                       self.session, revision_number=123)
+        self.net['revision_number'] = 10
+        net2['revision_number'] = 1
+        net3['revision_number'] = 20
+        db_rev.bump_revisions([self.net, net2, net3], constants.TYPE_NETWORKS)
+        revisions = {row.resource_uuid: row.revision_number
+                     for row in db_rev.get_revision_rows(
+                         [self.net['id'], net2['id'], net3['id']])}
+        # Assert net2 revision number wasn't bumped and the missing
+        # revision row for net3 has been created
+        self.assertEqual({self.net['id']: 10, net2['id']: 123,
+                          net3['id']: 20}, revisions)
+        self.assertEqual(1, mock_log.call_count)
+        self.assertIn('No revision row found for', mock_log.call_args[0][0])
+
+    def test_bump_revisions_row_created_concurrently(self):
+        self.net['revision_number'] = 20
+        insert_revision_rows = db_rev._insert_revision_rows
+
+        def _insert_revision_rows(session, values):
+            # The INSERT fails the first time, as if the row had been created
+            # concurrently
+            if mock_insert.call_count == 1:
+                raise os_db_exc.DBDuplicateEntry()
+            return insert_revision_rows(session, values)
+
+        with mock.patch.object(
+                db_rev, '_insert_revision_rows',
+                side_effect=_insert_revision_rows) as mock_insert:
+            db_rev.bump_revisions([self.net], constants.TYPE_NETWORKS)
+        self.assertEqual(2, mock_insert.call_count)
+        row = db_rev.get_revision_row(self.net['id'])
+        self.assertEqual(20, row.revision_number)
+
+    def test_get_neutron_revision_numbers(self):
+        net2, = self._create_networks(1)
+        revisions = db_rev.get_neutron_revision_numbers(
+            constants.TYPE_NETWORKS)
+        self.assertEqual({self.net['id']: self.net['revision_number'],
+                          net2['id']: net2['revision_number']}, revisions)
+        self.assertEqual(
+            {}, db_rev.get_neutron_revision_numbers(constants.TYPE_ROUTERS))
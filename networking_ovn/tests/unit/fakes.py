@@ -55,6 +55,7 @@ class FakeOvsdbNbOvnIdl(object):
         self.ls_del = mock.Mock()
         self.create_lswitch_port = mock.Mock()
         self.set_lswitch_port = mock.Mock()
+        self.set_lswitch_port_qos_options = mock.Mock()
         self.delete_lswitch_port = mock.Mock()
         self.get_acls_for_lswitches = mock.Mock()
         self.create_lrouter = mock.Mock()
@@ -76,6 +77,8 @@ class FakeOvsdbNbOvnIdl(object):
         self.delete_address_set = mock.Mock()
         self.update_address_set = mock.Mock()
         self.get_all_chassis_gateway_bindings = mock.Mock()
+        self.get_chassis_gateway_load = mock.Mock()
+        self.get_chassis_gateway_load.return_value = {}
         self.get_gateway_chassis_binding = mock.Mock()
         self.get_unhosted_gateways = mock.Mock()
         self.add_dhcp_options = mock.Mock()
@@ -86,6 +89,8 @@ class FakeOvsdbNbOvnIdl(object):
         self.get_subnets_dhcp_options = mock.Mock()
         self.get_subnets_dhcp_options.return_value = []
         self.get_all_dhcp_options = mock.Mock()
+        self.get_revision_numbers = mock.Mock()
+        self.get_revision_numbers.return_value = {}
         self.get_router_port_options = mock.MagicMock()
         self.get_router_port_options.return_value = {}
         self.add_nat_rule_in_lrouter = mock.Mock()
@@ -96,6 +101,8 @@ class FakeOvsdbNbOvnIdl(object):
         self.get_lrouter_nat_rules.return_value = []
         self.set_nat_rule_in_lrouter = mock.Mock()
         self.check_for_row_by_value_and_retry = mock.Mock()
+        self.lookup_by_index = mock.Mock()
+        self.lookup_by_index.return_value = None
         self.get_parent_port = mock.Mock()
         self.get_parent_port.return_value = []
         self.dns_add = mock.Mock()
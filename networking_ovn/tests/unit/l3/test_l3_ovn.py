@@ -1105,6 +1105,51 @@ class OVNL3RouterPlugin(test_mech_driver.OVNMechanismDriverTestCase):
         mock_updt_status.assert_called_once_with(
             mock.ANY, fake_port_id, constants.PORT_STATUS_DOWN)
 
+    @mock.patch('networking_ovn.l3.l3_ovn.OVNL3RouterPlugin.'
+                '_get_gateway_port_physnet_mapping')
+    def test_schedule_unhosted_gateways(self, get_gw_port_physnet):
+        config.cfg.CONF.set_override('ovsdb_txn_chunk_size', 2, group='ovn')
+        get_gw_port_physnet.return_value = {}
+        self.l3_inst._sb_ovn.get_chassis_and_physnets = mock.Mock(
+            return_value={'hv1': ['physnet1']})
+        self.l3_inst._sb_ovn.get_gateway_chassis_from_cms_options = (
+            mock.Mock(return_value=[]))
+        self.l3_inst._ovn.get_unhosted_gateways.return_value = [
+            'lrp-foo-1', 'lrp-foo-2', 'lrp-foo-3']
+        chassis_load = {'hv1': {1: 3}}
+        self.l3_inst._ovn.get_chassis_gateway_load.return_value = (
+            chassis_load)
+        with mock.patch.object(self.l3_inst.scheduler, 'plan') as plan:
+            plan.return_value = {'lrp-foo-1': ['hv1'],
+                                 'lrp-foo-2': ['hv1'],
+                                 'lrp-foo-3': ['hv1']}
+            self.l3_inst.schedule_unhosted_gateways()
+
+        # All the gateways are planned at once and the bindings are
+        # committed in batches
+        plan.assert_called_once_with(
+            self.l3_inst._ovn, self.l3_inst._sb_ovn,
+            {'lrp-foo-1': [], 'lrp-foo-2': [], 'lrp-foo-3': []},
+            chassis_load=chassis_load)
+        self.assertEqual(2, self.l3_inst._ovn.transaction.call_count)
+        self.l3_inst._ovn.update_lrouter_port.assert_has_calls([
+            mock.call('lrp-foo-1', gateway_chassis=['hv1']),
+            mock.call('lrp-foo-2', gateway_chassis=['hv1']),
+            mock.call('lrp-foo-3', gateway_chassis=['hv1'])])
+
+    @mock.patch('networking_ovn.l3.l3_ovn.OVNL3RouterPlugin.'
+                '_get_gateway_port_physnet_mapping')
+    def test_schedule_unhosted_gateways_none(self, get_gw_port_physnet):
+        get_gw_port_physnet.return_value = {}
+        self.l3_inst._sb_ovn.get_chassis_and_physnets = mock.Mock(
+            return_value={})
+        self.l3_inst._sb_ovn.get_gateway_chassis_from_cms_options = (
+            mock.Mock(return_value=[]))
+        self.l3_inst._ovn.get_unhosted_gateways.return_value = []
+        self.l3_inst.schedule_unhosted_gateways()
+        self.l3_inst._ovn.get_chassis_gateway_load.assert_not_called()
+        self.l3_inst._ovn.transaction.assert_not_called()
+
 
 class OVNL3ExtrarouteTests(test_l3_gw.ExtGwModeIntTestCase,
                            test_l3.L3NatDBIntTestCase,
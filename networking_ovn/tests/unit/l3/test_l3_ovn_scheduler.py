@@ -12,6 +12,7 @@
 #    under the License.
 #
 
+import copy
 import random
 
 import mock
@@ -25,6 +26,8 @@ class FakeOVNGatewaySchedulerNbOvnIdl(object):
     def __init__(self, chassis_gateway_mapping, gateway):
         self.get_all_chassis_gateway_bindings = mock.Mock(
             return_value=chassis_gateway_mapping['Chassis_Bindings'])
+        self.get_chassis_gateway_load = mock.Mock(
+            return_value=chassis_gateway_mapping['Chassis_Load'])
         self.get_gateway_chassis_binding = mock.Mock(
             return_value=chassis_gateway_mapping['Gateways'].get(gateway,
                                                                  None))
@@ -68,18 +71,33 @@ class TestOVNGatewayScheduler(base.BaseTestCase):
         for details in self.fake_chassis_gateway_mappings.values():
             self.assertNotIn(self.new_gateway_name, details['Gateways'])
             details.setdefault('Chassis_Bindings', {})
+            details.setdefault('Chassis_Load', {})
             for chassis in details['Chassis']:
                 details['Chassis_Bindings'].setdefault(chassis, [])
+                details['Chassis_Load'].setdefault(chassis, {})
             for gw, chassis_list in details['Gateways'].items():
                 for chassis in chassis_list:
                     if chassis in details['Chassis_Bindings']:
                         details['Chassis_Bindings'][chassis].append((gw, 0))
+                        load = details['Chassis_Load'][chassis]
+                        load[0] = load.get(0, 0) + 1
 
-    def select(self, chassis_gateway_mapping, gateway_name):
+    def select(self, chassis_gateway_mapping, gateway_name,
+               chassis_load=None):
         nb_idl = FakeOVNGatewaySchedulerNbOvnIdl(chassis_gateway_mapping,
                                                  gateway_name)
         sb_idl = FakeOVNGatewaySchedulerSbOvnIdl(chassis_gateway_mapping)
-        return self.l3_scheduler.select(nb_idl, sb_idl, gateway_name)
+        return self.l3_scheduler.select(nb_idl, sb_idl, gateway_name,
+                                        chassis_load=chassis_load)
+
+    def plan(self, chassis_gateway_mapping, gateways, chassis_load):
+        nb_idl = mock.Mock()
+        nb_idl.get_gateway_chassis_binding.side_effect = (
+            lambda gateway: chassis_gateway_mapping['Gateways'].get(
+                gateway, []))
+        sb_idl = FakeOVNGatewaySchedulerSbOvnIdl(chassis_gateway_mapping)
+        return self.l3_scheduler.plan(nb_idl, sb_idl, gateways,
+                                      chassis_load=chassis_load)
 
 
 class OVNGatewayChanceScheduler(TestOVNGatewayScheduler):
@@ -112,6 +130,12 @@ class OVNGatewayChanceScheduler(TestOVNGatewayScheduler):
         chassis = self.select(mapping, gateway_name)
         self.assertEqual(mapping['Gateways'][gateway_name], chassis)
 
+    def test_plan(self):
+        mapping = self.fake_chassis_gateway_mappings['Multiple1']
+        planned = self.plan(mapping, {'g1': None, 'lrp_new': ['hv2']},
+                            chassis_load={})
+        self.assertEqual({'g1': ['hv1'], 'lrp_new': ['hv2']}, planned)
+
 
 class OVNGatewayLeastLoadedScheduler(TestOVNGatewayScheduler):
 
@@ -160,15 +184,73 @@ class OVNGatewayLeastLoadedScheduler(TestOVNGatewayScheduler):
         chassis = self.select(mapping, gateway_name)
         self.assertEqual(mapping['Gateways'][gateway_name], chassis)
 
-    def test__get_chassis_load_by_prios_several_ports(self):
-        # Adding 5 ports of prio 1 and 5 ports of prio 2
-        chassis_info = []
-        for i in range(1, 6):
-            chassis_info.append(('lrp', 1))
-            chassis_info.append(('lrp', 2))
-        actual = self.l3_scheduler._get_chassis_load_by_prios(chassis_info)
-        expected = {1: 5, 2: 5}
-        self.assertItemsEqual(expected.items(), actual)
-
-    def test__get_chassis_load_by_prios_no_ports(self):
-        self.assertFalse(self.l3_scheduler._get_chassis_load_by_prios([]))
+    def test__get_chassis_load_several_ports(self):
+        # 5 ports of prio 1 and 5 ports of prio 2
+        actual = self.l3_scheduler._get_chassis_load(('hv1', {1: 5, 2: 5}))
+        self.assertEqual([(2, 5), (1, 5)], actual)
+
+    def test__get_chassis_load_no_ports(self):
+        self.assertFalse(self.l3_scheduler._get_chassis_load(('hv1', {})))
+        self.assertFalse(self.l3_scheduler._get_chassis_load(
+            ('hv1', {1: 0})))
+
+    def test_least_loaded_chassis_load_updated(self):
+        mapping = self.fake_chassis_gateway_mappings['Multiple3']
+        chassis_load = copy.deepcopy(mapping['Chassis_Load'])
+        chassis = self.select(mapping, 'lrp_new1', chassis_load=chassis_load)
+        self.assertEqual(['hv1', 'hv3', 'hv2'], chassis)
+        self.assertEqual({'hv1': {3: 1}, 'hv2': {0: 2, 1: 1},
+                          'hv3': {0: 1, 2: 1}}, chassis_load)
+        # The next gateway is scheduled according to the updated load,
+        # without reading it again
+        chassis = self.select(mapping, 'lrp_new2', chassis_load=chassis_load)
+        self.assertEqual(['hv2', 'hv3', 'hv1'], chassis)
+
+    def test_least_loaded_chassis_load_existing_gateway_moved(self):
+        mapping = self.fake_chassis_gateway_mappings['Multiple2']
+        mapping['Gateways']['g1'] = ['hv4', 'hv1']
+        chassis_load = {'hv1': {1: 1}, 'hv4': {2: 1}}
+        chassis = self.select(mapping, 'g1', chassis_load=chassis_load)
+        self.assertEqual(['hv2', 'hv3', 'hv1'], chassis)
+        self.assertEqual({'hv1': {1: 1}, 'hv2': {3: 1}, 'hv3': {2: 1},
+                          'hv4': {}}, chassis_load)
+
+    def test_plan_balanced(self):
+        mapping = self.fake_chassis_gateway_mappings['Multiple2']
+        chassis_load = {}
+        gateways = dict(('lrp_new%d' % i, ['hv1', 'hv2', 'hv3'])
+                        for i in range(6))
+        planned = self.plan(mapping, gateways, chassis_load)
+        self.assertEqual(set(gateways), set(planned))
+        for chassis in planned.values():
+            self.assertItemsEqual(['hv1', 'hv2', 'hv3'], chassis)
+        # Every chassis hosts as many gateways at each priority
+        self.assertEqual({'hv1': {1: 2, 2: 2, 3: 2},
+                          'hv2': {1: 2, 2: 2, 3: 2},
+                          'hv3': {1: 2, 2: 2, 3: 2}}, chassis_load)
+
+    def test_plan_most_constrained_first(self):
+        mapping = self.fake_chassis_gateway_mappings['Multiple2']
+        chassis_load = {}
+        planned = self.plan(
+            mapping, {'lrp_a': ['hv1', 'hv2'], 'lrp_b': ['hv1']},
+            chassis_load)
+        self.assertEqual({'lrp_a': ['hv2', 'hv1'], 'lrp_b': ['hv1']},
+                         planned)
+
+    def test_plan_existing_gateways(self):
+        mapping = self.fake_chassis_gateway_mappings['Multiple2']
+        mapping['Gateways']['g2'] = ['hv1', 'hv4']
+        mapping['Gateways']['g3'] = ['hv4', 'hv1']
+        chassis_load = {'hv1': {1: 1, 2: 2}, 'hv4': {1: 1, 2: 1}}
+        planned = self.plan(
+            mapping, {'g1': ['hv1', 'hv2'], 'g2': ['hv1', 'hv2', 'hv3'],
+                      'g3': ['hv1', 'hv2', 'hv3'], 'lrp_new': []},
+            chassis_load)
+        # g1 is still hosted on valid chassis, the highest priority chassis
+        # of g2 is kept and all the chassis are candidates for lrp_new
+        self.assertEqual({'g1': ['hv1'],
+                          'g2': ['hv1', 'hv2', 'hv3'],
+                          'g3': ['hv2', 'hv3', 'hv1'],
+                          'lrp_new': ['hv3', 'hv2', 'hv1']}, planned)
+        self.assertEqual({}, chassis_load['hv4'])
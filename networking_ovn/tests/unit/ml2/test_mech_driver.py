@@ -12,7 +12,10 @@
 #    under the License.
 #
 
+import collections
 import datetime
+import threading
+import time
 import uuid
 
 import mock
@@ -36,6 +39,7 @@ from oslo_utils import timeutils
 
 from neutron.db import provisioning_blocks
 from neutron.plugins.ml2.drivers import type_geneve  # noqa
+from neutron.tests import base
 from neutron.tests import tools
 from neutron.tests.unit.extensions import test_segment
 from neutron.tests.unit.plugins.ml2 import test_ext_portsecurity
@@ -102,6 +106,9 @@ class TestOVNMechanismDriver(test_plugin.Ml2PluginV2TestCase):
         p = mock.patch.object(db_rev, 'bump_revision')
         p.start()
         self.addCleanup(p.stop)
+        p = mock.patch.object(db_rev, 'bump_revisions')
+        p.start()
+        self.addCleanup(p.stop)
 
     @mock.patch.object(db_rev, 'bump_revision')
     def test__create_security_group(self, mock_bump):
@@ -158,14 +165,17 @@ class TestOVNMechanismDriver(test_plugin.Ml2PluginV2TestCase):
                 'SecurityGroupDbMixin.get_security_group_rule',
                 return_value=rule
             ):
-                self.mech_driver._process_sg_rule_notification(
-                    resources.SECURITY_GROUP_RULE, events.BEFORE_DELETE, {},
-                    security_group_rule=rule)
+                with mock.patch('networking_ovn.common.acl.'
+                                'invalidate_sg_rule_match') as mock_inval:
+                    self.mech_driver._process_sg_rule_notification(
+                        resources.SECURITY_GROUP_RULE, events.BEFORE_DELETE,
+                        {}, security_group_rule=rule)
                 ovn_acl_up.assert_called_once_with(
                     mock.ANY, mock.ANY, mock.ANY,
                     'sg_id', rule, is_add_acl=False)
                 mock_delrev.assert_called_once_with(
                     rule['id'], ovn_const.TYPE_SECURITY_GROUP_RULES)
+                mock_inval.assert_called_once_with(rule['id'])
 
     def test_add_acls_no_sec_group(self):
         fake_port_no_sg = fakes.FakePort.create_one_port().info()
@@ -760,6 +770,39 @@ class TestOVNMechanismDriver(test_plugin.Ml2PluginV2TestCase):
                 )
                 ude.assert_called_once_with(port1['port']['id'], False)
 
+    def test_commit_ports_status(self):
+        with self.network(set_context=True, tenant_id='test') as net1, \
+            self.subnet(network=net1) as subnet1, \
+            self.port(subnet=subnet1, set_context=True,
+                      tenant_id='test') as port1, \
+            self.port(subnet=subnet1, set_context=True,
+                      tenant_id='test') as port2, \
+            mock.patch('neutron.db.provisioning_blocks.'
+                       'provisioning_complete') as pc, \
+            mock.patch('neutron.db.provisioning_blocks.'
+                       'add_provisioning_component') as apc, \
+            mock.patch.object(self.mech_driver._plugin, 'get_ports',
+                              wraps=self.mech_driver._plugin.get_ports) as gp:
+                port1_id = port1['port']['id']
+                port2_id = port2['port']['id']
+                self.mech_driver._commit_ports_status(
+                    [(port1_id, True), (port2_id, False), ('foo', False)])
+                # The ports are fetched at once
+                gp.assert_called_once_with(
+                    mock.ANY, filters={'id': [port1_id, port2_id, 'foo']})
+                pc.assert_called_once_with(
+                    mock.ANY, port1_id, resources.PORT,
+                    provisioning_blocks.L2_AGENT_ENTITY)
+                apc.assert_called_once_with(
+                    mock.ANY, port2_id, resources.PORT,
+                    provisioning_blocks.L2_AGENT_ENTITY)
+
+    def test_queue_port_status(self):
+        with mock.patch.object(self.mech_driver,
+                               '_port_status_pipeline') as pipeline:
+            self.mech_driver.queue_port_status('foo', False)
+            pipeline.queue.assert_called_once_with('foo', False)
+
     def test__update_subport_host_if_needed(self):
         """Check that a subport is updated with parent's host_id."""
         binding_host_id = {'binding:host_id': 'hostname'}
@@ -1336,6 +1379,105 @@ class TestOVNMechanismDriver(test_plugin.Ml2PluginV2TestCase):
         mock_create_port.assert_called_once_with(fake_port)
         mock_notify_dhcp.assert_called_once_with(fake_port['id'])
 
+    @mock.patch.object(mech_driver.OVNMechanismDriver, '_notify_dhcp_updated')
+    @mock.patch.object(ovn_client.OVNClient, 'create_ports')
+    @mock.patch.object(ovn_client.OVNClient, 'create_port')
+    def test_create_port_postcommit_bulk(self, mock_create_port,
+                                         mock_create_ports, mock_notify_dhcp):
+        plugin_context = mock.Mock()
+        fake_ports = [fakes.FakePort.create_one_port().info()
+                      for _ in range(3)]
+        fake_ctxs = [mock.Mock(current=port, _plugin_context=plugin_context)
+                     for port in fake_ports]
+        # Simulate the precommit of a bulk request, the last port's
+        # database transaction has been retried and it doesn't exist
+        for ctx in fake_ctxs:
+            self.mech_driver._bulk_port_contexts.setdefault(
+                plugin_context, collections.OrderedDict())[
+                    ctx.current['id']] = ctx
+
+        with mock.patch.object(self.mech_driver._plugin, 'get_ports',
+                               return_value=[{'id': fake_ports[1]['id']}]):
+            for ctx in fake_ctxs[:2]:
+                self.mech_driver.create_port_postcommit(ctx)
+
+        mock_create_ports.assert_called_once_with(fake_ports[:2])
+        mock_create_port.assert_not_called()
+        mock_notify_dhcp.assert_has_calls(
+            [mock.call(fake_ports[0]['id']), mock.call(fake_ports[1]['id'])])
+        self.assertEqual(
+            {}, self.mech_driver._bulk_port_contexts[plugin_context])
+
+    @mock.patch.object(ovn_client.OVNClient, '_create_lswitch_port')
+    @mock.patch.object(ovn_client.OVNClient, '_get_port_options')
+    def test_create_ports(self, mock_get_port_options, mock_create_lsp):
+        ovn_config.cfg.CONF.set_override('ovsdb_txn_chunk_size', 2,
+                                         group='ovn')
+        fake_ports = [fakes.FakePort.create_one_port().info()
+                      for _ in range(3)]
+        self.mech_driver._ovn_client.create_ports(fake_ports)
+
+        self.assertEqual(3, mock_create_lsp.call_count)
+        self.assertEqual(2, self.nb_ovn.transaction.call_count)
+        db_rev.bump_revisions.assert_has_calls([
+            mock.call(fake_ports[:2], ovn_const.TYPE_PORTS),
+            mock.call(fake_ports[2:], ovn_const.TYPE_PORTS)])
+
+    @mock.patch.object(ovn_client.OVNClient, 'update_port')
+    @mock.patch.object(ovn_client.OVNClient, '_update_lswitch_port')
+    @mock.patch.object(ovn_client.OVNClient, '_get_port_options')
+    def test_update_ports(self, mock_get_port_options, mock_update_lsp,
+                          mock_update_port):
+        ovn_config.cfg.CONF.set_override('ovsdb_txn_chunk_size', 2,
+                                         group='ovn')
+        fake_ports = [fakes.FakePort.create_one_port().info()
+                      for _ in range(4)]
+        # The second transaction is aborted due to a revision conflict
+        mock_update_lsp.side_effect = [
+            mock.Mock(result=ovn_const.TXN_COMMITTED),
+            mock.Mock(result=ovn_const.TXN_COMMITTED),
+            mock.Mock(result=None), mock.Mock(result=None)]
+        self.mech_driver._ovn_client.update_ports(fake_ports)
+
+        self.assertEqual(2, self.nb_ovn.transaction.call_count)
+        db_rev.bump_revisions.assert_called_once_with(
+            fake_ports[:2], ovn_const.TYPE_PORTS)
+        mock_update_port.assert_has_calls([
+            mock.call(fake_ports[2], None, port_object=None),
+            mock.call(fake_ports[3], None, port_object=None)])
+
+    def test_update_ports_qos_options(self):
+        ovn_config.cfg.CONF.set_override('ovsdb_txn_chunk_size', 2,
+                                         group='ovn')
+        fake_ports = [fakes.FakePort.create_one_port().info()
+                      for _ in range(6)]
+        qos_options = {'qos_max_rate': '1000'}
+        lsps = [
+            # Up to date
+            mock.Mock(type='', options={'qos_max_rate': '1000',
+                                        'requested-chassis': 'host1'}),
+            # Not created yet in OVN
+            None,
+            mock.Mock(type='', options={'requested-chassis': 'host1'}),
+            mock.Mock(type='', options={'qos_max_rate': '2000',
+                                        'qos_burst': '1000'}),
+            mock.Mock(type='', options={'qos_max_rate': '1000',
+                                        'qos_burst': '1000'}),
+            mock.Mock(type='vtep', options={}),
+        ]
+        self.nb_ovn.get_lswitch_port = mock.Mock(side_effect=lsps)
+        self.mech_driver._ovn_client.update_ports_qos_options(
+            fake_ports, qos_options)
+
+        self.nb_ovn.set_lswitch_port_qos_options.assert_has_calls([
+            mock.call(fake_ports[2]['id'], qos_options),
+            mock.call(fake_ports[3]['id'], qos_options),
+            mock.call(fake_ports[4]['id'], qos_options)])
+        self.assertEqual(
+            3, self.nb_ovn.set_lswitch_port_qos_options.call_count)
+        self.assertEqual(2, self.nb_ovn.transaction.call_count)
+        db_rev.bump_revisions.assert_not_called()
+
     @mock.patch.object(mech_driver.OVNMechanismDriver,
                        '_is_port_provisioning_required', lambda *_: True)
     @mock.patch.object(mech_driver.OVNMechanismDriver, '_notify_dhcp_updated')
@@ -1400,6 +1542,69 @@ class TestOVNMechanismDriver(test_plugin.Ml2PluginV2TestCase):
         # shows it as "dead" instead of blowing up with an exception
         self.assertFalse(self.mech_driver.agent_alive(chassis, agent_type))
 
+    def _add_chassis(self, metadata_agent_id=None):
+        external_ids = {'ovn-bridge-mappings': 'physnet1:br-ex'}
+        if metadata_agent_id:
+            external_ids[ovn_const.OVN_AGENT_METADATA_ID_KEY] = (
+                metadata_agent_id)
+            external_ids[ovn_const.OVN_AGENT_METADATA_SB_CFG_KEY] = '1'
+        chassis = fakes.FakeOvsdbRow.create_one_ovsdb_row(
+            attrs={'uuid': uuid.uuid4(), 'hostname': 'host1', 'nb_cfg': 1,
+                   'external_ids': external_ids})
+        self.mech_driver._sb_ovn.tables = {
+            'Chassis': mock.Mock(rows={chassis.uuid: chassis})}
+        self.mech_driver._nb_ovn.nb_global.nb_cfg = 1
+        return chassis
+
+    def test_get_agents(self):
+        metadata_id = str(uuid.uuid4())
+        chassis = self._add_chassis(metadata_agent_id=metadata_id)
+        agents = mech_driver.get_agents(None, None, _driver=self.mech_driver)
+        self.assertItemsEqual(
+            [str(chassis.uuid), metadata_id], [a['id'] for a in agents])
+        self.assertTrue(all(agent['alive'] for agent in agents))
+        # The chassis are pinged by the maintenance task
+        self.nb_ovn.check_liveness.assert_not_called()
+
+        agents = mech_driver.get_agents(
+            None, None, filters={'agent_type': [ovn_const.OVN_METADATA_AGENT]},
+            _driver=self.mech_driver)
+        self.assertEqual([metadata_id], [a['id'] for a in agents])
+
+    def test_get_agents_chassis_deleted(self):
+        chassis = self._add_chassis()
+        stats.AgentCache.update(chassis)
+        self.mech_driver._sb_ovn.tables['Chassis'].rows = {}
+        self.assertEqual(
+            [], mech_driver.get_agents(None, None, _driver=self.mech_driver))
+
+    def test_get_agent_metadata_id(self):
+        metadata_id = str(uuid.uuid4())
+        chassis = self._add_chassis(metadata_agent_id=metadata_id)
+        stats.AgentCache.update(chassis)
+        with mock.patch.object(stats.AgentCache, 'update') as update:
+            agent = mech_driver.get_agent(None, None, metadata_id,
+                                          _driver=self.mech_driver)
+        # Found through the agent ID index, not by scanning the chassis
+        update.assert_not_called()
+        self.assertEqual(ovn_const.OVN_METADATA_AGENT, agent['agent_type'])
+        self.assertEqual('host1', agent['host'])
+
+    def test_get_agent_metadata_id_not_cached(self):
+        metadata_id = str(uuid.uuid4())
+        chassis = self._add_chassis(metadata_agent_id=metadata_id)
+        stats.AgentCache.delete(chassis.uuid)
+        agent = mech_driver.get_agent(None, None, metadata_id,
+                                      _driver=self.mech_driver)
+        self.assertEqual(metadata_id, agent['id'])
+        self.assertEqual(chassis.uuid,
+                         stats.AgentCache.get_chassis_uuid(metadata_id))
+
+    def test_get_agent_not_found(self):
+        self._add_chassis()
+        self.assertRaises(KeyError, mech_driver.get_agent, None, None,
+                          str(uuid.uuid4()), _driver=self.mech_driver)
+
 
 class OVNMechanismDriverTestCase(test_plugin.Ml2PluginV2TestCase):
     _mechanism_drivers = ['logger', 'ovn']
@@ -2383,3 +2588,81 @@ class TestOVNMechanismDriverMetadataPort(test_plugin.Ml2PluginV2TestCase):
         self.assertEqual(exc.HTTPNoContent.code,
                          res.status_int)
         self.assertEqual(1, self.nb_ovn.delete_lswitch_port.call_count)
+
+    def _test_wait_for_metadata_provisioned(self, networks):
+        self.sb_ovn.get_logical_port_chassis_and_datapath = mock.Mock(
+            return_value=('chassis1', 'dp1'))
+        self.sb_ovn.get_chassis_metadata_networks = mock.Mock(
+            side_effect=networks)
+        with mock.patch.object(mech_driver, 'METADATA_READY_WAIT_TIMEOUT',
+                               0.01), \
+                mock.patch.object(mech_driver.LOG, 'warning') as log_warn:
+            self.mech_driver._wait_for_metadata_provisioned_if_needed(
+                'port1')
+        self.sb_ovn.get_chassis_metadata_networks.assert_called_once_with(
+            'chassis1')
+        self.assertEqual(0, len(self.mech_driver._metadata_ready_waiters))
+        return log_warn
+
+    def test_wait_for_metadata_provisioned(self):
+        log_warn = self._test_wait_for_metadata_provisioned([['dp1']])
+        log_warn.assert_not_called()
+
+    def test_wait_for_metadata_provisioned_notified(self):
+        def get_chassis_metadata_networks(chassis):
+            # The metadata agent provisions the network once the waiter is
+            # registered
+            self.mech_driver.notify_metadata_networks(chassis, {'dp1'})
+            return []
+
+        log_warn = self._test_wait_for_metadata_provisioned(
+            get_chassis_metadata_networks)
+        log_warn.assert_not_called()
+
+    def test_wait_for_metadata_provisioned_timeout(self):
+        log_warn = self._test_wait_for_metadata_provisioned([['dp2']])
+        self.assertEqual(1, log_warn.call_count)
+
+
+class TestMetadataReadyWaiters(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestMetadataReadyWaiters, self).setUp()
+        self.waiters = mech_driver.MetadataReadyWaiters()
+
+    def test_wait_ready(self):
+        self.assertTrue(self.waiters.wait('ch1', 'net1', lambda: True, 0))
+        self.assertEqual(0, len(self.waiters))
+
+    def test_wait_timeout(self):
+        self.assertFalse(self.waiters.wait('ch1', 'net1', lambda: False, 0))
+        self.assertEqual(0, len(self.waiters))
+
+    def test_notify(self):
+        results = []
+
+        def wait():
+            results.append(
+                self.waiters.wait('ch1', 'net1', lambda: False, 10))
+
+        threads = [threading.Thread(target=wait) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        # Wait for the threads to be waiting
+        for _ in range(100):
+            waiter = self.waiters._waiters.get('ch1', {}).get('net1')
+            if waiter and waiter.count == len(threads):
+                break
+            time.sleep(0.01)
+        self.assertEqual(1, len(self.waiters))
+
+        # Other chassis and networks don't release the waiters
+        self.waiters.notify('ch2', ['net1'])
+        self.waiters.notify('ch1', ['net2'])
+        self.assertEqual(1, len(self.waiters))
+
+        self.waiters.notify('ch1', ['net1', 'net2'])
+        for thread in threads:
+            thread.join()
+        self.assertEqual([True] * len(threads), results)
+        self.assertEqual(0, len(self.waiters))
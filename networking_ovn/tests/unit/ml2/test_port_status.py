@@ -0,0 +1,121 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import eventlet
+from eventlet import event
+import mock
+
+from neutron.tests import base
+
+from networking_ovn.ml2 import port_status
+
+
+class TestPortStatusPipeline(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestPortStatusPipeline, self).setUp()
+        self.prepare = mock.Mock()
+        self.commit = mock.Mock()
+        self.pipeline = port_status.PortStatusPipeline(
+            self.prepare, self.commit, workers=10)
+
+    def test_queue(self):
+        self.pipeline.queue('port1', True)
+        self.pipeline.queue('port2', False)
+        self.pipeline.wait()
+        self.assertEqual([mock.call('port1', True), mock.call('port2', False)],
+                         self.prepare.call_args_list)
+        # The prepared ports are committed at once
+        self.commit.assert_called_once_with(
+            [('port1', True), ('port2', False)])
+        stats = self.pipeline.get_stats()
+        self.assertEqual(0, stats['queue_depth'])
+        self.assertEqual(0, stats['in_progress'])
+        self.assertEqual(2, stats['queued'])
+        self.assertEqual(2, stats['processed'])
+        for stage in port_status.STAGES:
+            self.assertEqual(2, self.pipeline.latencies[stage][0])
+
+    def test_queue_coalesced(self):
+        self.pipeline.queue('port1', True)
+        self.pipeline.queue('port1', False)
+        self.pipeline.queue('port1', True)
+        self.pipeline.wait()
+        self.prepare.assert_called_once_with('port1', True)
+        self.commit.assert_called_once_with([('port1', True)])
+        self.assertEqual(2, self.pipeline.counters['coalesced'])
+
+    def test_queue_while_processing(self):
+        def prepare(port_id, up):
+            if self.prepare.call_count == 1:
+                # The port goes down while its status up is prepared
+                self.pipeline.queue(port_id, False)
+                eventlet.sleep(0)
+
+        self.prepare.side_effect = prepare
+        self.pipeline.queue('port1', True)
+        self.pipeline.wait()
+        self.assertEqual([mock.call('port1', True), mock.call('port1', False)],
+                         self.prepare.call_args_list)
+        self.assertEqual([mock.call([('port1', True)]),
+                          mock.call([('port1', False)])],
+                         self.commit.call_args_list)
+
+    def test_slow_port(self):
+        ready = event.Event()
+
+        def prepare(port_id, up):
+            if port_id == 'slow-port':
+                ready.wait()
+
+        def commit(statuses):
+            if ('port1', True) in statuses:
+                ready.send()
+
+        self.prepare.side_effect = prepare
+        self.commit.side_effect = commit
+        self.pipeline.queue('slow-port', True)
+        self.pipeline.queue('port1', True)
+        self.pipeline.wait()
+        # The slow port doesn't hold the status of the other port
+        self.assertEqual([mock.call([('port1', True)]),
+                          mock.call([('slow-port', True)])],
+                         self.commit.call_args_list)
+
+    def test_prepare_failure(self):
+        self.prepare.side_effect = [Exception, None]
+        self.pipeline.queue('port1', True)
+        self.pipeline.queue('port2', True)
+        self.pipeline.wait()
+        self.commit.assert_called_once_with([('port2', True)])
+        self.assertEqual(1, self.pipeline.counters['failed'])
+        self.assertEqual(0, self.pipeline.get_stats()['in_progress'])
+
+    def test_commit_failure(self):
+        self.commit.side_effect = Exception
+        self.pipeline.queue('port1', True)
+        self.pipeline.wait()
+        self.assertEqual(1, self.pipeline.counters['failed'])
+        # The port can be processed again
+        self.commit.side_effect = None
+        self.pipeline.queue('port1', True)
+        self.pipeline.wait()
+        self.assertEqual(2, self.commit.call_count)
+        self.assertEqual(1, self.pipeline.counters['processed'])
+
+    @mock.patch.object(port_status, 'PORT_STATUS_BATCH_SIZE', 2)
+    def test_commit_batches(self):
+        for i in range(5):
+            self.pipeline.queue('port%d' % i, True)
+        self.pipeline.wait()
+        self.assertEqual([2, 2, 1], [len(call[0][0]) for call in
+                                     self.commit.call_args_list])
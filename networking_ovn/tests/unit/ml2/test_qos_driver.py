@@ -161,19 +161,39 @@ class TestOVNQosDriver(base.BaseTestCase):
         port['qos_policy_id'] = None
         self._get_qos_options(port, False, True)
 
+    @mock.patch('neutron_lib.context.get_admin_context', return_value=context)
+    def test_get_qos_options_cache(self, *mocks):
+        cache = {}
+        port = self._create_fake_port()
+        port['qos_policy_id'] = None
+        with mock.patch.object(qos_policy.QosPolicy, 'get_network_policy',
+                               return_value=self.policy) as get_network_policy:
+            with mock.patch.object(
+                    self.driver, '_generate_port_options',
+                    return_value=self.expected) as generate_port_options:
+                for _ in range(2):
+                    options = self.driver.get_qos_options(port, cache=cache)
+                    self.assertEqual(self.expected, options)
+                    # The cached options are not modified by the caller
+                    options['requested-chassis'] = 'host'
+                get_network_policy.assert_called_once_with(context,
+                                                           self.network_id)
+                generate_port_options.assert_called_once_with(
+                    context, self.network_policy_id)
+
     def _update_network_ports(self, port, called):
         with mock.patch.object(self.plugin, 'get_ports',
                                return_value=[port]) as get_ports:
-            with mock.patch.object(self.ovn_client,
-                                   'update_port') as update_port:
+            with mock.patch.object(
+                    self.ovn_client,
+                    'update_ports_qos_options') as update_ports_qos_options:
                 self.driver._update_network_ports(
                     context, self.network_id, {})
                 get_ports.assert_called_once_with(
                     context, filters={'network_id': [self.network_id]})
-                if called:
-                    update_port.assert_called()
-                else:
-                    update_port.assert_not_called()
+                update_ports_qos_options.assert_called_once_with(
+                    [port] if called else [], {})
+                self.ovn_client.update_port.assert_not_called()
 
     def test__update_network_ports_port_policy(self):
         self._update_network_ports(self.port, False)
@@ -225,10 +245,10 @@ class TestOVNQosDriver(base.BaseTestCase):
             mock.patch.object(self.policy, 'get_bound_ports',
                               return_value=[self.port_id]
                               ) as get_bound_ports, \
-            mock.patch.object(self.plugin, 'get_port',
-                              return_value=self.port) as get_port, \
-            mock.patch.object(self.ovn_client, 'update_port',
-                              ) as update_port:
+            mock.patch.object(self.plugin, 'get_ports',
+                              return_value=[self.port]) as get_ports, \
+            mock.patch.object(self.ovn_client, 'update_ports_qos_options',
+                              ) as update_ports_qos_options:
 
             self.driver.update_policy(context, self.policy)
 
@@ -238,5 +258,6 @@ class TestOVNQosDriver(base.BaseTestCase):
             update_network_ports.assert_called_once_with(
                 context, self.network_id, {})
             get_bound_ports.assert_called_once()
-            get_port.assert_called_once_with(context, self.port_id)
-            update_port.assert_called_once_with(self.port, qos_options={})
+            get_ports.assert_called_once_with(
+                context, filters={'id': [self.port_id]})
+            update_ports_qos_options.assert_called_once_with([self.port], {})
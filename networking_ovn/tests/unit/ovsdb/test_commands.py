@@ -365,6 +365,42 @@ class TestSetLSwitchPortCommand(TestBaseCommand):
                     dhcpv4_opts, dhcpv6_opts)
 
 
+class TestSetLSwitchPortQosOptionsCommand(TestBaseCommand):
+
+    def _test_lswitch_port_qos_no_exist(self, if_exists=True):
+        with mock.patch.object(idlutils, 'row_by_value',
+                               side_effect=idlutils.RowNotFound):
+            cmd = commands.SetLSwitchPortQosOptionsCommand(
+                self.ovn_api, 'fake-lsp', {}, if_exists=if_exists)
+            if if_exists:
+                cmd.run_idl(self.transaction)
+            else:
+                self.assertRaises(RuntimeError, cmd.run_idl, self.transaction)
+
+    def test_lswitch_port_qos_no_exist_ignore(self):
+        self._test_lswitch_port_qos_no_exist(if_exists=True)
+
+    def test_lswitch_port_qos_no_exist_fail(self):
+        self._test_lswitch_port_qos_no_exist(if_exists=False)
+
+    def test_lswitch_port_qos_update(self):
+        fake_lsp = fakes.FakeOvsdbRow.create_one_ovsdb_row(
+            attrs={'options': {'requested-chassis': 'host1',
+                               'qos_max_rate': '2000',
+                               'qos_burst': '1000'}},
+            methods={'setkey': None, 'delkey': None})
+        self.ovn_api.lookup_by_index.return_value = [fake_lsp]
+        cmd = commands.SetLSwitchPortQosOptionsCommand(
+            self.ovn_api, fake_lsp.name, {'qos_max_rate': '1000'},
+            if_exists=True)
+        cmd.run_idl(self.transaction)
+        self.ovn_api.lookup_by_index.assert_called_once_with(
+            'Logical_Switch_Port', 'name', fake_lsp.name)
+        fake_lsp.setkey.assert_called_once_with(
+            'options', 'qos_max_rate', '1000')
+        fake_lsp.delkey.assert_called_once_with('options', 'qos_burst')
+
+
 class TestDelLSwitchPortCommand(TestBaseCommand):
 
     def _test_lswitch_no_exist(self, if_exists=True):
@@ -820,9 +856,10 @@ class TestUpdateACLsCommand(TestBaseCommand):
                    'acls': []})
         add_acl = ovn_acl.add_sg_rule_acl_for_port(
             fake_port, fake_sg_rule, 'add_acl')
+        del_acl = {'match': fake_del_acl.match}
         self.ovn_api.get_acls_for_lswitches.return_value = (
-            {fake_port['id']: [fake_del_acl.match]},
-            {fake_del_acl.match: fake_del_acl},
+            {fake_port['id']: [del_acl]},
+            {ovn_acl.ACLFingerprint(del_acl): fake_del_acl},
             {fake_lswitch.name.replace('neutron-', ''): fake_lswitch})
         cmd = commands.UpdateACLsCommand(
             self.ovn_api, [fake_port['network_id']],
@@ -882,6 +919,34 @@ class TestUpdateACLsCommand(TestBaseCommand):
             self.transaction.insert.assert_not_called()
             fake_lswitch.delvalue.assert_called_with('acls', mock.ANY)
 
+    def test_acl_update_no_compare_del_acls_indexed(self):
+        fake_sg_rule = \
+            fakes.FakeSecurityGroupRule.create_one_security_group_rule().info()
+        fake_port = fakes.FakePort.create_one_port().info()
+        del_acl = ovn_acl.add_sg_rule_acl_for_port(
+            fake_port, fake_sg_rule, '*')
+        fake_acl = fakes.FakeOvsdbRow.create_one_ovsdb_row(
+            attrs={'match': '*', 'external_ids': del_acl['external_ids']})
+        fake_other_acl = fakes.FakeOvsdbRow.create_one_ovsdb_row(
+            attrs={'match': 'other', 'external_ids': del_acl['external_ids']})
+        fake_lswitch = fakes.FakeOvsdbRow.create_one_ovsdb_row(
+            attrs={'name': ovn_utils.ovn_name(fake_port['network_id']),
+                   'acls': []})
+        self.ovn_api.lookup_by_index.return_value = [fake_acl, fake_other_acl]
+        with mock.patch.object(idlutils, 'row_by_value',
+                               return_value=fake_lswitch):
+            cmd = commands.UpdateACLsCommand(
+                self.ovn_api, [fake_port['network_id']],
+                [fake_port], {fake_port['id']: del_acl},
+                need_compare=False,
+                is_add_acl=False)
+            cmd.run_idl(self.transaction)
+        self.ovn_api.lookup_by_index.assert_called_once_with(
+            'ACL', 'sg_rule_lport', (fake_sg_rule['id'], fake_port['id']))
+        fake_lswitch.delvalue.assert_called_once_with('acls', fake_acl)
+        fake_acl.delete.assert_called_once_with()
+        fake_other_acl.delete.assert_not_called()
+
 
 class TestAddStaticRouteCommand(TestBaseCommand):
 
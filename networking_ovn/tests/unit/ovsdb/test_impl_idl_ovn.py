@@ -560,6 +560,16 @@ class TestNBImplIdlOvn(TestDBImplIdlOvn):
                                utils.ovn_lrouter_port_name('orp-id-a2')]}
         self.assertItemsEqual(bindings, expected)
 
+    def test_get_chassis_gateway_load(self):
+        self._load_nb_db()
+        load = self.nb_ovn_idl.get_chassis_gateway_load()
+        expected = {'host-1': {0: 2}, 'host-2': {0: 1},
+                    ovn_const.OVN_GATEWAY_INVALID_CHASSIS: {0: 1}}
+        self.assertEqual(expected, load)
+
+        load = self.nb_ovn_idl.get_chassis_gateway_load(['host-2', 'host-3'])
+        self.assertEqual({'host-2': {0: 1}, 'host-3': {}}, load)
+
     def test_get_gateway_chassis_binding(self):
         self._load_nb_db()
         chassis = self.nb_ovn_idl.get_gateway_chassis_binding(
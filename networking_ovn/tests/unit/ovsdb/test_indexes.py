@@ -0,0 +1,289 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sys
+import threading
+
+import mock
+from ovs.db import data as ovs_data
+from ovs.db import types as ovs_types
+
+from networking_ovn.ovsdb import indexes
+from networking_ovn.tests import base
+from networking_ovn.tests.unit import fakes
+
+
+class TestIdlIndexes(base.TestCase):
+
+    def setUp(self):
+        super(TestIdlIndexes, self).setUp()
+        self.pb_table = fakes.FakeOvsdbTable.create_one_ovsdb_table()
+        self.pg_table = fakes.FakeOvsdbTable.create_one_ovsdb_table()
+        self.gwc_table = fakes.FakeOvsdbTable.create_one_ovsdb_table()
+        self.acl_table = fakes.FakeOvsdbTable.create_one_ovsdb_table()
+        self.idl = mock.Mock(tables={'ACL': self.acl_table,
+                                     'Port_Binding': self.pb_table,
+                                     'Port_Group': self.pg_table,
+                                     'Gateway_Chassis': self.gwc_table})
+        self.indexes = indexes.IdlIndexes(self.idl)
+        self.chassis = fakes.FakeOvsdbRow.create_one_ovsdb_row(
+            attrs={'name': 'chassis-1'})
+        self.datapath = fakes.FakeOvsdbRow.create_one_ovsdb_row()
+
+    def _create_row(self, table, table_name, attrs):
+        row = fakes.FakeOvsdbRow.create_one_ovsdb_row(attrs=attrs)
+        row._table = mock.Mock()
+        row._table.name = table_name
+        table.rows[row.uuid] = row
+        self.indexes.notify('create', row)
+        return row
+
+    def _create_port_binding(self, logical_port, mac=None, chassis=None):
+        return self._create_row(
+            self.pb_table, 'Port_Binding',
+            {'logical_port': logical_port, 'mac': mac or [],
+             'chassis': chassis or [], 'datapath': self.datapath})
+
+    def test_only_monitored_tables_are_indexed(self):
+        self.assertTrue(self.indexes.has_index('Port_Binding', 'chassis'))
+        self.assertTrue(self.indexes.has_index('Port_Group', 'name'))
+        self.assertFalse(self.indexes.has_index('Address_Set', 'name'))
+
+    def test_lookup_port_binding_by_chassis(self):
+        pb1 = self._create_port_binding('lp1', chassis=[self.chassis])
+        self._create_port_binding('lp2')
+        self.assertEqual(
+            [pb1], self.indexes.lookup('Port_Binding', 'chassis',
+                                       'chassis-1'))
+        self.assertEqual(
+            [], self.indexes.lookup('Port_Binding', 'chassis', 'chassis-2'))
+
+    def test_lookup_port_binding_by_datapath_ip(self):
+        pb = self._create_port_binding(
+            'lp1', mac=['fa:16:3e:00:00:01 10.0.0.1 fd00::1'])
+        self.assertEqual(
+            [pb], self.indexes.lookup('Port_Binding', 'datapath_ip',
+                                      (str(self.datapath.uuid), 'fd00::1')))
+        self.assertEqual(
+            [], self.indexes.lookup('Port_Binding', 'datapath_ip',
+                                    ('other-dp', '10.0.0.1')))
+
+    def test_lookup_acl_by_sg_rule_lport(self):
+        ext_ids = {'neutron:lport': 'lp1',
+                   'neutron:security_group_rule_id': 'rule-1'}
+        acl = self._create_row(self.acl_table, 'ACL',
+                               {'external_ids': ext_ids})
+        self._create_row(self.acl_table, 'ACL',
+                         {'external_ids': {'neutron:lport': 'lp1'}})
+        self.assertEqual(
+            [acl], self.indexes.lookup('ACL', 'sg_rule_lport',
+                                       ('rule-1', 'lp1')))
+        self.assertEqual(
+            [], self.indexes.lookup('ACL', 'sg_rule_lport',
+                                    ('rule-1', 'lp2')))
+
+    def test_lookup_updated_row(self):
+        pb = self._create_port_binding('lp1')
+        pb.chassis = [self.chassis]
+        self.indexes.notify('update', pb)
+        self.assertEqual(
+            [pb], self.indexes.lookup('Port_Binding', 'chassis',
+                                      'chassis-1'))
+        pb.chassis = []
+        self.indexes.notify('update', pb)
+        self.assertEqual(
+            [], self.indexes.lookup('Port_Binding', 'chassis', 'chassis-1'))
+
+    def test_lookup_deleted_row(self):
+        pg = self._create_row(self.pg_table, 'Port_Group', {'name': 'pg1'})
+        del self.pg_table.rows[pg.uuid]
+        self.indexes.notify('delete', pg)
+        self.assertEqual([], self.indexes.lookup('Port_Group', 'name', 'pg1'))
+
+    def test_lookup_stale_entries(self):
+        # Rows dropped or modified without a notification (e.g. on
+        # reconnection) must not be returned.
+        pg1 = self._create_row(self.pg_table, 'Port_Group', {'name': 'pg1'})
+        pg2 = self._create_row(self.pg_table, 'Port_Group', {'name': 'pg2'})
+        del self.pg_table.rows[pg1.uuid]
+        pg2.name = 'pg3'
+        self.assertEqual([], self.indexes.lookup('Port_Group', 'name', 'pg1'))
+        self.assertEqual([], self.indexes.lookup('Port_Group', 'name', 'pg2'))
+        self.assertEqual(
+            [pg2], self.indexes.lookup('Port_Group', 'name', 'pg3'))
+
+    def test_register_indexes_existing_rows(self):
+        pg = self._create_row(self.pg_table, 'Port_Group', {'name': 'pg1'})
+        new_indexes = indexes.IdlIndexes(self.idl)
+        self.assertEqual([pg], new_indexes.lookup('Port_Group', 'name', 'pg1'))
+
+    def _create_gateway_chassis(self, lrp_name, chassis, priority):
+        return self._create_row(
+            self.gwc_table, 'Gateway_Chassis',
+            {'name': '%s_%s' % (lrp_name, chassis), 'chassis_name': chassis,
+             'priority': priority})
+
+    def _get_gateway_load(self, chassis_list=None):
+        return self.indexes.get_gateway_load(chassis_list)
+
+    def test_gateway_load(self):
+        self._create_gateway_chassis('lrp-1', 'hv1', 2)
+        self._create_gateway_chassis('lrp-1', 'hv2', 1)
+        self._create_gateway_chassis('lrp-2', 'hv1', 2)
+        # Not a gateway of a neutron router
+        self._create_gateway_chassis('gw-1', 'hv2', 2)
+        self.assertEqual({'hv1': {2: 2}, 'hv2': {1: 1}},
+                         self._get_gateway_load())
+        self.assertEqual({'hv2': {1: 1}, 'hv3': {}},
+                         self._get_gateway_load(['hv2', 'hv3']))
+
+    def test_gateway_load_updated_and_deleted_rows(self):
+        gwc1 = self._create_gateway_chassis('lrp-1', 'hv1', 2)
+        gwc2 = self._create_gateway_chassis('lrp-2', 'hv1', 2)
+        gwc1.priority = 1
+        self.indexes.notify('update', gwc1)
+        self.assertEqual({'hv1': {1: 1, 2: 1}}, self._get_gateway_load())
+        del self.gwc_table.rows[gwc2.uuid]
+        self.indexes.notify('delete', gwc2)
+        self.assertEqual({'hv1': {1: 1}}, self._get_gateway_load())
+
+    def test_gateway_load_stale_entries(self):
+        gwc = self._create_gateway_chassis('lrp-1', 'hv1', 2)
+        del self.gwc_table.rows[gwc.uuid]
+        self.assertEqual({}, self._get_gateway_load())
+        self.assertEqual({'hv1': {}}, self._get_gateway_load(['hv1']))
+
+    def test_lookup_waits_for_notify(self):
+        pg = self._create_row(self.pg_table, 'Port_Group', {'name': 'pg1'})
+        result = []
+        with self.indexes._lock:
+            # A notification is being processed, e.g. by the IDL thread
+            thread = threading.Thread(target=lambda: result.append(
+                self.indexes.lookup('Port_Group', 'name', 'pg1')))
+            thread.start()
+            thread.join(0.1)
+            self.assertEqual([], result)
+        thread.join()
+        self.assertEqual([[pg]], result)
+
+
+class TestOctaviaProviderIndexes(base.TestCase):
+
+    def setUp(self):
+        super(TestOctaviaProviderIndexes, self).setUp()
+        self.lb_table = fakes.FakeOvsdbTable.create_one_ovsdb_table()
+        self.lr_table = fakes.FakeOvsdbTable.create_one_ovsdb_table()
+        self.lrp_table = fakes.FakeOvsdbTable.create_one_ovsdb_table()
+        self.idl = mock.Mock(tables={'Load_Balancer': self.lb_table,
+                                     'Logical_Router': self.lr_table,
+                                     'Logical_Router_Port': self.lrp_table})
+        self.indexes = indexes.IdlIndexes(
+            self.idl, indexes=indexes.OCTAVIA_PROVIDER_INDEXES,
+            gateway_load=False)
+
+    def _create_row(self, table, table_name, attrs):
+        row = fakes.FakeOvsdbRow.create_one_ovsdb_row(attrs=attrs)
+        row._table = mock.Mock()
+        row._table.name = table_name
+        table.rows[row.uuid] = row
+        self.indexes.notify('create', row)
+        return row
+
+    def test_no_gateway_load_index(self):
+        self.assertFalse(self.indexes.has_index('Logical_Router_Port',
+                                                'gateway_load'))
+        self.assertIsNone(self.indexes.get_gateway_load())
+
+    def test_lookup_load_balancer(self):
+        lb = self._create_row(
+            self.lb_table, 'Load_Balancer',
+            {'name': 'lb1', 'external_ids': {'pool_p1': '',
+                                             'pool_p2:D': 'member_m1',
+                                             'listener_l1': '80:pool_p1'}})
+        self.assertEqual(
+            [lb], self.indexes.lookup('Load_Balancer', 'name', 'lb1'))
+        self.assertEqual(
+            [lb], self.indexes.lookup('Load_Balancer', 'pool_key', 'pool_p1'))
+        self.assertEqual(
+            [lb], self.indexes.lookup('Load_Balancer', 'pool_key',
+                                      'pool_p2:D'))
+        self.assertEqual(
+            [], self.indexes.lookup('Load_Balancer', 'pool_key',
+                                    'listener_l1'))
+        # The pool is disabled
+        lb.external_ids = {'pool_p1:D': ''}
+        self.indexes.notify('update', lb)
+        self.assertEqual(
+            [], self.indexes.lookup('Load_Balancer', 'pool_key', 'pool_p1'))
+        self.assertEqual(
+            [lb], self.indexes.lookup('Load_Balancer', 'pool_key',
+                                      'pool_p1:D'))
+
+    @staticmethod
+    def _ports_datum(ports):
+        # The raw data of the ports column of a Logical_Router
+        port_type = ovs_types.Type(
+            ovs_types.BaseType(ovs_types.UuidType,
+                               ref_table_name='Logical_Router_Port'),
+            n_min=0, n_max=sys.maxsize)
+        return ovs_data.Datum(port_type, dict(
+            (ovs_data.Atom(ovs_types.UuidType, port.uuid), None)
+            for port in ports))
+
+    def test_lookup_logical_router_by_port_uuid(self):
+        lrp1 = self._create_row(self.lrp_table, 'Logical_Router_Port',
+                                {'name': 'lrp1'})
+        lrp2 = self._create_row(self.lrp_table, 'Logical_Router_Port',
+                                {'name': 'lrp2'})
+        lr = self._create_row(self.lr_table, 'Logical_Router',
+                              {'name': 'lr1', 'ports': [lrp1],
+                               '_data': {'ports': self._ports_datum([lrp1])}})
+        self.assertEqual(
+            [lrp1], self.indexes.lookup('Logical_Router_Port', 'name',
+                                        'lrp1'))
+        self.assertEqual(
+            [lr], self.indexes.lookup('Logical_Router', 'port_uuid',
+                                      lrp1.uuid))
+        lr.ports = [lrp1, lrp2]
+        lr._data = {'ports': self._ports_datum([lrp1, lrp2])}
+        self.indexes.notify('update', lr)
+        self.assertEqual(
+            [lr], self.indexes.lookup('Logical_Router', 'port_uuid',
+                                      lrp2.uuid))
+        del self.lr_table.rows[lr.uuid]
+        self.indexes.notify('delete', lr)
+        self.assertEqual(
+            [], self.indexes.lookup('Logical_Router', 'port_uuid',
+                                    lrp1.uuid))
+
+    def test_lookup_logical_router_port_notified_after_router(self):
+        # The router is notified before the row of its new port exists, the
+        # port is missing from its ports column but not from its raw data
+        lrp = fakes.FakeOvsdbRow.create_one_ovsdb_row(attrs={'name': 'lrp1'})
+        lr = self._create_row(self.lr_table, 'Logical_Router',
+                              {'name': 'lr1', 'ports': [],
+                               '_data': {'ports': self._ports_datum([lrp])}})
+        self.assertEqual(
+            [lr], self.indexes.lookup('Logical_Router', 'port_uuid',
+                                      lrp.uuid))
+
+    def test_lookup_by_index(self):
+        lr = self._create_row(self.lr_table, 'Logical_Router',
+                              {'name': 'lr1', 'ports': [],
+                               '_data': {'ports': self._ports_datum([])}})
+        self.idl.indexes = self.indexes
+        self.assertEqual([], indexes.lookup_by_index(
+            self.idl, 'Logical_Router', 'port_uuid', lr.uuid))
+        self.assertIsNone(indexes.lookup_by_index(
+            self.idl, 'Logical_Router', 'name', 'lr1'))
+        self.assertIsNone(indexes.lookup_by_index(
+            mock.Mock(spec=[]), 'Logical_Router', 'port_uuid', lr.uuid))
@@ -89,8 +89,7 @@ class TestOvnNbIdlNotifyHandler(test_mech_driver.OVNMechanismDriverTestCase):
         self.idl.lock_name = self.idl.event_lock_name
         self.idl.has_lock = True
         self.lp_table = self.idl.tables.get('Logical_Switch_Port')
-        self.driver.set_port_status_up = mock.Mock()
-        self.driver.set_port_status_down = mock.Mock()
+        self.driver.queue_port_status = mock.Mock()
 
     def _test_lsp_helper(self, event, new_row_json, old_row_json=None,
                          table=None):
@@ -113,32 +112,29 @@ class TestOvnNbIdlNotifyHandler(test_mech_driver.OVNMechanismDriverTestCase):
     def test_lsp_up_create_event(self):
         row_data = {"up": True, "name": "foo-name"}
         self._test_lsp_helper('create', row_data)
-        self.driver.set_port_status_up.assert_called_once_with("foo-name")
-        self.assertFalse(self.driver.set_port_status_down.called)
+        self.driver.queue_port_status.assert_called_once_with(
+            "foo-name", True)
 
     def test_lsp_down_create_event(self):
         row_data = {"up": False, "name": "foo-name"}
         self._test_lsp_helper('create', row_data)
-        self.driver.set_port_status_down.assert_called_once_with("foo-name")
-        self.assertFalse(self.driver.set_port_status_up.called)
+        self.driver.queue_port_status.assert_called_once_with(
+            "foo-name", False)
 
     def test_lsp_up_not_set_event(self):
         row_data = {"up": ['set', []], "name": "foo-name"}
         self._test_lsp_helper('create', row_data)
-        self.assertFalse(self.driver.set_port_status_up.called)
-        self.assertFalse(self.driver.set_port_status_down.called)
+        self.assertFalse(self.driver.queue_port_status.called)
 
     def test_unwatch_logical_switch_port_create_events(self):
         self.idl.unwatch_logical_switch_port_create_events()
         row_data = {"up": True, "name": "foo-name"}
         self._test_lsp_helper('create', row_data)
-        self.assertFalse(self.driver.set_port_status_up.called)
-        self.assertFalse(self.driver.set_port_status_down.called)
+        self.assertFalse(self.driver.queue_port_status.called)
 
         row_data["up"] = False
         self._test_lsp_helper('create', row_data)
-        self.assertFalse(self.driver.set_port_status_up.called)
-        self.assertFalse(self.driver.set_port_status_down.called)
+        self.assertFalse(self.driver.queue_port_status.called)
 
     def test_post_connect(self):
         self.idl.post_connect()
@@ -150,30 +146,28 @@ class TestOvnNbIdlNotifyHandler(test_mech_driver.OVNMechanismDriverTestCase):
         old_row_json = {"up": False}
         self._test_lsp_helper('update', new_row_json,
                               old_row_json=old_row_json)
-        self.driver.set_port_status_up.assert_called_once_with("foo-name")
-        self.assertFalse(self.driver.set_port_status_down.called)
+        self.driver.queue_port_status.assert_called_once_with(
+            "foo-name", True)
 
     def test_lsp_down_update_event(self):
         new_row_json = {"up": False, "name": "foo-name"}
         old_row_json = {"up": True}
         self._test_lsp_helper('update', new_row_json,
                               old_row_json=old_row_json)
-        self.driver.set_port_status_down.assert_called_once_with("foo-name")
-        self.assertFalse(self.driver.set_port_status_up.called)
+        self.driver.queue_port_status.assert_called_once_with(
+            "foo-name", False)
 
     def test_lsp_up_update_event_no_old_data(self):
         new_row_json = {"up": True, "name": "foo-name"}
         self._test_lsp_helper('update', new_row_json,
                               old_row_json=None)
-        self.assertFalse(self.driver.set_port_status_up.called)
-        self.assertFalse(self.driver.set_port_status_down.called)
+        self.assertFalse(self.driver.queue_port_status.called)
 
     def test_lsp_down_update_event_no_old_data(self):
         new_row_json = {"up": False, "name": "foo-name"}
         self._test_lsp_helper('update', new_row_json,
                               old_row_json=None)
-        self.assertFalse(self.driver.set_port_status_up.called)
-        self.assertFalse(self.driver.set_port_status_down.called)
+        self.assertFalse(self.driver.queue_port_status.called)
 
     def test_lsp_other_column_update_event(self):
         new_row_json = {"up": False, "name": "foo-name",
@@ -181,15 +175,13 @@ class TestOvnNbIdlNotifyHandler(test_mech_driver.OVNMechanismDriverTestCase):
         old_row_json = {"addresses": ["10.0.0.3"]}
         self._test_lsp_helper('update', new_row_json,
                               old_row_json=old_row_json)
-        self.assertFalse(self.driver.set_port_status_up.called)
-        self.assertFalse(self.driver.set_port_status_down.called)
+        self.assertFalse(self.driver.queue_port_status.called)
 
     def test_notify_other_table(self):
         new_row_json = {"name": "foo-name"}
         self._test_lsp_helper('create', new_row_json,
                               table=self.idl.tables.get("Logical_Switch"))
-        self.assertFalse(self.driver.set_port_status_up.called)
-        self.assertFalse(self.driver.set_port_status_down.called)
+        self.assertFalse(self.driver.queue_port_status.called)
 
     def test_notify_no_ovsdb_lock(self):
         self.idl.is_lock_contended = True
@@ -220,6 +212,9 @@ class TestOvnSbIdlNotifyHandler(test_mech_driver.OVNMechanismDriverTestCase):
         self.driver.update_segment_host_mapping = mock.Mock()
         self.l3_plugin = directory.get_plugin(constants.L3)
         self.l3_plugin.schedule_unhosted_gateways = mock.Mock()
+        # The events are debounced, the tests flush them explicitly
+        self.mock_timer = mock.patch.object(ovsdb_monitor.threading,
+                                            'Timer').start()
 
         self.row_json = {
             "name": "fake-name",
@@ -228,7 +223,7 @@ class TestOvnSbIdlNotifyHandler(test_mech_driver.OVNMechanismDriverTestCase):
                                       "fake-phynet1:fake-br1"]]]
         }
 
-    def _test_chassis_helper(self, event, new_row_json, old_row_json=None):
+    def _notify_chassis(self, event, new_row_json, old_row_json=None):
         row_uuid = uuidutils.generate_uuid()
         table = self.chassis_table
         row = ovs_idl.Row.from_json(self.sb_idl, table, row_uuid, new_row_json)
@@ -238,10 +233,17 @@ class TestOvnSbIdlNotifyHandler(test_mech_driver.OVNMechanismDriverTestCase):
         else:
             old_row = None
         self.sb_idl.notify(event, row, updates=old_row)
+
+    def _process_chassis_events(self):
         # Add a STOP EVENT to the queue
         self.sb_idl.notify_handler.shutdown()
         # Execute the notifications queued
         self.sb_idl.notify_handler.notify_loop()
+        self.sb_idl._chassis_event.flush()
+
+    def _test_chassis_helper(self, event, new_row_json, old_row_json=None):
+        self._notify_chassis(event, new_row_json, old_row_json)
+        self._process_chassis_events()
 
     def test_chassis_create_event(self):
         self._test_chassis_helper('create', self.row_json)
@@ -270,6 +272,75 @@ class TestOvnSbIdlNotifyHandler(test_mech_driver.OVNMechanismDriverTestCase):
             1,
             self.l3_plugin.schedule_unhosted_gateways.call_count)
 
+    def test_chassis_update_event_hostname(self):
+        old_row_json = {'hostname': 'old-hostname'}
+        self._test_chassis_helper('update', self.row_json, old_row_json)
+        self.driver.update_segment_host_mapping.assert_called_once_with(
+            'fake-hostname', ['fake-phynet1'])
+
+    def test_chassis_update_event_filtered(self):
+        # Only the external_ids keys not used by the segment host mappings
+        # nor by the gateways scheduling are updated
+        row_json = copy.deepcopy(self.row_json)
+        row_json['external_ids'][1].append(['neutron:ovn-metadata-id', 'id'])
+        old_row_json = {'external_ids': self.row_json['external_ids']}
+        self._test_chassis_helper('update', row_json, old_row_json)
+        self.driver.update_segment_host_mapping.assert_not_called()
+        self.l3_plugin.schedule_unhosted_gateways.assert_not_called()
+        self.mock_timer.assert_not_called()
+        self.assertEqual(1, self.sb_idl._chassis_event.counters['filtered'])
+
+    def test_chassis_events_coalesced(self):
+        row_json2 = copy.deepcopy(self.row_json)
+        row_json2['hostname'] = 'fake-hostname2'
+        self._notify_chassis('create', self.row_json)
+        self._notify_chassis('create', row_json2)
+        self._notify_chassis('delete', self.row_json)
+        self._process_chassis_events()
+
+        # The last event of a host wins
+        self.assertEqual(2, self.driver.update_segment_host_mapping.call_count)
+        self.driver.update_segment_host_mapping.assert_has_calls(
+            [mock.call('fake-hostname', []),
+             mock.call('fake-hostname2', ['fake-phynet1'])], any_order=True)
+        self.assertEqual(
+            1,
+            self.l3_plugin.schedule_unhosted_gateways.call_count)
+        self.mock_timer.assert_called_once_with(
+            ovsdb_monitor.ChassisEvent.DEBOUNCE_DELAY,
+            self.sb_idl._chassis_event.flush)
+        counters = self.sb_idl._chassis_event.counters
+        self.assertEqual(1, counters['processed'])
+        self.assertEqual(2, counters['coalesced'])
+
+    def test_chassis_events_flush_nothing_pending(self):
+        self.sb_idl._chassis_event.flush()
+        self.driver.update_segment_host_mapping.assert_not_called()
+        self.l3_plugin.schedule_unhosted_gateways.assert_not_called()
+
+    def _test_chassis_metadata_networks(self, old_networks, new_networks):
+        self.driver.notify_metadata_networks = mock.Mock()
+        # The waiters are notified even if the SB event lock is not held
+        self.sb_idl.is_lock_contended = True
+        row_json = copy.deepcopy(self.row_json)
+        row_json['external_ids'][1].append(
+            ['neutron-metadata-proxy-networks', new_networks])
+        old_row_json = copy.deepcopy(self.row_json)
+        old_row_json['external_ids'][1].append(
+            ['neutron-metadata-proxy-networks', old_networks])
+        self._notify_chassis('update', row_json,
+                             {'external_ids': old_row_json['external_ids']})
+        self.driver.update_segment_host_mapping.assert_not_called()
+        return self.driver.notify_metadata_networks
+
+    def test_chassis_metadata_networks_event(self):
+        notify = self._test_chassis_metadata_networks('net1', 'net1,net2')
+        notify.assert_called_once_with('fake-name', {'net2'})
+
+    def test_chassis_metadata_networks_event_removed(self):
+        notify = self._test_chassis_metadata_networks('net1,net2', 'net1')
+        notify.assert_not_called()
+
 
 class TestOvnDbNotifyHandler(base.TestCase):
 
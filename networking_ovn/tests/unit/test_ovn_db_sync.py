@@ -14,8 +14,11 @@
 
 import collections
 
+import eventlet
 import mock
+from neutron_lib import context
 
+from networking_ovn.common import config as ovn_config
 from networking_ovn.common import constants as ovn_const
 from networking_ovn.common import ovn_client
 from networking_ovn import ovn_db_sync
@@ -440,6 +443,7 @@ class TestOvnNbSyncML2(test_mech_driver.OVNMechanismDriverTestCase):
         ovn_driver.validate_and_get_data_from_binding_profile = mock.Mock()
         ovn_nb_synchronizer._ovn_client.create_port = mock.Mock()
         ovn_nb_synchronizer._ovn_client.create_port.return_value = mock.ANY
+        ovn_nb_synchronizer._ovn_client.create_ports = mock.Mock()
         ovn_nb_synchronizer._ovn_client._create_provnet_port = mock.Mock()
         ovn_api.ls_del = mock.Mock()
         ovn_api.delete_lswitch_port = mock.Mock()
@@ -595,12 +599,11 @@ class TestOvnNbSyncML2(test_mech_driver.OVNMechanismDriverTestCase):
         ovn_nb_synchronizer._ovn_client.create_network.assert_has_calls(
             create_network_calls, any_order=True)
 
-        self.assertEqual(
-            len(create_port_list),
-            ovn_nb_synchronizer._ovn_client.create_port.call_count)
-        create_port_calls = [mock.call(port) for port in create_port_list]
-        ovn_nb_synchronizer._ovn_client.create_port.assert_has_calls(
-            create_port_calls, any_order=True)
+        created_ports = [
+            port for call in
+            ovn_nb_synchronizer._ovn_client.create_ports.call_args_list
+            for port in call[0][0]]
+        self.assertItemsEqual(create_port_list, created_ports)
 
         create_provnet_port_calls = [
             mock.call(mock.ANY, mock.ANY,
@@ -944,6 +947,424 @@ class TestOvnNbSyncML2(test_mech_driver.OVNMechanismDriverTestCase):
     def test_ovn_nb_sync_mode_log_no_pgs(self):
         self._test_ovn_nb_sync_mode_log_helper(port_groups_supported=False)
 
+    def test_ovn_nb_sync_stages_concurrency(self):
+        ovn_config.cfg.CONF.set_override('neutron_sync_concurrency', 3,
+                                         group='ovn')
+        ovn_nb_synchronizer = ovn_db_sync.OvnNbSynchronizer(
+            self.plugin, self.mech_driver._nb_ovn, self.mech_driver._sb_ovn,
+            'log', self.mech_driver)
+        running = set()
+        events = []
+
+        def fake_stage(name, deps):
+            def stage(ctx):
+                # All the dependencies must have finished
+                self.assertTrue(set(deps).issubset(
+                    [e[1] for e in events if e[0] == 'finished']))
+                running.add(name)
+                events.append(('started', name, len(running)))
+                eventlet.sleep(0)
+                running.discard(name)
+                events.append(('finished', name, len(running)))
+                return 1
+            return stage
+
+        stages = [(name, fake_stage(name, deps), deps) for name, _func, deps
+                  in ovn_nb_synchronizer._get_sync_stages()]
+        with mock.patch.object(ovn_nb_synchronizer, '_get_sync_stages',
+                               return_value=stages):
+            ovn_nb_synchronizer.do_sync()
+
+        self.assertEqual(len(stages) * 2, len(events))
+        # Address Sets and Port Groups run concurrently, so do the
+        # stages depending only on the networks and ports one
+        self.assertEqual(2, max(e[2] for e in events[:2]))
+        self.assertEqual(3, max(e[2] for e in events))
+
+    def _test_ovn_nb_sync_revision_numbers(self, mode):
+        neutron_revs = {
+            ovn_const.TYPE_NETWORKS: {'n1': 1, 'n2': 2},
+            ovn_const.TYPE_PORTS: {'p1': 1, 'p2': 3, 'p3': 1}}
+        ovn_revs = {
+            ovn_const.TYPE_NETWORKS: {'n1': 1, 'n3': 4},
+            ovn_const.TYPE_PORTS: {'p1': 1, 'p2': 2}}
+        ovn_nb_synchronizer = ovn_db_sync.OvnNbSynchronizer(
+            self.plugin, self.mech_driver._nb_ovn, self.mech_driver._sb_ovn,
+            mode, self.mech_driver)
+        ovn_nb_synchronizer.ovn_api.get_revision_numbers.side_effect = (
+            lambda res_type: ovn_revs.get(res_type, {}))
+        ovn_api = ovn_nb_synchronizer.ovn_api
+        ovn_client = ovn_nb_synchronizer._ovn_client
+        core_plugin = ovn_nb_synchronizer.core_plugin
+
+        def get_resources(res_type):
+            return lambda ctx, filters: [
+                {'id': res_uuid, 'type': res_type}
+                for res_uuid in filters['id']]
+
+        with mock.patch.object(
+                ovn_db_sync.db_rev, 'get_neutron_revision_numbers',
+                side_effect=lambda res_type: neutron_revs.get(res_type, {})), \
+                mock.patch.object(core_plugin, 'get_networks',
+                                  side_effect=get_resources('net')), \
+                mock.patch.object(core_plugin, 'get_ports',
+                                  side_effect=get_resources('port')), \
+                mock.patch.object(ovn_client, 'create_network') as m_cn, \
+                mock.patch.object(ovn_client, 'delete_network') as m_dn, \
+                mock.patch.object(ovn_client, 'update_network') as m_un, \
+                mock.patch.object(ovn_client, 'update_ports') as m_ups, \
+                mock.patch.object(ovn_client, 'delete_port') as m_dp, \
+                mock.patch.object(ovn_nb_synchronizer,
+                                  '_create_ports_in_ovn') as m_cps:
+            ctx = context.get_admin_context()
+            self.assertEqual(
+                5, ovn_nb_synchronizer.sync_revision_numbers(ctx))
+
+        self.assertEqual(len(ovn_db_sync.INCREMENTAL_SYNC_TYPES),
+                         ovn_api.get_revision_numbers.call_count)
+        if mode == ovn_db_sync.SYNC_MODE_LOG:
+            for m in (m_cn, m_dn, m_un, m_ups, m_dp, m_cps):
+                m.assert_not_called()
+            return
+
+        m_cn.assert_called_once_with({'id': 'n2', 'type': 'net'})
+        m_dn.assert_called_once_with('n3')
+        m_un.assert_not_called()
+        m_cps.assert_called_once_with(ctx, [{'id': 'p3', 'type': 'port'}])
+        m_ups.assert_called_once_with([{'id': 'p2', 'type': 'port'}])
+        m_dp.assert_not_called()
+
+    def test_ovn_nb_sync_revision_numbers_repair(self):
+        self._test_ovn_nb_sync_revision_numbers(ovn_db_sync.SYNC_MODE_REPAIR)
+
+    def test_ovn_nb_sync_revision_numbers_log(self):
+        self._test_ovn_nb_sync_revision_numbers(ovn_db_sync.SYNC_MODE_LOG)
+
+    def test_ovn_nb_sync_incremental_stages(self):
+        ovn_config.cfg.CONF.set_override('neutron_sync_incremental', True,
+                                         group='ovn')
+        ovn_nb_synchronizer = ovn_db_sync.OvnNbSynchronizer(
+            self.plugin, self.mech_driver._nb_ovn, self.mech_driver._sb_ovn,
+            'log', self.mech_driver)
+        stages = ovn_nb_synchronizer._get_sync_stages()
+        self.assertEqual(
+            ['address_sets', 'port_groups', 'revision_numbers',
+             'metadata_provnet_and_dhcp_opts', 'port_dns_records', 'acls'],
+            [name for name, _func, _deps in stages])
+
+    def test_ovn_nb_sync_metadata_provnet_and_dhcp_opts(self):
+        ovn_nb_synchronizer = ovn_db_sync.OvnNbSynchronizer(
+            self.plugin, self.mech_driver._nb_ovn, self.mech_driver._sb_ovn,
+            'repair', self.mech_driver)
+        ovn_api = ovn_nb_synchronizer.ovn_api
+        core_plugin = ovn_nb_synchronizer.core_plugin
+        networks = [{'id': 'n1', 'provider:physical_network': 'physnet1',
+                     'provider:segmentation_id': 100},
+                    {'id': 'n2'}]
+        ports = [{'id': 'p1', 'network_id': 'n1',
+                  'device_owner': 'compute:nova'},
+                 {'id': 'p2', 'network_id': 'n1',
+                  'device_owner': 'network:dhcp'},
+                 {'id': 'p3', 'network_id': 'n2',
+                  'device_owner': 'compute:nova'}]
+        ovn_api.get_all_logical_switches_with_ports = mock.Mock()
+        ovn_api.get_all_logical_switches_with_ports.return_value = [
+            {'name': 'neutron-n1', 'ports': ['p1', 'p2'],
+             'provnet_port': None},
+            {'name': 'neutron-n2', 'ports': ['p3'], 'provnet_port': None}]
+        ovn_api.get_all_dhcp_options.return_value = {
+            'subnets': {}, 'ports_v4': {'p1': {}}, 'ports_v6': {}}
+
+        with mock.patch.object(core_plugin, 'get_networks',
+                               return_value=networks), \
+                mock.patch.object(core_plugin, 'get_ports',
+                                  return_value=ports), \
+                mock.patch.object(ovn_nb_synchronizer,
+                                  '_sync_metadata_ports') as m_md, \
+                mock.patch.object(ovn_nb_synchronizer,
+                                  '_sync_port_dhcp_options') as m_dhcp, \
+                mock.patch.object(ovn_nb_synchronizer._ovn_client,
+                                  '_create_provnet_port') as m_provnet:
+            ctx = context.get_admin_context()
+            self.assertEqual(
+                1, ovn_nb_synchronizer.sync_metadata_provnet_and_dhcp_opts(
+                    ctx))
+
+        m_md.assert_called_once_with(ctx, {})
+        m_provnet.assert_called_once_with(mock.ANY, networks[0], 'physnet1',
+                                          100)
+        m_dhcp.assert_called_once_with(ctx, [ports[0], ports[2]],
+                                       {'p1': {}}, {})
+
+    def test_ovn_nb_sync_incremental_create_router_port(self):
+        ovn_nb_synchronizer = ovn_db_sync.OvnNbSynchronizer(
+            self.plugin, self.mech_driver._nb_ovn, self.mech_driver._sb_ovn,
+            'repair', self.mech_driver)
+        ovn_api = ovn_nb_synchronizer.ovn_api
+        client = ovn_nb_synchronizer._ovn_client
+        port = {'id': 'port-id', 'device_id': 'router-id',
+                'device_owner': 'network:router_interface',
+                'revision_number': 1,
+                'mac_address': 'fa:16:3e:00:00:01', 'network_id': 'net-id',
+                'fixed_ips': [{'subnet_id': 'subnet-id',
+                               'ip_address': '10.0.0.1'}]}
+        router = {'id': 'router-id', 'gw_port_id': 'gw-port-id',
+                  'external_gateway_info': {
+                      'network_id': 'ext-net-id', 'enable_snat': True,
+                      'external_fixed_ips': [{'subnet_id': 'ext-subnet-id',
+                                              'ip_address': '172.24.4.2'}]}}
+        subnets = {'subnet-id': {'id': 'subnet-id', 'ip_version': 4,
+                                 'cidr': '10.0.0.0/24',
+                                 'network_id': 'net-id'},
+                   'ext-subnet-id': {'id': 'ext-subnet-id', 'ip_version': 4,
+                                     'cidr': '172.24.4.0/24',
+                                     'gateway_ip': '172.24.4.1',
+                                     'network_id': 'ext-net-id'}}
+        client._plugin_property = mock.Mock()
+        client._plugin_property.get_port.return_value = port
+        client._plugin_property.get_subnet.side_effect = (
+            lambda ctx, subnet_id: subnets[subnet_id])
+        client._l3_plugin_property = mock.Mock()
+        client._l3_plugin_property.get_router.return_value = router
+        with mock.patch.object(ovn_client.db_rev, 'bump_revision') as bump:
+            ovn_nb_synchronizer._get_incremental_sync_map()[
+                ovn_const.TYPE_ROUTER_PORTS]['ovn_create'](port)
+
+        ovn_api.add_lrouter_port.assert_called_once_with(
+            name='lrp-port-id', lrouter='neutron-router-id',
+            mac='fa:16:3e:00:00:01', networks=['10.0.0.1/24'],
+            may_exist=True, external_ids=mock.ANY)
+        ovn_api.add_nat_rule_in_lrouter.assert_called_once_with(
+            'neutron-router-id', type='snat', logical_ip='10.0.0.0/24',
+            external_ip='172.24.4.2')
+        bump.assert_called_once_with(port, ovn_const.TYPE_ROUTER_PORTS)
+
+    def test_ovn_nb_sync_incremental_create_router_gw_port(self):
+        ovn_nb_synchronizer = ovn_db_sync.OvnNbSynchronizer(
+            self.plugin, self.mech_driver._nb_ovn, self.mech_driver._sb_ovn,
+            'repair', self.mech_driver)
+        ovn_api = ovn_nb_synchronizer.ovn_api
+        client = ovn_nb_synchronizer._ovn_client
+        port = {'id': 'gw-port-id', 'device_id': 'router-id',
+                'device_owner': 'network:router_gateway',
+                'revision_number': 1,
+                'mac_address': 'fa:16:3e:00:00:02', 'network_id': 'ext-net-id',
+                'fixed_ips': [{'subnet_id': 'ext-subnet-id',
+                               'ip_address': '172.24.4.2'}]}
+        router = {'id': 'router-id', 'gw_port_id': 'gw-port-id',
+                  'external_gateway_info': {
+                      'network_id': 'ext-net-id', 'enable_snat': True,
+                      'external_fixed_ips': [{'subnet_id': 'ext-subnet-id',
+                                              'ip_address': '172.24.4.2'}]}}
+        subnet = {'id': 'ext-subnet-id', 'ip_version': 4,
+                  'cidr': '172.24.4.0/24', 'gateway_ip': '172.24.4.1',
+                  'network_id': 'ext-net-id'}
+        client._plugin_property = mock.Mock()
+        client._plugin_property.get_port.return_value = port
+        client._plugin_property.get_subnet.return_value = subnet
+        with mock.patch.object(ovn_nb_synchronizer.l3_plugin, 'get_router',
+                               return_value=router), \
+                mock.patch.object(client, 'create_router_port') as create, \
+                mock.patch.object(
+                    client, '_get_v4_network_of_all_router_ports',
+                    return_value=['10.0.0.0/24']), \
+                mock.patch.object(client, '_get_physnet', return_value=None), \
+                mock.patch.object(client, 'get_candidates_for_scheduling',
+                                  return_value=['chassis1']), \
+                mock.patch.object(client._ovn_scheduler, 'select',
+                                  return_value=['chassis1']), \
+                mock.patch.object(ovn_db_sync.db_rev,
+                                  'bump_revision') as bump:
+            ovn_nb_synchronizer._get_incremental_sync_map()[
+                ovn_const.TYPE_ROUTER_PORTS]['ovn_create'](port)
+
+        # The gateway port is recreated with its gateway chassis, along with
+        # the default route and the SNAT rules of the router subnets
+        create.assert_not_called()
+        ovn_api.delete_lrouter_ext_gw.assert_called_once_with(
+            'neutron-router-id')
+        ovn_api.add_lrouter_port.assert_called_once_with(
+            name='lrp-gw-port-id', lrouter='neutron-router-id',
+            mac='fa:16:3e:00:00:02', networks=['172.24.4.2/24'],
+            may_exist=True, external_ids=mock.ANY,
+            gateway_chassis=['chassis1'])
+        ovn_api.add_static_route.assert_called_once_with(
+            'neutron-router-id', ip_prefix='0.0.0.0/0', nexthop='172.24.4.1')
+        ovn_api.add_nat_rule_in_lrouter.assert_called_once_with(
+            'neutron-router-id', type='snat', logical_ip='10.0.0.0/24',
+            external_ip='172.24.4.2')
+        bump.assert_called_once_with(port, ovn_const.TYPE_ROUTER_PORTS)
+
+    @staticmethod
+    def _fake_get_security_groups(security_groups):
+        def get_security_groups(ctx, filters=None, fields=None):
+            return [{'id': sg_id, 'security_group_rules': rules}
+                    for sg_id, rules in sorted(security_groups.items())
+                    if not filters or sg_id in filters['id']]
+        return get_security_groups
+
+    def _test_migrate_to_port_groups(self, dry_run):
+        ovn_config.cfg.CONF.set_override('ovsdb_txn_chunk_size', 2,
+                                         group='ovn')
+        ovn_nb_synchronizer = ovn_db_sync.OvnNbSynchronizer(
+            self.plugin, self.mech_driver._nb_ovn, self.mech_driver._sb_ovn,
+            'log', self.mech_driver)
+        ovn_api = ovn_nb_synchronizer.ovn_api
+        core_plugin = ovn_nb_synchronizer.core_plugin
+        ovn_api.is_port_groups_supported.return_value = True
+        # sg2 has already been migrated but its Address Set is left
+        ovn_api.get_port_group.side_effect = (
+            lambda name: name == 'pg_sg2')
+        sg_ext_ids = {ovn_const.OVN_SG_EXT_ID_KEY: 'sg1'}
+        ovn_api.get_address_sets = mock.Mock(return_value={
+            'as_ip4_sg1': {'external_ids': sg_ext_ids},
+            'as_ip6_sg1': {'external_ids': sg_ext_ids},
+            'as_ip4_sg2': {'external_ids': {
+                ovn_const.OVN_SG_EXT_ID_KEY: 'sg2',
+                ovn_const.OVN_PG_MIGRATED_EXT_ID_KEY: 'true'}}})
+        ovn_api.db_remove = mock.Mock()
+        lswitch = mock.Mock(acls=[mock.Mock(uuid=i) for i in range(3)])
+        lswitch.name = 'neutron-n1'
+        ovn_api.get_lswitch.side_effect = (
+            lambda name: lswitch if name == 'neutron-n1' else None)
+
+        ports = [{'id': 'p%d' % i, 'port_security_enabled': True,
+                  'device_owner': 'compute:nova',
+                  'security_groups': ['sg1']} for i in range(3)]
+        ports.append({'id': 'p3', 'port_security_enabled': False,
+                      'device_owner': 'compute:nova',
+                      'security_groups': []})
+
+        def get_ports(ctx, filters=None, sorts=None, limit=None,
+                      marker=None):
+            if filters:
+                return [p for p in ports if p['id'] in filters['id']]
+            start = 0
+            if marker:
+                start = [p['id'] for p in ports].index(marker) + 1
+            return ports[start:start + limit]
+
+        sg_rule = {'id': 'r1', 'security_group_id': 'sg1',
+                   'direction': 'ingress', 'ethertype': 'IPv4',
+                   'remote_group_id': None, 'remote_ip_prefix': None,
+                   'protocol': None}
+        with mock.patch.object(core_plugin, 'get_ports',
+                               side_effect=get_ports), \
+                mock.patch.object(
+                    core_plugin, '_get_port_security_group_bindings',
+                    return_value=[{'port_id': p['id']} for p in ports[:3]]), \
+                mock.patch.object(
+                    core_plugin, 'get_security_groups',
+                    side_effect=self._fake_get_security_groups(
+                        {'sg1': [sg_rule], 'sg2': []})), \
+                mock.patch.object(core_plugin, 'get_networks',
+                                  return_value=[{'id': 'n1'},
+                                                {'id': 'n2'}]):
+            steps = ovn_nb_synchronizer.migrate_to_port_groups(
+                context.get_admin_context(), dry_run=dry_run)
+
+        self.assertEqual(
+            [('drop_port_group', 6, 3, 3), ('port_groups', 2, 1, 2),
+             ('port_group_ports', 5, 3, 2), ('lswitch_acls', 3, 2, 2),
+             ('address_sets', 3, 2, 2)],
+            [(step.name, step.rows, step.transactions, step.largest)
+             for step in steps])
+        ovn_api.pg_add_ports.assert_has_calls([
+            mock.call(ovn_const.OVN_DROP_PORT_GROUP_NAME, ['p0', 'p1']),
+            mock.call(ovn_const.OVN_DROP_PORT_GROUP_NAME, ['p2']),
+            mock.call('pg_sg1', ['p0', 'p1']),
+            mock.call('pg_sg1', ['p2'])])
+        ovn_api.pg_add.assert_called_with(
+            name='pg_sg1', acls=[],
+            external_ids={ovn_const.OVN_SG_EXT_ID_KEY: 'sg1'})
+        ovn_api.update_address_set_ext_ids.assert_has_calls([
+            mock.call(name, {ovn_const.OVN_PG_MIGRATED_EXT_ID_KEY: 'true'})
+            for name in ('as_ip4_sg1', 'as_ip6_sg1')])
+        ovn_api.db_remove.assert_has_calls([
+            mock.call('Logical_Switch', 'neutron-n1', 'acls', 0, 1,
+                      if_exists=True),
+            mock.call('Logical_Switch', 'neutron-n1', 'acls', 2,
+                      if_exists=True)])
+        ovn_api.delete_address_set.assert_has_calls([
+            mock.call('as_ip4_sg1'), mock.call('as_ip4_sg2'),
+            mock.call('as_ip6_sg1')])
+        self.assertEqual(0 if dry_run else 11,
+                         ovn_api.transaction.call_count)
+
+    def test_migrate_to_port_groups(self):
+        self._test_migrate_to_port_groups(dry_run=False)
+
+    def test_migrate_to_port_groups_dry_run(self):
+        self._test_migrate_to_port_groups(dry_run=True)
+
+    def test_migrate_to_port_groups_rules_changed(self):
+        ovn_nb_synchronizer = ovn_db_sync.OvnNbSynchronizer(
+            self.plugin, self.mech_driver._nb_ovn, self.mech_driver._sb_ovn,
+            'log', self.mech_driver)
+        ovn_api = ovn_nb_synchronizer.ovn_api
+        core_plugin = ovn_nb_synchronizer.core_plugin
+        ovn_api.is_port_groups_supported.return_value = True
+        ovn_api.get_port_group.return_value = None
+        ovn_api.get_address_sets = mock.Mock(return_value={
+            'as_ip4_sg1': {'external_ids': {
+                ovn_const.OVN_SG_EXT_ID_KEY: 'sg1'}}})
+        ovn_api.get_lswitch.return_value = None
+
+        def sg_rule(rule_id):
+            return {'id': rule_id, 'security_group_id': 'sg1',
+                    'direction': 'ingress', 'ethertype': 'IPv4',
+                    'remote_group_id': None, 'remote_ip_prefix': None,
+                    'protocol': None}
+
+        security_groups = {'sg1': [sg_rule('r1')], 'sg2': []}
+        ports = [{'id': 'p0', 'port_security_enabled': True,
+                  'device_owner': 'compute:nova',
+                  'security_groups': ['sg1']}]
+
+        def get_ports(ctx, filters=None, sorts=None, limit=None,
+                      marker=None):
+            # r1 is replaced by r2 and sg2 is deleted while the ports are
+            # added to the drop Port Group
+            security_groups['sg1'] = [sg_rule('r2')]
+            security_groups.pop('sg2', None)
+            return [] if marker else ports
+
+        with mock.patch.object(core_plugin, 'get_ports',
+                               side_effect=get_ports), \
+                mock.patch.object(
+                    core_plugin, '_get_port_security_group_bindings',
+                    return_value=[{'port_id': 'p0'}]), \
+                mock.patch.object(
+                    core_plugin, 'get_security_groups',
+                    side_effect=self._fake_get_security_groups(
+                        security_groups)), \
+                mock.patch.object(core_plugin, 'get_networks',
+                                  return_value=[]):
+            ovn_nb_synchronizer.migrate_to_port_groups(
+                context.get_admin_context())
+
+        ovn_api.pg_add.assert_has_calls([
+            mock.call(ovn_const.OVN_DROP_PORT_GROUP_NAME, acls=[]),
+            mock.call(name='pg_sg1', acls=[],
+                      external_ids={ovn_const.OVN_SG_EXT_ID_KEY: 'sg1'})])
+        self.assertEqual(2, ovn_api.pg_add.call_count)
+        self.assertEqual(
+            ['r2'],
+            [kwargs[ovn_const.OVN_SG_RULE_EXT_ID_KEY]
+             for _args, kwargs in ovn_api.pg_acl_add.call_args_list
+             if kwargs['port_group'] == 'pg_sg1'])
+
+    def test_migrate_to_port_groups_not_needed(self):
+        ovn_nb_synchronizer = ovn_db_sync.OvnNbSynchronizer(
+            self.plugin, self.mech_driver._nb_ovn, self.mech_driver._sb_ovn,
+            'log', self.mech_driver)
+        ovn_api = ovn_nb_synchronizer.ovn_api
+        ovn_api.is_port_groups_supported.return_value = True
+        ovn_api.get_address_sets = mock.Mock(return_value={})
+        self.assertEqual([], ovn_nb_synchronizer.migrate_to_port_groups(
+            context.get_admin_context()))
+        ovn_api.transaction.assert_not_called()
+
 
 class TestOvnSbSyncML2(test_mech_driver.OVNMechanismDriverTestCase):
 
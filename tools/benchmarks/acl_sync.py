@@ -0,0 +1,108 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare the ACLs of Neutron and OVN as the DB sync does.
+
+Synthetic security group rules are turned into the ACLs of their Port
+Groups, the OVN side misses --missing percent of them and has as many
+stale ACLs. The ACLs to add and to remove are computed by comparing every
+ACL of Neutron to the ACLs of OVN, as the Port Group ACL sync used to, and
+with the keyed diff_acls() of networking_ovn/common/acl.py. The pairwise
+comparison is quadratic, it is skipped above --max-pairwise ACLs.
+
+Usage: python tools/benchmarks/acl_sync.py [--acls 1000,10000,100000,500000]
+"""
+
+import argparse
+import copy
+import random
+import time
+import uuid
+
+from networking_ovn.common import acl as acl_utils
+from networking_ovn.common import constants as ovn_const
+
+
+def pairwise_diff(neutron_acls, ovn_acls):
+    neutron_acls = list(neutron_acls)
+    ovn_acls = list(ovn_acls)
+    for na in list(neutron_acls):
+        for ovn_a in ovn_acls:
+            if all(item in na.items() for item in ovn_a.items()):
+                neutron_acls.remove(na)
+                ovn_acls.remove(ovn_a)
+                break
+    return neutron_acls, ovn_acls
+
+
+def build(num_acls, missing, rules_per_group):
+    neutron_acls = []
+    for i in range(num_acls):
+        pg_name = 'pg_%d' % (i // rules_per_group)
+        rule = {'id': str(uuid.uuid4()),
+                'direction': random.choice(('ingress', 'egress'))}
+        match = 'outport == @%s && ip4 && tcp.dst == %d' % (pg_name, i)
+        neutron_acls.append(acl_utils.add_sg_rule_acl_for_port_group(
+            pg_name, rule, match))
+
+    # The ACLs read from the NB have no Neutron rule id
+    ovn_acls = []
+    for acl in neutron_acls:
+        ovn_acl = copy.deepcopy(acl)
+        del ovn_acl[ovn_const.OVN_SG_RULE_EXT_ID_KEY]
+        ovn_acls.append(ovn_acl)
+    random.shuffle(ovn_acls)
+    num_changes = num_acls * missing // 100
+    del ovn_acls[:num_changes]
+    for acl in random.sample(ovn_acls, num_changes):
+        ovn_acls.append(dict(acl, match=acl['match'] + ' && ip4.src == 0/0'))
+    return neutron_acls, ovn_acls, num_changes
+
+
+def measure(func, neutron_acls, ovn_acls):
+    start = time.time()
+    to_add, to_remove = func(neutron_acls, ovn_acls)
+    return time.time() - start, len(to_add), len(to_remove)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--acls', default='1000,10000,100000,500000',
+                        help='Comma separated list of numbers of ACLs')
+    parser.add_argument('--missing', type=int, default=1,
+                        help='Percentage of ACLs missing from OVN, as many '
+                             'stale ACLs are found in OVN')
+    parser.add_argument('--rules-per-group', type=int, default=20,
+                        help='Number of rules per security group')
+    parser.add_argument('--max-pairwise', type=int, default=10000,
+                        help='Largest number of ACLs compared pairwise')
+    args = parser.parse_args()
+
+    random.seed(0)
+    for num_acls in [int(n) for n in args.acls.split(',')]:
+        neutron_acls, ovn_acls, num_changes = build(
+            num_acls, args.missing, args.rules_per_group)
+        keyed = measure(acl_utils.diff_acls, neutron_acls, ovn_acls)
+        assert keyed[1:] == (num_changes, num_changes)
+        if num_acls <= args.max_pairwise:
+            pairwise = measure(pairwise_diff, neutron_acls, ovn_acls)
+            assert pairwise[1:] == keyed[1:]
+            pairwise = '%10.3f s' % pairwise[0]
+        else:
+            pairwise = '%12s' % 'skipped'
+        print('%7d ACLs, %6d to add, %6d to remove: pairwise %s  '
+              'keyed %8.3f s' % (num_acls, keyed[1], keyed[2], pairwise,
+                                 keyed[0]))
+
+
+if __name__ == '__main__':
+    main()
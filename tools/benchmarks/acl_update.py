@@ -0,0 +1,193 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Diff the ACLs of the ports of Logical Switches without Port Groups.
+
+The Logical Switches of a fake Northbound database hold the ACLs of
+--rules security group rules for each of --ports ports, --changed rules
+of every port differ from the ones expected by Neutron. The time taken to
+index the ACLs of the switches (get_acls_for_lswitches()), to compute the
+ACLs to add and to delete of UpdateACLsCommand and to remove the ACLs
+common to Neutron and OVN in the DB sync (remove_common_acls()) is
+measured, the last two along with the list based comparison they used to
+do.
+
+Usage: python tools/benchmarks/acl_update.py [--ports 10000] [--rules 50]
+"""
+
+import argparse
+import copy
+import random
+import time
+import uuid
+
+from networking_ovn.common import acl as acl_utils
+from networking_ovn.common import utils as ovn_utils
+from networking_ovn import ovn_db_sync
+from networking_ovn.ovsdb import commands
+from networking_ovn.ovsdb import impl_idl_ovn
+
+
+class FakeTable(object):
+    def __init__(self, name):
+        self.name = name
+        self.rows = {}
+
+
+class FakeRow(object):
+    def __init__(self, **columns):
+        self.uuid = uuid.uuid4()
+        self._data = columns
+        self.__dict__.update(columns)
+
+
+class FakeIdl(object):
+    def __init__(self):
+        self.tables = {'Logical_Switch': FakeTable('Logical_Switch')}
+
+
+class FakeNbApi(impl_idl_ovn.OvsdbNbOvnIdl):
+    """The ACL lookups of the NB API over in-memory rows."""
+
+    idl = None
+
+    def __init__(self, idl):
+        self.idl = idl
+
+
+class FakeSynchronizer(ovn_db_sync.OvnNbSynchronizer):
+    def __init__(self):
+        pass
+
+
+def legacy_compute_acl_differences(port_list, acl_old_values_dict,
+                                   acl_new_values_dict, acl_obj_dict):
+    def acl_list_sub(acl_list1, acl_list2):
+        return [acl for acl in acl_list1 if acl not in acl_list2]
+
+    acl_del_objs_dict = {}
+    acl_add_values_dict = {}
+    for port in port_list:
+        lswitch_name = port['network_id']
+        acls_old = acl_old_values_dict.get(port['id'], [])
+        acls_new = acl_new_values_dict.get(port['id'], [])
+        acl_del_objs = acl_del_objs_dict.setdefault(lswitch_name, [])
+        for acl in acl_list_sub(acls_old, acls_new):
+            acl_del_objs.append(acl_obj_dict[str(acl)])
+        acl_add_values = acl_add_values_dict.setdefault(lswitch_name, [])
+        for acl in acl_list_sub(acls_new, acls_old):
+            del acl['lswitch']
+            del acl['lport']
+            acl_add_values.append(acl)
+    return acl_del_objs_dict, acl_add_values_dict
+
+
+def legacy_remove_common_acls(neutron_acls, nb_acls):
+    for port in neutron_acls.keys():
+        for acl in list(neutron_acls[port]):
+            if port in nb_acls and acl in nb_acls[port]:
+                neutron_acls[port].remove(acl)
+                nb_acls[port].remove(acl)
+
+
+def build(args, idl):
+    ports = []
+    neutron_acls = {}
+    lswitches = [FakeRow(name=ovn_utils.ovn_name(str(uuid.uuid4())), acls=[])
+                 for i in range(args.networks)]
+    for lswitch in lswitches:
+        idl.tables['Logical_Switch'].rows[lswitch.uuid] = lswitch
+
+    for i in range(args.ports):
+        lswitch = lswitches[i % args.networks]
+        port = {'id': str(uuid.uuid4()),
+                'network_id': lswitch.name.replace('neutron-', '')}
+        ports.append(port)
+        acls = neutron_acls[port['id']] = []
+        for j in range(args.rules):
+            rule = {'id': str(uuid.uuid4()),
+                    'direction': 'ingress' if j % 2 else 'egress'}
+            match = 'outport == "%s" && ip4 && tcp.dst == %d' % (
+                port['id'], j)
+            acl = acl_utils.add_sg_rule_acl_for_port(port, rule, match)
+            acls.append(acl)
+            columns = {k: v for k, v in acl.items()
+                       if k not in ('lswitch', 'lport')}
+            if j < args.changed:
+                columns['match'] += ' && ip4.src == 0/0'
+            lswitch.acls.append(FakeRow(**columns))
+    # The acls column of a Logical_Switch is a set, the rows aren't in the
+    # order of the security group rules
+    for lswitch in lswitches:
+        random.shuffle(lswitch.acls)
+    return ports, neutron_acls, [ls.name.replace('neutron-', '')
+                                 for ls in lswitches]
+
+
+def measure(func, *args):
+    start = time.time()
+    func(*args)
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ports', type=int, default=10000,
+                        help='Number of ports')
+    parser.add_argument('--rules', type=int, default=50,
+                        help='Number of security group rules of each port')
+    parser.add_argument('--networks', type=int, default=10,
+                        help='Number of networks the ports are spread over')
+    parser.add_argument('--changed', type=int, default=1,
+                        help='Number of rules of each port that differ '
+                             'between Neutron and OVN')
+    args = parser.parse_args()
+
+    random.seed(0)
+    idl = FakeIdl()
+    ports, neutron_acls, lswitch_names = build(args, idl)
+    nb_api = FakeNbApi(idl)
+    print('%d ports x %d rules over %d networks, %d changed rules per port'
+          % (args.ports, args.rules, args.networks, args.changed))
+
+    start = time.time()
+    acl_values_dict, acl_obj_dict, lswitch_ovsdb_dict = (
+        nb_api.get_acls_for_lswitches(lswitch_names))
+    print('get_acls_for_lswitches():   %8.3f s' % (time.time() - start))
+
+    # Each run takes its own copies, the computation of the differences
+    # removes the lswitch and lport columns of the ACLs to add
+    legacy_obj_dict = {str(acl): acl_obj_dict[
+        acl_utils.ACLFingerprint(acl)]
+        for acls in acl_values_dict.values() for acl in acls}
+    legacy = measure(legacy_compute_acl_differences, ports,
+                     acl_values_dict, copy.deepcopy(neutron_acls),
+                     legacy_obj_dict)
+    update_cmd = commands.UpdateACLsCommand(
+        nb_api, lswitch_names, ports, neutron_acls)
+    fingerprints = measure(update_cmd._compute_acl_differences, ports,
+                           acl_values_dict, copy.deepcopy(neutron_acls),
+                           acl_obj_dict)
+    print('UpdateACLsCommand diff:     %8.3f s, list based %8.3f s' % (
+        fingerprints, legacy))
+
+    legacy = measure(legacy_remove_common_acls, copy.deepcopy(neutron_acls),
+                     copy.deepcopy(acl_values_dict))
+    fingerprints = measure(FakeSynchronizer().remove_common_acls,
+                           copy.deepcopy(neutron_acls),
+                           copy.deepcopy(acl_values_dict))
+    print('remove_common_acls():       %8.3f s, list based %8.3f s' % (
+        fingerprints, legacy))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Simulate the failover of gateway chassis with the L3 schedulers.
+
+The gateways of a set of routers are scheduled on chassis spread over two
+physical networks, some chassis are then removed and the gateways they
+hosted are rescheduled:
+
+* sequential: one gateway at a time, reading the load of the chassis from
+  all the bindings for each gateway and committing one transaction per
+  gateway.
+* greedy: one gateway at a time against a load read once and updated
+  locally, committed in chunks.
+* planner: all the gateways planned at once by the scheduler, committed in
+  chunks.
+
+The number of gateways hosted by each surviving chassis, in total and as
+the highest priority (active) chassis, is reported before the failure and
+after the rescheduling.
+
+Usage: python tools/benchmarks/gateway_failover.py [--routers 10000]
+"""
+
+import argparse
+import math
+import random
+import time
+
+from networking_ovn.l3 import l3_ovn_scheduler
+
+
+class FakeNbIdl(object):
+    """The gateway bindings of the NB API over an in-memory dictionary."""
+
+    def __init__(self):
+        # Gateway name -> chassis list, ordered by priority
+        self.bindings = {}
+
+    def get_gateway_chassis_binding(self, gateway_name):
+        return self.bindings.get(gateway_name, [])
+
+    def get_chassis_gateway_load(self, chassis_candidate_list=None):
+        chassis_load = dict((chassis, {})
+                            for chassis in chassis_candidate_list or [])
+        for chassis_list in self.bindings.values():
+            prio = len(chassis_list)
+            for chassis in chassis_list:
+                if (chassis_candidate_list and
+                        chassis not in chassis_load):
+                    prio -= 1
+                    continue
+                load = chassis_load.setdefault(chassis, {})
+                load[prio] = load.get(prio, 0) + 1
+                prio -= 1
+        return chassis_load
+
+
+class FakeSbIdl(object):
+    def __init__(self, chassis_physnets, cms):
+        self.chassis_physnets = chassis_physnets
+        self.cms = cms
+
+    def get_all_chassis(self):
+        return list(self.chassis_physnets)
+
+
+def get_candidates(sb_idl, physnet):
+    # Same criteria as OVNClient.get_candidates_for_scheduling()
+    cms_bmaps = []
+    bmaps = []
+    for chassis, physnets in sb_idl.chassis_physnets.items():
+        if physnet in physnets:
+            if chassis in sb_idl.cms:
+                cms_bmaps.append(chassis)
+            else:
+                bmaps.append(chassis)
+    return cms_bmaps or bmaps
+
+
+def build(args):
+    chassis_physnets = {}
+    for i in range(args.chassis):
+        physnets = []
+        # The two physical networks overlap on a third of the chassis
+        if i < args.chassis * 2 // 3:
+            physnets.append('physnet1')
+        if i >= args.chassis // 3:
+            physnets.append('physnet2')
+        chassis_physnets['hv%d' % i] = physnets
+    cms = set(random.sample(sorted(chassis_physnets),
+                            int(args.chassis * args.cms_ratio)))
+    sb_idl = FakeSbIdl(chassis_physnets, cms)
+    gateway_physnets = dict(('lrp-%d' % i, random.choice(['physnet1',
+                                                          'physnet2']))
+                            for i in range(args.routers))
+
+    # Initial placement, the routers are created one after the other
+    nb_idl = FakeNbIdl()
+    scheduler = l3_ovn_scheduler.OVNGatewayLeastLoadedScheduler()
+    chassis_load = {}
+    for gateway, physnet in sorted(gateway_physnets.items()):
+        nb_idl.bindings[gateway] = scheduler.select(
+            nb_idl, sb_idl, gateway,
+            candidates=get_candidates(sb_idl, physnet),
+            chassis_load=chassis_load)
+    return nb_idl, sb_idl, gateway_physnets
+
+
+def fail_chassis(sb_idl, nb_idl, failed):
+    for chassis in failed:
+        del sb_idl.chassis_physnets[chassis]
+        sb_idl.cms.discard(chassis)
+    return sorted(gateway for gateway, chassis_list in nb_idl.bindings.items()
+                  if set(chassis_list) & set(failed))
+
+
+def spread(nb_idl, chassis_list):
+    total = dict((chassis, 0) for chassis in chassis_list)
+    active = dict((chassis, 0) for chassis in chassis_list)
+    for bindings in nb_idl.bindings.values():
+        for chassis in bindings:
+            if chassis in total:
+                total[chassis] += 1
+        if bindings and bindings[0] in active:
+            active[bindings[0]] += 1
+
+    def stats(counts):
+        values = list(counts.values())
+        mean = float(sum(values)) / len(values)
+        stdev = math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+        return '%5d..%-5d stdev %7.1f' % (min(values), max(values), stdev)
+
+    return 'total %s  active %s' % (stats(total), stats(active))
+
+
+def reschedule(mode, nb_idl, sb_idl, gateway_physnets, unhosted, chunk_size):
+    scheduler = l3_ovn_scheduler.OVNGatewayLeastLoadedScheduler()
+    gateways = dict((gateway, get_candidates(sb_idl,
+                                             gateway_physnets[gateway]))
+                    for gateway in unhosted)
+    if mode == 'planner':
+        planned = scheduler.plan(
+            nb_idl, sb_idl, gateways,
+            chassis_load=nb_idl.get_chassis_gateway_load())
+        nb_idl.bindings.update(planned)
+        return int(math.ceil(float(len(unhosted)) / chunk_size))
+
+    chassis_load = None
+    if mode == 'greedy':
+        chassis_load = nb_idl.get_chassis_gateway_load()
+    for gateway in unhosted:
+        nb_idl.bindings[gateway] = scheduler.select(
+            nb_idl, sb_idl, gateway, candidates=gateways[gateway],
+            chassis_load=chassis_load)
+    if mode == 'greedy':
+        return int(math.ceil(float(len(unhosted)) / chunk_size))
+    return len(unhosted)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--routers', type=int, default=10000,
+                        help='Number of routers with a gateway port')
+    parser.add_argument('--chassis', type=int, default=50,
+                        help='Number of gateway chassis')
+    parser.add_argument('--failed', type=int, default=2,
+                        help='Number of chassis failing')
+    parser.add_argument('--cms-ratio', type=float, default=0.8,
+                        help='Ratio of chassis with enable-chassis-as-gw in '
+                             'their ovn-cms-options')
+    parser.add_argument('--chunk-size', type=int, default=500,
+                        help='Number of gateways bound per transaction')
+    parser.add_argument('--modes', default='sequential,greedy,planner',
+                        help='Comma separated list of rescheduling modes')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the random generator')
+    args = parser.parse_args()
+
+    for mode in args.modes.split(','):
+        random.seed(args.seed)
+        nb_idl, sb_idl, gateway_physnets = build(args)
+        failed = random.sample(sorted(sb_idl.chassis_physnets), args.failed)
+        # Only the chassis enabled as gateways host gateways
+        survivors = sorted(sb_idl.cms - set(failed))
+        before = spread(nb_idl, survivors)
+        unhosted = fail_chassis(sb_idl, nb_idl, failed)
+        start = time.time()
+        transactions = reschedule(mode, nb_idl, sb_idl, gateway_physnets,
+                                  unhosted, args.chunk_size)
+        elapsed = time.time() - start
+        print('%-10s %6d gateways rescheduled in %8.3f s, %6d transactions'
+              % (mode, len(unhosted), elapsed, transactions))
+        print('    before: %s' % before)
+        print('    after:  %s' % spread(nb_idl, survivors))
+
+
+if __name__ == '__main__':
+    main()
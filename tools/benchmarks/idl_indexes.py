@@ -0,0 +1,124 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare Port_Binding lookups by full table scan and by IDL index.
+
+Usage: python tools/benchmarks/idl_indexes.py [--rows 10000,100000,500000]
+"""
+
+import argparse
+import random
+import timeit
+import uuid
+
+from networking_ovn.ovsdb import indexes
+
+
+class FakeTable(object):
+    def __init__(self, name):
+        self.name = name
+        self.rows = {}
+
+
+class FakeRow(object):
+    def __init__(self, table, **columns):
+        self._table = table
+        self.uuid = uuid.uuid4()
+        self.__dict__.update(columns)
+
+
+class FakeIdl(object):
+    def __init__(self):
+        self.tables = {'Port_Binding': FakeTable('Port_Binding'),
+                       'Chassis': FakeTable('Chassis'),
+                       'Datapath_Binding': FakeTable('Datapath_Binding')}
+
+
+def populate(idl, idl_indexes, num_rows, num_chassis=100, num_datapaths=500):
+    chassis = [FakeRow(idl.tables['Chassis'], name='chassis-%d' % i)
+               for i in range(num_chassis)]
+    datapaths = [FakeRow(idl.tables['Datapath_Binding'])
+                 for i in range(num_datapaths)]
+    table = idl.tables['Port_Binding']
+    for i in range(num_rows):
+        row = FakeRow(
+            table, logical_port='lp-%d' % i,
+            chassis=[chassis[i % num_chassis]],
+            datapath=datapaths[i % num_datapaths],
+            mac=['fa:16:3e:%02x:%02x:%02x 10.%d.%d.%d' % (
+                (i >> 16) & 0xff, (i >> 8) & 0xff, i & 0xff,
+                (i >> 16) & 0xff, (i >> 8) & 0xff, i & 0xff)])
+        table.rows[row.uuid] = row
+        idl_indexes.notify('create', row)
+    return table
+
+
+def scan_by_logical_port(table, name):
+    for row in table.rows.values():
+        if row.logical_port == name:
+            return row
+
+
+def scan_by_chassis(table, name):
+    return [r for r in table.rows.values()
+            if r.chassis and r.chassis[0].name == name]
+
+
+def scan_by_ip(table, datapath, ip):
+    return [r for r in table.rows.values()
+            if r.mac and str(r.datapath.uuid) == datapath and
+            ip in r.mac[0].split(' ')]
+
+
+def run(num_rows, repeat):
+    idl = FakeIdl()
+    idl_indexes = indexes.IdlIndexes(idl)
+    table = populate(idl, idl_indexes, num_rows)
+    row = random.choice(list(table.rows.values()))
+    datapath = str(row.datapath.uuid)
+    ip = row.mac[0].split(' ')[1]
+    chassis = row.chassis[0].name
+
+    cases = (
+        ('logical_port',
+         lambda: scan_by_logical_port(table, row.logical_port),
+         lambda: idl_indexes.lookup('Port_Binding', 'logical_port',
+                                    row.logical_port)),
+        ('chassis',
+         lambda: scan_by_chassis(table, chassis),
+         lambda: idl_indexes.lookup('Port_Binding', 'chassis', chassis)),
+        ('datapath_ip',
+         lambda: scan_by_ip(table, datapath, ip),
+         lambda: idl_indexes.lookup('Port_Binding', 'datapath_ip',
+                                    (datapath, ip))),
+    )
+    for name, scan, index in cases:
+        scan_time = timeit.timeit(scan, number=repeat) / repeat
+        index_time = timeit.timeit(index, number=repeat) / repeat
+        print('%8d rows %-13s scan: %10.3f ms  index: %8.4f ms  (x%.0f)' % (
+            num_rows, name, scan_time * 1000, index_time * 1000,
+            scan_time / index_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', default='10000,100000,500000',
+                        help='Comma separated list of table sizes')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of lookups timed per case')
+    args = parser.parse_args()
+    for num_rows in args.rows.split(','):
+        run(int(num_rows), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Replay a metadata request storm against the metadata proxy handler.
+
+Every instance of a fake Southbound database issues a burst of concurrent
+metadata requests, as cloud-init does after a mass reboot, and the time
+spent looking up the instance of the requests is compared with and without
+the instance lookup cache of the proxy. Nova is not involved.
+
+Usage: python tools/benchmarks/metadata_proxy.py [--instances 2000]
+"""
+
+import argparse
+import random
+import time
+import uuid
+
+import eventlet
+from oslo_config import cfg
+
+from networking_ovn.agent.metadata import server
+from networking_ovn.common import constants as ovn_const
+from networking_ovn.ovsdb import indexes
+
+
+class FakeTable(object):
+    def __init__(self, name):
+        self.name = name
+        self.rows = {}
+
+
+class FakeRow(object):
+    def __init__(self, table, **columns):
+        self._table = table
+        self.uuid = uuid.uuid4()
+        self.__dict__.update(columns)
+
+
+class FakeSbIdl(object):
+    """The Port_Binding lookup of the SB API over an in-memory table."""
+
+    def __init__(self, use_index):
+        self.tables = {'Port_Binding': FakeTable('Port_Binding'),
+                       'Datapath_Binding': FakeTable('Datapath_Binding')}
+        self.indexes = indexes.IdlIndexes(self) if use_index else None
+        self.lookups = 0
+
+    def add_port_binding(self, datapath, ip):
+        row = FakeRow(
+            self.tables['Port_Binding'], datapath=datapath,
+            mac=['fa:16:3e:00:00:01 %s' % ip],
+            external_ids={ovn_const.OVN_DEVID_EXT_ID_KEY: str(uuid.uuid4()),
+                          ovn_const.OVN_PROJID_EXT_ID_KEY: 'project'})
+        self.tables['Port_Binding'].rows[row.uuid] = row
+        if self.indexes:
+            self.indexes.notify('create', row)
+        return row
+
+    def get_network_port_bindings_by_ip(self, network, ip_address):
+        self.lookups += 1
+        if self.indexes:
+            return self.indexes.lookup('Port_Binding', 'datapath_ip',
+                                       (network, ip_address))
+        return [r for r in self.tables['Port_Binding'].rows.values()
+                if (r.mac and str(r.datapath.uuid) == network) and
+                ip_address in r.mac[0].split(' ')]
+
+
+class FakeRequest(object):
+    def __init__(self, network, ip):
+        self.headers = {'X-Forwarded-For': ip, 'X-OVN-Network-ID': network}
+
+
+def run(args, use_index, use_cache):
+    sb_idl = FakeSbIdl(use_index)
+    datapaths = [FakeRow(sb_idl.tables['Datapath_Binding'])
+                 for _ in range(args.networks)]
+    requests = []
+    for i in range(args.instances):
+        datapath = datapaths[i % args.networks]
+        ip = '10.%d.%d.%d' % ((i >> 16) & 0xff, (i >> 8) & 0xff, i & 0xff)
+        sb_idl.add_port_binding(datapath, ip)
+        requests += [FakeRequest(str(datapath.uuid), ip)] * args.requests
+    random.shuffle(requests)
+
+    handler = server.MetadataProxyHandler(cfg.CONF)
+    handler.sb_idl = sb_idl
+    if not use_cache:
+        handler.instance_cache.get = lambda key, rows: None
+
+    pool = eventlet.GreenPool(args.concurrency)
+    start = time.time()
+    for instance_id, project_id in pool.imap(
+            handler._get_instance_and_project_id, requests):
+        assert instance_id is not None
+    elapsed = time.time() - start
+    print('%-5s %-8s %7d requests: %8.3f s  %9.0f req/s  %7d SB lookups' % (
+        'index' if use_index else 'scan', 'cache' if use_cache else '-',
+        len(requests), elapsed, len(requests) / elapsed, sb_idl.lookups))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--instances', type=int, default=2000,
+                        help='Number of instances requesting metadata')
+    parser.add_argument('--networks', type=int, default=50,
+                        help='Number of networks the instances are on')
+    parser.add_argument('--requests', type=int, default=20,
+                        help='Number of metadata requests per instance')
+    parser.add_argument('--concurrency', type=int, default=100,
+                        help='Number of requests served concurrently')
+    parser.add_argument('--no-scan', action='store_true',
+                        help='Skip the slow runs without the IDL index')
+    args = parser.parse_args()
+    for use_index in ((True,) if args.no_scan else (False, True)):
+        for use_cache in (False, True):
+            run(args, use_index, use_cache)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compare the lookups of the OVN Octavia provider with and without indexes.
+
+The load balancer of a pool, the load balancer of a name and the router of
+a switch are looked up in a fake Northbound IDL holding a growing number of
+load balancers and routers, by scanning the tables and with the secondary
+indexes of the IDL of the provider.
+
+Usage: python tools/benchmarks/octavia_lookups.py [--lbs 100,1000,10000]
+"""
+
+import argparse
+import random
+import time
+import uuid
+
+from networking_ovn.octavia import ovn_driver
+from networking_ovn.ovsdb import indexes
+
+
+class FakeTable(object):
+    def __init__(self, name):
+        self.name = name
+        self.rows = {}
+
+
+class FakeRow(object):
+    def __init__(self, table, **columns):
+        self._table = table
+        self.uuid = uuid.uuid4()
+        self.__dict__.update(columns)
+
+
+class FakeDatum(object):
+    """The raw data of a column referencing other rows."""
+
+    def __init__(self, rows):
+        self.uuids = [row.uuid for row in rows]
+
+    def to_python(self, uuid_to_row):
+        return [uuid_to_row(row_uuid, None) for row_uuid in self.uuids]
+
+
+class FakeIdl(object):
+    def __init__(self):
+        self.tables = dict((name, FakeTable(name)) for name in (
+            'Load_Balancer', 'Logical_Router', 'Logical_Router_Port',
+            'Logical_Switch', 'Logical_Switch_Port'))
+
+    def add_row(self, table, **columns):
+        row = FakeRow(self.tables[table], **columns)
+        self.tables[table].rows[row.uuid] = row
+        return row
+
+
+class FakeCommand(object):
+    def __init__(self, func):
+        self.func = func
+
+    def execute(self, check_error=False):
+        return self.func()
+
+
+class FakeNbApi(object):
+    """The lookups of the ovsdbapp NB API over the rows of a fake IDL."""
+
+    def __init__(self, idl):
+        self.idl = idl
+        self.tables = idl.tables
+
+    def db_find(self, table, condition, row=False):
+        column, op, value = condition
+        return FakeCommand(lambda: [
+            r for r in self.tables[table].rows.values()
+            if getattr(r, column) == value])
+
+    def db_list_rows(self, table):
+        return FakeCommand(lambda: list(self.tables[table].rows.values()))
+
+
+def build(count):
+    idl = FakeIdl()
+    lookups = []
+    for i in range(count):
+        pool_key = ovn_driver.LB_EXT_IDS_POOL_PREFIX + str(uuid.uuid4())
+        lb = idl.add_row(
+            'Load_Balancer', name=str(uuid.uuid4()),
+            external_ids={pool_key: '', ovn_driver.LB_EXT_IDS_VIP_KEY:
+                          '172.24.%d.%d' % (i >> 8 & 0xff, i & 0xff)})
+        lrp = idl.add_row('Logical_Router_Port',
+                          name='lrp-%s' % uuid.uuid4())
+        idl.add_row('Logical_Router', name='router-%d' % i, ports=[lrp],
+                    _data={'ports': FakeDatum([lrp])})
+        lsp = idl.add_row('Logical_Switch_Port', type='router',
+                          options={'router-port': lrp.name})
+        ls = idl.add_row('Logical_Switch', name='switch-%d' % i,
+                         ports=[lsp])
+        lookups.append((lb.name, pool_key, ls))
+    return idl, lookups
+
+
+def run(args, count):
+    idl, lookups = build(count)
+    helper = ovn_driver.OvnProviderHelper()
+    helper.shutdown()
+    samples = [random.choice(lookups) for _ in range(args.lookups)]
+    results = []
+    for use_index in (False, True):
+        if use_index:
+            idl.indexes = indexes.IdlIndexes(
+                idl, indexes=indexes.OCTAVIA_PROVIDER_INDEXES,
+                gateway_load=False)
+        helper.ovn_nbdb_api = FakeNbApi(idl)
+        timings = []
+        for lookup in (lambda s: helper._find_ovn_lb_with_pool_key(s[1]),
+                       lambda s: helper._find_ovn_lb(s[0]),
+                       lambda s: helper._find_lr_of_ls(s[2])):
+            start = time.time()
+            for sample in samples:
+                assert lookup(sample) is not None
+            timings.append((time.time() - start) / len(samples) * 1e6)
+        results.append(timings)
+    print('%6d LBs  scan: pool %9.1f  name %9.1f  router %9.1f us  '
+          'index: pool %5.1f  name %5.1f  router %5.1f us' % (
+              (count,) + tuple(results[0]) + tuple(results[1])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lbs', default='100,1000,10000',
+                        help='Comma separated list of numbers of load '
+                             'balancers, each with a router')
+    parser.add_argument('--lookups', type=int, default=1000,
+                        help='Number of lookups of each kind')
+    args = parser.parse_args()
+
+    # The lookups do not go through the NB API built by the helper
+    ovn_driver.OvnProviderHelper.ovn_nbdb_api = FakeNbApi(FakeIdl())
+    for count in args.lbs.split(','):
+        run(args, int(count))
+
+
+if __name__ == '__main__':
+    main()
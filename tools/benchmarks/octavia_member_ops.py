@@ -0,0 +1,245 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Replay concurrent member operations against the OVN Octavia provider.
+
+A set of API clients concurrently creates the members of the pools of
+load balancers stored in a fake Northbound database, where every round
+trip takes --nb-latency milliseconds. The time for the provider driver to
+report the status of all the members to Octavia is measured for each
+number of request workers, along with the time the requests waited in the
+queues and the time they took to be processed. The members found in the
+pools at the end are checked, as concurrent updates of a load balancer
+would lose some of them.
+
+Usage: python tools/benchmarks/octavia_member_ops.py [--members 1000]
+"""
+
+import argparse
+import threading
+import time
+import uuid
+
+from octavia.api.drivers import data_models as o_datamodels
+from octavia.common import utils as o_utils
+from oslo_config import cfg
+
+from networking_ovn.common import utils as ovn_utils
+from networking_ovn.octavia import ovn_driver
+
+
+class FakeRow(object):
+    def __init__(self, **columns):
+        self.uuid = uuid.uuid4()
+        self.__dict__.update(columns)
+
+
+class FakeCommand(object):
+    def __init__(self, nb_api, apply=None, result=None):
+        self.nb_api = nb_api
+        self.apply = apply
+        self.result = result
+
+    def execute(self, check_error=False):
+        self.nb_api.round_trip([self])
+        return self.result
+
+
+class FakeTransaction(object):
+    def __init__(self, nb_api):
+        self.nb_api = nb_api
+        self.commands = []
+
+    def add(self, command):
+        self.commands.append(command)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, tb):
+        if not exc_type:
+            self.nb_api.round_trip(self.commands)
+
+
+class FakeNbApi(object):
+    """The Load_Balancer commands of the NB API over in-memory rows."""
+
+    # No IDL indexes, see octavia_lookups.py
+    idl = None
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.lbs = {}
+        self.switches = {}
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def round_trip(self, commands):
+        # The requests of the provider wait for the NB DB, the other
+        # threads of the provider keep running in the meantime
+        time.sleep(self.latency)
+        with self._lock:
+            self.round_trips += 1
+            for command in commands:
+                if command.apply:
+                    command.apply()
+
+    def _get_lb(self, lb_uuid):
+        return self.lbs[lb_uuid]
+
+    def transaction(self, check_error=False):
+        return FakeTransaction(self)
+
+    def db_list_rows(self, table):
+        return FakeCommand(self, result=list(self.lbs.values()))
+
+    def db_find(self, table, condition, row=False):
+        return FakeCommand(self, result=[lb for lb in self.lbs.values()
+                                         if lb.name == condition[2]])
+
+    def db_set(self, table, lb_uuid, column_value):
+        column, value = column_value
+
+        def apply():
+            lb = self._get_lb(lb_uuid)
+            if column == 'external_ids':
+                lb.external_ids = dict(lb.external_ids, **value)
+            else:
+                setattr(lb, column, dict(value))
+        return FakeCommand(self, apply=apply)
+
+    def db_clear(self, table, lb_uuid, column):
+        return FakeCommand(
+            self, apply=lambda: setattr(self._get_lb(lb_uuid), column, {}))
+
+    def ls_get(self, ls_name):
+        return FakeCommand(self, result=self.switches.get(ls_name))
+
+    def ls_lb_add(self, ls_uuid, lb_uuid, may_exist=False):
+        return FakeCommand(self)
+
+
+class FakeNetworkDriver(object):
+    def get_subnet(self, subnet_id):
+        return FakeRow(network_id=subnet_id)
+
+
+class FakeDriverLibrary(object):
+    """Record the member statuses reported to Octavia."""
+
+    def __init__(self, expected):
+        self.expected = expected
+        self.members = 0
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    def update_loadbalancer_status(self, status):
+        with self._lock:
+            self.members += len(status.get('members', []))
+            if self.members >= self.expected:
+                self.done.set()
+
+
+def build(args, nb_api):
+    pools = []
+    for i in range(args.lbs):
+        network_id = str(uuid.uuid4())
+        ls = FakeRow(name=ovn_utils.ovn_name(network_id))
+        nb_api.switches[ls.name] = ls
+        pool_id = str(uuid.uuid4())
+        pool_key = ovn_driver.LB_EXT_IDS_POOL_PREFIX + pool_id
+        listener_key = ovn_driver.LB_EXT_IDS_LISTENER_PREFIX + str(
+            uuid.uuid4())
+        lb = FakeRow(
+            name=str(uuid.uuid4()), protocol=['tcp'], vips={},
+            external_ids={ovn_driver.LB_EXT_IDS_VIP_KEY: '172.24.4.%d' % i,
+                          ovn_driver.LB_EXT_IDS_LS_REFS_KEY: '{}',
+                          pool_key: '', listener_key: '80:' + pool_key})
+        nb_api.lbs[lb.uuid] = lb
+        pools.append((lb, pool_key, pool_id, network_id))
+    return pools
+
+
+def run(args, workers):
+    cfg.CONF.set_override('octavia_provider_workers', workers, group='ovn')
+    nb_api = FakeNbApi(args.nb_latency / 1000.0)
+    pools = build(args, nb_api)
+    ovn_driver.OvnProviderHelper.ovn_nbdb_api = nb_api
+    driver = ovn_driver.OvnProviderDriver()
+    helper = driver._ovn_helper
+    driver_lib = FakeDriverLibrary(args.members)
+    helper._octavia_driver_lib = driver_lib
+
+    members = []
+    for i in range(args.members):
+        lb, pool_key, pool_id, network_id = pools[i % len(pools)]
+        members.append(o_datamodels.Member(
+            member_id=str(uuid.uuid4()), pool_id=pool_id,
+            address='10.%d.%d.%d' % (i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff),
+            protocol_port=80, subnet_id=network_id, admin_state_up=True))
+
+    def client(members):
+        for member in members:
+            driver.member_create(member)
+
+    clients = [threading.Thread(target=client,
+                                args=(members[i::args.clients],))
+               for i in range(args.clients)]
+    start = time.time()
+    for thread in clients:
+        thread.start()
+    finished = driver_lib.done.wait(args.timeout)
+    elapsed = time.time() - start
+    helper.shutdown()
+
+    lost = args.members - sum(
+        len([m for m in lb.external_ids[pool_key].split(',') if m])
+        for lb, pool_key, pool_id, network_id in pools)
+    stats = helper.get_stats()
+    queued = stats['%s_latency' % ovn_driver.QUEUE_LATENCY]
+    processed = stats['%s_latency' % ovn_driver.REQ_TYPE_MEMBER_CREATE]
+    print('%3d workers %6d members: %8.3f s %s %7.1f ops/s  %5d lost  '
+          'queued avg %6.3f s max %6.3f s  processed avg %6.3f s '
+          'max %6.3f s' % (
+              workers, args.members, elapsed,
+              ' ' if finished else '!', args.members / elapsed, lost,
+              queued['avg'], queued['max'], processed['avg'],
+              processed['max']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--members', type=int, default=1000,
+                        help='Number of members created')
+    parser.add_argument('--lbs', type=int, default=100,
+                        help='Number of load balancers the members are '
+                             'spread over')
+    parser.add_argument('--clients', type=int, default=50,
+                        help='Number of concurrent API clients')
+    parser.add_argument('--nb-latency', type=float, default=2.0,
+                        help='Duration of a round trip to the NB DB in '
+                             'milliseconds')
+    parser.add_argument('--workers', default='1,4,8,16',
+                        help='Comma separated list of numbers of request '
+                             'workers of the provider')
+    parser.add_argument('--timeout', type=float, default=600,
+                        help='Maximum time in seconds to wait for a run')
+    args = parser.parse_args()
+
+    # The subnets of the members are looked up in Neutron
+    o_utils.get_network_driver = FakeNetworkDriver
+    for workers in args.workers.split(','):
+        run(args, int(workers))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Migrate the Security Groups of a cloud from Address Sets to Port Groups.
+
+--ports ports spread over --networks networks belong to --sgs-per-port of
+--sgs security groups of --rules rules each, their ACLs are on the Logical
+Switches. The migration is run against a fake Northbound database which
+records the transactions, the way it used to be done, a few transactions
+holding the whole migration, and as OvnNbSynchronizer.migrate_to_port_groups()
+(networking_ovn/ovn_db_sync.py) does it now, in chunks. The number of
+transactions, the size of the largest one, in rows written, and the time
+taken by each step are reported.
+
+Usage: python tools/benchmarks/pg_migration.py [--ports 20000]
+"""
+
+import argparse
+import collections
+import contextlib
+import random
+import time
+import uuid
+
+from networking_ovn.common import acl as acl_utils
+from networking_ovn.common import config as ovn_config
+from networking_ovn.common import constants as ovn_const
+from networking_ovn.common import utils as ovn_utils
+from networking_ovn import ovn_db_sync
+
+
+class FakeCommand(object):
+    def __init__(self, size):
+        self.size = size
+
+
+class FakeTransaction(object):
+    def __init__(self):
+        self.size = 0
+
+    def add(self, command):
+        self.size += command.size
+
+
+class FakeNbApi(object):
+    """Records the size of the transactions, nothing is written."""
+
+    def __init__(self, address_sets, lswitches):
+        self.address_sets = address_sets
+        self.lswitches = lswitches
+        self.transactions = []
+
+    @contextlib.contextmanager
+    def transaction(self, check_error=False):
+        txn = FakeTransaction()
+        yield txn
+        self.transactions.append(txn.size)
+
+    def is_port_groups_supported(self):
+        return True
+
+    def get_address_sets(self):
+        return self.address_sets
+
+    def get_port_group(self, pg_name):
+        return None
+
+    def get_lswitch(self, lswitch_name):
+        return self.lswitches.get(lswitch_name)
+
+    def pg_add(self, *args, **kwargs):
+        return FakeCommand(1)
+
+    def pg_acl_add(self, **columns):
+        return FakeCommand(1)
+
+    def pg_add_ports(self, pg_name, lsp):
+        return FakeCommand(len(lsp) if isinstance(lsp, list) else 1)
+
+    def update_address_set_ext_ids(self, name, external_ids):
+        return FakeCommand(1)
+
+    def delete_address_set(self, name):
+        return FakeCommand(1)
+
+    def acl_del(self, lswitch_name):
+        return FakeCommand(len(self.lswitches[lswitch_name].acls))
+
+    def db_remove(self, table, record, column, *values, **kwargs):
+        return FakeCommand(len(values))
+
+
+class FakePlugin(object):
+    def __init__(self, ports, sgs, networks):
+        self.ports = ports
+        self.ports_by_id = {port['id']: port for port in ports}
+        self.sgs = sgs
+        self.sgs_by_id = {sg['id']: sg for sg in sgs}
+        self.networks = networks
+        self.bindings = collections.defaultdict(list)
+        for port in ports:
+            for sg_id in port['security_groups']:
+                self.bindings[sg_id].append({'port_id': port['id']})
+
+    def get_ports(self, context, filters=None, sorts=None, limit=None,
+                  marker=None):
+        if filters:
+            return [self.ports_by_id[port_id] for port_id in filters['id']]
+        if limit is None:
+            return list(self.ports)
+        start = 0
+        if marker is not None:
+            start = self.ports.index(self.ports_by_id[marker]) + 1
+        return self.ports[start:start + limit]
+
+    def _get_port_security_group_bindings(self, context, filters):
+        return self.bindings[filters['security_group_id'][0]]
+
+    def get_security_groups(self, context, filters=None, fields=None):
+        if filters:
+            return [self.sgs_by_id[sg_id] for sg_id in filters['id']
+                    if sg_id in self.sgs_by_id]
+        return self.sgs
+
+    def get_networks(self, context, fields=None):
+        return self.networks
+
+
+class FakeSynchronizer(ovn_db_sync.OvnNbSynchronizer):
+    def __init__(self, core_plugin, ovn_api):
+        self.core_plugin = core_plugin
+        self.ovn_api = ovn_api
+
+
+def legacy_migrate_to_port_groups(self, ctx):
+    steps = []
+
+    def step(name, func, *args):
+        del self.ovn_api.transactions[:]
+        start = time.time()
+        func(*args)
+        steps.append((name, time.time() - start,
+                      len(self.ovn_api.transactions),
+                      max(self.ovn_api.transactions)))
+
+    def create_default_drop_port_group(db_ports):
+        with self.ovn_api.transaction(check_error=True) as txn:
+            pg_name = ovn_const.OVN_DROP_PORT_GROUP_NAME
+            txn.add(self.ovn_api.pg_add(pg_name, acls=[]))
+            for acl in acl_utils.add_acls_for_drop_port_group(pg_name):
+                txn.add(self.ovn_api.pg_acl_add(**acl))
+            txn.add(self.ovn_api.pg_add_ports(
+                pg_name, [port['id'] for port in db_ports]))
+
+    def create_sg_port_groups_and_acls(db_ports):
+        with self.ovn_api.transaction(check_error=True) as txn:
+            for sg in self.core_plugin.get_security_groups(ctx):
+                pg_name = ovn_utils.ovn_port_group_name(sg['id'])
+                txn.add(self.ovn_api.pg_add(name=pg_name, acls=[]))
+                acl_utils.add_acls_for_sg_port_group(self.ovn_api, sg, txn)
+            for port in db_ports:
+                for sg in port['security_groups']:
+                    txn.add(self.ovn_api.pg_add_ports(
+                        ovn_utils.ovn_port_group_name(sg), port['id']))
+
+    def delete_address_sets():
+        with self.ovn_api.transaction(check_error=True) as txn:
+            for sg in self.core_plugin.get_security_groups(ctx):
+                for ip_version in ['ip4', 'ip6']:
+                    txn.add(self.ovn_api.delete_address_set(
+                        ovn_utils.ovn_addrset_name(sg['id'], ip_version)))
+
+    def delete_acls_from_lswitches():
+        with self.ovn_api.transaction(check_error=True) as txn:
+            for net in self.core_plugin.get_networks(ctx):
+                txn.add(self.ovn_api.acl_del(ovn_utils.ovn_name(net['id'])))
+
+    db_ports = [port for port in self.core_plugin.get_ports(ctx)
+                if self._is_port_in_port_groups(port)]
+    step('drop_port_group', create_default_drop_port_group, db_ports)
+    step('port_groups', create_sg_port_groups_and_acls, db_ports)
+    step('address_sets', delete_address_sets)
+    step('lswitch_acls', delete_acls_from_lswitches)
+    return steps
+
+
+def build_rule(sg_id, i):
+    return {'id': str(uuid.uuid4()), 'revision_number': 1,
+            'security_group_id': sg_id,
+            'direction': 'ingress' if i % 2 else 'egress',
+            'ethertype': 'IPv4', 'remote_group_id': None,
+            'remote_ip_prefix': '10.%d.0.0/16' % (i % 256),
+            'protocol': 'tcp', 'port_range_min': 1000 + i,
+            'port_range_max': 1000 + i}
+
+
+def build(args):
+    sgs = []
+    for i in range(args.sgs):
+        sg_id = str(uuid.uuid4())
+        sgs.append({'id': sg_id, 'security_group_rules': [
+            build_rule(sg_id, j) for j in range(args.rules)]})
+    networks = [{'id': str(uuid.uuid4())} for i in range(args.networks)]
+    ports = sorted(
+        [{'id': str(uuid.uuid4()),
+          'network_id': networks[i % args.networks]['id'],
+          'device_owner': 'compute:nova', 'port_security_enabled': True,
+          'security_groups': [sg['id'] for sg in random.sample(
+              sgs, args.sgs_per_port)]}
+         for i in range(args.ports)], key=lambda port: port['id'])
+
+    # The ACLs of the rules of the security groups of each port, plus the
+    # ones dropping all the traffic of the port
+    num_acls = collections.Counter()
+    for port in ports:
+        num_acls[port['network_id']] += 2 + args.rules * args.sgs_per_port
+    lswitches = {}
+    for net in networks:
+        lswitch = type('FakeLSwitch', (object,), {})()
+        lswitch.name = ovn_utils.ovn_name(net['id'])
+        lswitch.acls = [type('FakeACL', (object,), {'uuid': uuid.uuid4()})()
+                        for i in range(num_acls[net['id']])]
+        lswitches[lswitch.name] = lswitch
+    address_sets = {}
+    for sg in sgs:
+        for ip_version in ('ip4', 'ip6'):
+            address_sets[ovn_utils.ovn_addrset_name(sg['id'], ip_version)] = {
+                'external_ids': {ovn_const.OVN_SG_EXT_ID_KEY: sg['id']}}
+    return FakePlugin(ports, sgs, networks), address_sets, lswitches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ports', type=int, default=20000,
+                        help='Number of ports')
+    parser.add_argument('--networks', type=int, default=10,
+                        help='Number of networks the ports are spread over')
+    parser.add_argument('--sgs', type=int, default=500,
+                        help='Number of security groups')
+    parser.add_argument('--rules', type=int, default=10,
+                        help='Number of rules per security group')
+    parser.add_argument('--sgs-per-port', type=int, default=2,
+                        help='Number of security groups of each port')
+    args = parser.parse_args()
+
+    random.seed(0)
+    plugin, address_sets, lswitches = build(args)
+    print('%d ports over %d networks, %d security groups, %d ACLs, '
+          'transaction chunk size %d' % (
+              args.ports, args.networks, args.sgs,
+              sum(len(ls.acls) for ls in lswitches.values()),
+              ovn_config.get_ovn_txn_chunk_size()))
+
+    nb_api = FakeNbApi(address_sets, lswitches)
+    synchronizer = FakeSynchronizer(plugin, nb_api)
+    print('single transaction per step:')
+    for name, elapsed, txns, largest in legacy_migrate_to_port_groups(
+            synchronizer, None):
+        print('  %-18s %8.3f s, %5d transactions, largest %7d rows' % (
+            name, elapsed, txns, largest))
+
+    del nb_api.transactions[:]
+    print('chunked:')
+    for step in synchronizer.migrate_to_port_groups(None):
+        print('  %-18s %8.3f s, %5d transactions, largest %7d rows' % (
+            step.name, step.time, step.transactions,
+            max(nb_api.transactions[:step.transactions])))
+        del nb_api.transactions[:step.transactions]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Build the ACLs of the security group rules of many ports.
+
+Without Port Groups, the ACLs of every rule of the security groups of a
+port are built for each port, as the DB sync does for all the ports. The
+time taken is measured with the rules as loaded from Neutron, whose match
+is compiled once per rule (networking_ovn/common/acl.py), and without
+their revision number, which compiles the match of a rule for each port.
+
+Usage: python tools/benchmarks/sg_rule_matches.py [--ports 10000]
+"""
+
+import argparse
+import random
+import time
+import uuid
+
+from networking_ovn.common import acl as acl_utils
+
+
+def build_rule(sg_id, sg_ids, i):
+    rule = {'id': str(uuid.uuid4()), 'revision_number': 1,
+            'security_group_id': sg_id,
+            'direction': random.choice(('ingress', 'egress')),
+            'ethertype': random.choice(('IPv4', 'IPv6')),
+            'remote_group_id': None, 'remote_ip_prefix': None,
+            'protocol': random.choice(('tcp', 'udp', 'icmp', '6', None)),
+            'port_range_min': None, 'port_range_max': None}
+    if rule['protocol'] in ('tcp', 'udp', '6'):
+        rule['port_range_min'] = 1000 + i
+        rule['port_range_max'] = 1000 + i + random.choice((0, 100))
+    if i % 3 == 0:
+        rule['remote_group_id'] = random.choice(sg_ids)
+    elif i % 3 == 1:
+        rule['remote_ip_prefix'] = (
+            '10.%d.0.0/16' % i if rule['ethertype'] == 'IPv4' else
+            'fd00:%x::/64' % i)
+    return rule
+
+
+def build(args):
+    sg_ids = [str(uuid.uuid4()) for i in range(args.sgs)]
+    sg_rules = {sg_id: [build_rule(sg_id, sg_ids, i)
+                        for i in range(args.rules)]
+                for sg_id in sg_ids}
+    ports = [{'id': str(uuid.uuid4()), 'network_id': str(uuid.uuid4()),
+              'security_groups': random.sample(sg_ids, args.sgs_per_port)}
+             for i in range(args.ports)]
+    return ports, sg_rules
+
+
+def build_acls(ports, sg_rules):
+    start = time.time()
+    num_acls = 0
+    for port in ports:
+        for sg_id in port['security_groups']:
+            for r in sg_rules[sg_id]:
+                acl_utils._add_sg_rule_acl_for_port(port, r)
+                num_acls += 1
+    return time.time() - start, num_acls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ports', type=int, default=10000,
+                        help='Number of ports')
+    parser.add_argument('--sgs', type=int, default=100,
+                        help='Number of security groups')
+    parser.add_argument('--rules', type=int, default=20,
+                        help='Number of rules per security group')
+    parser.add_argument('--sgs-per-port', type=int, default=3,
+                        help='Number of security groups of each port')
+    args = parser.parse_args()
+
+    random.seed(0)
+    ports, sg_rules = build(args)
+    compiled, num_acls = build_acls(ports, sg_rules)
+
+    for rules in sg_rules.values():
+        for r in rules:
+            del r['revision_number']
+    uncached, num_acls = build_acls(ports, sg_rules)
+    print('%d ACLs of %d rules for %d ports: compiled once per rule '
+          '%.3f s, once per port %.3f s' % (
+              num_acls, args.sgs * args.rules, args.ports, compiled,
+              uncached))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Add and delete a rule of a security group without Port Groups.
+
+A security group has --ports member ports spread over --networks Logical
+Switches, each port holding the ACLs of --rules other rules. A rule is
+added to the security group and deleted again through
+update_acls_for_security_group() (networking_ovn/common/acl.py), the way
+it used to be done, loading all the ports at once and updating their ACLs
+in a single transaction whose deletions scan the ACLs of the switches, and
+chunked, looking the ACLs to delete up in the ACL index of the IDL
+(networking_ovn/ovsdb/indexes.py). The time taken, the number of
+transactions and the size of the largest one are reported.
+
+Usage: python tools/benchmarks/sg_rule_update.py [--ports 20000]
+"""
+
+import argparse
+import random
+import time
+import uuid
+
+from networking_ovn.common import acl as acl_utils
+from networking_ovn.common import config as ovn_config
+from networking_ovn.common import utils as ovn_utils
+from networking_ovn.ovsdb import impl_idl_ovn
+from networking_ovn.ovsdb import indexes
+
+
+class FakeTable(object):
+    def __init__(self, name, columns=(), refs=None):
+        self.name = name
+        self.columns = dict.fromkeys(columns)
+        self.refs = refs or {}
+        self.rows = {}
+
+
+class FakeRow(object):
+    def __init__(self, table, **columns):
+        self.uuid = uuid.uuid4()
+        self._table = table
+        self._deleted = set()
+        self.__dict__.update(columns)
+        table.rows[self.uuid] = self
+
+    def delete(self):
+        del self._table.rows[self.uuid]
+
+    def addvalue(self, column, value):
+        getattr(self, column).append(self._table.refs[column].rows[value])
+
+    def delvalue(self, column, value):
+        # Applied by compact(), as the IDL does once the transaction is
+        # committed
+        self._deleted.add(value.uuid)
+
+    def compact(self, column):
+        setattr(self, column, [row for row in getattr(self, column)
+                               if row.uuid not in self._deleted])
+        self._deleted.clear()
+
+
+class FakeIdl(object):
+    def __init__(self):
+        acl_table = FakeTable('ACL', ('match', 'direction', 'priority',
+                                      'action', 'log', 'name', 'severity',
+                                      'external_ids'))
+        self.tables = {
+            'ACL': acl_table,
+            'Logical_Switch': FakeTable('Logical_Switch', ('name', 'acls'),
+                                        refs={'acls': acl_table})}
+
+
+class FakeTransaction(object):
+    def __init__(self, idl):
+        self.idl = idl
+
+    def insert(self, table):
+        return FakeRow(self.idl.tables[table.name])
+
+
+class FakeCommand(object):
+    def __init__(self, api, command):
+        self.api = api
+        self.command = command
+
+    def execute(self, check_error=False):
+        self.command.run_idl(FakeTransaction(self.api.idl))
+        # One ACL added or deleted per port
+        self.api.transactions.append(len(self.command.acl_new_values_dict))
+
+
+class FakeNbApi(impl_idl_ovn.OvsdbNbOvnIdl):
+    """The ACL updates of the NB API over in-memory rows."""
+
+    idl = None
+
+    def __init__(self, idl):
+        self.idl = idl
+        self.transactions = []
+
+    def update_acls(self, *args, **kwargs):
+        return FakeCommand(self, super(FakeNbApi, self).update_acls(
+            *args, **kwargs))
+
+
+class FakePlugin(object):
+    def __init__(self, ports):
+        self.ports = {port['id']: port for port in ports}
+        self.loaded = 0
+
+    def get_ports(self, context, filters):
+        ports = [self.ports[port_id] for port_id in filters['id']]
+        self.loaded = max(self.loaded, len(ports))
+        return ports
+
+
+def legacy_update_acls_for_security_group(plugin, admin_context, ovn,
+                                          security_group_id,
+                                          security_group_rule,
+                                          sg_ports_cache=None,
+                                          is_add_acl=True):
+    sg_ports = sg_ports_cache[security_group_id]
+    sg_port_ids = list(set([binding['port_id'] for binding in sg_ports]))
+    port_list = plugin.get_ports(admin_context, filters={'id': sg_port_ids})
+    acl_new_values_dict = {}
+    for port in port_list:
+        acl = acl_utils._add_sg_rule_acl_for_port(port, security_group_rule)
+        acl.pop('lport')
+        acl.pop('lswitch')
+        acl_new_values_dict[port['id']] = acl
+    lswitch_names = set([p['network_id'] for p in port_list])
+    ovn.update_acls(list(lswitch_names), iter(port_list),
+                    acl_new_values_dict, need_compare=False,
+                    is_add_acl=is_add_acl).execute(check_error=True)
+
+
+def build_rule(sg_id, i):
+    return {'id': str(uuid.uuid4()), 'revision_number': 1,
+            'security_group_id': sg_id,
+            'direction': 'ingress' if i % 2 else 'egress',
+            'ethertype': 'IPv4', 'remote_group_id': None,
+            'remote_ip_prefix': '10.%d.0.0/16' % (i % 256),
+            'protocol': 'tcp', 'port_range_min': 1000 + i,
+            'port_range_max': 1000 + i}
+
+
+def build(args, idl):
+    sg_id = str(uuid.uuid4())
+    acl_table = idl.tables['ACL']
+    lswitches = {}
+    ports = []
+    for i in range(args.ports):
+        if i < args.networks:
+            network_id = str(uuid.uuid4())
+            lswitches[ovn_utils.ovn_name(network_id)] = FakeRow(
+                idl.tables['Logical_Switch'],
+                name=ovn_utils.ovn_name(network_id), acls=[])
+        else:
+            network_id = ports[i % args.networks]['network_id']
+        ports.append({'id': str(uuid.uuid4()), 'network_id': network_id,
+                      'security_groups': [sg_id], 'fixed_ips': [],
+                      'device_owner': 'compute:nova'})
+    for j in range(args.rules):
+        rule = build_rule(sg_id, j)
+        for port in ports:
+            acl = acl_utils._add_sg_rule_acl_for_port(port, rule)
+            del acl['lport']
+            lswitch = lswitches[acl.pop('lswitch')]
+            lswitch.acls.append(FakeRow(acl_table, **acl))
+    for lswitch in lswitches.values():
+        random.shuffle(lswitch.acls)
+    sg_ports_cache = {sg_id: [{'port_id': port['id']} for port in ports]}
+    return sg_id, ports, sg_ports_cache
+
+
+def run(func, ports, sg_id, rule, sg_ports_cache, idl, with_index):
+    nb_api = FakeNbApi(idl)
+    plugin = FakePlugin(ports)
+    results = []
+    for is_add_acl in (True, False):
+        # The index of the IDL is kept current by its notifications,
+        # rebuild it with the ACLs added by the previous run
+        if with_index:
+            idl.indexes = indexes.IdlIndexes(idl)
+        elif hasattr(idl, 'indexes'):
+            del idl.indexes
+        del nb_api.transactions[:]
+        start = time.time()
+        func(plugin, None, nb_api, sg_id, rule,
+             sg_ports_cache=sg_ports_cache, is_add_acl=is_add_acl)
+        results.append((time.time() - start, len(nb_api.transactions),
+                        max(nb_api.transactions)))
+        for lswitch in idl.tables['Logical_Switch'].rows.values():
+            lswitch.compact('acls')
+    return results, plugin.loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ports', type=int, default=20000,
+                        help='Number of ports of the security group')
+    parser.add_argument('--rules', type=int, default=10,
+                        help='Number of the other rules of the group')
+    parser.add_argument('--networks', type=int, default=10,
+                        help='Number of networks the ports are spread over')
+    args = parser.parse_args()
+
+    random.seed(0)
+    acl_utils.is_sg_enabled = lambda: True
+    idl = FakeIdl()
+    sg_id, ports, sg_ports_cache = build(args, idl)
+    rule = build_rule(sg_id, args.rules)
+    print('%d ports over %d networks, %d ACLs, %d ports per chunk' % (
+        args.ports, args.networks, len(idl.tables['ACL'].rows),
+        ovn_config.get_ovn_txn_chunk_size()))
+
+    for label, func, with_index in (
+            ('single transaction, switch scan',
+             legacy_update_acls_for_security_group, False),
+            ('chunked, ACL index',
+             acl_utils.update_acls_for_security_group, True)):
+        results, loaded = run(func, ports, sg_id, rule, sg_ports_cache, idl,
+                              with_index)
+        print('%s, up to %d ports loaded at once:' % (label, loaded))
+        for action, result in zip(('add', 'delete'), results):
+            elapsed, txns, largest = result
+            print('  %-6s %8.3f s, %5d transactions, largest %6d ACLs' % (
+                action, elapsed, txns, largest))
+
+
+if __name__ == '__main__':
+    main()